@@ -1,9 +1,46 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+from dataclasses import replace
+
+from vita_model.data import (
+    MESES, DATA, BASE,
+    BASE_REVENUE, BASE_GASTOS, BASE_COGS, BASE_PERSONAL, BASE_MARKETING, BASE_ADMIN,
+    BASE_TAX, BASE_BANKING, BASE_INVERSIONES, BASE_OP_MARGIN, BASE_GROSS_MARGIN,
+    BASE_GTV_B2B, BASE_GTV_B2C,
+    AVG_CHURN_B2B_SAFE, BASE_ARPU_PAYOUTS_B2B, BASE_MRR_B2B, BASE_CLTV_B2B, BASE_ARR_B2B,
+    BASE_LTV_CAC, BASE_ARPU_TOTAL_B2B, CROSS_SELL_UPSIDE,
+)
+from vita_model.scenario import ScenarioInputs, DEFAULT_ASSUMPTIONS, evaluate, run_scenario
+from vita_model.graph import IncrementalGraph
+from vita_model.hiring import AREAS, AREA_MIX
+from vita_model.countries import COUNTRIES, LAUNCH_MONTHS
+from vita_model.metrics import SCENARIO_GRAPH
+from vita_model.projection import HORIZONS, LINE_LABELS
+from vita_model.curves import CURVE_FAMILIES, CURVE_LABELS, data_version, fit_history
+from vita_model.sensitivity import run_tornado
+from vita_model.goal_seek import GOAL_TARGETS, META_MULT_TOTAL, SLIDER_KEYS, goal_seek
+from vita_model.valuation import (DCF_YEARS, REV_MULTIPLES, VALUATION_DISTRIBUTIONS, VALUATION_MC_LABELS, VALUATION_METHODS,
+                                  dcf_grid, run_valuation, run_valuation_mc, valuation_inputs)
+from vita_model.cache import LRUCache, fingerprint
+from vita_model.cube import FIXED_FIELDS, CubeStore, scenario_outputs
+from vita_model.pareto import pareto_frontier
+from vita_model.rollout import ROLLOUT_CACHE, optimize_rollout
+from vita_model.liquidity import LIQUIDITY_LABELS, LIQUIDITY_PRODUCTS, SETTLEMENT, scenario_liquidity
+from vita_model.financing import COVENANTS, DEFAULT_TERMS, FINANCING_ROUTES, scenario_financing
+from vita_model.clients import AGENT_MONTHS, AGENT_PATHS, TIER_LABELS, simulate_clients
+from vita_model.cohorts import COHORT_PATHS, book_activity, cohort_analysis
+from vita_model.elasticity import FIT_MIN_R2, TAKE_FIT, TAKE_OBJECTIVES, take_rate_curve
+from vita_model.exchange import EXCHANGE_BUCKETS, EXCHANGE_FIT, EXCHANGE_SEGMENTS, EXCHANGE_SIDES
+from vita_model.forwards import DEFAULT_FWD_TERMS, FWD_MONTHS, FWD_PATHS, FWD_SCENARIOS, simulate_forwards
+from vita_model.card import CARD_CURRENCIES, CARD_MCC, DEFAULT_CARD_TERMS, simulate_card
+from vita_model.payins import (NEW_LEADS, ONBOARDING_MONTHS, PAYINS_PATHS, PAYINS_PIPELINE, price_points,
+                               project_payins, required_leads, scale_curve)
+from vita_model.montecarlo import MC_DISTRIBUTIONS, MC_LABELS, PERCENTILES, run_monte_carlo
 
 # ══════════════════════════════════════════════════════════════
 # CONFIG & THEME
@@ -324,175 +361,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ══════════════════════════════════════════════════════════════
-# DATA
-# ══════════════════════════════════════════════════════════════
-MESES = ['Mes 1', 'Mes 2', 'Mes 3', 'Mes 4']
-
-DATA = {
-    'revenue': [352978, 381724, 478609, 360467],
-    'gastos': [290432, 290152, 384939, 320474],
-    'cash': [2688667, 2595101, 3085277, 3231872],
-    'headcount': [61, 61, 57, 58],
-    # Revenue por línea (corregido del Excel)
-    'rev_payouts_b2b': [281711, 303602, 389162, 264741],
-    'rev_payouts_b2c': [37080, 38996, 37543, 39851],
-    'rev_exchange': [34187, 39127, 50359, 49232],
-    'rev_payins_b2b': [0, 0, 1546, 6643],
-    # Desglose Exchange B2B/B2C (nuevo)
-    'rev_exchange_b2b': [28728, 32743, 45880, 42976],
-    'rev_exchange_b2c': [5458, 6384, 4479, 6256],
-    # GTV (corregido del Excel)
-    'gtv_payouts_b2b': [40186000, 48461200, 69585000, 47906000],
-    'gtv_payouts_b2c': [2495976, 2893301, 2862897, 3088382],
-    'gtv_payins_b2b': [0, 0, 129426, 485049],
-    'gtv_payouts_total': [42682044, 51354673, 72448634, 50994350],
-    # Volúmenes Exchange (nuevo del Excel)
-    'vol_exchange_ventas_b2b': [37990879, 46551246, 67119333, 47790270],
-    'vol_exchange_compras_b2b': [7955534, 6210183, 3513810, 4708377],
-    'vol_exchange_ventas_b2c': [543235, 690050, 908847, 725178],
-    'vol_exchange_compras_b2c': [1089656, 2147553, 1175741, 1270818],
-    # Take rates (corregido)
-    'take_payouts_b2b': [0.70, 0.63, 0.56, 0.55],
-    'take_payouts_b2c': [1.49, 1.35, 1.31, 1.29],
-    'take_payins_b2b': [0, 0, 1.19, 1.37],
-    # CAC y LTV
-    'cac_b2b': [684, 967, 2646, 999],
-    'cac_b2c': [11.97, 12.23, 20.14, 15.37],
-    'ltv_b2b': [30861, 30807, 39520, 37165],
-    'ltv_b2c': [921, 727, 563, 728],
-    # Churn y otros
-    'churn_b2b': [2.64, -1.30, 1.00, 1.45],
-    'churn_b2c': [1.23, 1.15, 0.92, 1.11],
-    'cogs': [116992, 78264, 130868, 77290],
-    'personal': [94540, 93089, 88344, 106514],
-    'marketing': [14622, 46821, 93867, 56772],
-    'admin': [33401, 26839, 26392, 28806],
-    'tax': [23265, 24522, 29269, 26290],
-    'banking': [5275, 20214, 15938, 17454],
-    'inversiones': [2337, 403, 261, 7348],
-    'tx_rejected': [1387, 2788, 2734, 2245],
-    'b2b_users_est': [323, 342, 353, 396],
-    # Avg GTV per User B2B (del Excel)
-    'avg_gtv_user_b2b': [124415.07, 141699.92, 197126.73, 120974.67],
-}
-
-# Derived
-DATA['op_margin'] = [(r-g)/r*100 for r,g in zip(DATA['revenue'], DATA['gastos'])]
-DATA['gross_margin'] = [(r-c)/r*100 for r,c in zip(DATA['revenue'], DATA['cogs'])]
-DATA['rev_per_emp'] = [r/h for r,h in zip(DATA['revenue'], DATA['headcount'])]
-DATA['mktg_efficiency'] = [r/m for r,m in zip(DATA['revenue'], DATA['marketing'])]
-
-# ARPU B2B Total = (Payouts B2B + Exchange B2B + Payins B2B) / Usuarios B2B
-DATA['arpu_b2b_total'] = [
-    (DATA['rev_payouts_b2b'][i] + DATA['rev_exchange_b2b'][i] + DATA['rev_payins_b2b'][i]) / DATA['b2b_users_est'][i]
-    for i in range(4)
-]
-
-# CAC Payback usa ARPU total B2B, no solo Payouts
-DATA['cac_payback_b2b'] = [c/a if a>0 else 0 for c,a in zip(DATA['cac_b2b'], DATA['arpu_b2b_total'])]
-DATA['eff_take_rate'] = [r/(gb+gc+pi)*100 if (gb+gc+pi)>0 else 0 for r,gb,gc,pi in zip(DATA['revenue'], DATA['gtv_payouts_b2b'], DATA['gtv_payouts_b2c'], DATA['gtv_payins_b2b'])]
-
-# ══════════════════════════════════════════════════════════════
-# BASE = Promedio M1-M4 (run-rate representativo)
-# ══════════════════════════════════════════════════════════════
-BASE = {}
-for key, vals in DATA.items():
-    if isinstance(vals, list) and len(vals) == 4:
-        BASE[key] = sum(vals) / 4
-
-# Excepción: Payins B2B usa M4 (producto nuevo, M1-M2 son $0)
-BASE['rev_payins_b2b'] = DATA['rev_payins_b2b'][3]  # $6,744
-
-# Promedios clave para referencia rápida
-BASE_REVENUE = BASE['revenue']              # ~$393,444
-BASE_GASTOS = BASE['gastos']                # ~$321,499
-BASE_COGS = BASE['cogs']                    # ~$100,854
-BASE_PERSONAL = BASE['personal']            # ~$95,622
-BASE_MARKETING = BASE['marketing']          # ~$53,020
-BASE_ADMIN = BASE['admin']                  # ~$28,860
-BASE_TAX = BASE['tax']                      # ~$25,837
-BASE_BANKING = BASE['banking']              # ~$14,720
-BASE_INVERSIONES = BASE['inversiones']      # ~$2,587
-BASE_HEADCOUNT = BASE['headcount']          # ~59.25
-BASE_OP_MARGIN = (BASE_REVENUE - BASE_GASTOS) / BASE_REVENUE * 100  # ~18.3%
-BASE_GROSS_MARGIN = (BASE_REVENUE - BASE_COGS) / BASE_REVENUE * 100  # ~74.4%
-
-# GTV promedios
-BASE_GTV_B2B = BASE['gtv_payouts_b2b']      # ~$51.5M
-BASE_GTV_B2C = BASE['gtv_payouts_b2c']      # ~$2.4M
-BASE_GTV_PAYINS = BASE['gtv_payins_b2b']    # ~$256K (solo M3-M4)
-
-# ══════════════════════════════════════════════════════════════
-# CLIENTES B2B Y MÉTRICAS POR USUARIO
-# ══════════════════════════════════════════════════════════════
-
-# Usuarios B2B activos por mes (ya existe en DATA como b2b_users_est)
-DATA['users_b2b'] = DATA['b2b_users_est']  # [323, 342, 353, 396]
-
-# avg_gtv_user_b2b ya viene del Excel en DATA, no se recalcula
-
-# Revenue por cliente B2B por línea de negocio
-DATA['rev_per_user_payouts_b2b'] = [
-    DATA['rev_payouts_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
-    for i in range(4)
-]
-DATA['rev_per_user_exchange_b2b'] = [
-    DATA['rev_exchange_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
-    for i in range(4)
-]
-DATA['rev_per_user_payins_b2b'] = [
-    DATA['rev_payins_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
-    for i in range(4)
-]
-DATA['rev_per_user_total_b2b'] = [
-    DATA['rev_per_user_payouts_b2b'][i] +
-    DATA['rev_per_user_exchange_b2b'][i] +
-    DATA['rev_per_user_payins_b2b'][i]
-    for i in range(4)
-]
-
-# Take rate efectivo por usuario B2B
-DATA['take_rate_per_user_b2b'] = [
-    (DATA['rev_per_user_total_b2b'][i] / DATA['avg_gtv_user_b2b'][i] * 100)
-    if DATA['avg_gtv_user_b2b'][i] > 0 else 0
-    for i in range(4)
-]
-
-# Promedios para BASE
-BASE['users_b2b'] = sum(DATA['users_b2b']) / 4                              # ~353.5
-BASE['avg_gtv_user_b2b'] = sum(DATA['avg_gtv_user_b2b']) / 4                # ~$146,054
-BASE['rev_per_user_total_b2b'] = sum(DATA['rev_per_user_total_b2b']) / 4
-BASE['rev_per_user_payouts_b2b'] = sum(DATA['rev_per_user_payouts_b2b']) / 4
-BASE['rev_per_user_exchange_b2b'] = sum(DATA['rev_per_user_exchange_b2b']) / 4
-BASE['rev_per_user_payins_b2b'] = sum(DATA['rev_per_user_payins_b2b']) / 4
-BASE['take_rate_per_user_b2b'] = sum(DATA['take_rate_per_user_b2b']) / 4
-BASE['arpu_b2b_total'] = sum(DATA['arpu_b2b_total']) / 4
-
-# Churn promedio B2B - usar los 4 meses (Vita tiene 6 años, M1 no es onboarding)
-# Datos: [2.64%, -1.30%, 1.00%, 1.45%] → promedio = 0.95%
-# M2 negativo (-1.30%) = expansión neta, se incluye como está (no usar abs())
-AVG_CHURN_B2B = sum(DATA['churn_b2b']) / 4 / 100  # promedio M1-M4 como decimal = 0.0095
-# Para cálculos de CLTV, usar valor seguro (mínimo 0.5% para evitar división por cero)
-AVG_CHURN_B2B_SAFE = max(0.005, AVG_CHURN_B2B)  # = 0.0095 (0.95%)
-
-# ARPU B2B — SOLO PAYOUTS (consistente con base de clientes derivada de Payouts)
-# Exchange y Payins son oportunidad de cross-sell, no se incluyen en cálculo base
-BASE_ARPU_PAYOUTS_B2B = np.mean([DATA['rev_payouts_b2b'][i] / DATA['b2b_users_est'][i] for i in range(4)])  # ~$872
-
-# CLTV y MRR B2B — usando ARPU solo Payouts
-BASE_MRR_B2B = BASE['users_b2b'] * BASE_ARPU_PAYOUTS_B2B  # ~$308K
-BASE_CLTV_B2B = BASE_ARPU_PAYOUTS_B2B / AVG_CHURN_B2B_SAFE if AVG_CHURN_B2B_SAFE > 0 else 0  # ~$92K
-BASE_ARR_B2B = BASE_MRR_B2B * 12  # ~$3.7M
-
-# CLTV/CAC ratio y LTV/CAC promedio
-AVG_CAC_B2B = sum(DATA['cac_b2b']) / 4  # ~$1,324
-BASE_LTV_CAC = BASE_CLTV_B2B / AVG_CAC_B2B if AVG_CAC_B2B > 0 else 0  # ~69x
-
-# ARPU total (para referencia de cross-sell upside)
-BASE_ARPU_TOTAL_B2B = BASE['rev_per_user_total_b2b']  # ~$994 (incluye Exchange + Payins)
-CROSS_SELL_UPSIDE = (BASE_ARPU_TOTAL_B2B / BASE_ARPU_PAYOUTS_B2B - 1) * 100  # ~14%
-
 # ══════════════════════════════════════════════════════════════
 # HELPERS
 # ══════════════════════════════════════════════════════════════
@@ -514,13 +382,15 @@ def format_k(v):
     elif abs(v) >= 1000: return f"${v/1000:.0f}K"
     else: return f"${v:,.0f}"
 
-def plotly_theme(fig, height=400):
-    fig.update_layout(
-        template="plotly_white",
+@st.cache_resource
+def register_plotly_theme():
+    # Tema Vita como template default de plotly, armado una vez por proceso: cada figura lo referencia en vez
+    # de copiar plotly_white y actualizar layout y ejes en cada rerun (era la mayor parte del tiempo del rerun)
+    template = go.layout.Template(pio.templates["plotly_white"])
+    template.layout.update(
         paper_bgcolor='rgba(255,255,255,0)',
         plot_bgcolor='rgba(255,255,255,0)',
         font=dict(family="Plus Jakarta Sans, sans-serif", color="#2D3748", size=16),
-        height=height,
         margin=dict(l=55, r=30, t=55, b=55),
         legend=dict(
             orientation="h",
@@ -534,10 +404,73 @@ def plotly_theme(fig, height=400):
             borderwidth=1
         ),
     )
-    fig.update_xaxes(gridcolor='#EDF2F7', linecolor='#E2E8F0', tickfont=dict(color='#4A5568', size=14), title_font=dict(size=14))
-    fig.update_yaxes(gridcolor='#EDF2F7', linecolor='#E2E8F0', tickfont=dict(color='#4A5568', size=14), title_font=dict(size=14))
+    axis = dict(gridcolor='#EDF2F7', linecolor='#E2E8F0', tickfont=dict(color='#4A5568', size=14), title_font=dict(size=14))
+    template.layout.xaxis.update(axis)
+    template.layout.yaxis.update(axis)
+    pio.templates["vita"] = template
+    pio.templates.default = "vita"
+
+register_plotly_theme()
+
+def plotly_theme(fig, height=400):
+    # Colores, fuentes, márgenes, leyenda y ejes vienen del template "vita" (register_plotly_theme)
+    fig.update_layout(height=height)
     return fig
 
+@st.cache_resource
+def scenario_cube_store():
+    # Cubo precalculado (python -m vita_model.cube): compartido por todas las sesiones, abierto con memmap
+    return CubeStore()
+
+@st.cache_data(show_spinner=False)
+def cached_forwards(clients, gtv_per_client, terms, n_paths, n_scenarios):
+    # Los ~10^5 contratos y la matriz contratos × escenarios no salen de la función: sólo percentiles
+    fwd = simulate_forwards(np.array(clients), gtv_per_client, terms, n_paths=n_paths, n_scenarios=n_scenarios)
+    return {
+        'months': fwd['months'],
+        'contracts': fwd['contracts'].mean(axis=0),
+        'revenue': np.percentile(fwd['revenue'], [10, 50, 90], axis=0),
+        'hedge_cost': np.median(fwd['hedge_cost'], axis=0),
+        'net': np.percentile(fwd['net'], [10, 50, 90], axis=0),
+        'open_contracts': float(fwd['open_contracts'].mean()),
+        'open_notional': float(np.median(fwd['open_notional'])),
+        'shocks': fwd['shocks'],
+        'margin_need': np.percentile(fwd['margin_need'], [50, 95], axis=0),
+        'credit_loss': np.percentile(fwd['credit_loss'], [50, 95], axis=0),
+        'random_loss': np.percentile(fwd['random_loss'], [95, 99]),
+        'n_contracts': fwd['n_contracts'],
+        'n_open': fwd['n_open'],
+        'elapsed_ms': fwd['elapsed_ms'],
+    }
+
+@st.cache_data(show_spinner=False)
+def cached_card(mult_b2c, gtv_b2c, terms):
+    # El flujo de transacciones se consume por bloques dentro de la función: sólo salen los agregados mensuales
+    return simulate_card(mult_b2c, gtv_b2c, terms)
+
+# Pasada del sidebar cacheada por inputs/supuestos: un rerun sin cambios del escenario (otra pestaña, otro
+# control) no vuelve a evaluar. Los argumentos con _ no entran en la clave: el grafo de la sesión recalcula
+# en un miss sólo lo que cambió, y la financiación usa el ScenarioResult de esos mismos inputs/supuestos
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_scenario(inputs, assumptions, horizon, _graph):
+    return run_scenario(inputs, assumptions, horizon=horizon, state=_graph)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_take_best(inputs, assumptions):
+    return take_rate_curve(inputs, assumptions)['best']
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def cached_financing(inputs, assumptions, terms, last_month, _scenario):
+    return scenario_financing(_scenario, terms, last_month=last_month)
+
+def forwards_book(result):
+    # Libro de forwards sobre la cartera B2B del escenario (clientes M5..M16 y GTV por cliente M16)
+    proj = result.trajectory
+    clients = proj.clients_b2b[proj.index(int(FWD_MONTHS[0])):proj.index(int(FWD_MONTHS[-1])) + 1]
+    gtv_per_client = result.gtv_b2b_m16 / result.clients_payouts if result.clients_payouts > 0 else 0.0
+    return cached_forwards(tuple(np.round(clients, 1).tolist()), round(float(gtv_per_client), 2), DEFAULT_FWD_TERMS,
+                           FWD_PATHS, FWD_SCENARIOS)
+
 # ══════════════════════════════════════════════════════════════
 # SIDEBAR - Scenario Builder Parameters (fixed, collapsible)
 # ══════════════════════════════════════════════════════════════
@@ -549,51 +482,36 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
+    # Los textos de feedback dependen del escenario completo: se reservan con
+    # st.empty() y se llenan después de correr el motor (ver más abajo).
+    ph_quick = st.empty()
+
     # ══════════════════════════════════════════════════════════════
     # PAYOUTS B2B — Clientes = f(take rate, países)
     # ══════════════════════════════════════════════════════════════
     st.markdown(f'<div style="font-size:0.75rem; color:{COLORS["muted"]}; margin-bottom:4px; font-weight:700;">PAYOUTS B2B</div>', unsafe_allow_html=True)
 
     take_b2b = st.slider("Take Rate Payouts B2B (%)", 0.30, 0.55, 0.50, 0.01, key="sb_tr_b2b",
-        help="M4: 0.55%. Bajar precio = más clientes. Dato: drop 0.70→0.55 generó 18 clientes/mes")
-
-    new_countries = st.slider("Nuevos Países", 0, 3, 3, 1, key="sb_countries",
-        help="Bolivia, Perú, España — cada país aporta ~50 clientes B2B/año")
-
-    clients_per_country = 50  # clientes B2B por país nuevo en 12 meses
-
-    # Ritmo orgánico: 15bp de baja = 18 clientes/mes (dato real M1-M4)
-    # Cada bp adicional de baja = 18/15 = 1.2 clientes/mes más
-    base_rate = 18  # clientes/mes con drop actual (0.70→0.55)
-    additional_drop_bp = max(0, (0.55 - take_b2b) * 100)  # bp adicionales
-    additional_rate = additional_drop_bp * (18 / 15)  # proporcional al dato real
-    monthly_client_rate = base_rate + additional_rate
-
-    # Clientes M16
-    organic_growth = int(monthly_client_rate * 12)
-    country_growth = new_countries * clients_per_country
-    clients_payouts = 396 + organic_growth + country_growth
-    clients_b2b_m16 = clients_payouts  # alias para compatibilidad
-
-    # Revenue
-    gtv_per_client_payouts = np.mean(DATA['avg_gtv_user_b2b'])
-    gtv_b2b_m16 = clients_payouts * gtv_per_client_payouts  # GTV total para COGS
-    rev_b2b_proj = clients_payouts * gtv_per_client_payouts * (take_b2b / 100)
-    arpu_b2b_m16 = rev_b2b_proj / clients_payouts if clients_payouts > 0 else 0
-    new_clients_b2b = clients_payouts - 396
-
-    # Feedback con tasa de crecimiento implícita
-    rebaja_text = f'+ {additional_rate:.0f} por rebaja' if additional_drop_bp > 0 else ''
-    paises_text = f'+ {country_growth} por {new_countries} países' if new_countries > 0 else ''
-    growth_pct_payouts = ((rev_b2b_proj / BASE['rev_payouts_b2b']) - 1) * 100 if BASE['rev_payouts_b2b'] > 0 else 0
-    growth_color = COLORS['success'] if growth_pct_payouts >= 50 else COLORS['warning']
-    st.markdown(f"""<div style="font-size:0.78rem; color:{COLORS['muted']}; line-height:1.6; background:#F7FAFC; padding:10px; border-radius:6px; margin-top:8px;">
-Ritmo: <b>{monthly_client_rate:.0f} cli/mes</b> ({base_rate} orgánico {rebaja_text}) {paises_text}<br>
-Clientes M16: <b>{clients_payouts:,}</b> → Revenue: <b>{format_k(rev_b2b_proj)}/mes</b><br>
-<span style="color:{growth_color}; font-weight:700;">Crecimiento implícito: +{growth_pct_payouts:.0f}%</span></div>""", unsafe_allow_html=True)
-
-    # Para compatibilidad con código existente
-    mult_b2b = gtv_b2b_m16 / BASE_GTV_B2B if BASE_GTV_B2B > 0 else 1
+        help=f"M4: 0.55%. Bajar precio = más clientes. "
+             f"{'Ajuste M1-M4 débil, se usa 18 / 15' if TAKE_FIT['acquisition']['fallback'] else 'Respuesta ajustada a M1-M4'}: "
+             f"{TAKE_FIT['acquisition']['clients_per_bp']:.2f} clientes/mes por bp de baja")
+
+    new_countries = st.slider("Nuevos Países", 0, len(COUNTRIES), 3, 1, key="sb_countries",
+        help="Se lanzan los primeros N del calendario: Bolivia, Perú, España (~50 clientes B2B c/u a M16), luego Ecuador y Brasil")
+
+    # Mes de lanzamiento por país (vita_model.countries); la búsqueda de calendario está en el Scenario Builder
+    with st.expander("🗓️ Calendario de países"):
+        country_launch = tuple(
+            np.inf if m is None else m
+            for m in (st.selectbox(c.name, LAUNCH_MONTHS.tolist() + [None], index=LAUNCH_MONTHS.tolist().index(c.launch),
+                                   format_func=lambda m: "No se lanza" if m is None else f"M{m}",
+                                   key=f"sb_launch_{c.name}") for c in COUNTRIES))
+        st.markdown(f"""<div style="font-size:0.72rem; color:{COLORS['muted']}; line-height:1.6;">
+            Se lanzan los {new_countries} primeros por mes. Captación con rampa lineal; admin desde el mes de lanzamiento.<br>
+            {'<br>'.join(f"{c.name}: desde M{c.earliest} · {c.clients * DEFAULT_ASSUMPTIONS.clients_per_country:.0f} clientes a M16 si lanza en M{c.launch} · admin ×{c.admin:.1f} · GTV ×{c.gtv:.1f}" for c in COUNTRIES)}
+        </div>""", unsafe_allow_html=True)
+
+    ph_payouts = st.empty()
     pct_from_clients = 60  # Default
 
     # ══════════════════════════════════════════════════════════════
@@ -608,40 +526,12 @@ Clientes M16: <b>{clients_payouts:,}</b> → Revenue: <b>{format_k(rev_b2b_proj)
     clients_payins_m16 = st.slider("Clientes Payins M16", 5, 100, 50, 5, key="sb_cli_pi",
         help="Target de clientes exportadores")
 
-    # Take rate se deriva de la escala: pocos = 1.37% (actual), muchos = 0.65%
-    # Curva logarítmica para que baje más rápido al principio
-    scale_factor = np.log(clients_payins_m16 / 2) / np.log(100 / 2)  # 0 at 2 clients, 1 at 100
-    scale_factor = min(1.0, max(0.0, scale_factor))
-    take_payins_derived = 1.37 - scale_factor * (1.37 - 0.65)
-
-    # GTV per Payins client (M4: $491K GTV / ~2 clientes = ~$250K/cliente)
-    avg_gtv_payins_client = 250000
-    gtv_payins_m16 = clients_payins_m16 * avg_gtv_payins_client
-    rev_payins_proj = gtv_payins_m16 * (take_payins_derived / 100)
-
-    growth_pct_payins = ((rev_payins_proj / BASE['rev_payins_b2b']) - 1) * 100 if BASE['rev_payins_b2b'] > 0 else 0
-    st.markdown(f"""<div style='background:#F7FAFC; padding:10px; border-radius:6px; font-size:0.8rem; margin-top:8px;'>
-Take Rate: <b>{take_payins_derived:.2f}%</b> | GTV: <b>{format_k(gtv_payins_m16)}</b> | Revenue: <b>{format_k(rev_payins_proj)}</b><br>
-<span style="color:{COLORS['success']}; font-weight:700;">Crecimiento: ×{rev_payins_proj/BASE['rev_payins_b2b']:.0f}</span></div>""", unsafe_allow_html=True)
-
-    # Para compatibilidad - calcular mult_payins equivalente
-    mult_payins = rev_payins_proj / BASE['rev_payins_b2b'] if BASE['rev_payins_b2b'] > 0 else 1
-    take_payins = take_payins_derived
-    clients_payins = clients_payins_m16  # alias para el resumen
+    ph_payins = st.empty()
 
     # ══════════════════════════════════════════════════════════════
     # RESUMEN TOTAL B2B
     # ══════════════════════════════════════════════════════════════
-    total_b2b_m4 = 398
-    total_b2b_m16 = clients_payouts + clients_payins
-    mult_total = total_b2b_m16 / total_b2b_m4
-    target_color = COLORS['success'] if mult_total >= 2.8 else COLORS['warning']
-    meta_check = '✅ Meta 3×' if mult_total >= 2.8 else ''
-
-    st.markdown(f"""<div style="background:{COLORS['card_bg']}; border-radius:10px; padding:0.8rem; margin-top:0.8rem; border:1px solid #E2E8F0;">
-<span style="font-size:0.85rem; color:{COLORS['text']};">👥 Clientes B2B: {total_b2b_m4} → <b style="color:{target_color};">{total_b2b_m16:,}</b> (<b style="color:{target_color};">{mult_total:.1f}x</b>) {meta_check}</span><br>
-<span style="font-size:0.75rem; color:{COLORS['muted']};">Payouts: {clients_payouts:,} (orgánico + países) | Payins: {clients_payins} (exportadores)</span>
-</div>""", unsafe_allow_html=True)
+    ph_total_b2b = st.empty()
 
     # ══════════════════════════════════════════════════════════════
     # EXCHANGE + B2C
@@ -649,15 +539,7 @@ Take Rate: <b>{take_payins_derived:.2f}%</b> | GTV: <b>{format_k(gtv_payins_m16)
     st.markdown("<hr style='margin:16px 0; border:none; border-top:1px solid #E2E8F0;'>", unsafe_allow_html=True)
     st.markdown("**📊 OTROS PRODUCTOS**")
 
-    # Exchange: correlacionado con Payouts B2B (mismo cliente usa ambos)
-    exchange_ratio = BASE['rev_exchange'] / BASE['rev_payouts_b2b']  # ~0.19
-    rev_ex_proj = rev_b2b_proj * exchange_ratio
-    mult_exchange = rev_ex_proj / BASE['rev_exchange'] if BASE['rev_exchange'] > 0 else 1
-
-    st.markdown(f"""<div style='font-size:0.8rem; color:{COLORS["muted"]}; margin-bottom:8px;'>
-        Exchange: correlacionado con Payouts B2B ({exchange_ratio*100:.0f}% del revenue B2B)
-        → <span style='font-weight:700;'>{format_k(rev_ex_proj)}</span>
-    </div>""", unsafe_allow_html=True)
+    ph_exchange = st.empty()
 
     mult_b2c = st.slider("Payouts B2C (×)", 1.0, 4.0, 2.5, 0.1, key="sb_b2c",
         help="España + Vita Card como drivers")
@@ -667,48 +549,169 @@ Take Rate: <b>{take_payins_derived:.2f}%</b> | GTV: <b>{format_k(gtv_payins_m16)
     hiring_mode = st.toggle("Contratación gradual", value=True, key="hiring_mode",
         help="ON: hires escalonados en 12 meses. OFF: todos desde mes 5.")
 
-    # Mostrar impacto de modo de contratación
-    new_positions = max(0, hc_target - 58)
-    if new_positions > 0:
-        costo_anual_inmediato = new_positions * 2500 * 12
-        hire_interval = 12 / new_positions if new_positions > 0 else 999
-        costo_anual_gradual = sum(min(new_positions, int((i+1) / hire_interval)) * 2500 for i in range(12)) if new_positions > 0 else 0
-        ahorro = costo_anual_inmediato - costo_anual_gradual
-        if hiring_mode:
-            st.markdown(f"""<span style="font-size:0.75rem; color:{COLORS['success']};">
-                Gradual: ahorro de {format_k(ahorro)} en 12 meses vs contratar todos de una</span>""",
-                unsafe_allow_html=True)
-        else:
-            st.markdown(f"""<span style="font-size:0.75rem; color:{COLORS['warning']};">
-                Inmediato: +{format_k(ahorro)} en costos vs contratación gradual</span>""",
-                unsafe_allow_html=True)
+    ph_hiring = st.empty()
 
     mktg_monthly = st.slider("Marketing ($K/mes)", 20, 100, 55, 5, key="sb_mktg")
 
-    # Mostrar CAC implícito basado en marketing y nuevos clientes B2B
-    total_new_clients_12m = new_clients_b2b + clients_payins_m16  # Nuevos B2B + Payins
-    mktg_12m = mktg_monthly * 1000 * 12
-    effective_cac = mktg_12m / total_new_clients_12m if total_new_clients_12m > 0 else 0
-    cac_color = COLORS['success'] if effective_cac < 1500 else COLORS['warning'] if effective_cac < 2500 else COLORS['danger']
-    st.markdown(f"""<div style='background:#F7FAFC; padding:8px; border-radius:6px; font-size:0.78rem; margin-top:6px;'>
-        <span style='color:{COLORS["muted"]}'>Marketing 12m:</span> {format_k(mktg_12m)} ÷ {total_new_clients_12m:.0f} clientes nuevos =
-        <span style='color:{cac_color}; font-weight:700;'>CAC ${effective_cac:,.0f}</span>
-    </div>""", unsafe_allow_html=True)
+    ph_cac = st.empty()
 
     st.markdown("**🚀 Innovación**")
     fwd_on = st.toggle("Forwards FX", value=True, key="sb_fwd_on")
     ai_on = st.toggle("AI Sales Agent", value=True, key="sb_ai_on")
     card_on = st.toggle("Vita Card", value=True, key="sb_card_on")
 
+    fwd_sim = False
     if fwd_on:
-        fwd_rev = st.slider("Forwards ($/mes)", 15000, 80000, 45000, 5000, key="sb_fwd_rev")
+        fwd_sim = st.toggle("Forwards desde libro simulado", value=False, key="sb_fwd_sim",
+            help="Revenue y costo de cobertura M16 (P50) de un libro de contratos sobre la cartera B2B del escenario")
+        fwd_rev = 0 if fwd_sim else st.slider("Forwards ($/mes)", 15000, 80000, 45000, 5000, key="sb_fwd_rev")
     else:
         fwd_rev = 0
+    ph_fwd = st.empty()
+    card_model = False
     if card_on:
-        card_rev = st.slider("Vita Card ($/mes)", 10000, 60000, 40000, 5000, key="sb_card_rev")
+        card_model = st.toggle("Vita Card desde transacciones", value=False, key="sb_card_model",
+            help="Interchange + spread FX M16 de un flujo de transacciones de los tarjetahabientes (escalan con Payouts B2C ×)")
+        if card_model:
+            card_book = cached_card(mult_b2c, BASE_GTV_B2C * mult_b2c, DEFAULT_CARD_TERMS)
+            card_rev = round(float(card_book['revenue'][-1]), -2)
+            st.markdown(f"""<div style="font-size:0.72rem; color:{COLORS['muted']}; line-height:1.6;">
+                Modelo M16: interchange {format_k(card_book['interchange'][-1])} + FX {format_k(card_book['fx'][-1])} ·
+                {card_book['transactions'][-1] / 1e3:,.0f}K transacciones/mes
+            </div>""", unsafe_allow_html=True)
+        else:
+            card_rev = st.slider("Vita Card ($/mes)", 10000, 60000, 40000, 5000, key="sb_card_rev")
     else:
         card_rev = 0
 
+    # Curva de la rampa M4→M16 por línea de negocio (vita_model.curves)
+    with st.expander("📈 Curvas de rampa M4→M16"):
+        ramp_curves = tuple((line, st.selectbox(label, CURVE_FAMILIES, format_func=CURVE_LABELS.get,
+                                                key=f"sb_curve_{line}")) for line, label in LINE_LABELS.items())
+        curve_fits = fit_history(data_version())  # cacheado por versión de DATA: un ajuste por carga de datos
+        st.markdown(f"""<div style="font-size:0.72rem; color:{COLORS['muted']}; line-height:1.6;">
+            Ajustada a M1-M4 (logística k, f₀, R²):<br>
+            {'<br>'.join(f"{LINE_LABELS[line]}: " + ("sin historia creciente → logística default" if fit['fallback']
+                else f"k={fit['k']:.1f}, f₀={fit['f0']:.2f}, R²={fit['r2']:.2f}") for line, fit in curve_fits.items())}
+        </div>""", unsafe_allow_html=True)
+    # Términos de la deuda para el plan de financiamiento (vita_model.financing)
+    with st.expander("🏦 Deuda y covenants"):
+        fin_line = st.number_input("Línea de crédito ($M)", 0.0, 10.0, DEFAULT_TERMS.line_limit / 1e6, 0.5, key="sb_fin_line")
+        fin_line_rate = st.slider("Tasa línea (%)", 6.0, 24.0, DEFAULT_TERMS.line_rate * 100, 0.5, key="sb_fin_line_rate")
+        fin_vd = st.number_input(f"Venture debt por tramo ($M) · {len(DEFAULT_TERMS.vd_tranches)} tramos", 0.0, 3.0,
+            DEFAULT_TERMS.vd_tranches[0][1] / 1e6, 0.25, key="sb_fin_vd",
+            help=f"Tramos en {', '.join(f'M{m}' for m, _ in DEFAULT_TERMS.vd_tranches)}: se giran sólo si la línea no alcanza")
+        fin_vd_rate = st.slider("Tasa venture debt (%)", 6.0, 24.0, DEFAULT_TERMS.vd_rate * 100, 0.5, key="sb_fin_vd_rate")
+        fin_min_cash = st.number_input("Caja mínima ($M)", 0.25, 3.0, DEFAULT_TERMS.min_cash / 1e6, 0.25, key="sb_fin_min_cash")
+    financing_terms = replace(DEFAULT_TERMS, line_limit=fin_line * 1e6, line_rate=fin_line_rate / 100,
+        vd_tranches=tuple((m, fin_vd * 1e6) for m, _ in DEFAULT_TERMS.vd_tranches), vd_rate=fin_vd_rate / 100,
+        min_cash=fin_min_cash * 1e6)
+
+    # Logística = default: sin entrada, así el escenario default comparte cubo y cachés
+    scenario_assumptions = replace(DEFAULT_ASSUMPTIONS, ramp_curves=tuple(c for c in ramp_curves if c[1] != 'logistic'),
+                                   country_launch=country_launch)
+
+    # ══════════════════════════════════════════════════════════════
+    # MOTOR DE ESCENARIOS — un solo cálculo por rerun
+    # ══════════════════════════════════════════════════════════════
+    # El grafo de métricas vive en la sesión: sólo se recalcula lo que depende de los sliders que cambiaron
+    if 'scenario_graph' not in st.session_state:
+        st.session_state['scenario_graph'] = IncrementalGraph(SCENARIO_GRAPH)
+    scenario_inputs = ScenarioInputs(
+        take_b2b=take_b2b, new_countries=new_countries, clients_payins_m16=clients_payins_m16,
+        mult_b2c=mult_b2c, hc_target=hc_target, hiring_mode=hiring_mode, mktg_monthly=mktg_monthly,
+        fwd_on=fwd_on, ai_on=ai_on, card_on=card_on, fwd_rev=fwd_rev, card_rev=card_rev,
+    )
+
+    def render_quick(quick, source):
+        quick_margin_color = COLORS['success'] if quick['margin_proj'] >= 30 else COLORS['warning']
+        ph_quick.markdown(f"""<div style="background:{COLORS['card_bg']}; border-radius:10px; padding:0.7rem 0.8rem; margin-bottom:1rem; border:1px solid #E2E8F0; font-size:0.78rem; color:{COLORS['text']}; line-height:1.7;">
+Revenue M16: <b>{format_k(quick['total_rev_proj'])}/mes</b> · Margen: <b style="color:{quick_margin_color};">{quick['margin_proj']:.1f}%</b><br>
+Caja M16: <b>{format_k(quick['cash_proj'])}</b> · {'Surplus' if quick['gap'] < 0 else 'Gap'}: <b>{format_k(abs(quick['gap']))}</b><br>
+Valorización M16 (punto medio): <b>{format_k(quick['valuation_mid'])}</b><br>
+<span style="font-size:0.7rem; color:{COLORS['muted']};">{source}</span></div>""", unsafe_allow_html=True)
+
+    # Resumen M16 antes del cálculo en vivo: lectura O(1) del cubo precalculado, visible mientras corre el resto.
+    # Los ingresos de Forwards/Card se suman a la lectura (sirve cualquier valor del slider o del modelo de
+    # transacciones); con el libro de Forwards simulado el fwd_rev y su costo salen del cálculo en vivo, así
+    # que el cubo no aplica. En un hit el resumen no se recalcula: el cálculo en vivo sólo alimenta el resto
+    quick = None if fwd_sim else scenario_cube_store().lookup(scenario_inputs, scenario_assumptions)
+    if quick is not None:
+        render_quick(quick, "⚡ cubo precalculado (antes del cálculo en vivo)")
+
+    graph_runs = st.session_state['scenario_graph'].runs  # sin cambio tras la pasada = escenario desde la caché
+    scenario = cached_scenario(scenario_inputs, scenario_assumptions, 16 + 12 * DCF_YEARS,
+                               st.session_state['scenario_graph'])  # M4→M76: cubre los 24 meses de financiamiento y el DCF a 5 años post-M16
+    if fwd_sim:
+        # La cartera B2B no depende de Forwards: el libro sale de la primera pasada y el grafo recalcula
+        # sólo lo que depende de fwd_rev y fwd_cost
+        fwd_book = forwards_book(scenario)
+        fwd_rev = round(float(fwd_book['revenue'][1][-1]), -2)
+        scenario_assumptions = replace(scenario_assumptions,
+                                       fwd_cost=DEFAULT_ASSUMPTIONS.fwd_cost + round(float(fwd_book['hedge_cost'][-1]), -2))
+        scenario = cached_scenario(replace(scenario_inputs, fwd_rev=fwd_rev), scenario_assumptions,
+                                   16 + 12 * DCF_YEARS, st.session_state['scenario_graph'])
+        ph_fwd.markdown(f"""<div style="font-size:0.72rem; color:{COLORS['muted']}; line-height:1.6;">
+            Libro simulado M16 (P50): revenue <b>{format_k(fwd_rev)}</b> · cobertura {format_k(fwd_book['hedge_cost'][-1])}
+            + desk {format_k(DEFAULT_ASSUMPTIONS.fwd_cost)} · {fwd_book['contracts'][-1]:.0f} contratos/mes
+        </div>""", unsafe_allow_html=True)
+    clients_b2b_m16 = scenario.clients_payouts  # alias para compatibilidad
+    # Plan de financiamiento M5→M24 sobre la misma trayectoria (Scenario Builder y Valuation)
+    financing = cached_financing(scenario.inputs, scenario_assumptions, financing_terms, 24, scenario)
+
+    if quick is None:
+        render_quick(scenario_outputs(scenario), "cálculo en vivo")
+
+    # Feedback Payouts B2B con tasa de crecimiento implícita
+    rebaja_text = f'+ {scenario.additional_rate:.0f} por rebaja' if scenario.additional_drop_bp > 0 else ''
+    paises_text = f'+ {scenario.country_growth} por {new_countries} países' if new_countries > 0 else ''
+    growth_color = COLORS['success'] if scenario.growth_pct_payouts >= 50 else COLORS['warning']
+    # Take óptimo: la grilla completa del slider en una sola pasada vectorizada (vita_model.elasticity)
+    take_best = cached_take_best(scenario.inputs, scenario_assumptions)
+    ph_payouts.markdown(f"""<div style="font-size:0.78rem; color:{COLORS['muted']}; line-height:1.6; background:#F7FAFC; padding:10px; border-radius:6px; margin-top:8px;">
+Ritmo: <b>{scenario.monthly_client_rate:.0f} cli/mes</b> ({DEFAULT_ASSUMPTIONS.base_rate:.0f} orgánico {rebaja_text}) {paises_text}<br>
+Clientes M16: <b>{scenario.clients_payouts:,}</b> → Revenue: <b>{format_k(scenario.rev_b2b_proj)}/mes</b><br>
+<span style="color:{growth_color}; font-weight:700;">Crecimiento implícito: +{scenario.growth_pct_payouts:.0f}%</span><br>
+Take óptimo: <b>{take_best['revenue']:.2f}%</b> ({TAKE_OBJECTIVES['revenue']}) · <b>{take_best['clients']:.2f}%</b> ({TAKE_OBJECTIVES['clients']})</div>""", unsafe_allow_html=True)
+
+    ph_payins.markdown(f"""<div style='background:#F7FAFC; padding:10px; border-radius:6px; font-size:0.8rem; margin-top:8px;'>
+Take Rate: <b>{scenario.take_payins_derived:.2f}%</b> | GTV: <b>{format_k(scenario.gtv_payins_m16)}</b> | Revenue: <b>{format_k(scenario.rev_payins_proj)}</b><br>
+<span style="color:{COLORS['success']}; font-weight:700;">Crecimiento: ×{scenario.rev_payins_proj/BASE['rev_payins_b2b']:.0f}</span><br>
+Pipeline: <b>{required_leads(clients_payins_m16, scenario_assumptions):.0f} leads nuevos/mes</b> para la meta</div>""", unsafe_allow_html=True)
+
+    total_b2b_m4 = 398
+    target_color = COLORS['success'] if scenario.mult_total >= META_MULT_TOTAL else COLORS['warning']
+    meta_check = f'✅ Meta {META_MULT_TOTAL:g}×' if scenario.mult_total >= META_MULT_TOTAL else ''
+    ph_total_b2b.markdown(f"""<div style="background:{COLORS['card_bg']}; border-radius:10px; padding:0.8rem; margin-top:0.8rem; border:1px solid #E2E8F0;">
+<span style="font-size:0.85rem; color:{COLORS['text']};">👥 Clientes B2B: {total_b2b_m4} → <b style="color:{target_color};">{scenario.total_b2b_m16:,}</b> (<b style="color:{target_color};">{scenario.mult_total:.1f}x</b>) {meta_check}</span><br>
+<span style="font-size:0.75rem; color:{COLORS['muted']};">Payouts: {scenario.clients_payouts:,} (orgánico + países) | Payins: {clients_payins_m16} (exportadores)</span>
+</div>""", unsafe_allow_html=True)
+
+    exchange_yield = scenario.rev_ex_b2b_proj / scenario.gtv_b2b_m16 if scenario.gtv_b2b_m16 > 0 else 0
+    ph_exchange.markdown(f"""<div style='font-size:0.8rem; color:{COLORS["muted"]}; margin-bottom:8px;'>
+        Exchange: spread × volumen ∝ GTV Payouts ({exchange_yield*100:.3f}% del GTV B2B)
+        → <span style='font-weight:700;'>{format_k(scenario.rev_ex_proj)}</span>
+    </div>""", unsafe_allow_html=True)
+
+    # Mostrar impacto de modo de contratación
+    if scenario.new_positions > 0:
+        if hiring_mode:
+            ph_hiring.markdown(f"""<span style="font-size:0.75rem; color:{COLORS['success']};">
+                Gradual: ahorro de {format_k(scenario.hiring_savings_12m)} en 12 meses vs contratar todos de una</span>""",
+                unsafe_allow_html=True)
+        else:
+            ph_hiring.markdown(f"""<span style="font-size:0.75rem; color:{COLORS['warning']};">
+                Inmediato: +{format_k(scenario.hiring_savings_12m)} en costos vs contratación gradual</span>""",
+                unsafe_allow_html=True)
+
+    # Mostrar CAC implícito basado en marketing y nuevos clientes B2B
+    effective_cac = scenario.effective_cac
+    cac_color = COLORS['success'] if effective_cac < 1500 else COLORS['warning'] if effective_cac < 2500 else COLORS['danger']
+    ph_cac.markdown(f"""<div style='background:#F7FAFC; padding:8px; border-radius:6px; font-size:0.78rem; margin-top:6px;'>
+        <span style='color:{COLORS["muted"]}'>Marketing 12m:</span> {format_k(scenario.mktg_12m)} ÷ {scenario.total_new_clients_12m:.0f} clientes nuevos =
+        <span style='color:{cac_color}; font-weight:700;'>CAC ${effective_cac:,.0f}</span>
+    </div>""", unsafe_allow_html=True)
+
     with st.expander("📋 Justificación de Supuestos — ¿Por qué estos defaults?"):
         st.markdown(f"""
         <div style="font-size:0.82rem; color:#4A5568; line-height:1.8;">
@@ -844,13 +847,14 @@ st.markdown(f"""
 """, unsafe_allow_html=True)
 
 # Horizontal tabs navigation
-tab_exec, tab_rev, tab_unit, tab_costs, tab_strat, tab_scenario, tab_val = st.tabs([
+tab_exec, tab_rev, tab_unit, tab_costs, tab_strat, tab_scenario, tab_mc, tab_val = st.tabs([
     "📊 Executive Summary",
     "💰 Revenue",
     "🎯 Unit Economics",
     "💸 Costs & P&L",
     "🚀 Strategy",
     "🔮 Scenario Builder",
+    "🎲 Monte Carlo",
     "📈 Valuation"
 ])
 
@@ -1015,6 +1019,21 @@ with tab_exec:
 # ══════════════════════════════════════════════════════════════
 # PAGE 2: REVENUE DEEP DIVE
 # ══════════════════════════════════════════════════════════════
+@st.cache_data(show_spinner=False)
+def cached_payins(target, assumptions, n_paths):
+    # Sólo percentiles por mes: las n_paths trayectorias no van al browser
+    pi = project_payins(target, assumptions, n_paths=n_paths)
+    return {
+        'months': pi['months'],
+        'clients': np.percentile(pi['clients'], [10, 50, 90], axis=0),
+        'revenue': np.percentile(pi['revenue'], [10, 50, 90], axis=0),
+        'take': np.median(pi['take'], axis=0),
+        'adds': pi['adds'].mean(axis=0),
+        'lead_rate': pi['lead_rate'],
+        'elapsed_ms': pi['elapsed_ms'],
+    }
+
+
 with tab_rev:
     st.markdown('<div class="page-title">Revenue Deep Dive</div>', unsafe_allow_html=True)
     st.markdown('<div class="page-subtitle">Composición, tendencias y oportunidades por línea de negocio</div>', unsafe_allow_html=True)
@@ -1093,6 +1112,115 @@ with tab_rev:
         </div>
         """, unsafe_allow_html=True)
     
+    # ═══════════════════════════════════════════════════════════
+    # PAYINS — Curva precio/escala y pipeline de exportadores
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">💜 PAYINS — Curva Precio/Escala y Pipeline de Exportadores</div>', unsafe_allow_html=True)
+    pi_points = tuple(zip(*(np.ravel(x).tolist() for x in price_points(scenario_assumptions))))
+    pi_grid, pi_curve, pi_fit = scale_curve(pi_points)
+    payins = cached_payins(clients_payins_m16, scenario_assumptions, PAYINS_PATHS)
+
+    col_pi_curve, col_pi_proj = st.columns(2)
+    with col_pi_curve:
+        fig_pi = go.Figure()
+        fig_pi.add_trace(go.Scatter(x=pi_grid, y=pi_curve, name='Curva ajustada', mode='lines',
+            line=dict(color=COLORS['payins_b2b'], width=3)))
+        fig_pi.add_trace(go.Scatter(x=[c for c, _ in pi_points], y=[t for _, t in pi_points], name='Puntos de precio',
+            mode='markers', marker=dict(size=10, color=COLORS['text'], symbol='circle-open')))
+        fig_pi.add_trace(go.Scatter(x=[clients_payins_m16], y=[scenario.take_payins_derived], name='Escenario M16',
+            mode='markers+text', marker=dict(size=12, color=COLORS['danger']), text=[f"{scenario.take_payins_derived:.2f}%"],
+            textposition='top right'))
+        fig_pi = plotly_theme(fig_pi, height=360)
+        fig_pi.update_layout(xaxis_title="Clientes Payins activos", yaxis_title="Take Rate %",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        fig_pi.update_xaxes(type='log')
+        st.plotly_chart(fig_pi, use_container_width=True)
+    with col_pi_proj:
+        pi_months = [f"M{m}" for m in payins['months']]
+        pi_traj = scenario.trajectory.window(16, 5).rev_pi
+        fig_pi_proj = go.Figure()
+        fig_pi_proj.add_trace(go.Scatter(x=pi_months, y=payins['revenue'][2], mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'))
+        fig_pi_proj.add_trace(go.Scatter(x=pi_months, y=payins['revenue'][0], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor='rgba(139,92,246,0.15)', name='Pipeline P10–P90'))
+        fig_pi_proj.add_trace(go.Scatter(x=pi_months, y=payins['revenue'][1], name='Pipeline P50', mode='lines+markers',
+            line=dict(color=COLORS['payins_b2b'], width=2.5)))
+        fig_pi_proj.add_trace(go.Scatter(x=pi_months, y=pi_traj, name='Rampa del escenario', mode='lines',
+            line=dict(color=COLORS['muted'], width=1.5, dash='dash')))
+        fig_pi_proj = plotly_theme(fig_pi_proj, height=360)
+        fig_pi_proj.update_layout(yaxis_title="Revenue Payins (USD/mes)",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_pi_proj, use_container_width=True)
+
+    pi_k1, pi_k2, pi_k3, pi_k4 = st.columns(4)
+    with pi_k1:
+        st.markdown(metric_card("Leads nuevos / mes", f"{payins['lead_rate']:.0f}",
+            f"para llegar a {clients_payins_m16} clientes en M16", "up"), unsafe_allow_html=True)
+    with pi_k2:
+        st.markdown(metric_card("Clientes M16 (P10–P90)", f"{payins['clients'][0][-1]:.0f}–{payins['clients'][2][-1]:.0f}"),
+            unsafe_allow_html=True)
+    with pi_k3:
+        pi_rev16 = payins['revenue'][1][-1]
+        st.markdown(metric_card("Revenue M16 (P50)", format_k(pi_rev16),
+            f"vs {format_k(scenario.rev_payins_proj)} del escenario", "up" if pi_rev16 >= scenario.rev_payins_proj else "down"),
+            unsafe_allow_html=True)
+    with pi_k4:
+        st.markdown(metric_card("Take M16", f"{payins['take'][-1]:.2f}", f"desde {DATA['take_payins_b2b'][3]:.2f}% en M4", "down",
+            suffix="%"), unsafe_allow_html=True)
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        Curva: take = {pi_fit[0]:.2f} {'−' if pi_fit[1] < 0 else '+'} {abs(pi_fit[1]):.3f} × ln(clientes), acotada a {pi_fit[2]:.2f}%–{pi_fit[3]:.2f}%, ajustada a {len(pi_points)} puntos de precio.
+        Pipeline: {' · '.join(f"{s.name} {s.prospects} × {s.conversion:.0%}" for s in PAYINS_PIPELINE)} + leads nuevos al {NEW_LEADS.conversion:.0%};
+        GTV por exportador lognormal (media {format_k(scenario_assumptions.avg_gtv_payins_client)}) con {ONBOARDING_MONTHS} meses de onboarding.
+        {PAYINS_PATHS:,} trayectorias ({payins['elapsed_ms']:,.0f} ms).
+    </div>""", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # EXCHANGE — Spread por bucket de volumen
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">💱 EXCHANGE — Spread por Bucket de Volumen</div>', unsafe_allow_html=True)
+    ex_labels = [f"{side.capitalize()} {segment.upper()}" for segment in EXCHANGE_SEGMENTS for side in EXCHANGE_SIDES]
+    ex_vol_m4 = np.array([DATA[f'vol_exchange_{b}'][3] for b in EXCHANGE_BUCKETS], dtype=float)
+    ex_spreads = np.array(scenario_assumptions.exchange_spreads)
+    ex_ratio_old = BASE['rev_exchange'] / BASE['rev_payouts_b2b']
+
+    col_ex_chart, col_ex_table = st.columns(2)
+    with col_ex_chart:
+        fig_ex = go.Figure()
+        fig_ex.add_trace(go.Bar(x=ex_labels, y=ex_vol_m4 * ex_spreads / 100, name='M4 (volumen real × spread)',
+            marker_color=COLORS['muted']))
+        fig_ex.add_trace(go.Bar(x=ex_labels, y=scenario.exchange_rev_m16, name='M16 (escenario)',
+            marker_color=COLORS['exchange'], text=[format_k(v) for v in scenario.exchange_rev_m16], textposition='outside'))
+        fig_ex = plotly_theme(fig_ex, height=340)
+        fig_ex.update_layout(barmode='group', yaxis_title="Revenue Exchange (USD/mes)",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_ex, use_container_width=True)
+    with col_ex_table:
+        st.dataframe(pd.DataFrame([
+            {'Bucket': label, 'Volumen / GTV': f"{ratio:.3f}", 'R² volumen': f"{r2:.2f}" + (" → promedio" if fallback else ""), 'Spread': f"{spread:.3f}%",
+             'Volumen M4': format_k(vol4), 'Volumen M16': format_k(vol16)}
+            for label, ratio, r2, fallback, spread, vol4, vol16 in zip(
+                ex_labels, scenario_assumptions.exchange_volume_ratios, EXCHANGE_FIT['r2_volume'].ravel(),
+                EXCHANGE_FIT['volume_fallback'].ravel(), ex_spreads, ex_vol_m4, scenario.exchange_volume_m16)
+        ]), use_container_width=True, hide_index=True)
+        ex_k1, ex_k2 = st.columns(2)
+        with ex_k1:
+            st.markdown(metric_card("Exchange M16", format_k(scenario.rev_ex_proj),
+                f"vs {format_k(scenario.rev_b2b_proj * ex_ratio_old)} con ratio fijo", "up" if scenario.rev_ex_proj >= scenario.rev_b2b_proj * ex_ratio_old else "down"),
+                unsafe_allow_html=True)
+        with ex_k2:
+            st.markdown(metric_card("B2B / B2C M16", f"{format_k(scenario.rev_ex_b2b_proj)} / {format_k(scenario.rev_ex_b2c_proj)}",
+                f"desde {format_k(DATA['rev_exchange_b2b'][3])} / {format_k(DATA['rev_exchange_b2c'][3])} en M4", "up"),
+                unsafe_allow_html=True)
+    ex_fit_text = ' · '.join(
+        f"{segment.upper()} R² {r2:.2f}" + (" → spread promedio" if fallback else "")
+        for segment, r2, fallback in zip(EXCHANGE_SEGMENTS, EXCHANGE_FIT['r2_revenue'], EXCHANGE_FIT['fallback']))
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        Volumen por bucket = k × GTV Payouts del segmento; revenue = Σ spread × volumen, ambos por MCO sin intercepto
+        sobre M1–M{len(DATA['rev_exchange_b2b'])} ({ex_fit_text}); un ratio de volumen con R² menor a {FIT_MIN_R2} usa la
+        participación histórica del bucket. El Exchange ya no sigue al take rate de Payouts:
+        escala con el GTV. Ratio fijo anterior: {ex_ratio_old*100:.0f}% del revenue Payouts B2B.
+    </div>""", unsafe_allow_html=True)
+
     # Effective take rate
     st.markdown('<div class="section-header">📊 Effective Take Rate Global</div>', unsafe_allow_html=True)
     c1, c2, c3, c4 = st.columns(4)
@@ -1190,6 +1318,15 @@ with tab_rev:
 # ══════════════════════════════════════════════════════════════
 # PAGE 3: UNIT ECONOMICS
 # ══════════════════════════════════════════════════════════════
+@st.cache_data(show_spinner=False)
+def cached_cohorts(n_paths, version):
+    # version = data_version(): la cartera simulada es la del escenario base sobre DATA, así que los sliders
+    # no la invalidan; la misma versión es la clave de cohort_analysis() (sin hashear la actividad en cada rerun)
+    agents = simulate_clients(run_scenario(ScenarioInputs(), DEFAULT_ASSUMPTIONS, horizon=int(AGENT_MONTHS[-1])),
+                              DEFAULT_ASSUMPTIONS, n_paths=n_paths)
+    return cohort_analysis(book_activity(agents), version=f'base-{n_paths}-{version}')
+
+
 with tab_unit:
     st.markdown('<div class="page-title">Unit Economics</div>', unsafe_allow_html=True)
     st.markdown('<div class="page-subtitle">Los fundamentos del negocio son excepcionales — esta es la prueba</div>', unsafe_allow_html=True)
@@ -1525,6 +1662,60 @@ with tab_unit:
     </div>
     """, unsafe_allow_html=True)
 
+    # ═══════════════════════════════════════════════════════════
+    # COHORTES — Retención, NRR y LTV por mes de adquisición
+    # ═══════════════════════════════════════════════════════════
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="section-header">🧬 COHORTES — Retención, NRR y LTV</div>', unsafe_allow_html=True)
+
+    with st.spinner("Armando matrices de cohortes..."):
+        cohorts = cached_cohorts(COHORT_PATHS, data_version())
+    coh_ret, coh_nrr = cohorts['retention_curve'], cohorts['nrr_curve']
+    coh_ltv = cohorts['ltv_cohort']
+
+    coh_k1, coh_k2, coh_k3, coh_k4 = st.columns(4)
+    with coh_k1:
+        st.markdown(metric_card("LTV de cohortes", format_k(coh_ltv) if np.isfinite(coh_ltv) else "∞",
+            f"vs {format_k(BASE_CLTV_B2B)} con ARPU ÷ churn", "up" if coh_ltv >= BASE_CLTV_B2B else "down"),
+            unsafe_allow_html=True)
+    with coh_k2:
+        st.markdown(metric_card("Churn implícito", f"{cohorts['churn'] * 100:.2f}", f"vs {AVG_CHURN_B2B_SAFE * 100:.2f}% promedio M1-M4",
+            "up" if cohorts['churn'] <= AVG_CHURN_B2B_SAFE else "down", suffix="%/mes"), unsafe_allow_html=True)
+    with coh_k3:
+        st.markdown(metric_card("NRR a 12 meses", f"{coh_nrr.get(12, np.nan) * 100:.0f}", suffix="%"), unsafe_allow_html=True)
+    with coh_k4:
+        st.markdown(metric_card("Retención a 24 meses", f"{coh_ret.get(24, np.nan) * 100:.0f}", suffix="%"), unsafe_allow_html=True)
+
+    coh_c1, coh_c2 = st.columns([3, 2])
+    with coh_c1:
+        coh_matrix = cohorts['retention']
+        fig_coh = go.Figure(go.Heatmap(z=coh_matrix.values * 100, x=coh_matrix.columns, y=[f"M{c}" for c in coh_matrix.index],
+            colorscale=[[0, '#F7FAFC'], [0.5, COLORS['primary']], [1, COLORS['secondary']]],
+            colorbar=dict(title="%"),
+            hovertemplate="Cohorte %{y} · mes %{x}<br>Retención %{z:.1f}%<extra></extra>"))
+        fig_coh = plotly_theme(fig_coh, height=420)
+        fig_coh.update_xaxes(title_text="Meses desde la adquisición")
+        fig_coh.update_yaxes(title_text="Cohorte", autorange='reversed')
+        st.plotly_chart(fig_coh, use_container_width=True)
+    with coh_c2:
+        fig_coh_curve = go.Figure()
+        fig_coh_curve.add_trace(go.Scatter(x=coh_ret.index, y=coh_ret.values * 100, name='Retención de clientes',
+            mode='lines', line=dict(color=COLORS['primary'], width=2.5)))
+        fig_coh_curve.add_trace(go.Scatter(x=coh_nrr.index, y=coh_nrr.values * 100, name='NRR',
+            mode='lines', line=dict(color=COLORS['secondary'], width=2, dash='dot')))
+        fig_coh_curve.add_trace(go.Scatter(x=coh_ret.index, y=(1 - AVG_CHURN_B2B_SAFE) ** coh_ret.index.values * 100,
+            name='Churn constante M1-M4', mode='lines', line=dict(color=COLORS['muted'], width=1, dash='dash')))
+        fig_coh_curve = plotly_theme(fig_coh_curve, height=420)
+        fig_coh_curve.update_layout(xaxis_title="Meses desde la adquisición", yaxis_title="% de la cohorte",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_coh_curve, use_container_width=True)
+
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        {cohorts['n_clients']:,} clientes en {len(cohorts['size'])} cohortes ({cohorts['n_rows']:,} filas cliente-mes, {cohorts['elapsed_ms']:,.0f} ms).
+        Actividad de la cartera simulada del escenario base (M5→M64, churn heterogéneo por cliente) hasta tener el histórico por cliente del ledger.
+        LTV = revenue del primer mes × Σ NRR observada + cola geométrica con el decaimiento mensual de la NRR en los últimos 12 meses (×{cohorts['decay']:.4f}/mes).
+    </div>""", unsafe_allow_html=True)
+
 # ══════════════════════════════════════════════════════════════
 # PAGE 4: COST STRUCTURE & P&L
 # ══════════════════════════════════════════════════════════════
@@ -1648,25 +1839,36 @@ with tab_costs:
 
     col_chart, col_insight = st.columns([3, 2])
     with col_chart:
-        areas = ['Growth', 'Desarrollo', 'Operaciones', 'Finanzas', 'Compliance', 'Legales', 'RRHH', 'BI']
-        pct_area = [20, 20, 20, 20, 8, 5, 5, 2]
+        # Nómina M16 por área: equipo actual repartido según AREA_MIX + plan de contrataciones (vita_model.hiring)
+        areas = list(AREAS)
+        plan = scenario.hiring_plan
+        team_area = scenario_assumptions.team_size * scenario_assumptions.team_cost_per_head * np.array(AREA_MIX)
+        plan_area = plan.payroll_by_area(12)[:, -1]
+        hires_area = plan.hires_by_area().astype(int)
+        budget_total = (team_area + plan_area).sum()
+        pct_area = (team_area + plan_area) / budget_total * 100
         colores_area = [COLORS['success'], COLORS['secondary'], COLORS['primary'], COLORS['warning'],
                         '#9F7AEA', '#ED8936', '#4FD1C5', '#A0AEC0']
 
         fig = go.Figure()
-        for area, pct, color in zip(areas, pct_area, colores_area):
-            fig.add_trace(go.Bar(
-                y=[area], x=[pct], orientation='h', marker_color=color,
-                text=[f"{pct}%"], textposition='inside', textfont=dict(size=14, color='white'),
-                showlegend=False
-            ))
+        fig.add_trace(go.Bar(
+            y=areas, x=team_area / budget_total * 100, orientation='h', marker_color=colores_area,
+            text=[f"{pct:.0f}%" for pct in pct_area], textposition='inside', textfont=dict(size=14, color='white'),
+            hovertemplate="%{y} · equipo actual: %{x:.1f}%<extra></extra>", showlegend=False
+        ))
+        fig.add_trace(go.Bar(
+            y=areas, x=plan_area / budget_total * 100, orientation='h', marker_color=colores_area, opacity=0.45,
+            text=[f"+{h}" if h else "" for h in hires_area], textposition='outside',
+            customdata=plan_area, hovertemplate="%{y} · plan: %{x:.1f}% ($%{customdata:,.0f}/mes)<extra></extra>",
+            showlegend=False
+        ))
         fig = plotly_theme(fig, height=350)
         fig.update_layout(
-            xaxis_title="% del Presupuesto Total",
+            xaxis_title="% de la Nómina M16 (equipo actual + plan de contrataciones)",
             yaxis=dict(autorange="reversed", categoryorder='array', categoryarray=areas),
-            bargap=0.3
+            barmode='stack', bargap=0.3
         )
-        fig.update_xaxes(range=[0, 25])
+        fig.update_xaxes(range=[0, max(25, pct_area.max() + 4)])
         st.plotly_chart(fig, use_container_width=True)
 
     with col_insight:
@@ -1678,14 +1880,15 @@ with tab_costs:
                 <div>
                     <div style="font-weight:600; color:#2D3748; margin-bottom:0.5rem; font-size:1.05rem;">Distribución del Presupuesto</div>
                     <div style="font-size:0.95rem; color:#4A5568; line-height:1.6;">
-                        Cuatro áreas concentran el <strong>80% del presupuesto</strong> en partes iguales
-                        (Growth, Desarrollo, Operaciones, Finanzas). Esta distribución refleja la filosofía
-                        de equilibrio entre crecimiento e infraestructura.<br><br>
+                        Cuatro áreas concentran el <strong>{np.sort(pct_area)[-4:].sum():.0f}% de la nómina M16</strong>
+                        (Growth, Desarrollo, Operaciones, Finanzas). El plan de contrataciones suma
+                        <strong>{scenario.new_positions} hires</strong> ({format_k(plan_area.sum())}/mes en M16),
+                        repartidos según la distribución actual del presupuesto.<br><br>
                         <strong>Oportunidades:</strong><br>
-                        <span style="color:{COLORS['warning']};">①</span> BI con solo 2% podría estar subinvertido dado el valor de data analytics
+                        <span style="color:{COLORS['warning']};">①</span> BI con solo {pct_area[AREAS.index('BI')]:.0f}% podría estar subinvertido dado el valor de data analytics
                         para decisiones de pricing y retención<br>
-                        <span style="color:{COLORS['warning']};">②</span> Compliance al 8% es adecuado para el stage regulatorio actual pero
-                        podría necesitar incremento con 3 nuevos países
+                        <span style="color:{COLORS['warning']};">②</span> Compliance al {pct_area[AREAS.index('Compliance')]:.0f}% es adecuado para el stage regulatorio actual pero
+                        podría necesitar incremento con {new_countries} nuevos países
                     </div>
                 </div>
             </div>
@@ -1787,6 +1990,8 @@ with tab_costs:
 # ══════════════════════════════════════════════════════════════
 with tab_strat:
     st.markdown('<div class="page-title">Propuestas Estratégicas</div>', unsafe_allow_html=True)
+    strat_fwd = forwards_book(scenario)
+    strat_card = cached_card(mult_b2c, BASE_GTV_B2C * mult_b2c, DEFAULT_CARD_TERMS)
     st.markdown('<div class="page-subtitle">Plan concreto por línea de negocio — 12 meses de ejecución</div>', unsafe_allow_html=True)
     
     # ═══════════════════════════════════════════════════════════
@@ -1961,7 +2166,7 @@ with tab_strat:
             <span class="proposal-badge" style="background:{COLORS['forwards']}22; color:{COLORS['forwards']}; border:1px solid {COLORS['forwards']}44;">🆕 NUEVO · DOBLE MARGEN · HIGH VALUE</span>
             <span style="font-size:1.1rem; font-weight:700; color:{COLORS['forwards']};">Forwards FX</span>
             <span style="margin-left:auto; font-size:1.05rem; color:#718096;">
-                $0/mes → <strong style="color:#2D3748;">$45K/mes</strong>
+                $0/mes → <strong style="color:#2D3748;">{format_k(strat_fwd['revenue'][1][-1])}/mes</strong> <span style="font-size:0.8rem;">(libro simulado)</span>
             </span>
         </div>
         <div style="font-size:1rem; color:#4A5568; margin-bottom:1rem; font-style:italic;">
@@ -1990,6 +2195,60 @@ with tab_strat:
     </div>
     """, unsafe_allow_html=True)
 
+    # Libro de forwards simulado sobre la cartera B2B del escenario (vita_model.forwards)
+    fwd_terms = DEFAULT_FWD_TERMS
+    fwd_months = [f"M{m}" for m in strat_fwd['months']]
+    col_fwd_book, col_fwd_stress = st.columns(2)
+    with col_fwd_book:
+        fig_fwd = go.Figure()
+        fig_fwd.add_trace(go.Scatter(x=fwd_months, y=strat_fwd['revenue'][2], mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'))
+        fig_fwd.add_trace(go.Scatter(x=fwd_months, y=strat_fwd['revenue'][0], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor='rgba(236,72,153,0.15)', name='Spread P10–P90'))
+        fig_fwd.add_trace(go.Scatter(x=fwd_months, y=strat_fwd['revenue'][1], name='Spread P50', mode='lines+markers',
+            line=dict(color=COLORS['forwards'], width=2.5)))
+        fig_fwd.add_trace(go.Scatter(x=fwd_months, y=strat_fwd['hedge_cost'], name='Costo back-to-back', mode='lines',
+            line=dict(color=COLORS['danger'], width=1.5, dash='dash')))
+        if fwd_on and not fwd_sim:
+            fig_fwd.add_hline(y=fwd_rev, line_dash="dot", line_color=COLORS['muted'],
+                annotation_text=f"Slider: {format_k(fwd_rev)}", annotation_position="top left")
+        fig_fwd = plotly_theme(fig_fwd, height=340)
+        fig_fwd.update_layout(yaxis_title="USD/mes", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_fwd, use_container_width=True)
+    with col_fwd_stress:
+        shock_labels = [f"{s:+.0%}" for s in strat_fwd['shocks']]
+        fig_fwd_stress = go.Figure()
+        fig_fwd_stress.add_trace(go.Bar(x=shock_labels, y=strat_fwd['margin_need'][0], name='Margen a adelantar (P50)',
+            marker_color=COLORS['warning']))
+        fig_fwd_stress.add_trace(go.Bar(x=shock_labels, y=strat_fwd['credit_loss'][1], name='Pérdida de crédito (P95)',
+            marker_color=COLORS['danger']))
+        fig_fwd_stress = plotly_theme(fig_fwd_stress, height=340)
+        fig_fwd_stress.update_layout(barmode='group', xaxis_title="Shock FX sobre el libro abierto M16", yaxis_title="USD",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_fwd_stress, use_container_width=True)
+
+    fwd_k1, fwd_k2, fwd_k3, fwd_k4 = st.columns(4)
+    with fwd_k1:
+        st.markdown(metric_card("Neto M16 (P50)", format_k(strat_fwd['net'][1][-1]),
+            f"spread − {format_k(strat_fwd['hedge_cost'][-1])} de cobertura", "up"), unsafe_allow_html=True)
+    with fwd_k2:
+        st.markdown(metric_card("Contratos M16", f"{strat_fwd['contracts'][-1]:.0f}/mes",
+            f"{strat_fwd['open_contracts']:.0f} abiertos al cierre"), unsafe_allow_html=True)
+    with fwd_k3:
+        st.markdown(metric_card("Nocional abierto", format_k(strat_fwd['open_notional']),
+            f"plazo {fwd_terms.tenor_days[0]}–{fwd_terms.tenor_days[1]} días"), unsafe_allow_html=True)
+    with fwd_k4:
+        st.markdown(metric_card("Pérdida crédito P99", format_k(strat_fwd['random_loss'][1]),
+            f"P95 {format_k(strat_fwd['random_loss'][0])} · vol FX {fwd_terms.fx_vol:.0%}", "down"), unsafe_allow_html=True)
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']}; margin-bottom:1.5rem;">
+        Libro: {fwd_terms.adoption:.0%} de los clientes B2B cubre {fwd_terms.hedge_ratio:.0%} de su GTV (rampa desde M5),
+        {fwd_terms.contracts_per_client:.0f} contratos/mes por cliente, spread {fwd_terms.spread_range[0]:.2f}–{fwd_terms.spread_range[1]:.2f}%,
+        back-to-back al {fwd_terms.bank_spread:.2f}% con margen inicial del cliente de {fwd_terms.client_margin:.0%}.
+        Stress: lo que el cliente pierde por sobre su margen lo adelanta Vita al banco; {fwd_terms.walk_away:.0%} no se recupera.
+        {FWD_PATHS} libros · {strat_fwd['n_contracts']:,} contratos · {strat_fwd['n_open']:,} abiertos × {FWD_SCENARIOS} escenarios FX
+        ({strat_fwd['elapsed_ms']:,.0f} ms).
+    </div>""", unsafe_allow_html=True)
+
     # ═══════════════════════════════════════════════════════════
     # VITA CARD - Sección personalizada
     # ═══════════════════════════════════════════════════════════
@@ -1999,7 +2258,7 @@ with tab_strat:
             <span class="proposal-badge" style="background:{COLORS['vita_card']}22; color:{COLORS['vita_card']}; border:1px solid {COLORS['vita_card']}44;">🆕 NUEVO · ENGAGEMENT · CIERRA EL LOOP</span>
             <span style="font-size:1.1rem; font-weight:700; color:{COLORS['vita_card']};">Vita Card</span>
             <span style="margin-left:auto; font-size:1.05rem; color:#718096;">
-                $0/mes → <strong style="color:#2D3748;">$40K/mes</strong>
+                $0/mes → <strong style="color:#2D3748;">{format_k(strat_card['revenue'][-1])}/mes</strong> <span style="font-size:0.8rem;">(modelo de transacciones)</span>
             </span>
         </div>
         <div style="font-size:1rem; color:#4A5568; margin-bottom:1rem; font-style:italic;">
@@ -2028,80 +2287,121 @@ with tab_strat:
     </div>
     """, unsafe_allow_html=True)
 
+    # Revenue de la tarjeta desde el flujo de transacciones (vita_model.card)
+    card_months = [f"M{m}" for m in strat_card['months']]
+    col_card_rev, col_card_mcc = st.columns(2)
+    with col_card_rev:
+        fig_card = go.Figure()
+        fig_card.add_trace(go.Bar(x=card_months, y=strat_card['interchange'], name='Interchange',
+            marker_color=COLORS['vita_card']))
+        fig_card.add_trace(go.Bar(x=card_months, y=strat_card['fx'], name='Spread FX', marker_color=COLORS['secondary']))
+        if card_on and not card_model:
+            fig_card.add_hline(y=card_rev, line_dash="dot", line_color=COLORS['muted'],
+                annotation_text=f"Slider: {format_k(card_rev)}", annotation_position="top left")
+        fig_card = plotly_theme(fig_card, height=320)
+        fig_card.update_layout(barmode='stack', yaxis_title="USD/mes",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+        st.plotly_chart(fig_card, use_container_width=True)
+    with col_card_mcc:
+        fig_card_mcc = go.Figure(go.Bar(
+            x=strat_card['interchange_mcc'][-1], y=[m[0] for m in CARD_MCC], orientation='h',
+            marker_color=COLORS['vita_card'], text=[format_k(v) for v in strat_card['volume_mcc'][-1]],
+            textposition='outside', hovertemplate='%{y}: interchange $%{x:,.0f}<extra></extra>'))
+        fig_card_mcc = plotly_theme(fig_card_mcc, height=320)
+        fig_card_mcc.update_layout(xaxis_title="Interchange M16 por rubro (etiqueta: volumen)")
+        st.plotly_chart(fig_card_mcc, use_container_width=True)
+    card_foreign = ' · '.join(f"{c[0]} {c[2]:.1f}%" for c in CARD_CURRENCIES[1:])
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']}; margin-bottom:1.5rem;">
+        {strat_card['holders'][-1]:,.0f} tarjetahabientes en M16 ({DEFAULT_CARD_TERMS.holders_per_mult:,.0f} × Payouts B2C {mult_b2c:.1f}×),
+        {DEFAULT_CARD_TERMS.txn_per_holder:.0f} transacciones/mes cada uno · volumen M16 {format_k(strat_card['volume'][-1])}
+        (+{strat_card['b2c_uplift'][-1]:.0%} sobre el GTV Payouts B2C) · Vita retiene {DEFAULT_CARD_TERMS.program_share:.0%} del interchange
+        · spread FX {card_foreign}. {strat_card['n_transactions']:,} transacciones procesadas en {strat_card['n_chunks']} bloques
+        ({strat_card['elapsed_ms']:,.0f} ms).
+    </div>""", unsafe_allow_html=True)
+
 # ══════════════════════════════════════════════════════════════
 # PAGE 6: SCENARIO BUILDER
 # ══════════════════════════════════════════════════════════════
-with tab_scenario:
-    st.markdown('<div class="page-title">Scenario Builder</div>', unsafe_allow_html=True)
-    st.markdown('<div class="page-subtitle">Ajusta los parámetros en el panel lateral ← y observa los resultados aquí</div>', unsafe_allow_html=True)
-
-    # Calculate (using variables from sidebar) - BASE = run-rate promedio M1-M4
-    base_rev = BASE_REVENUE  # Run-rate promedio, no M4
-    # rev_b2b_proj, rev_ex_proj, rev_payins_proj ya vienen calculados del sidebar
-    rev_b2c_proj = BASE['rev_payouts_b2c'] * mult_b2c
-    rev_pi_proj = rev_payins_proj  # Usa el valor derivado del sidebar (clientes × GTV × take rate)
-    total_rev_proj = rev_b2b_proj + rev_b2c_proj + rev_ex_proj + rev_pi_proj + fwd_rev + card_rev
-
-    # ═══════════════════════════════════════════════════════════
-    # MODELO DE COSTOS FIJOS/VARIABLES
-    # ═══════════════════════════════════════════════════════════
-
-    # --- COSTOS FIJOS (no cambian con revenue) ---
-    # Personal: equipo actual + hires nuevos (más caros: senior, nuevos países)
-    current_team_cost = 58 * 1836  # equipo actual al costo actual
-    new_hires_cost = max(0, hc_target - 58) * 2500  # hires nuevos son más caros
-    personal_proj = current_team_cost + new_hires_cost
-
-    # Admin: base fija + step por cada país nuevo
-    admin_base = BASE_ADMIN  # promedio M1-M4
-    admin_countries = new_countries * 5000  # oficinas, legal, regulatorio
-    admin_proj = admin_base + admin_countries
-
-    # Banking e inversiones: fijos
-    bank_proj = 18000
-    inv_proj = 8000
-
-    # Ahorro AI Sales Agent
-    ai_savings = 14000 if ai_on else 0
-
-    # Costo Forwards (si está activo)
-    fwd_cost = 4500 if fwd_on else 0
-
-    total_fixed = personal_proj + admin_proj + bank_proj + inv_proj + fwd_cost - ai_savings
-
-    # --- COSTOS VARIABLES (escalan con volumen/revenue) ---
-    # COGS: anclado al GTV total (B2B + B2C + Payins)
-    # GTV B2B viene del sidebar (gtv_b2b_m16), B2C crece con mult_b2c
-    gtv_b2c_m16 = BASE_GTV_B2C * mult_b2c
-    gtv_m16 = gtv_b2b_m16 + gtv_b2c_m16 + gtv_payins_m16  # GTV total M16
-    cogs_rate = 0.0016  # ~0.16% del GTV (promedio M2-M4)
-    cogs_proj = gtv_m16 * cogs_rate
+@st.cache_data(show_spinner=False)
+def cached_pareto(fixed_inputs, growth, assumptions):
+    # Sólo depende de los toggles y supuestos (los sliders recorren la grilla completa)
+    return pareto_frontier(fixed_inputs, assumptions, growth=growth, store=scenario_cube_store())
+
+
+@st.cache_data(show_spinner=False)
+def cached_liquidity(inputs, assumptions, n_months, n_paths, settlement):
+    # Al browser sólo van percentiles por día, no las n_paths trayectorias
+    values = evaluate(inputs, assumptions, horizon=4 + n_months)
+    liq = scenario_liquidity(values, assumptions, n_months, settlement=settlement, n_paths=n_paths)
+    return {
+        'dates': liq['dates'],
+        'month': liq['month'],
+        'balance': np.percentile(liq['balance'], [5, 50, 95], axis=0),
+        'need': np.percentile(liq['need'], [50, 95], axis=0),
+        'need_m4': liq['need_m4'],
+        'peak_need': np.percentile(liq['peak_need'], 95, axis=0),
+        'avg_need': liq['avg_need'].mean(axis=0),
+        'min_balance': np.percentile(liq['min_balance'], [5, 50]),
+        'min_day': np.bincount(liq['min_day'], minlength=len(liq['dates'])).argmax(),
+        'prob_negative': float((liq['min_balance'] < 0).mean()),
+        'elapsed_ms': liq['elapsed_ms'],
+    }
 
-    # Impuestos operativos: ~7.3% del revenue
-    tax_proj = total_rev_proj * 0.073
 
-    # Marketing: viene del slider
-    mktg_proj = mktg_monthly * 1000
 
-    total_variable = cogs_proj + tax_proj + mktg_proj
+@st.cache_data(show_spinner=False)
+def cached_clients(inputs, assumptions, n_paths, seed):
+    # La cartera (~10^5 clientes) no sale de la función: sólo bandas, campos M16 y distribuciones
+    agents = simulate_clients(run_scenario(inputs, assumptions, horizon=int(AGENT_MONTHS[-1])), assumptions,
+                              n_paths=n_paths, seed=seed)
+    book = agents['book']
+    return {
+        'months': agents['months'],
+        'active': np.percentile(agents['active'], [5, 50, 95], axis=0),
+        'mrr': np.percentile(agents['mrr'], [5, 50, 95], axis=0),
+        'm16': {k: np.percentile(v, [5, 50, 95]) for k, v in agents['m16'].items()},
+        'tiers': np.bincount(book.tier[book.alive(16)], minlength=len(TIER_LABELS)) / n_paths,
+        'client_cltv': np.percentile(agents['client_cltv'], np.arange(1, 100)),
+        'n_clients': agents['n_clients'],
+        'nbytes': agents['nbytes'],
+        'elapsed_ms': agents['elapsed_ms'],
+    }
 
-    # Total costos M16
-    total_gastos_proj = total_fixed + total_variable
 
-    # Ratio fijo/variable
-    fixed_ratio = (total_fixed / total_gastos_proj * 100) if total_gastos_proj > 0 else 0
-    variable_ratio = (total_variable / total_gastos_proj * 100) if total_gastos_proj > 0 else 0
-    
-    margin_proj = (total_rev_proj - total_gastos_proj) / total_rev_proj * 100 if total_rev_proj > 0 else 0
-    multiple = total_rev_proj / base_rev
-    rev_per_emp_proj = total_rev_proj / hc_target
-    monthly_net = total_rev_proj - total_gastos_proj
+with tab_scenario:
+    st.markdown('<div class="page-title">Scenario Builder</div>', unsafe_allow_html=True)
+    st.markdown('<div class="page-subtitle">Ajusta los parámetros en el panel lateral ← y observa los resultados aquí</div>', unsafe_allow_html=True)
 
-    # Inversión requerida para el plan (CAC, infraestructura, nuevos hires)
-    # Usar new_clients_b2b (derivado del sidebar) y clientes Payins
-    cac_investment = new_clients_b2b * 1200 + 3000*(mult_b2c-1)*15 + clients_payins_m16 * 2000
-    total_investment = cac_investment + 150000 + 150000 + (hc_target-58)*1900*12
-    # Nota: cash_proj y gap se recalculan después de la trayectoria para reflejar el modo de contratación
+    # Escenario calculado en el sidebar por el motor (vita_model.scenario)
+    # Alias para compatibilidad con el resto del tab
+    base_rev = BASE_REVENUE  # Run-rate promedio, no M4
+    rev_b2b_proj = scenario.rev_b2b_proj
+    rev_b2c_proj = scenario.rev_b2c_proj
+    rev_ex_proj = scenario.rev_ex_proj
+    rev_pi_proj = scenario.rev_payins_proj
+    total_rev_proj = scenario.total_rev_proj
+    gtv_b2b_m16 = scenario.gtv_b2b_m16
+    gtv_m16 = scenario.gtv_m16
+    clients_b2b_m16 = scenario.clients_payouts
+
+    # Costos fijos/variables M16
+    personal_proj = scenario.personal_proj
+    admin_proj = scenario.admin_proj
+    bank_proj = scenario.bank_proj
+    inv_proj = scenario.inv_proj
+    ai_savings = scenario.ai_savings
+    fwd_cost = scenario.fwd_cost
+    cogs_proj = scenario.cogs_proj
+    tax_proj = scenario.tax_proj
+    mktg_proj = scenario.mktg_proj
+    total_gastos_proj = scenario.total_gastos_proj
+    fixed_ratio = scenario.fixed_ratio
+    variable_ratio = scenario.variable_ratio
+
+    margin_proj = scenario.margin_proj
+    multiple = scenario.multiple
+    rev_per_emp_proj = scenario.rev_per_emp_proj
+    total_investment = scenario.total_investment
 
     # Guardar en session_state para que Valuation pueda usarlos
     st.session_state['scenario_rev_m16'] = total_rev_proj
@@ -2155,7 +2455,7 @@ with tab_scenario:
     st.markdown('<div class="section-header">👥 RESUMEN DE CLIENTES</div>', unsafe_allow_html=True)
 
     # Clientes target 3× (triplicar base)
-    target_clients_b2b = BASE['users_b2b'] * 3
+    target_clients_b2b = BASE['users_b2b'] * META_MULT_TOTAL
     target_clients_payins = 100  # Target para producto nuevo
     pct_target_b2b = (clients_b2b_m16 / target_clients_b2b * 100) if target_clients_b2b > 0 else 0
     pct_target_payins = (clients_payins_m16 / target_clients_payins * 100) if target_clients_payins > 0 else 0
@@ -2170,7 +2470,7 @@ with tab_scenario:
             <div style="font-size:2rem; font-weight:800; color:{COLORS['dark']};">{clients_b2b_m16:.0f}</div>
             <div style="font-size:0.85rem; color:{COLORS['muted']};">vs {BASE['users_b2b']:.0f} hoy</div>
             <div style="font-size:0.75rem; color:{cli_color}; font-weight:700;">
-                {pct_target_b2b:.0f}% del target 3× ({target_clients_b2b:.0f})
+                {pct_target_b2b:.0f}% del target {META_MULT_TOTAL:g}× ({target_clients_b2b:.0f})
             </div>
         </div>""", unsafe_allow_html=True)
 
@@ -2272,7 +2572,7 @@ with tab_scenario:
         if fwd_rev > 0:
             mix_labels.append('Forwards FX'); mix_values.append(fwd_rev); mix_colors.append(COLORS['forwards'])
         if card_rev > 0:
-            mix_labels.append('Vita Card'); mix_values.append(card_rev); mix_colors.append(COLORS['vita_card'])
+            mix_labels.append('Vita Card (modelo)' if card_model else 'Vita Card'); mix_values.append(card_rev); mix_colors.append(COLORS['vita_card'])
 
         fig_m16 = go.Figure(go.Pie(labels=mix_labels, values=mix_values, hole=0.5,
             marker=dict(colors=mix_colors, line=dict(color='#FFFFFF', width=2)),
@@ -2284,106 +2584,32 @@ with tab_scenario:
             annotations=[dict(text=f"<b>{b2b_pct:.0f}%</b><br>B2B", x=0.5, y=0.5,
                  font=dict(size=16, color=b2b_color), showarrow=False)])
         st.plotly_chart(fig_m16, use_container_width=True)
+        if card_model:
+            st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']}; text-align:center;">
+                Vita Card (modelo de transacciones): interchange {format_k(card_book['interchange'][-1])} + FX {format_k(card_book['fx'][-1])}
+                · +{card_book['b2c_uplift'][-1]:.0%} sobre el GTV Payouts B2C
+            </div>""", unsafe_allow_html=True)
 
     # Nota: Financing verdict se muestra después de calcular la trayectoria y el gap real
 
     # Trajectory chart with fixed/variable cost model
     st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown('<div class="section-header">📈 Trayectoria de Revenue — 12 meses</div>', unsafe_allow_html=True)
-
-    # Valores base = run-rate promedio M1-M4 (no M4 solo)
-    rev_base = BASE_REVENUE
-    # Fijos base: Personal + Admin + Banking + Inversiones (promedios)
-    fixed_base = BASE_PERSONAL + BASE_ADMIN + BASE_BANKING + BASE_INVERSIONES
-    # Variables base: COGS + Impuestos + Marketing (promedios)
-    gtv_base_traj = BASE_GTV_B2B + BASE_GTV_B2C
-    cogs_base_traj = BASE_COGS
-    tax_base_traj = BASE_TAX
-    mktg_base_traj = BASE_MARKETING
-    variable_base = cogs_base_traj + tax_base_traj + mktg_base_traj
-
-    # El primer punto de la trayectoria es M4 REAL
-    rev_trajectory = [DATA['revenue'][3]]       # $360,467
-    cost_trajectory = [DATA['gastos'][3]]       # $320,474
-    fixed_trajectory = [DATA['gastos'][3] - DATA['cogs'][3] - DATA['tax'][3] - DATA['marketing'][3]]
-    variable_trajectory = [DATA['cogs'][3] + DATA['tax'][3] + DATA['marketing'][3]]
-    cash_trajectory = [DATA['cash'][3]]         # $3,231,872
-    monthly_data = []
-
-    # M4 = datos reales
-    monthly_data.append({
-        'mes': 'M4',
-        'revenue': DATA['revenue'][3],
-        'fixed': fixed_trajectory[0],
-        'variable': variable_trajectory[0],
-        'total_cost': DATA['gastos'][3],
-        'net_income': DATA['revenue'][3] - DATA['gastos'][3],
-        'margin': (DATA['revenue'][3] - DATA['gastos'][3]) / DATA['revenue'][3] * 100,
-    })
-
-    # A partir de M5 empieza la S-curve hacia M16
-    months_proj = list(range(5, 17))  # M5 a M16 (12 meses)
-    for i, m in enumerate(months_proj):
-        f = (i + 1) / 12  # interpolation factor
-
-        # Revenue: curva S desde M4 real hacia M16 proyectado
-        s_curve = 1 / (1 + np.exp(-8 * (f - 0.4)))
-        rev_m = DATA['revenue'][3] + (total_rev_proj - DATA['revenue'][3]) * s_curve
-
-        # Costos fijos: step function con entrada gradual o inmediata
-        new_positions_calc = max(0, hc_target - 58)
-        if hiring_mode:
-            # Gradual: 1 hire cada N meses
-            hire_interval = 12 / new_positions_calc if new_positions_calc > 0 else 999
-            hires_so_far = min(new_positions_calc, int((i + 1) / hire_interval)) if new_positions_calc > 0 else 0
-        else:
-            # Inmediato: todos desde mes 1 de proyección (mes 5 absoluto)
-            hires_so_far = new_positions_calc
-        pers_m = BASE_PERSONAL + hires_so_far * 2500
-        # Países: cada uno entra en un trimestre diferente
-        countries_active = min(new_countries, (i + 1) // 4 + (1 if i >= 2 else 0))
-        admin_m = BASE_ADMIN + countries_active * 5000
-        fixed_m = pers_m + admin_m + BASE_BANKING + BASE_INVERSIONES + (4500 if fwd_on else 0) - (ai_savings if i >= 3 else 0)
-
-        # Costos variables: proporcionales al revenue del mes
-        variable_ratio_base = variable_base / rev_base if rev_base > 0 else 0.40
-        variable_ratio_m16 = total_variable / total_rev_proj if total_rev_proj > 0 else 0.35
-        var_ratio_m = variable_ratio_base + (variable_ratio_m16 - variable_ratio_base) * f
-        variable_m = rev_m * var_ratio_m
-
-        cost_m = fixed_m + variable_m
-        net_m = rev_m - cost_m
-
-        rev_trajectory.append(rev_m)
-        cost_trajectory.append(cost_m)
-        fixed_trajectory.append(fixed_m)
-        variable_trajectory.append(variable_m)
-        cash_trajectory.append(cash_trajectory[-1] + net_m)
-
-        monthly_data.append({
-            'mes': f'M{m}',
-            'revenue': rev_m,
-            'fixed': fixed_m,
-            'variable': variable_m,
-            'total_cost': cost_m,
-            'net_income': net_m,
-            'margin': (rev_m - cost_m) / rev_m * 100 if rev_m > 0 else 0,
-        })
-
-    # Recalcular cash_proj usando la trayectoria real (no promedio)
-    # rev_trajectory[0] = M4 real, rev_trajectory[1:] = M5-M16 proyectado
-    cash_proj = DATA['cash'][3]
-    for i in range(1, 13):  # índices 1-12 = M5-M16 (saltar M4 que ya está en cash inicial)
-        cash_proj += rev_trajectory[i] - cost_trajectory[i]
+    proj_horizon = st.radio("Horizonte de proyección", HORIZONS, format_func=lambda h: f"M{h}",
+                            horizontal=True, key="proj_horizon")
+    st.markdown(f'<div class="section-header">📈 Trayectoria de Revenue — {proj_horizon - 4} meses</div>', unsafe_allow_html=True)
 
-    # Recalcular gap con el nuevo cash_proj basado en trayectoria
-    gap = total_investment - cash_proj
+    # Trayectoria M4 (real) → M{horizonte} calculada por el motor (KPIs siguen en M16)
+    traj = scenario.trajectory.window(proj_horizon)
+    months_proj = list(traj.months[1:])  # M5 a M{horizonte}
+    rev_trajectory = list(traj.revenue)
+    cash_proj = scenario.cash_proj
+    gap = scenario.gap
 
     # Para gráficos: M1-M4 histórico + M5-M16 proyectado (sin duplicar M4)
     full_months = MESES + [f'Mes {m}' for m in months_proj]
     full_rev = DATA['revenue'] + rev_trajectory[1:]  # skip M4 en trajectory
-    full_costs = DATA['gastos'] + cost_trajectory[1:]  # skip M4 en trajectory
-    full_cash = list(DATA['cash']) + cash_trajectory[1:]
+    full_costs = DATA['gastos'] + list(traj.cost[1:])  # skip M4 en trajectory
+    full_cash = list(DATA['cash']) + list(traj.cash[1:])
 
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     fig.add_trace(go.Bar(x=MESES, y=DATA['revenue'], name='Revenue (histórico)',
@@ -2400,6 +2626,9 @@ with tab_scenario:
     fig.update_layout(legend=dict(y=1.15))
     fig.add_vline(x=3.5, line_dash="dash", line_color="#636E72", line_width=1,
         annotation_text="Hoy", annotation_font_color="#636E72")
+    if proj_horizon > 16:
+        fig.add_vline(x=15.5, line_dash="dot", line_color="#636E72", line_width=1,
+            annotation_text="M16", annotation_font_color="#636E72")
     st.plotly_chart(fig, use_container_width=True)
 
     # Cash Position M16 y Financing Gap
@@ -2430,16 +2659,18 @@ with tab_scenario:
             <div style="color:{gap_color}; font-weight:700; margin-top:0.3rem;">{gap_label}</div>
         </div>""", unsafe_allow_html=True)
 
-    # Financing verdict (ahora usa gap calculado con trayectoria real)
-    if gap < 0:
-        verdict, v_color = "✅ CRECIMIENTO 100% ORGÁNICO", COLORS['success']
-        v_detail = f"Surplus: {format_k(abs(gap))}"
-    elif gap < 2000000:
-        verdict, v_color = "⚠️ NECESITA LÍNEAS DE CRÉDITO", COLORS['warning']
-        v_detail = f"Gap: {format_k(gap)}"
-    else:
-        verdict, v_color = "🔴 REQUIERE EQUITY", COLORS['danger']
-        v_detail = f"Gap: {format_k(gap)}"
+    # Financing verdict: ruta del plan de financiamiento M5→M24 (línea, venture debt, equity)
+    fin_route = int(financing['route'])
+    verdict, v_color = [("✅ CRECIMIENTO 100% ORGÁNICO", COLORS['success']),
+                        ("⚠️ NECESITA LÍNEAS DE CRÉDITO", COLORS['warning']),
+                        ("⚠️ NECESITA VENTURE DEBT", COLORS['warning']),
+                        ("🔴 REQUIERE EQUITY", COLORS['danger'])][fin_route]
+    v_detail = f"{'Surplus' if gap < 0 else 'Gap'} M16: {format_k(abs(gap))}"
+    if fin_route > 0:
+        v_detail += (f" · Pico línea: {format_k(financing['peak_line'])} · Venture debt: {format_k(financing['vd_drawn'])}"
+                     f" · Equity: {format_k(financing['equity_needed'])} · Costo financiero M5–M24: {format_k(financing['financing_cost'])}")
+    if financing['first_breach']:
+        v_detail += f"<br>⚠️ Covenant incumplido desde M{int(financing['first_breach'])}"
 
     st.markdown(f"""
     <div style="background:{v_color}11; border:2px solid {v_color}; border-radius:12px; padding:1rem; text-align:center; margin-top:1rem;">
@@ -2746,85 +2977,18 @@ with tab_scenario:
     # ═══════════════════════════════════════════════════════════
     st.markdown('<div class="section-header">📈 EVOLUCIÓN MENSUAL — INGRESOS, COSTOS Y RESULTADO</div>', unsafe_allow_html=True)
 
-    # Build monthly evolution data with S-curve interpolation
-    meses_evol = [f'M{i}' for i in range(4, 17)]
-
-    # M4 = valores REALES (no promedios)
-    rev_b2b_m4 = DATA['rev_payouts_b2b'][3]
-    rev_b2c_m4 = DATA['rev_payouts_b2c'][3]
-    rev_ex_m4 = DATA['rev_exchange_b2b'][3]
-    rev_pi_m4 = DATA['rev_payins_b2b'][3]
-    costs_m4 = DATA['gastos'][3]
-    cash_m4_evol = DATA['cash'][3]
-
-    # Monthly arrays
-    rev_b2b_evol, rev_b2c_evol, rev_ex_evol, rev_pi_evol = [], [], [], []
-    fwd_evol, card_evol = [], []
-    rev_total_evol, costs_total_evol, net_evol, margin_evol, cash_evol = [], [], [], [], []
-
-    # Client tracking arrays
-    clients_b2b_evol, clients_payins_evol = [], []
-    arpu_b2b_evol = []
-
-    # M4 clientes reales
-    clients_b2b_m4 = DATA['b2b_users_est'][3]  # 396
-    clients_payins_m4 = 2  # estimado
-
-    for m in range(13):  # m=0 is M4 (real), m=1..12 is M5..M16 (S-curve)
-        if m == 0:
-            # M4 = datos REALES
-            rb, rc, re, rp = rev_b2b_m4, rev_b2c_m4, rev_ex_m4, rev_pi_m4
-            fwd_m, card_m = 0, 0  # Productos nuevos no existían en M4
-            cost_m = costs_m4
-            cli_b2b_m = clients_b2b_m4
-            cli_pi_m = clients_payins_m4
-        else:
-            # M5-M16: S-curve desde M4 real hacia M16 proyectado
-            f = m / 12
-            s_factor = 1 / (1 + np.exp(-8 * (f - 0.4)))
-
-            rb = rev_b2b_m4 + (rev_b2b_proj - rev_b2b_m4) * s_factor
-            rc = rev_b2c_m4 + (rev_b2c_proj - rev_b2c_m4) * s_factor
-            re = rev_ex_m4 + (rev_ex_proj - rev_ex_m4) * s_factor
-            rp = rev_pi_m4 + (rev_pi_proj - rev_pi_m4) * s_factor
-
-            fwd_m = fwd_rev * s_factor if fwd_rev > 0 else 0
-            card_m = card_rev * s_factor if card_rev > 0 else 0
-
-            cost_m = costs_m4 + (total_gastos_proj - costs_m4) * s_factor * 0.8
-
-            # Clientes con S-curve
-            cli_b2b_m = clients_b2b_m4 + (clients_b2b_m16 - clients_b2b_m4) * s_factor
-            cli_pi_m = clients_payins_m4 + (clients_payins_m16 - clients_payins_m4) * s_factor
-
-        rev_b2b_evol.append(rb)
-        rev_b2c_evol.append(rc)
-        rev_ex_evol.append(re)
-        rev_pi_evol.append(rp)
-        fwd_evol.append(fwd_m)
-        card_evol.append(card_m)
-
-        # Client tracking
-        clients_b2b_evol.append(cli_b2b_m)
-        clients_payins_evol.append(cli_pi_m)
-        arpu_b2b_m = rb / cli_b2b_m if cli_b2b_m > 0 else 0
-        arpu_b2b_evol.append(arpu_b2b_m)
-
-        rev_tot = rb + rc + re + rp + fwd_m + card_m
-        rev_total_evol.append(rev_tot)
-        costs_total_evol.append(cost_m)
-
-        net_m = rev_tot - cost_m
-        net_evol.append(net_m)
-
-        margin_m = (net_m / rev_tot * 100) if rev_tot > 0 else 0
-        margin_evol.append(margin_m)
-
-        # Cash accumulation
-        if m == 0:
-            cash_evol.append(cash_m4_evol)
-        else:
-            cash_evol.append(cash_evol[-1] + net_m)
+    # Misma trayectoria del motor que el gráfico de arriba (M4 real → M16), por línea de negocio
+    evol = scenario.trajectory.window(16)
+    meses_evol = [f'M{m}' for m in evol.months]
+
+    rev_b2b_evol, rev_b2c_evol, rev_ex_evol, rev_pi_evol = evol.rev_b2b, evol.rev_b2c, evol.rev_ex, evol.rev_pi
+    fwd_evol, card_evol = evol.rev_fwd, evol.rev_card
+    rev_total_evol, costs_total_evol, net_evol, cash_evol = evol.revenue, evol.cost, evol.net, evol.cash
+    margin_evol = np.where(rev_total_evol > 0, net_evol / rev_total_evol * 100, 0)
+
+    # Clientes B2B y ARPU Payouts por mes
+    clients_b2b_evol, clients_payins_evol = evol.clients_b2b, evol.clients_payins
+    arpu_b2b_evol = np.where(clients_b2b_evol > 0, rev_b2b_evol / clients_b2b_evol, 0)
 
     # 1. Stacked Area Chart - Revenue by Line
     # Helper to convert hex to rgba
@@ -2999,21 +3163,34 @@ ARPU Payouts M4: $669 (mes estacionalmente bajo). Promedio M1-M4: $883. Rango: $
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown('<div class="section-header">👥 Métricas por Cliente B2B — Proyectado a M16</div>', unsafe_allow_html=True)
 
-    # Usar clients_b2b_m16 derivado del sidebar (GTV ÷ avg GTV per client)
-    users_b2b_m16 = clients_b2b_m16
+    agent_on = st.toggle("Simulación por cliente (cartera uno a uno, P50)", value=False, key="agent_on",
+        help="Cada cliente B2B con su GTV, tramo de take rate, hazard de churn y cross-sell a Exchange/Payins, M5→M64")
+    if agent_on:
+        with st.spinner("Simulando la cartera B2B cliente a cliente..."):
+            agents = cached_clients(scenario.inputs, scenario_assumptions, AGENT_PATHS, 0)
+        agent_m16 = {k: v[1] for k, v in agents['m16'].items()}
+
+    # Usar clients_b2b_m16 derivado del sidebar (GTV ÷ avg GTV per client) o la mediana de la cartera simulada
+    users_b2b_m16 = agent_m16['clients_payouts'] if agent_on else clients_b2b_m16
     client_growth = users_b2b_m16 / BASE['users_b2b'] if BASE['users_b2b'] > 0 else 1
     ticket_m16 = gtv_b2b_m16 / users_b2b_m16 if users_b2b_m16 > 0 else BASE['avg_gtv_user_b2b']
     ticket_growth = ticket_m16 / BASE['avg_gtv_user_b2b'] if BASE['avg_gtv_user_b2b'] > 0 else 1
 
     # Revenue por cliente M16 (derivado de revenue ÷ clientes)
-    rev_per_user_b2b_m16 = rev_b2b_proj / users_b2b_m16 if users_b2b_m16 > 0 else 0
-    rev_per_user_ex_m16 = rev_ex_proj / users_b2b_m16 if users_b2b_m16 > 0 else 0
-    rev_per_user_pi_m16 = rev_pi_proj / users_b2b_m16 if users_b2b_m16 > 0 else 0
+    rev_b2b_users, rev_ex_users, rev_pi_users = (
+        (agent_m16['rev_b2b_proj'], agent_m16['rev_ex_b2b_proj'], agent_m16['rev_payins_proj']) if agent_on
+        else (rev_b2b_proj, scenario.rev_ex_b2b_proj, rev_pi_proj))
+    rev_per_user_b2b_m16 = rev_b2b_users / users_b2b_m16 if users_b2b_m16 > 0 else 0
+    rev_per_user_ex_m16 = rev_ex_users / users_b2b_m16 if users_b2b_m16 > 0 else 0
+    rev_per_user_pi_m16 = rev_pi_users / users_b2b_m16 if users_b2b_m16 > 0 else 0
     rev_per_user_total_m16 = rev_per_user_b2b_m16 + rev_per_user_ex_m16 + rev_per_user_pi_m16
 
-    # MRR y CLTV proyectados
+    # MRR y CLTV proyectados (la cartera simulada usa el churn realizado, con hazard heterogéneo)
     mrr_m16 = users_b2b_m16 * rev_per_user_total_m16
-    cltv_m16 = rev_per_user_total_m16 / AVG_CHURN_B2B_SAFE if AVG_CHURN_B2B_SAFE > 0 else 0
+    if agent_on:
+        cltv_m16 = agent_m16['cltv_m16']
+    else:
+        cltv_m16 = rev_per_user_total_m16 / AVG_CHURN_B2B_SAFE if AVG_CHURN_B2B_SAFE > 0 else 0
 
     # Guardar en session_state para usar en Valuation
     st.session_state['users_b2b_m16'] = users_b2b_m16
@@ -3101,11 +3278,532 @@ ARPU Payouts M4: $669 (mes estacionalmente bajo). Promedio M1-M4: $883. Rango: $
             </div>
             """, unsafe_allow_html=True)
 
+    if agent_on:
+        # Bandas de la cartera simulada y distribución de CLTV por cliente
+        agent_c1, agent_c2 = st.columns([3, 2])
+        with agent_c1:
+            fig_agents = make_subplots(specs=[[{"secondary_y": True}]])
+            fig_agents.add_trace(go.Scatter(x=agents['months'], y=agents['active'][2], mode='lines', line=dict(width=0),
+                showlegend=False, hoverinfo='skip'), secondary_y=False)
+            fig_agents.add_trace(go.Scatter(x=agents['months'], y=agents['active'][0], mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor='rgba(0,201,167,0.15)', name='Clientes P5–P95'), secondary_y=False)
+            fig_agents.add_trace(go.Scatter(x=agents['months'], y=agents['active'][1], name='Clientes P50', mode='lines',
+                line=dict(color=COLORS['primary'], width=2)), secondary_y=False)
+            fig_agents.add_trace(go.Scatter(x=agents['months'], y=agents['mrr'][1], name='MRR B2B P50', mode='lines',
+                line=dict(color=COLORS['secondary'], width=2, dash='dot')), secondary_y=True)
+            fig_agents.add_vline(x=16, line_dash="dash", line_color="#636E72", line_width=1)
+            fig_agents = plotly_theme(fig_agents, height=340)
+            fig_agents.update_yaxes(title_text="Clientes activos", secondary_y=False)
+            fig_agents.update_yaxes(title_text="MRR B2B (USD)", secondary_y=True)
+            fig_agents.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+            st.plotly_chart(fig_agents, use_container_width=True)
+        with agent_c2:
+            tier_rows = "".join(
+                f"<tr><td style='padding:0.3rem;'>{label}</td><td style='padding:0.3rem; text-align:right;'>{n:,.0f}</td></tr>"
+                for label, n in zip(TIER_LABELS, agents['tiers']))
+            cltv_p = agents['client_cltv']
+            st.markdown(f"""<div style="background:{COLORS['card_bg']}; border-radius:10px; padding:0.8rem 1rem; border:1px solid #E2E8F0; font-size:0.85rem; color:{COLORS['text']};">
+<strong>Clientes activos M16 por tramo de take rate</strong>
+<table style="width:100%; font-family:'JetBrains Mono', monospace; margin:0.3rem 0 0.6rem;">{tier_rows}</table>
+<strong>CLTV por cliente (M16)</strong><br>
+P10 {format_k(cltv_p[9])} · P50 {format_k(cltv_p[49])} · P90 {format_k(cltv_p[89])}<br>
+<span style="font-size:0.78rem; color:{COLORS['muted']};">CLTV B2B M16: P5 {format_k(agents['m16']['cltv_m16'][0])} – P95 {format_k(agents['m16']['cltv_m16'][2])} · MRR: P5 {format_k(agents['m16']['mrr_m16'][0])} – P95 {format_k(agents['m16']['mrr_m16'][2])}</span></div>""", unsafe_allow_html=True)
+        st.caption(f"{agents['n_clients']:,} clientes en {AGENT_PATHS} carteras simuladas · "
+                   f"{agents['nbytes'] / 1e6:.1f} MB en memoria · {agents['elapsed_ms']:,.0f} ms")
+
+    # ═══════════════════════════════════════════════════════════
+    # SENSIBILIDAD — Tornado sobre sliders y constantes del modelo
+    # ═══════════════════════════════════════════════════════════
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="section-header">🌪️ SENSIBILIDAD — ¿Qué mueve más el resultado?</div>', unsafe_allow_html=True)
+
+    tor_c1, tor_c2 = st.columns([1, 2])
+    with tor_c1:
+        tornado_pct = st.slider("Perturbación (±%)", 5, 50, 10, 5, key="tornado_pct")
+    with tor_c2:
+        tornado_labels = {'total_rev_proj': 'Revenue M16', 'margin_proj': 'Margen M16', 'gap': 'Financing Gap'}
+        tornado_metric = st.radio("Métrica", list(tornado_labels), format_func=tornado_labels.get,
+            horizontal=True, key="tornado_metric")
+
+    tornado = run_tornado(scenario.inputs, pct=tornado_pct / 100, assumptions=scenario_assumptions)
+    tor_base = tornado['base'][tornado_metric]
+    tor_rows = [r for r in tornado['rows'][tornado_metric] if r['swing'] > 0][:12][::-1]
+    tor_fmt = (lambda v: f"{v:.1f}%") if tornado_metric == 'margin_proj' else format_k
+
+    fig_tor = go.Figure()
+    fig_tor.add_trace(go.Bar(y=[r['label'] for r in tor_rows], x=[r['low'] - tor_base for r in tor_rows],
+        base=tor_base, orientation='h', name=f'−{tornado_pct}%', marker_color=COLORS['danger'],
+        text=[tor_fmt(r['low']) for r in tor_rows], textposition='outside',
+        hovertext=[f"{r['label']} = {r['low_value']:,.4g}" if r['low_value'] is not None else r['label']
+                   for r in tor_rows], hoverinfo='text'))
+    fig_tor.add_trace(go.Bar(y=[r['label'] for r in tor_rows], x=[r['high'] - tor_base for r in tor_rows],
+        base=tor_base, orientation='h', name=f'+{tornado_pct}%', marker_color=COLORS['success'],
+        text=[tor_fmt(r['high']) for r in tor_rows], textposition='outside',
+        hovertext=[f"{r['label']} = {r['high_value']:,.4g}" if r['high_value'] is not None else r['label']
+                   for r in tor_rows], hoverinfo='text'))
+    fig_tor = plotly_theme(fig_tor, height=460)
+    fig_tor.update_layout(barmode='overlay', legend=dict(y=1.1))
+    fig_tor.add_vline(x=tor_base, line_dash="dash", line_color="#636E72", line_width=1,
+        annotation_text=f"Base {tor_fmt(tor_base)}", annotation_font_color="#636E72")
+    st.plotly_chart(fig_tor, use_container_width=True)
+
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        Cada barra mueve un solo parámetro ±{tornado_pct}% (resto fijo). Rojo = −{tornado_pct}%, verde = +{tornado_pct}%.
+        Países, headcount y equipo actual se mueven al entero más cercano (mínimo ±1) dentro del rango de su slider.
+        Incluye sliders y constantes del modelo (costo por hire, admin por país, banking, impuestos, CAC, etc.).
+    </div>""", unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # GOAL SEEK — Combinación más barata que cumple las metas
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">🎯 GOAL SEEK — ¿Qué sliders cumplen las metas?</div>', unsafe_allow_html=True)
+
+    goal_labels = {
+        'mult_total': f'Clientes B2B ≥ {META_MULT_TOTAL:g}×',
+        'multiple': 'Revenue ≥ 3×',
+        'margin_proj': 'Margen ≥ 30%',
+        'gap': 'Gap ≤ 0 (sin financiamiento)',
+    }
+    free_labels = {
+        'take_b2b': 'Take Rate Payouts B2B',
+        'mktg_monthly': 'Marketing',
+        'hc_target': 'Headcount',
+        'clients_payins_m16': 'Clientes Payins',
+    }
+    gs_c1, gs_c2 = st.columns(2)
+    with gs_c1:
+        gs_targets = st.multiselect("Metas", list(goal_labels), default=['mult_total', 'margin_proj', 'gap'],
+            format_func=goal_labels.get, key="gs_targets")
+    with gs_c2:
+        gs_free = st.multiselect("Variables libres", list(free_labels), default=list(free_labels),
+            format_func=free_labels.get, key="gs_free")
+
+    if st.button("🔎 Buscar combinación", key="gs_run", disabled=not (gs_targets and gs_free)):
+        st.session_state['gs_result'] = goal_seek(scenario.inputs,
+            targets={k: GOAL_TARGETS[k][1] for k in gs_targets}, free=gs_free, assumptions=scenario_assumptions)
+
+    gs_result = st.session_state.get('gs_result')
+    if gs_result:
+        gs_color = COLORS['success'] if gs_result['feasible'] else COLORS['warning']
+        gs_title = "✅ Combinación más barata que cumple las metas" if gs_result['feasible'] else "⚠️ Ninguna combinación cumple — la más cercana"
+        gs_fmt = {
+            'take_b2b': lambda v: f"{v:.2f}%",
+            'mktg_monthly': lambda v: f"${v}K/mes",
+            'hc_target': lambda v: f"{v} personas",
+            'clients_payins_m16': lambda v: f"{v} clientes",
+        }
+        gs_inputs_html = " · ".join(f"{free_labels[k]}: <b>{gs_fmt[k](v)}</b>" for k, v in gs_result['inputs'].items())
+        gs_out = gs_result['outputs']
+        st.markdown(f"""
+        <div style="background:{gs_color}11; border:2px solid {gs_color}; border-radius:12px; padding:1rem; margin-top:0.5rem;">
+            <div style="font-weight:800; font-size:1rem; color:{gs_color};">{gs_title}</div>
+            <div style="font-size:0.9rem; color:#4A5568; margin-top:0.4rem;">{gs_inputs_html}</div>
+            <div style="font-size:0.85rem; color:#4A5568; margin-top:0.4rem;">
+                Clientes ×{gs_out['mult_total']:.2f} · Revenue ×{gs_out['multiple']:.2f} · Margen {gs_out['margin_proj']:.1f}% ·
+                {'Surplus' if gs_out['gap'] < 0 else 'Gap'} {format_k(abs(gs_out['gap']))}
+            </div>
+            <div style="font-size:0.75rem; color:{COLORS['muted']}; margin-top:0.4rem;">
+                Costo 12m (inversión del plan + marketing): {format_k(gs_result['cost'])} ·
+                {gs_result['n_evaluated']:,} combinaciones en {gs_result['elapsed_ms']:.0f} ms{'' if gs_result['exhaustive'] else ' (grilla gruesa + refinamiento)'}
+            </div>
+        </div>""", unsafe_allow_html=True)
+
+        def apply_goal_seek(values):
+            for k, v in values.items():
+                st.session_state[SLIDER_KEYS[k]] = v
+
+        st.button("↩️ Aplicar al sidebar", key="gs_apply", on_click=apply_goal_seek, args=(gs_result['inputs'],))
+
+    # ═══════════════════════════════════════════════════════════
+    # FRONTERA DE PARETO — Crecimiento vs Margen vs Gap
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">🧭 FRONTERA DE PARETO — Crecimiento vs Margen vs Gap</div>', unsafe_allow_html=True)
+
+    pf_growth_labels = {'multiple': 'Revenue M16 (×)', 'mult_total': 'Clientes B2B (×)'}
+    pf_c1, pf_c2 = st.columns([2, 1])
+    with pf_c1:
+        pf_growth = st.radio("Crecimiento", list(pf_growth_labels), format_func=pf_growth_labels.get,
+            horizontal=True, key="pf_growth")
+    with pf_c2:
+        if st.button("🧭 Calcular frontera", key="pf_run"):
+            st.session_state['pf_on'] = True
+
+    if st.session_state.get('pf_on'):
+        pf_fixed = ScenarioInputs(**{k: getattr(scenario.inputs, k) for k in FIXED_FIELDS})
+        with st.spinner("Evaluando la grilla de sliders..."):
+            pf = cached_pareto(pf_fixed, pf_growth, scenario_assumptions)
+        pf_sample = pf['sample']
+
+        def apply_pareto_point():
+            # Traza 1 = frontera; point_index = fila de pf
+            picked = [p['point_index'] for p in st.session_state['pf_chart']['selection']['points'] if p['curve_number'] == 1]
+            if picked:
+                for k, v in pf['inputs'].items():
+                    st.session_state[SLIDER_KEYS[k]] = v[picked[0]].item()
+
+        pf_hover = [
+            f"Take B2B {tr:.2f}% · {c} países · {pi} cli. Payins<br>B2C ×{b2c:.1f} · HC {hc} · Mktg ${mk}K"
+            for tr, c, pi, b2c, hc, mk in zip(*(pf['inputs'][k] for k in
+                ('take_b2b', 'new_countries', 'clients_payins_m16', 'mult_b2c', 'hc_target', 'mktg_monthly')))
+        ]
+        fig_pf = go.Figure()
+        fig_pf.add_trace(go.Scattergl(x=pf_sample['margin_proj'], y=pf_sample[pf_growth], mode='markers',
+            name='Grilla (muestra)', marker=dict(size=4, color='#CBD5E0', opacity=0.5), hoverinfo='skip'))
+        fig_pf.add_trace(go.Scatter(x=pf['margin_proj'], y=pf[pf_growth], mode='markers+lines',
+            name='Frontera', line=dict(color=COLORS['secondary'], width=1, dash='dot'),
+            marker=dict(size=11, color=-pf['gap'] / 1e6, colorscale='Teal', showscale=True,
+                        colorbar=dict(title="Surplus $M"), line=dict(color='white', width=1)),
+            customdata=pf['gap'] / 1e6, text=pf_hover,
+            hovertemplate="%{text}<br>Margen %{x:.1f}% · ×%{y:.2f} · Gap $%{customdata:.2f}M<extra></extra>"))
+        fig_pf.add_trace(go.Scatter(x=[margin_proj], y=[getattr(scenario, pf_growth)], mode='markers',
+            name='Escenario actual', marker=dict(size=16, color=COLORS['warning'], symbol='star'), hoverinfo='skip'))
+        fig_pf = plotly_theme(fig_pf, height=430)
+        fig_pf.update_layout(xaxis_title="Margen M16 (%)", yaxis_title=pf_growth_labels[pf_growth],
+            legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"), clickmode='event+select')
+        st.plotly_chart(fig_pf, use_container_width=True, key="pf_chart", on_select=apply_pareto_point,
+            selection_mode="points")
+
+        pf_source = "cubo precalculado" if pf['source'] == 'cube' else "evaluación en batch"
+        pf_note = ("Un solo escenario domina toda la grilla: en el modelo actual ningún slider compensa crecimiento "
+                   "con margen o caja." if len(pf['gap']) == 1 else "Cada punto es no dominado: mejorar un eje exige ceder en otro.")
+        st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+            {pf_note} Click en un punto de la frontera → se aplica al sidebar.<br>
+            {len(pf['gap']):,} escenarios no dominados de {pf['n_evaluated']:,} ({pf_source}, {pf['elapsed_ms']:.0f} ms).
+        </div>""", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # CALENDARIO DE PAÍSES — Orden y mes de lanzamiento
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">🗓️ CALENDARIO DE PAÍSES — Orden y mes de lanzamiento</div>', unsafe_allow_html=True)
+
+    ro_objective_labels = {'cash_proj': 'Maximizar caja M16', 'gap': 'Minimizar gap'}
+    ro_c1, ro_c2, ro_c3 = st.columns([2, 2, 1])
+    with ro_c1:
+        ro_objective = st.radio("Objetivo", list(ro_objective_labels), format_func=ro_objective_labels.get,
+            horizontal=True, key="ro_objective")
+    with ro_c2:
+        ro_min_gap = st.select_slider("Meses mínimos entre lanzamientos", options=[0, 1, 2, 3], value=1, key="ro_min_gap")
+    with ro_c3:
+        if st.button("🗓️ Buscar calendario", key="ro_run"):
+            st.session_state['ro_on'] = True
+
+    if st.session_state.get('ro_on'):
+        ro = optimize_rollout(scenario.inputs, scenario_assumptions, objective=ro_objective, min_gap=ro_min_gap)
+        ro_best, ro_current = ro['top'][0], ro['current']
+
+        def apply_rollout():
+            # Países fuera del mejor calendario: "No se lanza"
+            for c in COUNTRIES:
+                st.session_state[f"sb_launch_{c.name}"] = ro_best['schedule'].get(c.name)
+
+        def schedule_text(schedule):
+            return ' → '.join(f"{name} M{m}" for name, m in sorted(schedule.items(), key=lambda x: x[1])) or "Sin lanzamientos"
+
+        fig_ro = go.Figure()
+        for label, plan, color in [("Actual", ro_current['schedule'], COLORS['muted']),
+                                   ("Mejor", ro_best['schedule'], COLORS['secondary'])]:
+            names = [c.name for c in COUNTRIES if c.name in plan]
+            fig_ro.add_trace(go.Bar(
+                y=names, x=[17 - plan[n] for n in names], base=[plan[n] for n in names], orientation='h',
+                name=label, marker_color=color, text=[f"M{plan[n]}" for n in names], textposition='inside',
+                hovertemplate="%{y}: lanza M%{base}<extra>" + label + "</extra>"))
+        fig_ro = plotly_theme(fig_ro, height=300)
+        fig_ro.update_layout(barmode='group', xaxis_title="Mes (activo hasta M16)",
+            yaxis=dict(autorange="reversed"), legend=dict(orientation="h", y=1.12, x=0.5, xanchor="center"))
+        fig_ro.update_xaxes(range=[4.5, 17], dtick=1)
+
+        ro_col_chart, ro_col_table = st.columns([3, 2])
+        with ro_col_chart:
+            st.plotly_chart(fig_ro, use_container_width=True)
+        with ro_col_table:
+            ro_delta = ro_best[ro_objective] - ro_current[ro_objective]
+            st.markdown(f"""
+            <div style="background:{COLORS['card_bg']}; border-radius:10px; padding:1rem; border:1px solid #E2E8F0;">
+                <div style="font-size:0.8rem; color:{COLORS['muted']};">Mejor calendario · {ro_objective_labels[ro_objective]}</div>
+                <div style="font-weight:700; color:{COLORS['text']}; margin:0.3rem 0;">{schedule_text(ro_best['schedule'])}</div>
+                <div style="font-size:0.85rem;">Caja M16 {format_k(ro_best['cash_proj'])} · Gap {format_k(ro_best['gap'])}</div>
+                <div style="font-size:0.85rem; color:{COLORS['success'] if (ro_delta >= 0) == (ro_objective == 'cash_proj') else COLORS['danger']};">
+                    {'+' if ro_delta >= 0 else ''}{format_k(ro_delta)} vs el calendario actual</div>
+            </div>""", unsafe_allow_html=True)
+            st.button("Aplicar al sidebar", key="ro_apply", on_click=apply_rollout)
+
+        st.dataframe(pd.DataFrame([
+            {'#': i + 1, 'Calendario': schedule_text(r['schedule']), 'Caja M16': format_k(r['cash_proj']),
+             'Gap': format_k(r['gap'])}
+            for i, r in enumerate(ro['top'])
+        ]), use_container_width=True, hide_index=True)
+        ro_cache = ROLLOUT_CACHE.stats()
+        st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+            {ro['n_countries']} países: {ro['n_evaluated']:,} calendarios evaluados en batch de {ro['n_space']:,} posibles
+            (poda por meses mínimos entre lanzamientos y mes más temprano de cada país), {ro['elapsed_ms']:.0f} ms ·
+            caché: {ro_cache['hits']} hits / {ro_cache['misses']} misses<br>
+            Cada país capta como máximo sus clientes planificados a M16: adelantar el lanzamiento sólo suma meses de admin.
+        </div>""", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # LIQUIDEZ DIARIA — Prefunding y float intra-mes
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">💧 LIQUIDEZ DIARIA — Prefunding y float intra-mes</div>', unsafe_allow_html=True)
+
+    liq_c1, liq_c2 = st.columns(2)
+    with liq_c1:
+        liq_paths = st.select_slider("Trayectorias simuladas", options=[200, 500, 1000, 2000], value=1000, key="liq_paths")
+    with liq_c2:
+        liq_months = st.radio("Horizonte", [12, 24], format_func=lambda m: f"{m} meses (M5–M{4 + m})",
+            horizontal=True, key="liq_months")
+
+    with st.expander("⚙️ Supuestos de settlement por producto"):
+        st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+            Lag: días entre que Vita paga y recibe los fondos (negativo = Vita retiene fondos del cliente).
+            Prefunding: días de volumen promedio pre-depositados en cuentas de destino.</div>""", unsafe_allow_html=True)
+        liq_settlement = {}
+        for col, product in zip(st.columns(len(LIQUIDITY_PRODUCTS)), LIQUIDITY_PRODUCTS):
+            with col:
+                st.markdown(f"**{LIQUIDITY_LABELS[product]}**")
+                liq_settlement[product] = replace(SETTLEMENT[product],
+                    lag=st.number_input("Lag (días)", min_value=-5, max_value=10, value=SETTLEMENT[product].lag,
+                        step=1, key=f"liq_lag_{product}"),
+                    prefund=st.number_input("Prefunding (días)", min_value=0.0, max_value=10.0,
+                        value=float(SETTLEMENT[product].prefund), step=0.25, key=f"liq_prefund_{product}"))
+
+    liq = cached_liquidity(scenario.inputs, scenario_assumptions, liq_months, liq_paths, liq_settlement)
+
+    liq_peak = liq['peak_need'].max()
+    liq_ratio = (liq['peak_need'] / liq['avg_need']).max()
+    liq_min_date = pd.Timestamp(liq['dates'][liq['min_day']])
+    liq_k1, liq_k2, liq_k3, liq_k4 = st.columns(4)
+    with liq_k1:
+        st.markdown(metric_card("Necesidad pico (P95)", format_k(liq_peak),
+            f"{format_k(liq_peak - liq['need_m4'])} sobre M4", "down"), unsafe_allow_html=True)
+    with liq_k2:
+        st.markdown(metric_card("Saldo mínimo (P5)", format_k(liq['min_balance'][0]),
+            f"P50 {format_k(liq['min_balance'][1])}", "up" if liq['min_balance'][0] > 0 else "down"), unsafe_allow_html=True)
+    with liq_k3:
+        st.markdown(metric_card("Pico / promedio intra-mes", f"{liq_ratio:.1f}", suffix="x"), unsafe_allow_html=True)
+    with liq_k4:
+        st.markdown(metric_card("Día del saldo mínimo", liq_min_date.strftime('%d/%m/%Y'),
+            f"{liq['prob_negative']:.0%} de trayectorias bajo cero", "down" if liq['prob_negative'] > 0 else "up"),
+            unsafe_allow_html=True)
+
+    liq_dates = pd.to_datetime(liq['dates'])
+    fig_liq = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_liq.add_trace(go.Scatter(x=liq_dates, y=liq['balance'][2], mode='lines', line=dict(width=0),
+        showlegend=False, hoverinfo='skip'), secondary_y=False)
+    fig_liq.add_trace(go.Scatter(x=liq_dates, y=liq['balance'][0], mode='lines', line=dict(width=0),
+        fill='tonexty', fillcolor='rgba(0,102,255,0.15)', name='Saldo libre P5–P95'), secondary_y=False)
+    fig_liq.add_trace(go.Scatter(x=liq_dates, y=liq['balance'][1], name='Saldo libre P50', mode='lines',
+        line=dict(color=COLORS['secondary'], width=2)), secondary_y=False)
+    fig_liq.add_trace(go.Scatter(x=liq_dates, y=liq['need'][1], name='Float + prefunding P95', mode='lines',
+        line=dict(color=COLORS['danger'], width=1)), secondary_y=True)
+    fig_liq.add_hline(y=0, line_dash="dash", line_color="#636E72", line_width=1)
+    fig_liq = plotly_theme(fig_liq, height=380)
+    fig_liq.update_yaxes(title_text="Saldo libre (USD)", secondary_y=False)
+    fig_liq.update_yaxes(title_text="Caja inmovilizada (USD)", secondary_y=True)
+    fig_liq.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5))
+    st.plotly_chart(fig_liq, use_container_width=True)
+
+    liq_short = max(-liq['min_balance'][0], 0)
+    liq_insight = (f"En el peor 5% de los casos la caja libre toca {format_k(liq['min_balance'][0])}: "
+                   f"hace falta ~{format_k(liq_short)} de línea de crédito o de prefunding con contrapartes para "
+                   "no frenar payouts en los cierres de mes." if liq_short > 0 else
+                   "La caja M4 más el resultado acumulado cubren el float y el prefunding incluso en el P5.")
+    st.markdown(f"""
+    <div style="background:linear-gradient(135deg, rgba(0, 102, 255, 0.06), rgba(0, 201, 167, 0.06));
+                border-radius:8px; padding:0.8rem 1rem; margin-bottom:0.5rem; border:1px solid rgba(0, 102, 255, 0.15);">
+        <span style="font-size:0.9rem; color:#4A5568;">
+            💡 <strong>El GTV inmoviliza caja.</strong> La necesidad promedio pasa de {format_k(liq['need_m4'])} en M4 a
+            {format_k(liq['avg_need'][-1])} en M{4 + liq_months}, con picos de {liq_ratio:.1f}x en los cierres de mes.
+            {liq_insight}
+        </span>
+    </div>""", unsafe_allow_html=True)
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        {liq_paths:,} trayectorias × {len(liq['dates'])} días × {len(LIQUIDITY_PRODUCTS)} productos ({liq['elapsed_ms']:.0f} ms).
+        Volumen diario = GTV mensual × perfil por día de semana, quincena y fin de mes × ruido lognormal.
+    </div>""", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # GRAFO DE MÉTRICAS — qué se recalculó en este rerun
+    # ═══════════════════════════════════════════════════════════
+    graph_info = st.session_state['scenario_graph'].inspect()
+    graph_cached = graph_info['run'] == graph_runs
+    graph_title = (f"escenario desde la caché, 0 de {len(graph_info['nodes'])} recalculadas en este rerun" if graph_cached
+                   else f"{len(graph_info['recomputed'])} de {len(graph_info['nodes'])} recalculadas en este rerun")
+    with st.expander(f"🔗 Grafo de métricas — {graph_title}"):
+        changed_inputs = [k.split('.', 1)[1] for k in graph_info['changed'] if k.startswith(('inp.', 'a.'))]
+        st.markdown(f"""<div style="font-size:0.85rem; color:#4A5568; line-height:1.7;">
+            Run #{graph_info['run']}{' (último run del grafo; este rerun salió de la caché)' if graph_cached else ''} ·
+            Sliders/supuestos cambiados: <b>{', '.join(changed_inputs) or 'ninguno'}</b><br>
+            Recalculadas: {', '.join(f'<code>{n}</code>' for n in graph_info['recomputed']) or '—'}<br>
+            <span style="color:{COLORS['muted']};">Reutilizadas del run anterior: {len(graph_info['reused'])}</span>
+        </div>""", unsafe_allow_html=True)
+        st.dataframe(pd.DataFrame([
+            {'Métrica': n['name'], 'Depende de': ', '.join(n['inputs']), 'Recalculada': '✅' if n['recomputed'] else ''}
+            for n in graph_info['nodes']
+        ]), use_container_width=True, hide_index=True, height=300)
+
     st.markdown("<br>", unsafe_allow_html=True)
 
 # ══════════════════════════════════════════════════════════════
-# PAGE 7: VALORIZACIÓN — Multi-Método Reactivo
+# PAGE 7: MONTE CARLO — Distribuciones sobre los drivers
 # ══════════════════════════════════════════════════════════════
+@st.cache_data(show_spinner=False)
+def cached_monte_carlo(inputs, n, seed, assumptions):
+    return run_monte_carlo(inputs, n=n, seed=seed, assumptions=assumptions)
+
+
+with tab_mc:
+    st.markdown('<div class="page-title">Monte Carlo</div>', unsafe_allow_html=True)
+    st.markdown('<div class="page-subtitle">Mismos sliders del panel lateral, pero con incertidumbre en los drivers del modelo</div>', unsafe_allow_html=True)
+
+    mc_c1, mc_c2, mc_c3 = st.columns([1, 2, 1])
+    with mc_c1:
+        mc_on = st.toggle("Simular", value=False, key="mc_on",
+            help="Apagado, los reruns del resto de la app no pagan las simulaciones")
+    with mc_c2:
+        mc_n = st.select_slider("Simulaciones", options=[100_000, 200_000, 500_000], value=100_000, key="mc_n",
+            format_func=lambda x: f"{x:,}")
+    with mc_c3:
+        mc_seed = st.number_input("Semilla (seed)", min_value=0, max_value=10**6, value=42, step=1, key="mc_seed",
+            help="Misma semilla = mismos resultados")
+
+    if mc_on:
+        mc = cached_monte_carlo(scenario.inputs, int(mc_n), int(mc_seed), scenario_assumptions)
+        mc_pct = mc['percentiles']
+
+        # Distribuciones usadas
+        with st.expander("🎲 Distribuciones de los drivers"):
+            rows = ""
+            for name, (dist, params) in MC_DISTRIBUTIONS.items():
+                s = mc['samples'][name]
+                rows += f"""<tr><td>{MC_LABELS[name]}</td><td>{dist}</td><td>{', '.join(f'{p:,.4g}' for p in params)}</td>
+                    <td>{np.percentile(s, 5):,.4g}</td><td>{np.median(s):,.4g}</td><td>{np.percentile(s, 95):,.4g}</td></tr>"""
+            st.markdown(f"""<table style="width:100%; font-size:0.8rem;">
+                <tr><th>Driver</th><th>Distribución</th><th>Parámetros</th><th>P5</th><th>P50</th><th>P95</th></tr>
+                {rows}</table>""", unsafe_allow_html=True)
+
+        # KPIs P5 / P50 / P95
+        k1, k2, k3, k4 = st.columns(4)
+        mc_cards = [
+            (k1, "Revenue M16", mc_pct['total_rev_proj'], format_k),
+            (k2, "Margen M16", mc_pct['margin_proj'], lambda v: f"{v:.0f}%"),
+            (k3, "Cash M16", mc_pct['cash_proj'], format_k),
+            (k4, "CLTV B2B", mc_pct['cltv_m16'], format_k),
+        ]
+        for col, label, (p5, p50, p95), fmt in mc_cards:
+            with col:
+                st.markdown(f"""
+                <div class="scenario-output" style="text-align:center;">
+                    <div class="scenario-big" style="font-size:1.8rem;">{fmt(p50)}</div>
+                    <div style="color:#718096; font-size:0.8rem; text-transform:uppercase;">{label} (P50)</div>
+                    <div style="color:{COLORS['muted']}; font-size:0.8rem;">P5 {fmt(p5)} — P95 {fmt(p95)}</div>
+                </div>""", unsafe_allow_html=True)
+
+        # Trayectoria con bandas P5/P95
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">📈 Trayectoria — bandas P5 / P50 / P95</div>', unsafe_allow_html=True)
+
+        mc_months = [f'Mes {m}' for m in mc['bands']['months']]
+        rev_band, cash_band = mc['bands']['revenue'], mc['bands']['cash']
+        fig_mc = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_mc.add_trace(go.Bar(x=MESES, y=DATA['revenue'], name='Revenue (histórico)',
+            marker_color=COLORS['primary'], opacity=0.8), secondary_y=False)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=rev_band[2], mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'), secondary_y=False)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=rev_band[0], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor='rgba(0,102,255,0.15)', name='Revenue P5–P95'), secondary_y=False)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=rev_band[1], name='Revenue P50', mode='lines',
+            line=dict(color=COLORS['secondary'], width=3)), secondary_y=False)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=cash_band[2], mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'), secondary_y=True)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=cash_band[0], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor='rgba(245,166,35,0.2)', name='Cash P5–P95'), secondary_y=True)
+        fig_mc.add_trace(go.Scatter(x=mc_months, y=cash_band[1], name='Cash P50', mode='lines+markers',
+            line=dict(color=COLORS['warning'], width=2), marker=dict(size=4)), secondary_y=True)
+        fig_mc = plotly_theme(fig_mc, height=400)
+        fig_mc.update_yaxes(title_text="Revenue (USD)", secondary_y=False)
+        fig_mc.update_yaxes(title_text="Cash Position (USD)", secondary_y=True)
+        fig_mc.update_layout(legend=dict(y=1.15))
+        st.plotly_chart(fig_mc, use_container_width=True)
+
+        # Histograma del gap de financiamiento (pre-binned: no mandar 100k puntos al browser)
+        st.markdown('<div class="section-header">💰 Distribución del Financing Gap</div>', unsafe_allow_html=True)
+        gap_counts, gap_edges = np.histogram(mc['outputs']['gap'], bins=60)
+        gap_centers = (gap_edges[:-1] + gap_edges[1:]) / 2
+        fig_gap = go.Figure(go.Bar(x=gap_centers, y=gap_counts / mc['n'] * 100,
+            marker_color=[COLORS['danger'] if c > 0 else COLORS['success'] for c in gap_centers]))
+        fig_gap = plotly_theme(fig_gap, height=320)
+        fig_gap.update_xaxes(title_text="Gap (USD) — negativo = surplus")
+        fig_gap.update_yaxes(title_text="% simulaciones")
+        fig_gap.update_layout(bargap=0.05, showlegend=False)
+        for p, v in zip(PERCENTILES, mc_pct['gap']):
+            fig_gap.add_vline(x=v, line_dash="dash", line_color="#636E72", line_width=1,
+                annotation_text=f"P{p}", annotation_font_color="#636E72")
+        st.plotly_chart(fig_gap, use_container_width=True)
+
+        prob_color = COLORS['success'] if mc['prob_gap'] < 0.1 else COLORS['warning'] if mc['prob_gap'] < 0.5 else COLORS['danger']
+        st.markdown(f"""
+        <div style="background:{prob_color}11; border:2px solid {prob_color}; border-radius:12px; padding:1rem; text-align:center; margin-top:1rem;">
+            <div style="font-weight:800; font-size:1.1rem; color:{prob_color};">P(necesitar financiamiento) = {mc['prob_gap']*100:.1f}%</div>
+            <div style="font-size:0.95rem; color:#4A5568;">Gap P5 {format_k(mc_pct['gap'][0])} · P50 {format_k(mc_pct['gap'][1])} · P95 {format_k(mc_pct['gap'][2])} — {mc['n']:,} simulaciones, seed {mc['seed']}</div>
+        </div>""", unsafe_allow_html=True)
+    else:
+        st.markdown(f"""<div style="font-size:0.85rem; color:{COLORS['muted']};">
+            Con <b>Simular</b> encendido corren las simulaciones sobre el escenario del panel lateral
+            (y se recalculan con cada cambio de sliders).</div>""", unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+# ══════════════════════════════════════════════════════════════
+# PAGE 8: VALORIZACIÓN — Multi-Método Reactivo
+# ══════════════════════════════════════════════════════════════
+@st.cache_resource
+def valuation_cache():
+    # Compartido entre sesiones: máx. 64 escenarios, cada uno válido por 1 hora
+    return LRUCache(maxsize=64, ttl=3600)
+
+
+def build_valuation(vi):
+    """6 métodos + filas de la tabla consolidada + gráfico comparativo (lo que se cachea)."""
+    val = run_valuation(vi)
+    gtv_check = "✅ Consistente" if val['take_rate_m16'] < 1.2 else "⚠️ Take rate alto"
+    methods_data = [
+        ("EV/Revenue (7x/8x)", val['evrev']['Base']['base'], val['evrev']['Base']['m16'], "Método estándar fintech early-stage"),
+        ("EV/EBITDA (20x)", val['evebitda_base'].get('20x', 0), val['evebitda_m16'].get('20x', 0), "Valida margen operativo"),
+        ("DCF (WACC 20%/15%)", val['dcf_base_20'], val['dcf_m16_15'], "Sensible a terminal value"),
+        ("Volume-Based (GTV)", val['vol_val_base'], val['vol_val_m16'], f"Take rate M16: {val['take_rate_m16']:.2f}% {gtv_check}"),
+        ("VC Method (35% IRR)", val['vc_vals'].get('35% IRR', 0), None, "Exit a 5 años, perspectiva inversionista"),
+        ("Rule of 40 Adjusted", val['r40_val_base'], val['r40_val_m16'], f"R40 Base: {val['rule40_base']:.0f} | M16: {val['rule40_m16']:.0f}"),
+    ]
+
+    method_names = [m[0] for m in methods_data]
+    base_vals = [m[1]/1e6 if m[1] else 0 for m in methods_data]
+    m16_vals = [m[2]/1e6 if m[2] else 0 for m in methods_data]
+
+    fig_comp = go.Figure()
+    fig_comp.add_trace(go.Bar(y=method_names, x=base_vals, name='Base (Avg M1-M4)',
+        orientation='h', marker_color='#718096', text=[f"${v:.0f}M" for v in base_vals],
+        textposition='outside', textfont=dict(size=12)))
+    fig_comp.add_trace(go.Bar(y=method_names, x=m16_vals, name='M16 (Proyectado)',
+        orientation='h', marker_color=COLORS['secondary'], text=[f"${v:.0f}M" if v > 0 else "—" for v in m16_vals],
+        textposition='outside', textfont=dict(size=12)))
+    fig_comp = plotly_theme(fig_comp, height=350)
+    fig_comp.update_layout(barmode='group', xaxis_title="Enterprise Value ($M)",
+        yaxis=dict(autorange="reversed"), legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"))
+    fig_comp.update_xaxes(range=[0, max(max(base_vals), max(m16_vals)) * 1.25])
+    return val, methods_data, fig_comp
+
+
+@st.cache_data(show_spinner=False)
+def cached_valuation_mc(vi, n, seed):
+    # Sin las muestras por sorteo: sólo percentiles e histogramas van a la sesión
+    mc = run_valuation_mc(vi, n=n, seed=seed)
+    mid = (mc['low'] + mc['high']) / 2
+    return dict({k: v for k, v in mc.items() if k not in ('samples', 'values', 'low', 'high')},
+                mid_hist=np.histogram(mid, bins=60))
+
+
 with tab_val:
     st.markdown('<div class="page-title">Valorización Multi-Método</div>', unsafe_allow_html=True)
     st.markdown('<div class="page-subtitle">6 metodologías independientes — Base vs M16 proyectado</div>', unsafe_allow_html=True)
@@ -3131,96 +3829,18 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
     # ═══════════════════════════════════════════════════════════
     # MOTOR DE CÁLCULO (usando valores del Scenario Builder)
     # ═══════════════════════════════════════════════════════════
-    # Anualizados
-    v_rev_annual_base = BASE_REVENUE * 12
-    v_rev_annual_m16 = v_rev_m16 * 12
-
-    # Crecimiento implícito
-    v_growth_multiple = v_multiple
-    v_annual_growth_pct = (v_growth_multiple - 1) * 100
-
-    v_gtv_base = BASE_GTV_B2B + BASE_GTV_B2C
-    v_gtv_annual_base = v_gtv_base * 12
-    v_gtv_annual_m16 = v_gtv_m16 * 12
-
-    # Márgenes
-    v_ebitda_base = BASE_REVENUE - BASE_GASTOS
-    v_ebitda_base_annual = v_ebitda_base * 12
-    v_margin_base = v_ebitda_base / BASE_REVENUE * 100 if BASE_REVENUE > 0 else 0
-
-    v_ebitda_m16 = v_rev_m16 - v_gastos_m16
-    v_ebitda_m16_annual = v_ebitda_m16 * 12
-    v_margin_m16 = v_ebitda_m16 / v_rev_m16 * 100 if v_rev_m16 > 0 else 0
-
-    # Rule of 40
-    v_rule40_base = 8 + v_margin_base  # ~8% growth MoM anualizado + margen
-    v_rule40_m16 = v_annual_growth_pct + v_margin_m16
-
-    # ═══════════════════════════════════════════════════════════
-    # PASO 3: FUNCIÓN DCF
-    # ═══════════════════════════════════════════════════════════
-    def calc_dcf_val(base_rev_annual, base_ebitda_annual, growth_rates, margins, wacc, terminal_growth=0.03):
-        rev = base_rev_annual
-        fcfs = []
-        for i in range(5):
-            rev = rev * (1 + growth_rates[i])
-            ebitda = rev * margins[i]
-            pv = ebitda / ((1 + wacc) ** (i + 1))
-            fcfs.append({'year': i + 1, 'revenue': rev, 'ebitda': ebitda, 'pv': pv})
-        last_ebitda = fcfs[-1]['ebitda']
-        terminal_value = last_ebitda * (1 + terminal_growth) / (wacc - terminal_growth) if wacc > terminal_growth else 0
-        tv_pv = terminal_value / ((1 + wacc) ** 5)
-        total_pv = sum(f['pv'] for f in fcfs) + tv_pv
-        return total_pv, fcfs, tv_pv
-
-    # ═══════════════════════════════════════════════════════════
-    # PASO 4: CALCULAR 6 MÉTODOS
-    # ═══════════════════════════════════════════════════════════
-
-    # MÉTODO 1: EV/Revenue Multiple
-    rev_multiples = {'Conservador': {'base': 5, 'm16': 6}, 'Base': {'base': 7, 'm16': 8}, 'Optimista': {'base': 9, 'm16': 11}}
-    evrev = {}
-    for scenario, mults in rev_multiples.items():
-        evrev[scenario] = {'base': v_rev_annual_base * mults['base'], 'm16': v_rev_annual_m16 * mults['m16']}
-
-    # MÉTODO 2: EV/EBITDA
-    ebitda_multiples = [15, 20, 25]
-    evebitda_base = {f'{m}x': v_ebitda_base_annual * m for m in ebitda_multiples}
-    evebitda_m16 = {f'{m}x': v_ebitda_m16_annual * m for m in ebitda_multiples}
-
-    # MÉTODO 3: DCF
-    gr_from_base = [1.0, 0.50, 0.30, 0.20, 0.15]
-    mg_from_base = [0.25, 0.35, 0.38, 0.40, 0.42]
-    dcf_base_20, dcf_base_detail, dcf_base_tv = calc_dcf_val(v_rev_annual_base, v_ebitda_base_annual, gr_from_base, mg_from_base, 0.20)
-    dcf_base_15, _, _ = calc_dcf_val(v_rev_annual_base, v_ebitda_base_annual, gr_from_base, mg_from_base, 0.15)
-
-    gr_from_m16 = [0.30, 0.25, 0.20, 0.15, 0.10]
-    mg_from_m16 = [v_margin_m16/100, min(0.40, v_margin_m16/100 + 0.03), min(0.42, v_margin_m16/100 + 0.05),
-                   min(0.43, v_margin_m16/100 + 0.06), min(0.44, v_margin_m16/100 + 0.07)]
-    dcf_m16_15, dcf_m16_detail, dcf_m16_tv = calc_dcf_val(v_rev_annual_m16, v_ebitda_m16_annual, gr_from_m16, mg_from_m16, 0.15)
-    dcf_m16_20, _, _ = calc_dcf_val(v_rev_annual_m16, v_ebitda_m16_annual, gr_from_m16, mg_from_m16, 0.20)
-
-    # MÉTODO 4: Volume-Based (GTV)
-    v_take_rate_base = v_rev_annual_base / v_gtv_annual_base * 100 if v_gtv_annual_base > 0 else 0
-    v_take_rate_m16 = v_rev_annual_m16 / v_gtv_annual_m16 * 100 if v_gtv_annual_m16 > 0 else 0
-    gtv_check = "✅ Consistente" if v_take_rate_m16 < 1.2 else "⚠️ Take rate alto"
-    vol_val_base = v_rev_annual_base * 7
-    vol_val_m16 = v_rev_annual_m16 * 8 if v_take_rate_m16 < 1.2 else v_rev_annual_m16 * 5
-
-    # MÉTODO 5: VC Method
-    rev_year5 = v_rev_annual_m16 * 1.30 * 1.25 * 1.20 * 1.15
-    exit_multiple = 6
-    exit_value = rev_year5 * exit_multiple
-    vc_vals = {}
-    for irr_label, irr in [('25% IRR', 0.25), ('35% IRR', 0.35), ('45% IRR', 0.45)]:
-        pv = exit_value / ((1 + irr) ** 5)
-        vc_vals[irr_label] = pv
-
-    # MÉTODO 6: Rule of 40 Adjusted
-    r40_premium_base = 1.75 if v_rule40_base >= 40 else 1.0
-    r40_val_base = v_rev_annual_base * 5 * r40_premium_base
-    r40_premium_m16 = 1.75 if v_rule40_m16 >= 40 else 1.0
-    r40_val_m16 = v_rev_annual_m16 * 6 * r40_premium_m16
+    # Memoizado por fingerprint de los inputs: revisitar un escenario no recalcula los 6 métodos ni el gráfico
+    val_inputs = valuation_inputs(v_rev_m16, v_gastos_m16, v_gtv_m16, v_multiple, scenario.trajectory)
+    val, methods_data, fig_comp = valuation_cache().get_or_compute(fingerprint(val_inputs), lambda: build_valuation(val_inputs))
+
+    v_rev_annual_base, v_rev_annual_m16 = val['rev_annual_base'], val['rev_annual_m16']
+    v_ebitda_base_annual, v_ebitda_m16_annual = val['ebitda_base_annual'], val['ebitda_m16_annual']
+    rev_multiples, evrev = REV_MULTIPLES, val['evrev']
+    evebitda_base, evebitda_m16 = val['evebitda_base'], val['evebitda_m16']
+    gr_from_base, mg_from_base = val['growth_from_base'], val['margin_from_base']
+    gr_from_m16, mg_from_m16 = val['growth_from_m16'], val['margin_from_m16']
+    dcf_m16_15, dcf_m16_detail, dcf_m16_tv = val['dcf_m16_15'], val['dcf_m16_detail'], val['dcf_m16_tv']
+    rev_year5, exit_multiple, exit_value, vc_vals = val['rev_year5'], val['exit_multiple'], val['exit_value'], val['vc_vals']
 
     # ═══════════════════════════════════════════════════════════
     # VALIDACIÓN DE CONSISTENCIA CON PROYECCIÓN DE CLIENTES
@@ -3254,15 +3874,6 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
     # ═══════════════════════════════════════════════════════════
     st.markdown('<div class="section-header">📊 Valorización Multi-Método</div>', unsafe_allow_html=True)
 
-    methods_data = [
-        ("EV/Revenue (7x/8x)", evrev['Base']['base'], evrev['Base']['m16'], "Método estándar fintech early-stage"),
-        ("EV/EBITDA (20x)", evebitda_base.get('20x', 0), evebitda_m16.get('20x', 0), "Valida margen operativo"),
-        ("DCF (WACC 20%/15%)", dcf_base_20, dcf_m16_15, "Sensible a terminal value"),
-        ("Volume-Based (GTV)", vol_val_base, vol_val_m16, f"Take rate M16: {v_take_rate_m16:.2f}% {gtv_check}"),
-        ("VC Method (35% IRR)", vc_vals.get('35% IRR', 0), None, "Exit a 5 años, perspectiva inversionista"),
-        ("Rule of 40 Adjusted", r40_val_base, r40_val_m16, f"R40 Base: {v_rule40_base:.0f} | M16: {v_rule40_m16:.0f}"),
-    ]
-
     # Tabla HTML
     table_html = """<table style="width:100%; border-collapse:collapse; font-size:0.95rem; margin-bottom:1rem;">
         <thead>
@@ -3289,15 +3900,7 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
     st.markdown(table_html, unsafe_allow_html=True)
 
     # Rango de convergencia
-    all_base_vals = [evrev['Base']['base'], evebitda_base.get('20x', 0), dcf_base_20, vol_val_base, vc_vals.get('35% IRR', 0), r40_val_base]
-    all_base_vals = sorted([v for v in all_base_vals if v and v > 0])
-    base_low = all_base_vals[1] if len(all_base_vals) > 2 else all_base_vals[0]
-    base_high = all_base_vals[-2] if len(all_base_vals) > 2 else all_base_vals[-1]
-
-    all_m16_vals = [evrev['Base']['m16'], evebitda_m16.get('20x', 0), dcf_m16_15, vol_val_m16, r40_val_m16]
-    all_m16_vals = sorted([v for v in all_m16_vals if v and v > 0])
-    m16_low = all_m16_vals[1] if len(all_m16_vals) > 2 else all_m16_vals[0]
-    m16_high = all_m16_vals[-2] if len(all_m16_vals) > 2 else all_m16_vals[-1]
+    base_low, base_high, m16_low, m16_high = val['base_low'], val['base_high'], val['m16_low'], val['m16_high']
 
     st.markdown(f"""
     <div style="background:linear-gradient(135deg, rgba(0, 201, 167, 0.08), rgba(0, 102, 255, 0.08));
@@ -3411,22 +4014,70 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
     # ═══════════════════════════════════════════════════════════
     st.markdown('<div class="section-header">📈 Comparación Visual — Base vs M16</div>', unsafe_allow_html=True)
 
-    method_names = [m[0] for m in methods_data]
-    base_vals = [m[1]/1e6 if m[1] else 0 for m in methods_data]
-    m16_vals = [m[2]/1e6 if m[2] else 0 for m in methods_data]
-
-    fig_comp = go.Figure()
-    fig_comp.add_trace(go.Bar(y=method_names, x=base_vals, name='Base (Avg M1-M4)',
-        orientation='h', marker_color='#718096', text=[f"${v:.0f}M" for v in base_vals],
-        textposition='outside', textfont=dict(size=12)))
-    fig_comp.add_trace(go.Bar(y=method_names, x=m16_vals, name='M16 (Proyectado)',
-        orientation='h', marker_color=COLORS['secondary'], text=[f"${v:.0f}M" if v > 0 else "—" for v in m16_vals],
-        textposition='outside', textfont=dict(size=12)))
-    fig_comp = plotly_theme(fig_comp, height=350)
-    fig_comp.update_layout(barmode='group', xaxis_title="Enterprise Value ($M)",
-        yaxis=dict(autorange="reversed"), legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"))
-    fig_comp.update_xaxes(range=[0, max(max(base_vals), max(m16_vals)) * 1.25])
     st.plotly_chart(fig_comp, use_container_width=True)
+    val_stats = valuation_cache().stats()
+    st.markdown(f"""<div style="font-size:0.75rem; color:{COLORS['muted']}; text-align:right;">
+        Caché de valorización: {val_stats['hits']} hits · {val_stats['misses']} misses
+        ({val_stats['hit_rate']*100:.0f}% hit rate) · {val_stats['size']}/{val_stats['maxsize']} escenarios · TTL {val_stats['ttl']//60:.0f} min
+    </div>""", unsafe_allow_html=True)
+
+    # ═══════════════════════════════════════════════════════════
+    # MODO SIMULACIÓN — FOOTBALL FIELD CON INTERVALOS REALES
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">🎲 Modo Simulación — Football Field M16</div>', unsafe_allow_html=True)
+
+    vmc_c1, vmc_c2, vmc_c3 = st.columns([1, 2, 1])
+    with vmc_c1:
+        vmc_on = st.toggle("Simular supuestos", value=False, key="vmc_on",
+            help="Múltiplos, WACC, g terminal, múltiplo de exit e IRR sorteados de sus distribuciones")
+    with vmc_c2:
+        vmc_n = st.select_slider("Sorteos", options=[10_000, 100_000, 500_000], value=100_000, key="vmc_n",
+            format_func=lambda x: f"{x:,}")
+    with vmc_c3:
+        vmc_seed = st.number_input("Semilla", min_value=0, max_value=10**6, value=42, step=1, key="vmc_seed")
+
+    if vmc_on:
+        vmc = cached_valuation_mc(val_inputs, vmc_n, vmc_seed)
+        vmc_point = dict(zip(VALUATION_METHODS, [val['evrev']['Base']['m16'], val['evebitda_m16']['20x'], val['dcf_m16_15'],
+                                                  val['vol_val_m16'], val['vc_vals']['35% IRR'], val['r40_val_m16']]))
+        vmc_rows = list(VALUATION_METHODS) + ['Convergencia (punto medio)']
+        vmc_pct = [vmc['percentiles'][k] / 1e6 for k in VALUATION_METHODS] + [vmc['mid_percentiles'] / 1e6]
+
+        fig_ff = go.Figure()
+        fig_ff.add_trace(go.Bar(y=vmc_rows, x=[p[4] - p[0] for p in vmc_pct], base=[p[0] for p in vmc_pct],
+            orientation='h', name='P5–P95', marker_color=COLORS['secondary'], opacity=0.3,
+            customdata=[[p[0], p[4]] for p in vmc_pct],
+            hovertemplate="%{y}<br>P5 $%{customdata[0]:.0f}M — P95 $%{customdata[1]:.0f}M<extra></extra>"))
+        fig_ff.add_trace(go.Bar(y=vmc_rows, x=[p[3] - p[1] for p in vmc_pct], base=[p[1] for p in vmc_pct],
+            orientation='h', name='P25–P75', marker_color=COLORS['secondary'], opacity=0.8,
+            customdata=[[p[1], p[3]] for p in vmc_pct],
+            hovertemplate="%{y}<br>P25 $%{customdata[0]:.0f}M — P75 $%{customdata[1]:.0f}M<extra></extra>"))
+        fig_ff.add_trace(go.Scatter(y=vmc_rows, x=[p[2] for p in vmc_pct], mode='markers', name='P50',
+            marker=dict(symbol='line-ns-open', size=18, color=COLORS['text'], line=dict(width=3)),
+            hovertemplate="%{y}<br>P50 $%{x:.0f}M<extra></extra>"))
+        fig_ff.add_trace(go.Scatter(y=list(vmc_point), x=[v / 1e6 for v in vmc_point.values()], mode='markers',
+            name='Estimación puntual', marker=dict(symbol='diamond', size=9, color=COLORS['warning'])))
+        fig_ff = plotly_theme(fig_ff, height=380)
+        fig_ff.update_layout(barmode='overlay', xaxis_title="Enterprise Value M16 ($M)",
+            yaxis=dict(autorange="reversed"), legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center"))
+        st.plotly_chart(fig_ff, use_container_width=True)
+
+        vmc_mid = vmc['mid_percentiles']
+        vmc_k1, vmc_k2, vmc_k3 = st.columns(3)
+        for col, label, value in [(vmc_k1, "P5", vmc_mid[0]), (vmc_k2, "P50", vmc_mid[2]), (vmc_k3, "P95", vmc_mid[4])]:
+            with col:
+                st.markdown(metric_card(f"Convergencia M16 — {label}", f"${value/1e6:.0f}M"), unsafe_allow_html=True)
+        def vmc_fmt(x):
+            return f"{x:.0%}" if x < 1 else f"{x:g}"
+
+        vmc_counts, vmc_edges = vmc['mid_hist']
+        vmc_in_point = ((vmc_edges[:-1] >= m16_low) & (vmc_edges[1:] <= m16_high)) @ vmc_counts / vmc['n']
+        st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+            {vmc['n']:,} sorteos × 6 métodos en {vmc['elapsed_ms']:.0f} ms.
+            Supuestos triangulares: {' · '.join(f"{VALUATION_MC_LABELS[k]} {vmc_fmt(p[0])}–{vmc_fmt(p[2])} (moda {vmc_fmt(p[1])})"
+                                                for k, (_, p) in VALUATION_DISTRIBUTIONS.items())}.
+            El rango puntual ${m16_low/1e6:.0f}M — ${m16_high/1e6:.0f}M contiene el {vmc_in_point:.0%} de los puntos medios simulados.
+        </div>""", unsafe_allow_html=True)
 
     # ═══════════════════════════════════════════════════════════
     # PASO 8: EXPANDERS DE DETALLE POR MÉTODO
@@ -3435,13 +4086,13 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
 
     with st.expander("📊 EV/Revenue — Escenarios"):
         cols = st.columns(3)
-        for i, (scenario, vals) in enumerate(evrev.items()):
-            mult_b = rev_multiples[scenario]['base']
-            mult_m = rev_multiples[scenario]['m16']
+        for i, (case, vals) in enumerate(evrev.items()):
+            mult_b = rev_multiples[case]['base']
+            mult_m = rev_multiples[case]['m16']
             with cols[i]:
                 st.markdown(f"""
                 <div style="background:#F7FAFC; border-radius:8px; padding:1rem; text-align:center;">
-                    <div style="font-weight:700; color:#2D3748;">{scenario}</div>
+                    <div style="font-weight:700; color:#2D3748;">{case}</div>
                     <div style="margin-top:0.5rem;">
                         <span style="color:#718096;">Base ({mult_b}x):</span>
                         <span style="font-weight:700;"> ${vals['base']/1e6:.1f}M</span>
@@ -3487,12 +4138,82 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
             </div>''' for label, val in vc_vals.items()])}
         </div>""", unsafe_allow_html=True)
 
+    # ═══════════════════════════════════════════════════════════
+    # SENSIBILIDAD DCF — WACC × CRECIMIENTO TERMINAL
+    # ═══════════════════════════════════════════════════════════
+    st.markdown('<div class="section-header">🌡️ Sensibilidad DCF — WACC × Crecimiento Terminal</div>', unsafe_allow_html=True)
+
+    dcf_case = st.radio("Caso DCF", ['M16 (Proyectado)', 'Base (Avg M1-M4)'], horizontal=True, key="dcf_heat_case")
+    heat_wacc = np.round(np.arange(0.10, 0.30001, 0.0025), 4)
+    heat_g = np.round(np.arange(0.01, 0.05001, 0.0025), 4)
+    if dcf_case.startswith('M16'):
+        heat_ev = dcf_grid(v_rev_annual_m16, gr_from_m16, mg_from_m16, heat_wacc, heat_g)
+        heat_ref_wacc = 0.15
+    else:
+        heat_ev = dcf_grid(v_rev_annual_base, gr_from_base, mg_from_base, heat_wacc, heat_g)
+        heat_ref_wacc = 0.20
+
+    fig_heat = go.Figure(go.Heatmap(z=heat_ev / 1e6, x=heat_g * 100, y=heat_wacc * 100,
+        colorscale=[[0, '#F7FAFC'], [0.5, COLORS['primary']], [1, COLORS['secondary']]],
+        colorbar=dict(title="EV ($M)"),
+        hovertemplate="WACC %{y:.2f}% · g %{x:.2f}%<br>EV $%{z:,.0f}M<extra></extra>"))
+    fig_heat.add_trace(go.Scatter(x=[3.0], y=[heat_ref_wacc * 100], mode='markers',
+        marker=dict(symbol='x', size=12, color=COLORS['danger']), name='Supuesto actual', showlegend=False))
+    fig_heat = plotly_theme(fig_heat, height=450)
+    fig_heat.update_xaxes(title_text="Crecimiento terminal g (%)")
+    fig_heat.update_yaxes(title_text="WACC (%)")
+    st.plotly_chart(fig_heat, use_container_width=True)
+
+    st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+        {heat_ev.size:,} combinaciones (WACC 10–30% × g 1–5%, pasos de 0.25%) · ✕ = supuesto del cuadro
+        (WACC {heat_ref_wacc*100:.0f}%, g 3%): <b>${heat_ev[np.isclose(heat_wacc, heat_ref_wacc)][0][np.isclose(heat_g, 0.03)][0]/1e6:.0f}M</b>
+    </div>""", unsafe_allow_html=True)
+
     # ═══════════════════════════════════════════════════════════
     # ESTRATEGIA DE FINANCIAMIENTO — 24 MESES
     # ═══════════════════════════════════════════════════════════
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown('<div class="section-header">💰 Estrategia de Financiamiento — 24 Meses</div>', unsafe_allow_html=True)
 
+    # Números de cada fase desde el plan de financiamiento del Scenario Builder (M1-M4 reales, M5→M24 motor + deuda)
+    fin_terms = financing_terms
+    fin_net = np.concatenate([np.array(DATA['revenue']) - np.array(DATA['gastos']),
+                              financing['flow']])
+    fin_cash = np.concatenate([DATA['cash'], financing['cash']])
+    fin_pad = np.zeros(4)
+    fin_series = {k: np.concatenate([fin_pad, financing[k]])
+                  for k in ('line', 'vd', 'line_draw', 'vd_draw', 'interest', 'fees', 'equity')}
+    fin_phases = []
+    for first, last in [(1, 8), (9, 16), (17, 24)]:
+        sl = slice(first - 1, last)
+        fin_phases.append({
+            'net': fin_net[sl].sum(),
+            'cash_end': fin_cash[last - 1],
+            'cash_min': fin_cash[sl].min(),
+            'line_peak': fin_series['line'][sl].max(),
+            'vd_draw': fin_series['vd_draw'][sl].sum(),
+            'equity': fin_series['equity'][sl].sum(),
+            'cost': fin_series['interest'][sl].sum() + fin_series['fees'][sl].sum(),
+            'debt_end': fin_series['line'][last - 1] + fin_series['vd'][last - 1],
+            'last': last,
+        })
+    fin_phase_html = [f"""<div style="border-top:1px solid #E2E8F0; margin-top:0.8rem; padding-top:0.6rem;
+                font-size:0.8rem; color:#4A5568; line-height:1.6;">
+                Flujo operativo de la fase: <b>{format_k(ph['net'])}</b><br>
+                Caja fin M{ph['last']}: <b>{format_k(ph['cash_end'])}</b> · mínimo {format_k(ph['cash_min'])}<br>
+                Deuda fin M{ph['last']}: <b>{format_k(ph['debt_end'])}</b> · intereses + comisiones {format_k(ph['cost'])}
+            </div>""" for ph in fin_phases]
+    fin_vd_total = sum(a for _, a in fin_terms.vd_tranches)
+    fin_tranches_text = ' y '.join(f"M{m}" for m, _ in fin_terms.vd_tranches)
+    fin_line_text = (f"Pico girado: <b>{format_k(fin_phases[0]['line_peak'])}</b>." if fin_phases[0]['line_peak'] > 0
+                     else "Sin giros: la caja propia alcanza.")
+    fin_vd_text = (f"Girado: <b>{format_k(fin_phases[1]['vd_draw'])}</b> — la línea no alcanza para el bache de los próximos "
+                   f"{fin_terms.vd_lookahead} meses." if fin_phases[1]['vd_draw'] > 0
+                   else "No se gira: la caja orgánica + la línea cubren el plan.")
+    fin_equity = financing['equity_needed']
+    fin_equity_text = (f"Equity necesario para sostener la caja mínima: <b>{format_k(fin_equity)}</b>" if fin_equity > 0
+                       else "Equity necesario: <b>$0</b> — uso: aceleración, no sobrevivencia")
+
     col1, col2, col3 = st.columns(3)
 
     with col1:
@@ -3508,12 +4229,13 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
             <div style="font-size:0.82rem; color:#4A5568; line-height:1.7;">
                 Crecer con caja propia (${DATA['cash'][3]/1e6:.1f}M) y generación mensual
                 (~{format_k(np.mean([r-g for r,g in zip(DATA['revenue'], DATA['gastos'])]))}).
-                Líneas de crédito bancarias como backstop para peaks de liquidez
-                al escalar GTV.<br><br>
+                Línea de crédito de {format_k(fin_terms.line_limit)} al {fin_terms.line_rate*100:.1f}% como
+                backstop para sostener {format_k(fin_terms.min_cash)} de caja mínima. {fin_line_text}<br><br>
                 <b style="color:{COLORS['success']};">Sin dilución. Sin dependencia.</b><br>
                 <span style="color:#718096;">Primero demostrar ejecución,
                 después negociar desde fortaleza.</span>
             </div>
+            {fin_phase_html[0]}
         </div>""", unsafe_allow_html=True)
 
     with col2:
@@ -3527,15 +4249,15 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
             <div style="font-size:1rem; font-weight:600; color:{COLORS['text']};
                 margin-bottom:0.8rem;">Evaluar + Venture Debt</div>
             <div style="font-size:0.82rem; color:#4A5568; line-height:1.7;">
-                Si el cash flow cubre el crecimiento, mantener orgánico.
-                Si hay oportunidad de acelerar (competidor débil, país que
-                se abre rápido), evaluar venture debt: $2-3M con dilución
-                mínima.<br><br>
+                Venture debt de hasta {format_k(fin_vd_total)} en tramos ({fin_tranches_text}) al
+                {fin_terms.vd_rate*100:.1f}%: {fin_terms.vd_interest_only} meses sólo interés y amortización en
+                {fin_terms.vd_amortization}. {fin_vd_text}<br><br>
                 <b style="color:{COLORS['warning']};">Ideal para fintech con revenue
                 predecible.</b><br>
                 <span style="color:#718096;">Venture debt no requiere
                 ceder board seats ni control.</span>
             </div>
+            {fin_phase_html[1]}
         </div>""", unsafe_allow_html=True)
 
     with col3:
@@ -3552,15 +4274,66 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
                 Solo si hay oportunidad de aceleración que lo justifique.
                 Con ejecución demostrada:<br><br>
                 Pre-money: <b>$80-100M</b><br>
-                Round: <b>$5-10M</b><br>
-                Uso: aceleración, no sobrevivencia<br><br>
+                {fin_equity_text}<br><br>
                 <b style="color:{COLORS['primary']};">"Levantamos porque queremos,
                 no porque necesitamos."</b><br>
                 <span style="color:#718096;">Posición de negociación
                 completamente distinta.</span>
             </div>
+            {fin_phase_html[2]}
         </div>""", unsafe_allow_html=True)
 
+    fin_months = [f'Mes {m}' for m in range(1, 25)]
+    fig_fin = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_fin.add_trace(go.Bar(x=fin_months, y=fin_net, name='Flujo operativo (resultado − inversión)',
+        marker_color=[COLORS['primary'] if v >= 0 else COLORS['danger'] for v in fin_net], opacity=0.8), secondary_y=False)
+    fig_fin.add_trace(go.Scatter(x=fin_months, y=fin_cash, name='Cash Position',
+        mode='lines+markers', line=dict(color=COLORS['warning'], width=2), marker=dict(size=4)), secondary_y=True)
+    for key, label, color in [('line', 'Línea de crédito', COLORS['success']), ('vd', 'Venture debt', COLORS['danger'])]:
+        if fin_series[key].any():
+            fig_fin.add_trace(go.Scatter(x=fin_months, y=fin_series[key], name=label, mode='lines',
+                line=dict(color=color, width=2, dash='dot')), secondary_y=True)
+    for (x0, x1), color in zip([(-0.5, 7.5), (7.5, 15.5), (15.5, 23.5)], [COLORS['success'], COLORS['warning'], COLORS['primary']]):
+        fig_fin.add_vrect(x0=x0, x1=x1, fillcolor=color, opacity=0.06, line_width=0)
+    fig_fin = plotly_theme(fig_fin, height=320)
+    fig_fin.update_yaxes(title_text="Flujo operativo (USD)", secondary_y=False)
+    fig_fin.update_yaxes(title_text="Caja y deuda (USD)", secondary_y=True)
+    fig_fin.update_layout(legend=dict(orientation="h", y=1.15, x=0.5, xanchor="center"))
+    st.plotly_chart(fig_fin, use_container_width=True)
+
+    # Covenants mientras hay deuda + sensibilidad del costo financiero a las tasas (batch en una pasada)
+    fin_c1, fin_c2 = st.columns([2, 3])
+    with fin_c1:
+        fin_cov_limits = {
+            'min_cash': f"Caja antes de equity ≥ {format_k(fin_terms.cov_min_cash)}",
+            'leverage': f"Deuda ≤ {fin_terms.cov_debt_mrr:.1f}× revenue mensual",
+            'coverage': f"Resultado ≥ {fin_terms.cov_coverage:.1f}× intereses",
+        }
+        fin_cov_rows = []
+        for name, label in COVENANTS.items():
+            breach = financing['covenants'][name]
+            fin_cov_rows.append({'Covenant': label, 'Límite': fin_cov_limits[name],
+                'Estado': f"⚠️ {int(breach.sum())} meses, desde M{int(financing['months'][breach.argmax()])}"
+                          if breach.any() else "✅ Cumple"})
+        st.dataframe(pd.DataFrame(fin_cov_rows), use_container_width=True, hide_index=True)
+        st.markdown(f"""<div style="font-size:0.8rem; color:{COLORS['muted']};">
+            Ruta: <b>{FINANCING_ROUTES[int(financing['route'])]}</b> · costo financiero M5–M24:
+            <b>{format_k(financing['financing_cost'])}</b> (intereses + comisiones)</div>""", unsafe_allow_html=True)
+    with fin_c2:
+        fin_rates = np.round(np.arange(0.06, 0.2401, 0.01), 2)
+        fin_grid = scenario_financing(scenario, replace(fin_terms, line_rate=fin_rates[:, None], vd_rate=fin_rates[None, :]),
+                                      last_month=24)
+        fig_fin_rates = go.Figure(go.Heatmap(z=fin_grid['financing_cost'] / 1e3, x=fin_rates * 100, y=fin_rates * 100,
+            colorscale=[[0, '#F7FAFC'], [1, COLORS['danger']]], colorbar=dict(title="$K"),
+            hovertemplate="Línea %{y:.0f}% · VD %{x:.0f}%<br>Costo $%{z:,.0f}K<extra></extra>"))
+        fig_fin_rates.add_trace(go.Scatter(x=[fin_terms.vd_rate * 100], y=[fin_terms.line_rate * 100], mode='markers',
+            marker=dict(symbol='x', size=12, color=COLORS['text']), showlegend=False))
+        fig_fin_rates = plotly_theme(fig_fin_rates, height=300)
+        fig_fin_rates.update_layout(title=dict(text="Costo financiero M5–M24 según tasas", font=dict(size=14)))
+        fig_fin_rates.update_xaxes(title_text="Tasa venture debt (%)")
+        fig_fin_rates.update_yaxes(title_text="Tasa línea (%)")
+        st.plotly_chart(fig_fin_rates, use_container_width=True)
+
     # Principio rector
     st.markdown(f"""
     <div style="background:linear-gradient(135deg, {COLORS['primary']}15, {COLORS['success']}15);
@@ -3579,7 +4352,7 @@ Clientes B2B: <b>{v_clients_b2b:.0f}</b> + Payins: <b>{v_clients_payins}</b>
     <div style="background: linear-gradient(135deg, {COLORS['primary']}22, {COLORS['secondary']}22);
                 border: 1px solid {COLORS['primary']}44; border-radius:16px; padding:1.5rem; text-align:center;">
         <div style="font-size:1.3rem; font-weight:800; background: linear-gradient(135deg, #00C9A7, #0066FF); -webkit-background-clip: text; -webkit-text-fill-color: transparent;">
-            Discipline + Technology + Expertise = {v_growth_multiple:.1f}x Sostenible
+            Discipline + Technology + Expertise = {v_multiple:.1f}x Sostenible
         </div>
         <div style="color:#718096; margin-top:0.4rem; font-size:0.85rem;">
             Pablo Martinez — CFO Candidate | Febrero 2026
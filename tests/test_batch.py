@@ -0,0 +1,33 @@
+import time
+
+import numpy as np
+
+from vita_model.batch import evaluate_batch
+
+# user-002: 10^6 combinaciones "muy por debajo de un segundo"
+BATCH_ROWS = 10 ** 6
+BATCH_BUDGET_S = 1.0
+
+
+def _random_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return dict(
+        take_b2b=rng.uniform(0.30, 0.55, n), new_countries=rng.integers(0, 6, n),
+        clients_payins_m16=rng.integers(5, 101, n), mult_b2c=rng.uniform(1, 4, n),
+        hc_target=rng.integers(58, 81, n), mktg_monthly=rng.uniform(20, 100, n),
+        fwd_rev=rng.uniform(15000, 80000, n), card_rev=rng.uniform(10000, 60000, n),
+        hiring_mode=rng.random(n) < 0.5, fwd_on=rng.random(n) < 0.5,
+        ai_on=rng.random(n) < 0.5, card_on=rng.random(n) < 0.5,
+    )
+
+
+def test_batch_1m_rows_within_budget():
+    args = _random_inputs(BATCH_ROWS)
+    evaluate_batch(**{k: v[:1000] for k, v in args.items()})   # imports y cachés fuera de la medición
+    best = np.inf
+    for _ in range(2):
+        t0 = time.perf_counter()
+        out = evaluate_batch(**args)
+        best = min(best, time.perf_counter() - t0)
+    assert all(v.shape == (BATCH_ROWS,) and np.isfinite(v).all() for v in out.values())
+    assert best < BATCH_BUDGET_S, f"{BATCH_ROWS:,} filas en {best:.2f} s (presupuesto {BATCH_BUDGET_S} s)"
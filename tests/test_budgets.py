@@ -0,0 +1,51 @@
+"""Presupuestos de tiempo de los requests (mejor de varias corridas, con los cachés ya calientes)."""
+import time
+
+import numpy as np
+
+from vita_model.goal_seek import GOAL_SEEK_BUDGET_MS, goal_seek
+from vita_model.hiring import scenario_plan
+from vita_model.liquidity import scenario_liquidity
+from vita_model.montecarlo import run_monte_carlo
+from vita_model.scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate, run_scenario
+from vita_model.valuation import run_valuation_mc, valuation_inputs
+
+
+def _best(fn, repeat=3):
+    fn()
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def test_monte_carlo_interactive():
+    # user-003: 100K escenarios "en menos de un par de segundos"
+    assert _best(lambda: run_monte_carlo(n=100_000), repeat=2) < 2.0
+
+
+def test_goal_seek_budget():
+    # user-005: ~200 ms; el presupuesto se hace cumplir entre bloques
+    assert goal_seek()['elapsed_ms'] < GOAL_SEEK_BUDGET_MS
+    assert _best(goal_seek) * 1000 < GOAL_SEEK_BUDGET_MS
+
+
+def test_hiring_plan_payroll_microseconds():
+    # user-014: cientos de hires en 60 meses en microsegundos
+    plan = scenario_plan(256, True, 2500)
+    assert _best(lambda: plan.payroll(60), repeat=20) < 1e-3
+
+
+def test_liquidity_year_milliseconds():
+    # user-016: un año diario (1.000 trayectorias × 4 productos) en milisegundos
+    values = evaluate(ScenarioInputs(), horizon=76)
+    assert _best(lambda: scenario_liquidity(values, DEFAULT_ASSUMPTIONS, n_paths=1000)) < 0.5
+
+
+def test_valuation_monte_carlo_interactive():
+    # user-018: ~1 s para quedar interactivo
+    r = run_scenario(horizon=76)
+    vi = valuation_inputs(r.total_rev_proj, r.total_gastos_proj, r.gtv_m16, r.multiple, r.trajectory)
+    assert _best(lambda: run_valuation_mc(vi, n=100_000), repeat=2) < 1.0
@@ -0,0 +1,31 @@
+from dataclasses import replace
+
+import numpy as np
+
+from vita_model.cache import fingerprint
+from vita_model.montecarlo import sample_drivers
+from vita_model.scenario import DEFAULT_ASSUMPTIONS
+
+
+def test_large_arrays_differ_beyond_repr_truncation():
+    # repr() de NumPy resume con "..." sobre 1000 elementos
+    a = np.zeros(2000)
+    b = a.copy()
+    b[1000] = 1.0
+    assert repr(a) == repr(b)
+    assert fingerprint(a) != fingerprint(b)
+    assert fingerprint((1, {'x': a})) != fingerprint((1, {'x': b}))
+
+
+def test_arrays_keyed_by_dtype_and_shape():
+    a = np.arange(6, dtype=np.int64)
+    assert fingerprint(a) != fingerprint(a.astype(np.float64))
+    assert fingerprint(a) != fingerprint(a.reshape(2, 3))
+    assert fingerprint(a) == fingerprint(np.arange(6, dtype=np.int64))
+
+
+def test_dataclass_with_sampled_arrays():
+    a = replace(DEFAULT_ASSUMPTIONS, **sample_drivers(5000, seed=1))
+    assert fingerprint(a) == fingerprint(replace(DEFAULT_ASSUMPTIONS, **sample_drivers(5000, seed=1)))
+    assert fingerprint(a) != fingerprint(replace(DEFAULT_ASSUMPTIONS, **sample_drivers(5000, seed=2)))
+    assert fingerprint(a) != fingerprint(DEFAULT_ASSUMPTIONS)
@@ -0,0 +1,40 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from vita_model.countries import COUNTRIES
+from vita_model.cube import (CUBE_AXES, CUBE_FIELDS, CUBE_OUTPUTS, HORIZON, cube_key, cube_outputs, cube_rows,
+                             scenario_outputs)
+from vita_model.scenario import ScenarioInputs, evaluate
+
+# Revenue y margen exactos (float32); caja/gap por pendiente; valorización con umbrales entre 0 y el ingreso
+CUBE_RTOL = {'total_rev_proj': 1e-6, 'margin_proj': 1e-5, 'cash_proj': 2e-3, 'gap': 3e-3, 'valuation_mid': 4e-2}
+
+
+def test_axes_cover_sliders():
+    assert CUBE_AXES['new_countries'].tolist() == list(range(len(COUNTRIES) + 1))
+
+
+def test_key_ignores_product_revenue():
+    base = ScenarioInputs()
+    assert cube_key(base) == cube_key(replace(base, fwd_rev=15000, card_rev=60000))
+    assert cube_key(base) != cube_key(replace(base, card_on=False))
+
+
+@pytest.mark.parametrize('fwd_on,card_on', [(True, True), (True, False), (False, False)])
+def test_outputs_match_live(fwd_on, card_on):
+    rng = np.random.default_rng(3)
+    n = 400
+    cols = {k: rng.choice(axis, n) for k, axis in CUBE_AXES.items()}
+    base = replace(ScenarioInputs(), fwd_on=fwd_on, card_on=card_on)
+    rows = cube_rows(cols, base).astype(np.float32)   # precisión del cubo
+    assert rows.shape == (n, len(CUBE_FIELDS))
+    revenues = dict(fwd_rev=rng.choice(np.arange(15000, 80001, 5000), n).astype(float),
+                    card_rev=rng.choice(np.arange(10000, 60001, 5000), n).astype(float))
+    inp = replace(base, **revenues)
+    live = scenario_outputs(evaluate(ScenarioInputs(**cols, **{k: getattr(inp, k) for k in (
+        'hiring_mode', 'fwd_on', 'ai_on', 'card_on', 'fwd_rev', 'card_rev')}), horizon=HORIZON))
+    out = cube_outputs(rows, inp)
+    for k in CUBE_OUTPUTS:
+        np.testing.assert_allclose(out[k], live[k], rtol=CUBE_RTOL[k], err_msg=k)
@@ -0,0 +1,33 @@
+from dataclasses import replace
+
+import numpy as np
+
+from vita_model.financing import DEFAULT_TERMS, financing_schedule
+
+MONTHS = np.arange(5, 25)
+# Sólo el covenant de caja mínima: apalancamiento y cobertura sin límite
+MIN_CASH_ONLY = replace(DEFAULT_TERMS, cov_debt_mrr=1e12, cov_coverage=-1e12)
+
+
+def _schedule(monthly_net, cash0=1_500_000, terms=DEFAULT_TERMS):
+    net = np.full(len(MONTHS), float(monthly_net))
+    return financing_schedule(net, np.full(len(MONTHS), 200_000.0), MONTHS, terms=terms, cash0=cash0)
+
+
+def test_min_cash_breach_when_equity_is_needed():
+    # Quema de $800K/mes: línea y venture debt no alcanzan y el equity repone min_cash cada mes
+    fin = _schedule(-800_000, terms=MIN_CASH_ONLY)
+    assert fin['equity_needed'] > 0
+    np.testing.assert_allclose(fin['cash'][fin['equity'] > 0], DEFAULT_TERMS.min_cash)
+    breach = fin['covenants']['min_cash']
+    assert breach.any()
+    assert (fin['cash_pre_equity'][breach] < DEFAULT_TERMS.cov_min_cash).all()
+    # Meses con equity chico (caja antes del equity sobre el covenant) no incumplen
+    assert not breach[(fin['equity'] > 0) & (fin['cash_pre_equity'] >= DEFAULT_TERMS.cov_min_cash)].any()
+    assert fin['first_breach'] == MONTHS[breach.argmax()]
+
+
+def test_line_alone_keeps_min_cash_covenant():
+    fin = _schedule(-60_000)
+    assert fin['peak_line'] > 0 and fin['equity_needed'] == 0
+    assert not fin['covenants']['min_cash'].any()
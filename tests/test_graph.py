@@ -0,0 +1,55 @@
+from dataclasses import fields, replace
+
+import numpy as np
+
+from vita_model.graph import IncrementalGraph
+from vita_model.metrics import SCENARIO_GRAPH
+from vita_model.scenario import ScenarioInputs, evaluate
+
+
+def test_partial_run_does_not_leave_stale_values():
+    # Run completo, run sin trayectoria con otro take y run completo de nuevo: la trayectoria no puede
+    # quedar la del primer take
+    g = IncrementalGraph(SCENARIO_GRAPH)
+    evaluate(ScenarioInputs(take_b2b=0.5), state=g)
+    evaluate(ScenarioInputs(take_b2b=0.4), with_trajectory=False, state=g)
+    incremental = evaluate(ScenarioInputs(take_b2b=0.4), state=g)
+    fresh = evaluate(ScenarioInputs(take_b2b=0.4))
+    assert 'trajectory' in g.recomputed
+    np.testing.assert_allclose(incremental['trajectory'].revenue, fresh['trajectory'].revenue)
+    np.testing.assert_allclose(incremental['cash_proj'], fresh['cash_proj'])
+
+
+def _assert_same(a, b):
+    for k in b:
+        if k in ('trajectory', 'hiring_plan'):
+            for f in fields(b[k]):
+                np.testing.assert_allclose(getattr(a[k], f.name), getattr(b[k], f.name), rtol=1e-12, err_msg=k)
+        else:
+            np.testing.assert_allclose(a[k], b[k], rtol=1e-12, err_msg=k)
+
+
+def test_incremental_matches_full_over_slider_changes():
+    rng = np.random.default_rng(3)
+    g = IncrementalGraph(SCENARIO_GRAPH)
+    inp = ScenarioInputs()
+    for step in range(30):
+        # Un slider por rerun, como en la app; a veces sin trayectoria
+        field = ('take_b2b', 'new_countries', 'mktg_monthly', 'hc_target', 'hiring_mode', 'fwd_on')[step % 6]
+        value = {'take_b2b': round(float(rng.uniform(0.30, 0.55)), 2), 'new_countries': int(rng.integers(0, 6)),
+                 'mktg_monthly': int(rng.integers(20, 101)), 'hc_target': int(rng.integers(58, 81)),
+                 'hiring_mode': bool(rng.random() < 0.5), 'fwd_on': bool(rng.random() < 0.5)}[field]
+        inp = replace(inp, **{field: value})
+        with_trajectory = step % 4 != 3
+        incremental = evaluate(inp, with_trajectory=with_trajectory, state=g)
+        _assert_same(incremental, evaluate(inp, with_trajectory=with_trajectory))
+
+
+def test_only_downstream_nodes_recomputed():
+    g = IncrementalGraph(SCENARIO_GRAPH)
+    evaluate(ScenarioInputs(), state=g)
+    evaluate(ScenarioInputs(mktg_monthly=80), state=g)
+    # El slider y el objeto ScenarioInputs completo (lo lee la trayectoria)
+    assert set(g.changed) == {'inp.mktg_monthly', 'inputs'}
+    assert set(g.recomputed) == SCENARIO_GRAPH.downstream(g.changed)
+    assert 'clients_payouts' not in g.recomputed and 'effective_cac' in g.recomputed
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from vita_model.hiring import (MAX_HIRES, PLAN_MONTHS, scenario_payroll, scenario_payroll_m16, scenario_payroll_total,
+                               scenario_plan, scenario_savings)
+
+
+@pytest.mark.parametrize('mode', [False, True])
+def test_payroll_tables_match_plan(mode):
+    n = np.array([0, 1, 5, 6, 7, 13, 22, 100, MAX_HIRES])
+    payroll = scenario_plan(n, mode, 2500).payroll(PLAN_MONTHS)
+    np.testing.assert_allclose(scenario_payroll(n, mode, 2500), payroll)
+    np.testing.assert_allclose(scenario_payroll_m16(n, mode, 2500), payroll[:, -1])
+    np.testing.assert_allclose(scenario_payroll_total(n, mode, 2500), payroll.sum(axis=1))
+
+
+def test_savings_immediate_minus_gradual():
+    n = np.arange(0, 23)
+    immediate = scenario_plan(n, False, 2500).payroll(PLAN_MONTHS).sum(axis=1)
+    gradual = scenario_plan(n, True, 2500).payroll(PLAN_MONTHS).sum(axis=1)
+    np.testing.assert_allclose(scenario_savings(n, 2500), immediate - gradual)
+
+
+def test_plan_size_limit():
+    with pytest.raises(ValueError):
+        scenario_payroll(MAX_HIRES + 1, True, 2500)
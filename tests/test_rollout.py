@@ -0,0 +1,24 @@
+from dataclasses import replace
+
+import numpy as np
+
+from vita_model.countries import COUNTRY_CLIENTS, COUNTRY_EARLIEST, COUNTRY_LAUNCH, COUNTRY_NAMES, country_clients
+from vita_model.rollout import optimize_rollout
+from vita_model.scenario import ScenarioInputs
+
+
+def test_clients_capped_at_planned():
+    planned = np.array(COUNTRY_LAUNCH, dtype=float)
+    np.testing.assert_allclose(country_clients(planned, 1.0), COUNTRY_CLIENTS)
+    np.testing.assert_allclose(country_clients(COUNTRY_EARLIEST.astype(float), 1.0), COUNTRY_CLIENTS)
+    assert (country_clients(planned + 1, 1.0) < COUNTRY_CLIENTS).all()
+
+
+def test_optimal_rollout_is_not_everything_first():
+    # Adelantar sólo suma admin: el óptimo es el último mes que aún llega al techo
+    n = 3
+    result = optimize_rollout(replace(ScenarioInputs(), new_countries=n), top=3)
+    best = result['top'][0]['schedule']
+    earliest = dict(zip(COUNTRY_NAMES, COUNTRY_EARLIEST.tolist()))
+    assert best != {name: earliest[name] for name in best}
+    assert best == dict(zip(COUNTRY_NAMES[:n], COUNTRY_LAUNCH[:n]))
@@ -0,0 +1,96 @@
+from dataclasses import fields, replace
+
+import numpy as np
+import pytest
+
+from vita_model.batch import BATCH_OUTPUTS, evaluate_batch
+from vita_model.data import BASE, BASE_ADMIN, BASE_GTV_B2C, DATA
+from vita_model.scenario import DEFAULT_ASSUMPTIONS, RESULT_FIELDS, ScenarioInputs, evaluate, run_scenario
+
+from .test_batch import _random_inputs
+
+GTV_PER_CLIENT = np.mean(DATA['avg_gtv_user_b2b'])
+SCALE = np.log(50 / 2) / np.log(100 / 2)
+TAKE_PAYINS = 1.37 - SCALE * (1.37 - 0.65)
+
+# Escenario por defecto con las fórmulas del sidebar original (app_1.py antes del motor)
+BASELINE = {
+    'clients_payouts': 396 + int((18 + 5 * 18 / 15) * 12) + 3 * 50,
+    'gtv_b2b_m16': 834 * GTV_PER_CLIENT,
+    'rev_b2b_proj': 834 * GTV_PER_CLIENT * 0.50 / 100,
+    'rev_b2c_proj': BASE['rev_payouts_b2c'] * 2.5,
+    'take_payins_derived': TAKE_PAYINS,
+    'rev_payins_proj': 50 * 250000 * TAKE_PAYINS / 100,
+    'mult_total': (834 + 50) / 398,
+    'gtv_m16': 834 * GTV_PER_CLIENT + BASE_GTV_B2C * 2.5 + 50 * 250000,
+    'admin_proj': BASE_ADMIN + 3 * 5000,
+    'mktg_proj': 55 * 1000,
+    'cac_investment': 438 * 1200 + 3000 * 1.5 * 15 + 50 * 2000,
+    'total_investment': 438 * 1200 + 3000 * 1.5 * 15 + 50 * 2000 + 150000 + 150000 + 6 * 1900 * 12,
+}
+
+# Cambios de modelo deliberados sobre el original, fijados como regresión:
+#   rev_ex_proj     Exchange regresionado sobre volúmenes (vita_model.exchange) en vez de 0.19 × Payouts B2B
+#   personal_proj   salario por rol del plan de contrataciones (vita_model.hiring) en vez de 2500 por hire
+#   cash_proj       rampa por línea, calendario de países y nómina del plan en la trayectoria M5..M16
+CURRENT = {
+    'rev_ex_proj': 102446.25097652288,
+    'personal_proj': 121988.0,
+    'total_rev_proj': 989607.1313637231,
+    'total_gastos_proj': 535823.9642935519,
+    'cash_proj': 6908780.625138535,
+    'gap': -5778880.625138535,
+}
+
+
+@pytest.mark.parametrize('field', BASELINE)
+def test_default_scenario_reproduces_baseline(field):
+    assert getattr(run_scenario(), field) == pytest.approx(BASELINE[field], rel=1e-12)
+
+
+@pytest.mark.parametrize('field', CURRENT)
+def test_default_scenario_regression(field):
+    assert getattr(run_scenario(), field) == pytest.approx(CURRENT[field], rel=1e-9)
+
+
+def test_closed_form_cash_matches_trajectory():
+    r = run_scenario(horizon=76)
+    assert r.cash_proj == pytest.approx(r.trajectory.cash[r.trajectory.index(16)], rel=1e-12)
+
+
+def test_b2b_churn_reaches_clients_and_cash():
+    # Al churn de referencia no cambia nada; por encima pierde clientes, revenue y caja
+    base = run_scenario()
+    high = run_scenario(assumptions=replace(DEFAULT_ASSUMPTIONS, churn_b2b=0.02))
+    low = run_scenario(assumptions=replace(DEFAULT_ASSUMPTIONS, churn_b2b=0.005))
+    assert low.clients_payouts > base.clients_payouts == BASELINE['clients_payouts'] > high.clients_payouts
+    assert high.cash_proj < base.cash_proj < low.cash_proj
+    assert high.gap > base.gap > low.gap
+
+
+def test_batch_matches_scalar_row_by_row():
+    n = 40
+    args = _random_inputs(n, seed=1)
+    outputs = BATCH_OUTPUTS + ('clients_payouts', 'personal_proj', 'admin_proj', 'rev_ex_proj', 'hiring_savings_12m')
+    batch = evaluate_batch(**args, outputs=outputs, chunk_size=16)
+    for i in range(n):
+        row = run_scenario(ScenarioInputs(**{k: v[i].item() for k, v in args.items()}))
+        for k in outputs:
+            assert batch[k][i] == pytest.approx(getattr(row, k), rel=1e-9, abs=1e-6), (i, k)
+
+
+def test_array_evaluate_matches_scalar_with_trajectory():
+    args = _random_inputs(8, seed=2)
+    values = evaluate(ScenarioInputs(**args), horizon=40)
+    for i in range(8):
+        row = evaluate(ScenarioInputs(**{k: v[i].item() for k, v in args.items()}), horizon=40)
+        for k in RESULT_FIELDS:
+            if k == 'hiring_plan':
+                continue
+            if k == 'trajectory':
+                for f in fields(row[k]):
+                    np.testing.assert_allclose(getattr(values[k], f.name)[..., i, :] if f.name != 'months'
+                                               else values[k].months, getattr(row[k], f.name), rtol=1e-9)
+            else:
+                batch = np.broadcast_to(values[k], (8,) + np.shape(row[k]))   # constantes quedan escalares
+                np.testing.assert_allclose(batch[i], row[k], rtol=1e-9, err_msg=k)
@@ -0,0 +1,29 @@
+from dataclasses import replace
+
+from vita_model.countries import COUNTRIES
+from vita_model.scenario import ScenarioInputs
+from vita_model.sensitivity import INTEGER_PARAMS, run_tornado
+
+
+def _rows(tornado):
+    return {r['param']: r for r in tornado['rows']['gap']}
+
+
+def test_integer_drivers_move_whole_steps():
+    inp = ScenarioInputs()
+    rows = _rows(run_tornado(inp, pct=0.10))
+    # 3 países ±10% = ±0.3 → al menos un país
+    assert (rows['new_countries']['low_value'], rows['new_countries']['high_value']) == (inp.new_countries - 1,
+                                                                                      inp.new_countries + 1)
+    for name in INTEGER_PARAMS:
+        assert rows[name]['low_value'].is_integer() and rows[name]['high_value'].is_integer()
+        assert rows[name]['low_value'] < rows[name]['high_value']
+
+
+def test_integer_drivers_clipped_to_slider_bounds():
+    inp = replace(ScenarioInputs(), new_countries=len(COUNTRIES), hc_target=60)
+    rows = _rows(run_tornado(inp, pct=0.50))
+    assert rows['new_countries']['high_value'] == len(COUNTRIES)
+    assert rows['hc_target']['low_value'] == 58
+    assert rows['hc_target']['high_value'] == 80
+    assert rows['team_size']['low_value'] >= 1
@@ -0,0 +1,57 @@
+"""Modelo financiero de Vita Wallet, independiente de Streamlit.
+
+app_1.py sólo se encarga de la UI: lee los sliders, llama al motor y
+renderiza los resultados.
+"""
+from .scenario import Assumptions, DEFAULT_ASSUMPTIONS, ScenarioInputs, ScenarioResult, evaluate, run_scenario
+from .projection import HORIZONS, Projection, project_months
+from .curves import CURVE_FAMILIES, fit_history, ramp_curves
+from .hiring import AREAS, ROLES, HiringPlan, scenario_plan
+from .countries import COUNTRIES, Country, launch_schedule
+from .batch import BATCH_OUTPUTS, evaluate_batch, grid_inputs
+from .montecarlo import MC_DISTRIBUTIONS, run_monte_carlo, sample_drivers
+from .sensitivity import TORNADO_METRICS, run_tornado
+from .goal_seek import GOAL_TARGETS, META_MULT_TOTAL, goal_seek
+from .graph import IncrementalGraph, MetricGraph
+from .metrics import SCENARIO_GRAPH
+from .valuation import VALUATION_DISTRIBUTIONS, ValuationInputs, dcf, dcf_grid, run_valuation, run_valuation_mc, valuation_inputs
+from .cache import LRUCache, fingerprint
+from .cube import CUBE_AXES, CUBE_OUTPUTS, CubeStore, ScenarioCube, build_cube, lookup_scenario
+from .pareto import pareto_frontier, pareto_mask
+from .rollout import optimize_rollout
+from .liquidity import SETTLEMENT, Settlement, scenario_liquidity, simulate_liquidity
+from .financing import DEFAULT_TERMS, FINANCING_ROUTES, FinancingTerms, financing_schedule, scenario_financing
+from .clients import ClientBook, simulate_clients
+from .cohorts import book_activity, cohort_analysis, cohort_tables
+from .elasticity import TAKE_FIT, fit_elasticity, take_rate_curve
+from .exchange import EXCHANGE_BUCKETS, EXCHANGE_FIT, bucket_volume, exchange_history, fit_exchange
+from .forwards import DEFAULT_FWD_TERMS, FX_SHOCKS, ForwardTerms, scenario_forwards, simulate_forwards
+from .card import CARD_MCC, CardTerms, aggregate_transactions, read_transactions, simulate_card, synthesize_transactions
+from .payins import PAYINS_PIPELINE, PipelineStage, project_payins, required_leads, scale_curve, scale_fit, scale_take
+
+__all__ = [
+    'Assumptions', 'DEFAULT_ASSUMPTIONS', 'ScenarioInputs', 'ScenarioResult', 'evaluate', 'run_scenario',
+    'HORIZONS', 'Projection', 'project_months',
+    'CURVE_FAMILIES', 'fit_history', 'ramp_curves',
+    'AREAS', 'ROLES', 'HiringPlan', 'scenario_plan',
+    'COUNTRIES', 'Country', 'launch_schedule',
+    'BATCH_OUTPUTS', 'evaluate_batch', 'grid_inputs',
+    'MC_DISTRIBUTIONS', 'run_monte_carlo', 'sample_drivers',
+    'TORNADO_METRICS', 'run_tornado',
+    'GOAL_TARGETS', 'META_MULT_TOTAL', 'goal_seek',
+    'IncrementalGraph', 'MetricGraph', 'SCENARIO_GRAPH',
+    'VALUATION_DISTRIBUTIONS', 'ValuationInputs', 'dcf', 'dcf_grid', 'run_valuation', 'run_valuation_mc', 'valuation_inputs',
+    'LRUCache', 'fingerprint',
+    'CUBE_AXES', 'CUBE_OUTPUTS', 'CubeStore', 'ScenarioCube', 'build_cube', 'lookup_scenario',
+    'pareto_frontier', 'pareto_mask',
+    'optimize_rollout',
+    'SETTLEMENT', 'Settlement', 'scenario_liquidity', 'simulate_liquidity',
+    'DEFAULT_TERMS', 'FINANCING_ROUTES', 'FinancingTerms', 'financing_schedule', 'scenario_financing',
+    'ClientBook', 'simulate_clients',
+    'book_activity', 'cohort_analysis', 'cohort_tables',
+    'TAKE_FIT', 'fit_elasticity', 'take_rate_curve',
+    'EXCHANGE_BUCKETS', 'EXCHANGE_FIT', 'bucket_volume', 'exchange_history', 'fit_exchange',
+    'DEFAULT_FWD_TERMS', 'FX_SHOCKS', 'ForwardTerms', 'scenario_forwards', 'simulate_forwards',
+    'CARD_MCC', 'CardTerms', 'aggregate_transactions', 'read_transactions', 'simulate_card', 'synthesize_transactions',
+    'PAYINS_PIPELINE', 'PipelineStage', 'project_payins', 'required_leads', 'scale_curve', 'scale_fit', 'scale_take',
+]
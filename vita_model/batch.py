@@ -0,0 +1,47 @@
+"""Evaluación vectorizada de escenarios para barridos de parámetros.
+
+En vez de un rerun de Streamlit por combinación, evaluate_batch() recibe
+arrays (o escalares) de los sliders del sidebar y corre las fórmulas de
+vita_model.scenario en una sola pasada NumPy. Se usa para los board packs
+con barridos completos y como base del Monte Carlo, tornado y goal-seek.
+"""
+import numpy as np
+
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate
+
+BATCH_OUTPUTS = ('total_rev_proj', 'margin_proj', 'total_gastos_proj', 'cash_proj', 'gap')
+
+# Filas por bloque: acota la memoria de los ~50 arrays intermedios
+CHUNK_SIZE = 1 << 15
+
+
+def evaluate_batch(take_b2b, new_countries, clients_payins_m16, mult_b2c, hc_target, mktg_monthly,
+                   fwd_rev, card_rev, hiring_mode=True, fwd_on=True, ai_on=True, card_on=True,
+                   assumptions=DEFAULT_ASSUMPTIONS, outputs=BATCH_OUTPUTS, chunk_size=CHUNK_SIZE):
+    """Evalúa N escenarios a la vez.
+
+    Los parámetros se combinan con broadcasting y se aplanan a 1-D; devuelve
+    un dict output → array de largo N. Sólo se calculan los outputs pedidos
+    y lo que necesitan (sin trayectoria ni series por mes). Para un barrido
+    cartesiano, pasar los ejes ya expandidos (p. ej. con grid_inputs()).
+    """
+    params = dict(take_b2b=take_b2b, new_countries=new_countries, clients_payins_m16=clients_payins_m16,
+                  mult_b2c=mult_b2c, hc_target=hc_target, mktg_monthly=mktg_monthly, fwd_rev=fwd_rev,
+                  card_rev=card_rev, hiring_mode=hiring_mode, fwd_on=fwd_on, ai_on=ai_on, card_on=card_on)
+    cols = dict(zip(params, (np.ravel(c) for c in np.broadcast_arrays(*params.values()))))
+    n = cols['take_b2b'].size
+    result = {k: np.empty(n) for k in outputs}
+    for start in range(0, n, chunk_size):
+        sl = slice(start, min(start + chunk_size, n))
+        inp = ScenarioInputs(**{k: c[sl] for k, c in cols.items()})
+        values = evaluate(inp, assumptions, targets=outputs)
+        for k in outputs:
+            result[k][sl] = values[k]
+    return result
+
+
+def grid_inputs(**axes):
+    """Producto cartesiano de ejes → dict de arrays 1-D listos para evaluate_batch()."""
+    names = list(axes)
+    mesh = np.meshgrid(*(np.asarray(axes[k]) for k in names), indexing='ij')
+    return {k: m.ravel() for k, m in zip(names, mesh)}
@@ -0,0 +1,118 @@
+"""Caché LRU acotado con expiración por TTL.
+
+Pensado para resultados caros que dependen de pocos inputs (p. ej. la
+valorización multi-método): la clave es un fingerprint de los inputs, se
+guardan a lo más maxsize entradas y cada una vence a los ttl segundos.
+Thread-safe, porque Streamlit atiende cada sesión en su propio thread.
+"""
+import dataclasses
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def fingerprint(obj):
+    """Hash estable de un objeto: dataclasses, tuplas, listas y dicts se recorren
+    campo a campo; los arrays NumPy entran por dtype, shape y bytes (su repr
+    se trunca sobre 1000 elementos); el resto por su repr determinístico."""
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, obj)
+    return h.hexdigest()
+
+
+def _feed(h, obj):
+    # Cada parte va con etiqueta y largo: dos estructuras distintas no se concatenan igual
+    def chunk(tag, data):
+        h.update(tag + len(data).to_bytes(8, 'little') + data)
+
+    if isinstance(obj, np.ndarray):
+        chunk(b'nd', f'{obj.dtype.str}{obj.shape}'.encode())
+        if obj.dtype.hasobject:
+            _feed(h, obj.tolist())
+        else:
+            chunk(b'b', np.ascontiguousarray(obj).tobytes())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        chunk(b'dc', type(obj).__qualname__.encode())
+        for f in dataclasses.fields(obj):
+            chunk(b'f', f.name.encode())
+            _feed(h, getattr(obj, f.name))
+    elif isinstance(obj, (tuple, list)):
+        chunk(b'l' if isinstance(obj, list) else b't', str(len(obj)).encode())
+        for item in obj:
+            _feed(h, item)
+    elif isinstance(obj, dict):
+        chunk(b'd', str(len(obj)).encode())
+        for k, v in obj.items():
+            _feed(h, k)
+            _feed(h, v)
+    elif isinstance(obj, bytes):
+        chunk(b'y', obj)
+    else:
+        chunk(b'r', repr(obj).encode())
+
+
+class LRUCache:
+    def __init__(self, maxsize=64, ttl=3600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()   # clave → (timestamp, valor), más reciente al final
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Valor cacheado para key o compute() (que se guarda) si no está o venció."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
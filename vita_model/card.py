@@ -0,0 +1,160 @@
+"""Vita Card: revenue de interchange y FX desde flujos de transacciones.
+
+El revenue de la tarjeta era un slider (card_rev, 10K–60K). Acá sale de
+las transacciones (mes, rubro MCC, moneda, monto):
+
+  interchange   monto × interchange del rubro (CARD_MCC) × program_share
+                (lo que queda después del emisor patrocinador y el procesador)
+  FX            monto × spread de la moneda en compras fuera de la moneda
+                local (CARD_CURRENCIES)
+  uplift B2C    volumen gastado con la tarjeta ÷ GTV Payouts B2C del mes:
+                el saldo que el usuario carga y gasta sin salir de Vita
+
+Las transacciones llegan como un iterable de bloques (dict de arrays
+month, mcc, currency, amount): synthesize_transactions() los genera desde
+la cartera de tarjetahabientes y read_transactions() los lee de un CSV.
+aggregate_transactions() los consume uno a uno y acumula con np.bincount
+en una grilla fija meses × rubros × monedas, así la memoria es la de un
+bloque (chunk_size) aunque el flujo tenga decenas de millones de
+transacciones.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+CARD_MONTHS = np.arange(5, 17)   # M5..M16: lanzamiento → fin de la rampa
+CHUNK_SIZE = 1 << 20             # transacciones por bloque
+
+# Rubros: (nombre, participación en transacciones, ticket promedio USD, interchange %, compras en moneda extranjera)
+CARD_MCC = (
+    ('Supermercados', 0.25, 35, 0.90, 0.02),
+    ('Restaurantes', 0.20, 18, 1.20, 0.03),
+    ('Transporte', 0.15, 8, 1.10, 0.02),
+    ('E-commerce', 0.20, 30, 1.50, 0.35),
+    ('Viajes', 0.05, 150, 1.60, 0.60),
+    ('Otros', 0.15, 25, 1.20, 0.05),
+)
+# Monedas: (código, participación dentro de las compras en moneda extranjera, spread FX %)
+CARD_CURRENCIES = (
+    ('LOCAL', 0.0, 0.0),
+    ('USD', 0.8, 1.5),
+    ('EUR', 0.2, 2.0),
+)
+TICKET_SIGMA = 0.8   # dispersión lognormal del monto por transacción
+
+
+@dataclass(frozen=True)
+class CardTerms:
+    holders_per_mult: float = 4000   # tarjetahabientes M16 por unidad del multiplicador B2C
+    txn_per_holder: float = 15       # transacciones por tarjetahabiente activo y mes
+    program_share: float = 0.6       # parte del interchange que queda en Vita
+
+
+DEFAULT_CARD_TERMS = CardTerms()
+
+
+def card_holders(mult_b2c, terms=DEFAULT_CARD_TERMS, months=CARD_MONTHS):
+    """Tarjetahabientes por mes: rampa lineal desde el lanzamiento hasta holders_per_mult × mult_b2c en M16."""
+    months = np.asarray(months)
+    return terms.holders_per_mult * mult_b2c * (months - months[0] + 1) / len(months)
+
+
+def synthesize_transactions(holders, terms=DEFAULT_CARD_TERMS, months=CARD_MONTHS, seed=0, chunk_size=CHUNK_SIZE):
+    """Genera bloques de transacciones sintéticas (≤ chunk_size filas cada uno) para los tarjetahabientes de cada mes."""
+    rng = np.random.default_rng(seed)
+    share = np.array([m[1] for m in CARD_MCC])
+    ticket = np.array([m[2] for m in CARD_MCC])
+    foreign = np.array([m[4] for m in CARD_MCC])
+    fx_share = np.cumsum([c[1] for c in CARD_CURRENCIES[1:]])
+    for month, n_holders in zip(months, np.asarray(holders, dtype=float)):
+        remaining = int(rng.poisson(n_holders * terms.txn_per_holder))
+        while remaining > 0:
+            n = min(remaining, chunk_size)
+            remaining -= n
+            mcc = rng.choice(len(CARD_MCC), size=n, p=share / share.sum()).astype(np.int8)
+            is_foreign = rng.random(n, dtype=np.float32) < foreign[mcc]
+            currency = np.where(is_foreign, 1 + np.searchsorted(fx_share, rng.random(n) * fx_share[-1]), 0)
+            yield {
+                'month': np.full(n, month, np.int16),
+                'mcc': mcc,
+                'currency': currency.astype(np.int8),
+                'amount': (rng.lognormal(-TICKET_SIGMA ** 2 / 2, TICKET_SIGMA, n) * ticket[mcc]).astype(np.float32),
+            }
+
+
+def read_transactions(path, chunk_size=CHUNK_SIZE):
+    """Lee un CSV (month, mcc, currency, amount) por bloques; rubros y monedas por nombre (CARD_MCC, CARD_CURRENCIES).
+
+    Un rubro desconocido cuenta como 'Otros'; una moneda desconocida queda
+    con código -1 y aggregate_transactions() la descarta.
+    """
+    mcc_names = [m[0] for m in CARD_MCC]
+    currency_codes = [c[0] for c in CARD_CURRENCIES]
+    for chunk in pd.read_csv(path, chunksize=chunk_size, usecols=['month', 'mcc', 'currency', 'amount']):
+        mcc = pd.Categorical(chunk['mcc'], categories=mcc_names).codes
+        yield {
+            'month': chunk['month'].to_numpy(np.int16),
+            'mcc': np.where(mcc < 0, mcc_names.index('Otros'), mcc).astype(np.int8),
+            'currency': pd.Categorical(chunk['currency'].str.upper(), categories=currency_codes).codes.astype(np.int8),
+            'amount': chunk['amount'].to_numpy(np.float32),
+        }
+
+
+def aggregate_transactions(chunks, months=CARD_MONTHS, gtv_b2c=None, terms=DEFAULT_CARD_TERMS):
+    """Revenue mensual de la tarjeta a partir de un iterable de bloques de transacciones.
+
+    Acumula conteo y monto por (mes, rubro, moneda) con np.bincount bloque a
+    bloque. Devuelve un dict con arrays por mes de transacciones, volumen,
+    revenue de interchange, FX y total; volumen e interchange por rubro y
+    mes (meses, rubros); el uplift B2C (volumen ÷ gtv_b2c, si se pasa);
+    transacciones procesadas y descartadas, bloques, memoria del bloque más
+    grande y tiempo.
+    """
+    t0 = time.perf_counter()
+    months = np.asarray(months)
+    shape = (len(months), len(CARD_MCC), len(CARD_CURRENCIES))
+    size = int(np.prod(shape))
+    count = np.zeros(size)
+    volume = np.zeros(size)
+    n_chunks = skipped = peak_bytes = 0
+    for chunk in chunks:
+        month = chunk['month'].astype(np.int64) - int(months[0])
+        mcc, currency = chunk['mcc'].astype(np.int64), chunk['currency'].astype(np.int64)
+        ok = (month >= 0) & (month < len(months)) & (currency >= 0)
+        cell = np.ravel_multi_index((month[ok], mcc[ok], currency[ok]), shape)
+        count += np.bincount(cell, minlength=size)
+        volume += np.bincount(cell, chunk['amount'][ok].astype(float), size)
+        skipped += int((~ok).sum())
+        n_chunks += 1
+        peak_bytes = max(peak_bytes, sum(v.nbytes for v in chunk.values()))
+    count, volume = count.reshape(shape), volume.reshape(shape)
+
+    interchange = volume * np.array([m[3] for m in CARD_MCC])[:, None] / 100 * terms.program_share
+    fx = volume * np.array([c[2] for c in CARD_CURRENCIES]) / 100
+    by_month = volume.sum(axis=(1, 2))
+    return {
+        'months': months,
+        'transactions': count.sum(axis=(1, 2)),
+        'volume': by_month,
+        'interchange': interchange.sum(axis=(1, 2)),
+        'fx': fx.sum(axis=(1, 2)),
+        'revenue': (interchange + fx).sum(axis=(1, 2)),
+        'volume_mcc': volume.sum(axis=2),
+        'interchange_mcc': interchange.sum(axis=2),
+        'b2c_uplift': None if gtv_b2c is None else by_month / np.asarray(gtv_b2c, dtype=float),
+        'n_transactions': int(count.sum()),
+        'n_skipped': skipped,
+        'n_chunks': n_chunks,
+        'chunk_bytes': peak_bytes,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def simulate_card(mult_b2c, gtv_b2c=None, terms=DEFAULT_CARD_TERMS, months=CARD_MONTHS, seed=0, chunk_size=CHUNK_SIZE):
+    """aggregate_transactions() sobre el flujo sintético de la cartera de tarjetahabientes de un escenario."""
+    holders = card_holders(mult_b2c, terms, months)
+    card = aggregate_transactions(synthesize_transactions(holders, terms, months, seed, chunk_size), months, gtv_b2c, terms)
+    card['holders'] = holders
+    return card
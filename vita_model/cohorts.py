@@ -0,0 +1,128 @@
+"""Cohortes de adquisición: retención, retención de revenue (NRR) y LTV.
+
+El churn y el CLTV del dashboard salen de cuatro promedios mensuales
+(AVG_CHURN_B2B, BASE_CLTV_B2B = ARPU / churn). Acá se parte de la
+actividad cliente-mes (client, month, revenue), p. ej. un export del
+ledger o la cartera simulada de clients.simulate_clients(), y se arman:
+
+  retención(c, a)  clientes de la cohorte c activos a la edad a ÷ tamaño de c
+  NRR(c, a)        revenue de la cohorte c a la edad a ÷ su revenue en la edad 0
+  LTV(c, a)        revenue acumulado de la cohorte c hasta la edad a ÷ tamaño de c
+
+con un groupby + unstack sobre todo el dataset (sin loops por cohorte).
+Las celdas que todavía no se pueden observar (cohorte + edad > último mes)
+quedan en NaN. Las curvas agregadas ponderan cada edad sólo con las
+cohortes observables a esa edad; el LTV de cohortes extiende la curva de
+NRR con su decaimiento mensual (ajuste log-lineal de los últimos
+TAIL_MONTHS meses, ponderado por clientes observados).
+
+El resultado se cachea por versión del dataset (hash del contenido), así
+un rerun de Streamlit con los mismos datos no recalcula las matrices.
+"""
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+
+TAIL_MONTHS = 12    # meses finales de la curva NRR para el decaimiento del LTV
+MIN_COHORTS = 12    # una edad entra a las curvas si la observan al menos estas cohortes
+COHORT_PATHS = 25   # carteras simuladas como fuente de actividad (~4.000 altas cada una)
+
+COHORT_CACHE = LRUCache(maxsize=8, ttl=24 * 3600)
+
+
+def activity_version(activity):
+    """Hash del contenido de la actividad (client, month, revenue): la clave del caché."""
+    hashed = pd.util.hash_pandas_object(activity[['client', 'month', 'revenue']], index=False)
+    return hashlib.blake2b(hashed.values.tobytes(), digest_size=16).hexdigest()
+
+
+def book_activity(agents):
+    """Actividad cliente-mes de la cartera de simulate_clients().
+
+    Sólo clientes dados de alta dentro de la simulación (la cartera M4 no
+    tiene mes de adquisición); cada slot (cartera, cliente) es un client id
+    y el revenue mensual es el del cliente a precios M16.
+    """
+    book, months = agents['book'], agents['months']
+    last = int(months[-1])
+    acquired = (book.start >= months[0]) & (book.start <= last)
+    start = book.start[acquired].astype(np.int64)
+    n = np.minimum(book.end[acquired].astype(np.int64), last + 1) - start
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    return pd.DataFrame({
+        'client': np.repeat(np.flatnonzero(acquired), n),
+        'month': np.repeat(start, n) + offset,
+        'revenue': np.repeat(agents['client_rev'][acquired], n),
+    })
+
+
+def cohort_tables(activity, min_cohorts=MIN_COHORTS, tail=TAIL_MONTHS):
+    """Matrices cohorte × edad y curvas agregadas a partir de la actividad cliente-mes.
+
+    Devuelve un dict con las matrices (DataFrame, índice = mes de la
+    cohorte, columnas = edad en meses) 'size', 'clients', 'retention',
+    'nrr' y 'ltv'; las curvas por edad 'retention_curve', 'nrr_curve' y
+    'ltv_curve' (Series); y el resumen: revenue del primer mes por
+    cliente, churn mensual implícito, decaimiento de la cola, LTV de
+    cohortes (inf si la NRR no decae), clientes, filas y tiempo.
+    """
+    t0 = time.perf_counter()
+    df = activity.groupby(['client', 'month'], sort=False, as_index=False)['revenue'].sum()
+    df['cohort'] = df.groupby('client')['month'].transform('min')
+    df['age'] = df['month'] - df['cohort']
+    last = int(df['month'].max())
+
+    grouped = df.groupby(['cohort', 'age'])
+    ages = pd.RangeIndex(int(df['age'].max()) + 1, name='age')
+    clients = grouped.size().unstack(fill_value=0).reindex(columns=ages, fill_value=0)
+    revenue = grouped['revenue'].sum().unstack(fill_value=0.0).reindex(columns=ages, fill_value=0.0)
+    observed = pd.DataFrame(ages.values[None, :] <= last - clients.index.values[:, None],
+                            index=clients.index, columns=ages)
+    size = clients[0]
+
+    # Curvas agregadas: cada edad con las cohortes que ya la alcanzaron (y al menos min_cohorts)
+    support = observed.sum()
+    ages_ok = ages[support >= min(min_cohorts, len(size))]
+    obs_size = observed.mul(size, axis=0).sum()
+    obs_rev0 = observed.mul(revenue[0], axis=0).sum()
+    retention_curve = (clients.where(observed).sum() / obs_size)[ages_ok]
+    nrr_curve = (revenue.where(observed).sum() / obs_rev0)[ages_ok]
+    rev0 = float(revenue[0].sum() / size.sum())
+    ltv_curve = rev0 * nrr_curve.cumsum()
+
+    # LTV: curva observada + cola geométrica con el decaimiento mensual de la NRR
+    a_max = int(ages_ok[-1])
+    tail_ages = ages_ok[-min(tail, len(ages_ok)):]
+    if len(tail_ages) > 1 and (nrr_curve[tail_ages] > 0).all():
+        slope = np.polyfit(tail_ages, np.log(nrr_curve[tail_ages]), 1, w=np.sqrt(obs_size[tail_ages]))[0]
+        decay = float(np.exp(slope))
+    else:
+        decay = 0.0
+    tail_ltv = rev0 * nrr_curve.iloc[-1] * decay / (1 - decay) if decay < 1 else np.inf
+    return {
+        'size': size,
+        'clients': clients.where(observed),
+        'retention': clients.div(size, axis=0).where(observed),
+        'nrr': revenue.div(revenue[0], axis=0).where(observed),
+        'ltv': revenue.cumsum(axis=1).div(size, axis=0).where(observed),
+        'retention_curve': retention_curve,
+        'nrr_curve': nrr_curve,
+        'ltv_curve': ltv_curve,
+        'rev0': rev0,
+        'churn': 1 - float(retention_curve.iloc[-1]) ** (1 / a_max) if a_max > 0 else 0.0,
+        'decay': decay,
+        'ltv_cohort': float(ltv_curve.iloc[-1] + tail_ltv),
+        'n_clients': int(size.sum()),
+        'n_rows': len(df),
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def cohort_analysis(activity, version=None, **kwargs):
+    """cohort_tables() cacheado por versión del dataset (por defecto, activity_version())."""
+    key = (version or activity_version(activity), tuple(sorted(kwargs.items())))
+    return COHORT_CACHE.get_or_compute(key, lambda: cohort_tables(activity, **kwargs))
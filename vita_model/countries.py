@@ -0,0 +1,101 @@
+"""Calendario de lanzamiento de países nuevos.
+
+Cada país tiene mes de lanzamiento planificado, rampa de captación,
+clientes B2B, admin mensual y GTV por cliente (los tres últimos relativos
+a las Assumptions clients_per_country, country_admin y
+gtv_per_client_payouts, así el Monte Carlo y el tornado siguen moviendo
+un solo driver). El slider "Nuevos Países" (N) lanza los N primeros países
+del calendario por mes de lanzamiento; Assumptions.country_launch trae el
+mes de cada país (escalares o arrays (..., países) para evaluar muchos
+calendarios en batch).
+
+Captación: el ritmo mensual sube linealmente durante ramp meses y luego
+queda constante. clients es lo captado a M16 con el lanzamiento
+planificado (la calibración de siempre: ~50 por país) y es también el
+techo del mercado a M16: lanzar después escala esa cifra con los meses
+activos, lanzar antes llega al techo antes pero no lo supera (sólo suma
+meses de admin). Por eso el lanzamiento planificado de cada país deja al
+menos un trimestre activo a M16.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Country:
+    name: str
+    launch: int            # mes de lanzamiento planificado (M7 = 7)
+    earliest: int          # primer mes posible (sociedad, licencias, banca local)
+    clients: float = 1.0   # clientes B2B a M16 con el lanzamiento planificado (× clients_per_country)
+    ramp: int = 3          # meses hasta el ritmo pleno de captación
+    admin: float = 1.0     # admin/legal/oficina mensual (× country_admin)
+    gtv: float = 1.0       # GTV por cliente (× gtv_per_client_payouts)
+
+
+COUNTRIES = (
+    Country('Bolivia', 7, earliest=5),
+    Country('Perú', 8, earliest=5),
+    Country('España', 12, earliest=9, ramp=4),
+    # Mercados futuros: sin sociedad constituida, lanzamiento más tardío y más caro
+    Country('Ecuador', 13, earliest=11, clients=0.4, admin=1.2, gtv=0.8),
+    Country('Brasil', 14, earliest=12, clients=0.3, ramp=6, admin=2.0, gtv=1.2),
+)
+COUNTRY_NAMES = tuple(c.name for c in COUNTRIES)
+COUNTRY_LAUNCH = tuple(c.launch for c in COUNTRIES)
+COUNTRY_EARLIEST = np.array([c.earliest for c in COUNTRIES])
+COUNTRY_CLIENTS = np.array([c.clients for c in COUNTRIES])
+COUNTRY_RAMP = np.array([c.ramp for c in COUNTRIES])
+COUNTRY_ADMIN = np.array([c.admin for c in COUNTRIES])
+COUNTRY_GTV = np.array([c.gtv for c in COUNTRIES])
+
+LAUNCH_MONTHS = np.arange(5, 17)   # M5..M16: la rampa del Scenario Builder
+
+
+def _acquired(months, ramp):
+    # Meses-ritmo captados tras `months` meses activos con rampa lineal de `ramp` meses
+    m = np.maximum(months, 0)
+    return np.where(m <= ramp, m * (m + 1) / (2 * ramp), (ramp + 1) / 2 + (m - ramp))
+
+
+_PLANNED = _acquired(17 - np.array(COUNTRY_LAUNCH), COUNTRY_RAMP)
+
+
+def launch_schedule(new_countries, country_launch):
+    """Mes de lanzamiento efectivo por país → (..., países); inf = no se lanza.
+
+    Se lanzan los new_countries primeros por mes (empates: orden de COUNTRIES).
+    """
+    launch = np.asarray(country_launch, dtype=float)
+    rank = np.argsort(np.argsort(launch, axis=-1, kind='stable'), axis=-1, kind='stable')
+    return np.where(rank < np.asarray(new_countries)[..., None], launch, np.inf)
+
+
+def country_clients(schedule, clients_per_country, month=16):
+    """Clientes B2B captados por país al cierre de `month` → (..., países), con techo en los planificados."""
+    acquired = _acquired(month + 1 - np.where(np.isfinite(schedule), schedule, month + 1), COUNTRY_RAMP)
+    return np.asarray(clients_per_country)[..., None] * COUNTRY_CLIENTS * np.minimum(acquired / _PLANNED, 1)
+
+
+def country_admin_months(schedule, country_admin, first=5, last=16):
+    """Admin acumulado de M{first} a M{last} → (...): admin de cada país × sus meses activos en el tramo."""
+    # inf (no se lanza) → 0 meses activos
+    active = np.clip(last + 1 - np.maximum(np.ceil(schedule), first), 0, last + 1 - first)
+    return np.asarray(country_admin) * (active @ COUNTRY_ADMIN)
+
+
+def country_admin_cost(schedule, country_admin, months):
+    """Admin mensual de los países activos en cada mes (months creciente) → (..., len(months)).
+
+    Cada país suma su admin desde el primer mes ≥ su lanzamiento: un
+    escalón por país (np.bincount) y un cumsum sobre los meses, sin la
+    matriz escenarios × meses × países.
+    """
+    months = np.asarray(months)
+    first = np.searchsorted(months, np.asarray(schedule, dtype=float))   # len(months) = fuera del horizonte
+    lead, width = first.shape[:-1], len(months) + 1
+    rows = math.prod(lead)
+    cell = np.arange(rows).reshape(lead + (1,)) * width + first
+    steps = np.bincount(cell.ravel(), np.broadcast_to(COUNTRY_ADMIN, first.shape).ravel(), rows * width)
+    return np.asarray(country_admin)[..., None] * steps.reshape(lead + (width,)).cumsum(axis=-1)[..., :-1]
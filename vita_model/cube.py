@@ -0,0 +1,300 @@
+"""Cubo precalculado de escenarios (float32, memory-mapped).
+
+Los sliders del sidebar tienen dominios discretos y chicos (take rate B2B,
+países, clientes Payins, ×B2C, headcount, marketing), así que los outputs
+clave se precalculan offline para la grilla completa: 38M escenarios ×
+CUBE_FIELDS en float32. Los toggles de contratación/Forwards/AI/Card, las
+Assumptions, los roles de vita_model.hiring y los países de
+vita_model.countries quedan fijos en cada cubo; su fingerprint, junto con
+el de DATA y el del código del modelo (MODEL_VERSION), es el nombre del
+archivo. Así se puede construir un cubo por configuración de toggles, y
+un cubo construido antes de un cambio de fórmulas, parámetros o datos
+deja de encontrarse (cálculo en vivo) en vez de servir números viejos.
+
+Los ingresos de Forwards y Card (REVENUE_FIELDS) no son parte de la
+clave: el cubo guarda cada escenario con ambos en 0 y se suman al leer
+(cube_outputs). Revenue M16 suma el ingreso, los gastos suman su tax_rate
+y el margen sale de los dos, exactos. Caja y valorización no son lineales
+en el ingreso (ratio variable de M16, umbrales de los métodos): el cubo
+guarda su pendiente por producto, secante entre 0 y el default del
+slider (SLOPE_REF), y el gap mueve lo mismo que la caja con signo
+opuesto. En el rango de los sliders caja y gap quedan a ~0.2% del cálculo
+en vivo; la valorización es exacta salvo cerca de un umbral de sus
+métodos (~0.1% de la grilla, hasta ~3.5%).
+
+El cubo es un .npy que ScenarioCube abre como np.memmap (mmap_mode='r'):
+lookup() lee un solo registro (tiempo constante, sin cargar el cubo en
+memoria) y devuelve None fuera de la grilla. lookup_scenario() usa el cubo primero y calcula
+en vivo sólo si el punto no está precalculado.
+
+Construir (~40 minutos por configuración con Forwards y Card, una pasada
+por pendiente; ~1.4 GB en disco):
+    python -m vita_model.cube [--dir DIR] [--no-fwd] [--no-card] [--no-ai] [--immediate-hiring]
+"""
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+
+import numpy as np
+
+from .cache import fingerprint
+from .countries import COUNTRIES
+from .curves import data_version
+from .hiring import ROLES
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate
+from .valuation import DCF_YEARS, ValuationInputs, m16_range
+
+# Ejes = sliders del sidebar (mismos rangos y pasos), en orden C del cubo
+CUBE_AXES = {
+    'take_b2b': np.round(np.arange(0.30, 0.551, 0.01), 2),
+    'new_countries': np.arange(0, len(COUNTRIES) + 1),
+    'clients_payins_m16': np.arange(5, 101, 5),
+    'mult_b2c': np.round(np.arange(1.0, 4.01, 0.1), 1),
+    'hc_target': np.arange(58, 81),
+    'mktg_monthly': np.arange(20, 101, 5),
+}
+FIXED_FIELDS = ('hiring_mode', 'fwd_on', 'ai_on', 'card_on', 'fwd_rev', 'card_rev')
+# Ingreso de producto → toggle; se suman al leer el cubo, con la pendiente medida en SLOPE_REF
+REVENUE_FIELDS = {'fwd_rev': 'fwd_on', 'card_rev': 'card_on'}
+SLOPE_REF = {'fwd_rev': ScenarioInputs.fwd_rev, 'card_rev': ScenarioInputs.card_rev}
+
+CUBE_OUTPUTS = ('total_rev_proj', 'margin_proj', 'cash_proj', 'gap', 'valuation_mid')
+# Columnas guardadas: outputs con ingresos en 0 (gastos en vez de margen) + pendientes por producto
+CUBE_BASE = ('total_rev_proj', 'total_gastos_proj', 'cash_proj', 'gap', 'valuation_mid')
+CUBE_SLOPES = ('cash_proj', 'valuation_mid')
+CUBE_FIELDS = CUBE_BASE + tuple(f'{k}/{rev}' for k in CUBE_SLOPES for rev in REVENUE_FIELDS)
+CUBE_SHAPE = tuple(len(v) for v in CUBE_AXES.values()) + (len(CUBE_FIELDS),)
+
+CUBE_DIR = Path(os.environ.get('VITA_CUBE_DIR', Path(__file__).resolve().parent.parent / 'cube'))
+HORIZON = 16 + 12 * DCF_YEARS
+
+# Escenarios por bloque al construir (proyección M4→M76 completa por escenario)
+BUILD_CHUNK = 1 << 12
+
+
+def model_version():
+    """Fingerprint del código del modelo (los .py de vita_model): cambia con cualquier cambio de fórmulas."""
+    files = sorted(Path(__file__).resolve().parent.glob('*.py'))
+    return fingerprint(tuple((p.name, p.read_bytes()) for p in files))
+
+
+MODEL_VERSION = model_version()
+
+
+def _fixed(inputs):
+    return {
+        'hiring_mode': bool(inputs.hiring_mode),
+        'fwd_on': bool(inputs.fwd_on),
+        'ai_on': bool(inputs.ai_on),
+        'card_on': bool(inputs.card_on),
+    }
+
+
+def _revenues(inputs):
+    # Forwards/Card apagados: el ingreso del slider no cuenta (la app pasa 0)
+    return {rev: np.where(getattr(inputs, on), np.asarray(getattr(inputs, rev), dtype=float), 0.0)
+            for rev, on in REVENUE_FIELDS.items()}
+
+
+def cube_key(inputs, assumptions=DEFAULT_ASSUMPTIONS):
+    """Fingerprint de lo que el cubo deja fijo: toggles, Assumptions, roles del plan, países, DATA y código
+    del modelo."""
+    return fingerprint((sorted(_fixed(inputs).items()), assumptions, ROLES, COUNTRIES, data_version(), MODEL_VERSION))
+
+
+def cube_path(inputs, assumptions=DEFAULT_ASSUMPTIONS, directory=CUBE_DIR):
+    return Path(directory) / f'scenario_cube_{cube_key(inputs, assumptions)}.npy'
+
+
+def scenario_outputs(values):
+    """Outputs del cubo desde un dict de evaluate() (o un ScenarioResult) con trayectoria ≥ M64."""
+    get = values.get if isinstance(values, dict) else (lambda k: getattr(values, k))
+    proj = get('trajectory')
+    years = proj.annual(16, DCF_YEARS)
+    low, high = m16_range(ValuationInputs(
+        rev_m16=get('total_rev_proj'), gastos_m16=get('total_gastos_proj'), gtv_m16=get('gtv_m16'),
+        multiple=get('multiple'), years_revenue=years['revenue'], years_net=years['net'],
+        rev_exit_monthly=proj.revenue[..., proj.index(16 + 48)],
+    ))
+    out = {k: get(k) for k in CUBE_OUTPUTS[:-1]}
+    out['valuation_mid'] = (low + high) / 2
+    return out
+
+
+def cube_rows(cols, base=None, assumptions=DEFAULT_ASSUMPTIONS):
+    """Columnas CUBE_FIELDS de los escenarios cols (sliders como arrays) → (n, len(CUBE_FIELDS)).
+
+    Una pasada con los ingresos en 0 y una por producto encendido en
+    SLOPE_REF para la pendiente (producto apagado: pendiente 0).
+    """
+    base = base if base is not None else ScenarioInputs()
+    inp = ScenarioInputs(**cols, **_fixed(base), **dict.fromkeys(REVENUE_FIELDS, 0.0))
+    values = evaluate(inp, assumptions, horizon=HORIZON)
+    zero = scenario_outputs(values)
+    zero['total_gastos_proj'] = values['total_gastos_proj']
+    out = [np.broadcast_to(np.asarray(zero[k], dtype=float), np.shape(zero['gap'])) for k in CUBE_BASE]
+    slopes = {}
+    for rev, on in REVENUE_FIELDS.items():
+        if getattr(base, on):
+            ref = scenario_outputs(evaluate(replace(inp, **{rev: SLOPE_REF[rev]}), assumptions, horizon=HORIZON))
+            slopes.update({f'{k}/{rev}': (ref[k] - zero[k]) / SLOPE_REF[rev] for k in CUBE_SLOPES})
+    out += [slopes.get(f'{k}/{rev}', np.zeros_like(out[0])) for k in CUBE_SLOPES for rev in REVENUE_FIELDS]
+    return np.column_stack(out)
+
+
+def cube_outputs(rows, inputs, assumptions=DEFAULT_ASSUMPTIONS):
+    """CUBE_OUTPUTS desde filas del cubo (..., len(CUBE_FIELDS)) con los ingresos Forwards/Card de inputs."""
+    rows = np.asarray(rows, dtype=float)
+    col = {k: rows[..., i] for i, k in enumerate(CUBE_FIELDS)}
+    revenues = _revenues(inputs)
+    extra = sum(revenues.values())
+    delta = {k: sum(col[f'{k}/{rev}'] * x for rev, x in revenues.items()) for k in CUBE_SLOPES}
+    rev = col['total_rev_proj'] + extra
+    gastos = col['total_gastos_proj'] + assumptions.tax_rate * extra
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin = np.where(rev > 0, (rev - gastos) / rev * 100, 0)
+    return {
+        'total_rev_proj': rev,
+        'margin_proj': margin,
+        'cash_proj': col['cash_proj'] + delta['cash_proj'],
+        'gap': col['gap'] - delta['cash_proj'],
+        'valuation_mid': col['valuation_mid'] + delta['valuation_mid'],
+    }
+
+
+def build_cube(base=None, assumptions=DEFAULT_ASSUMPTIONS, directory=CUBE_DIR, chunk_size=BUILD_CHUNK,
+               progress=None):
+    """Calcula el cubo de la configuración de toggles de base y lo escribe a disco.
+
+    Escribe a un archivo temporal y lo renombra al terminar, así una app
+    leyendo el cubo anterior nunca ve uno a medio escribir. Devuelve el path.
+    """
+    base = base if base is not None else ScenarioInputs()
+    path = cube_path(base, assumptions, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.npy')
+    cube = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=CUBE_SHAPE)
+    flat = cube.reshape(-1, len(CUBE_FIELDS))
+    grid_shape = CUBE_SHAPE[:-1]
+    n = flat.shape[0]
+    fixed = _fixed(base)
+    t0 = time.perf_counter()
+    for start in range(0, n, chunk_size):
+        idx = np.unravel_index(np.arange(start, min(start + chunk_size, n)), grid_shape)
+        cols = {k: axis[i] for (k, axis), i in zip(CUBE_AXES.items(), idx)}
+        flat[start:start + len(idx[0])] = cube_rows(cols, base, assumptions)
+        if progress is not None:
+            progress(min(start + chunk_size, n), n, time.perf_counter() - t0)
+    cube.flush()
+    del cube, flat
+    os.replace(tmp, path)
+    path.with_suffix('.json').write_text(json.dumps({
+        'axes': {k: v.tolist() for k, v in CUBE_AXES.items()},
+        'fields': list(CUBE_FIELDS),
+        'fixed': fixed,
+        'slope_ref': SLOPE_REF,
+        'assumptions': {k: list(v) if isinstance(v, tuple) else v for k, v in asdict(assumptions).items()},
+        'data_version': data_version(),
+        'model_version': MODEL_VERSION,
+        'built_s': round(time.perf_counter() - t0, 1),
+    }, indent=2))
+    return path
+
+
+class ScenarioCube:
+    """Lectura O(1) del cubo de una configuración de toggles (memmap de sólo lectura)."""
+
+    def __init__(self, path, assumptions=DEFAULT_ASSUMPTIONS):
+        self.path = Path(path)
+        self.assumptions = assumptions
+        self.data = np.load(self.path, mmap_mode='r')
+        if self.data.shape != CUBE_SHAPE:
+            raise ValueError(f"{self.path.name}: forma {self.data.shape}, se esperaba {CUBE_SHAPE}")
+
+    def index(self, inputs):
+        """Índices de grilla de los sliders, o None si algún valor no está en la grilla."""
+        idx = []
+        for k, axis in CUBE_AXES.items():
+            v = getattr(inputs, k)
+            i = int(np.searchsorted(axis, v - 1e-9))
+            if i >= len(axis) or abs(axis[i] - v) > 1e-9:
+                return None
+            idx.append(i)
+        return tuple(idx)
+
+    def outputs(self, rows, inputs):
+        """CUBE_OUTPUTS de filas leídas del cubo, con los ingresos Forwards/Card de inputs."""
+        return cube_outputs(rows, inputs, self.assumptions)
+
+    def lookup(self, inputs):
+        idx = self.index(inputs)
+        if idx is None:
+            return None
+        return {k: float(v) for k, v in self.outputs(self.data[idx], inputs).items()}
+
+
+class CubeStore:
+    """Cubos disponibles en un directorio, abiertos bajo demanda por configuración."""
+
+    def __init__(self, directory=CUBE_DIR, assumptions=DEFAULT_ASSUMPTIONS):
+        self.directory = Path(directory)
+        self.assumptions = assumptions
+        self._cubes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cube(self, inputs, assumptions=None):
+        # Sólo se memoizan los cubos que existen: uno construido con la app corriendo se toma en el próximo lookup
+        assumptions = assumptions if assumptions is not None else self.assumptions
+        path = cube_path(inputs, assumptions, self.directory)
+        if path not in self._cubes and path.exists():
+            self._cubes[path] = ScenarioCube(path, assumptions)
+        return self._cubes.get(path)
+
+    def lookup(self, inputs, assumptions=None):
+        """Outputs precalculados o None (sin cubo para esta configuración o sliders fuera de grilla)."""
+        cube = self.cube(inputs, assumptions)
+        out = cube.lookup(inputs) if cube is not None else None
+        if out is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return out
+
+
+def lookup_scenario(inputs, assumptions=DEFAULT_ASSUMPTIONS, store=None):
+    """Outputs clave del escenario: del cubo si está precalculado, si no en vivo → (dict, fuente)."""
+    store = store if store is not None else CubeStore(assumptions=assumptions)
+    out = store.lookup(inputs, assumptions)
+    if out is not None:
+        return out, 'cube'
+    values = evaluate(inputs, assumptions, horizon=HORIZON)
+    return {k: float(v) for k, v in scenario_outputs(values).items()}, 'live'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el cubo de escenarios precalculado (float32, memmap).")
+    parser.add_argument('--dir', default=str(CUBE_DIR), help="directorio de salida (default: %(default)s)")
+    parser.add_argument('--no-fwd', action='store_true', help="Forwards FX apagado")
+    parser.add_argument('--no-card', action='store_true', help="Vita Card apagada")
+    parser.add_argument('--no-ai', action='store_true', help="AI Sales Agent apagado")
+    parser.add_argument('--immediate-hiring', action='store_true', help="contratación inmediata (no gradual)")
+    args = parser.parse_args(argv)
+
+    base = replace(ScenarioInputs(), fwd_on=not args.no_fwd, card_on=not args.no_card, ai_on=not args.no_ai,
+                   hiring_mode=not args.immediate_hiring)
+
+    def progress(done, total, elapsed):
+        if done == total or done % (BUILD_CHUNK * 256) == 0:
+            print(f"  {done:>11,}/{total:,} escenarios · {elapsed:.0f}s", flush=True)
+
+    print(f"Cubo {CUBE_SHAPE} float32 ({np.prod(CUBE_SHAPE) * 4 / 1e6:.0f} MB) · {_fixed(base)}")
+    path = build_cube(base, directory=args.dir, progress=progress)
+    print(f"OK → {path}")
+
+
+if __name__ == '__main__':
+    main()
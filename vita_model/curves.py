@@ -0,0 +1,128 @@
+"""Familias de curva para la rampa M4 → M16 por línea de negocio.
+
+Cada curva lleva el progreso f = (mes − 4) / 12 ∈ (0, 1] a la fracción del
+camino M4 → M16 recorrida. ramp_curves() evalúa todas las líneas y meses
+en una sola llamada → array (líneas, meses), en el orden de
+projection.REVENUE_LINES.
+
+Familias:
+  logistic     curva S 1/(1+e^(−8(f−0.4))) (la de siempre, default)
+  gompertz     S asimétrica: arranque lento y aproximación larga a M16
+  linear       mismo incremento cada mes
+  exponential  concentrada al final (e^(3f)−1)/(e^3−1)
+  fitted       logística ajustada a la historia M1-M4 de la línea
+
+El ajuste es una búsqueda en grilla vectorizada sobre (k, f0) de la forma
+normalizada de la historia; se cachea por versión del dataset
+(fingerprint de DATA), así corre una vez por carga de datos. Las líneas
+sin historia o que no crecieron en M1→M4 usan la logística default.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .cache import fingerprint
+from .data import DATA
+
+CURVE_FAMILIES = ('logistic', 'gompertz', 'linear', 'exponential', 'fitted')
+
+CURVE_LABELS = {
+    'logistic': 'Logística (S)',
+    'gompertz': 'Gompertz',
+    'linear': 'Lineal',
+    'exponential': 'Exponencial',
+    'fitted': 'Ajustada a M1-M4',
+}
+
+# Línea de negocio → serie histórica en DATA (None = producto nuevo, sin historia)
+LINE_HISTORY = {
+    'rev_b2b': 'rev_payouts_b2b',
+    'rev_b2c': 'rev_payouts_b2c',
+    'rev_ex': 'rev_exchange',
+    'rev_pi': 'rev_payins_b2b',
+    'rev_fwd': None,
+    'rev_card': None,
+}
+LINES = tuple(LINE_HISTORY)
+
+LOGISTIC_K, LOGISTIC_F0 = 8.0, 0.4
+FIT_K = np.linspace(1, 20, 96)
+FIT_F0 = np.linspace(-0.5, 1.5, 101)
+
+
+def logistic(f, k=LOGISTIC_K, f0=LOGISTIC_F0):
+    return 1 / (1 + np.exp(-k * (f - f0)))
+
+
+def gompertz(f, b=4.0, c=6.0):
+    return np.exp(-b * np.exp(-c * f))
+
+
+def linear(f):
+    return np.asarray(f, dtype=float)
+
+
+def exponential(f, k=3.0):
+    return np.expm1(k * np.asarray(f, dtype=float)) / np.expm1(k)
+
+
+def _normalized_logistic(f, k, f0):
+    # Logística reescalada para pasar por (0, 0) y (1, 1); k y f0 hacen broadcasting con f
+    s0, s1 = logistic(0.0, k, f0), logistic(1.0, k, f0)
+    return (logistic(f, k, f0) - s0) / (s1 - s0)
+
+
+def data_version():
+    """Fingerprint del dataset: cambia si cambia cualquier serie de DATA."""
+    return fingerprint(sorted(DATA.items()))
+
+
+@lru_cache(maxsize=4)
+def fit_history(version):
+    """Logística ajustada por línea a su historia M1-M4 → {línea: dict(k, f0, r2, fallback)}.
+
+    version sólo es la clave del caché (ver data_version()); el ajuste lee
+    DATA. Grilla FIT_K × FIT_F0 × meses en una sola pasada NumPy.
+    """
+    k = FIT_K[:, None, None]
+    f0 = FIT_F0[None, :, None]
+    fits = {}
+    for line, series in LINE_HISTORY.items():
+        x = np.asarray(DATA[series], dtype=float) if series else np.zeros(0)
+        if len(x) < 3 or x[-1] <= x[0] or (x > 0).sum() < 2:
+            fits[line] = {'k': LOGISTIC_K, 'f0': LOGISTIC_F0, 'r2': None, 'fallback': True}
+            continue
+        t = np.linspace(0, 1, len(x))
+        y = (x - x[0]) / (x[-1] - x[0])
+        sse = ((_normalized_logistic(t, k, f0) - y) ** 2).sum(axis=-1)
+        i, j = np.unravel_index(np.argmin(sse), sse.shape)
+        sst = ((y - y.mean()) ** 2).sum()
+        fits[line] = {'k': float(FIT_K[i]), 'f0': float(FIT_F0[j]),
+                      'r2': float(1 - sse[i, j] / sst) if sst > 0 else None, 'fallback': False}
+    return fits
+
+
+def ramp_curves(selection=(), months=12):
+    """Fracción de la rampa por línea y mes → array (len(LINES), months).
+
+    selection: pares (línea, familia) o dict; las líneas que no aparecen
+    usan 'logistic'.
+    """
+    selection = dict(selection)
+    unknown = {fam for fam in selection.values() if fam not in CURVE_FAMILIES} | (set(selection) - set(LINES))
+    if unknown:
+        raise ValueError(f"Curvas desconocidas: {sorted(unknown)}")
+    f = np.arange(1, months + 1) / months
+    family = np.array([CURVE_FAMILIES.index(selection.get(line, 'logistic')) for line in LINES])
+    # Familias fijas: una fila cada una; 'fitted': una fila por línea con sus (k, f0)
+    fixed = np.stack([logistic(f), gompertz(f), linear(f), exponential(f)])
+    out = fixed[np.minimum(family, len(fixed) - 1)]
+    is_fitted = family == CURVE_FAMILIES.index('fitted')
+    if is_fitted.any():
+        fits = fit_history(data_version())
+        k = np.array([fits[line]['k'] for line in LINES])[:, None]
+        f0 = np.array([fits[line]['f0'] for line in LINES])[:, None]
+        fallback = np.array([fits[line]['fallback'] for line in LINES])[:, None]
+        fitted = np.where(fallback, logistic(f), _normalized_logistic(f, k, f0))
+        out = np.where(is_fitted[:, None], fitted, out)
+    return out
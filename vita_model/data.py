@@ -0,0 +1,176 @@
+"""Datos históricos M1-M4 y run-rate BASE del dashboard.
+
+Módulo sin dependencias de Streamlit: lo importan tanto app_1.py como el
+motor de escenarios.
+"""
+import numpy as np
+
+# ══════════════════════════════════════════════════════════════
+# DATA
+# ══════════════════════════════════════════════════════════════
+MESES = ['Mes 1', 'Mes 2', 'Mes 3', 'Mes 4']
+
+DATA = {
+    'revenue': [352978, 381724, 478609, 360467],
+    'gastos': [290432, 290152, 384939, 320474],
+    'cash': [2688667, 2595101, 3085277, 3231872],
+    'headcount': [61, 61, 57, 58],
+    # Revenue por línea (corregido del Excel)
+    'rev_payouts_b2b': [281711, 303602, 389162, 264741],
+    'rev_payouts_b2c': [37080, 38996, 37543, 39851],
+    'rev_exchange': [34187, 39127, 50359, 49232],
+    'rev_payins_b2b': [0, 0, 1546, 6643],
+    # Desglose Exchange B2B/B2C (nuevo)
+    'rev_exchange_b2b': [28728, 32743, 45880, 42976],
+    'rev_exchange_b2c': [5458, 6384, 4479, 6256],
+    # GTV (corregido del Excel)
+    'gtv_payouts_b2b': [40186000, 48461200, 69585000, 47906000],
+    'gtv_payouts_b2c': [2495976, 2893301, 2862897, 3088382],
+    'gtv_payins_b2b': [0, 0, 129426, 485049],
+    'gtv_payouts_total': [42682044, 51354673, 72448634, 50994350],
+    # Volúmenes Exchange (nuevo del Excel)
+    'vol_exchange_ventas_b2b': [37990879, 46551246, 67119333, 47790270],
+    'vol_exchange_compras_b2b': [7955534, 6210183, 3513810, 4708377],
+    'vol_exchange_ventas_b2c': [543235, 690050, 908847, 725178],
+    'vol_exchange_compras_b2c': [1089656, 2147553, 1175741, 1270818],
+    # Take rates (corregido)
+    'take_payouts_b2b': [0.70, 0.63, 0.56, 0.55],
+    'take_payouts_b2c': [1.49, 1.35, 1.31, 1.29],
+    'take_payins_b2b': [0, 0, 1.19, 1.37],
+    # CAC y LTV
+    'cac_b2b': [684, 967, 2646, 999],
+    'cac_b2c': [11.97, 12.23, 20.14, 15.37],
+    'ltv_b2b': [30861, 30807, 39520, 37165],
+    'ltv_b2c': [921, 727, 563, 728],
+    # Churn y otros
+    'churn_b2b': [2.64, -1.30, 1.00, 1.45],
+    'churn_b2c': [1.23, 1.15, 0.92, 1.11],
+    'cogs': [116992, 78264, 130868, 77290],
+    'personal': [94540, 93089, 88344, 106514],
+    'marketing': [14622, 46821, 93867, 56772],
+    'admin': [33401, 26839, 26392, 28806],
+    'tax': [23265, 24522, 29269, 26290],
+    'banking': [5275, 20214, 15938, 17454],
+    'inversiones': [2337, 403, 261, 7348],
+    'tx_rejected': [1387, 2788, 2734, 2245],
+    'b2b_users_est': [323, 342, 353, 396],
+    # Avg GTV per User B2B (del Excel)
+    'avg_gtv_user_b2b': [124415.07, 141699.92, 197126.73, 120974.67],
+}
+
+# Derived
+DATA['op_margin'] = [(r-g)/r*100 for r,g in zip(DATA['revenue'], DATA['gastos'])]
+DATA['gross_margin'] = [(r-c)/r*100 for r,c in zip(DATA['revenue'], DATA['cogs'])]
+DATA['rev_per_emp'] = [r/h for r,h in zip(DATA['revenue'], DATA['headcount'])]
+DATA['mktg_efficiency'] = [r/m for r,m in zip(DATA['revenue'], DATA['marketing'])]
+
+# ARPU B2B Total = (Payouts B2B + Exchange B2B + Payins B2B) / Usuarios B2B
+DATA['arpu_b2b_total'] = [
+    (DATA['rev_payouts_b2b'][i] + DATA['rev_exchange_b2b'][i] + DATA['rev_payins_b2b'][i]) / DATA['b2b_users_est'][i]
+    for i in range(4)
+]
+
+# CAC Payback usa ARPU total B2B, no solo Payouts
+DATA['cac_payback_b2b'] = [c/a if a>0 else 0 for c,a in zip(DATA['cac_b2b'], DATA['arpu_b2b_total'])]
+DATA['eff_take_rate'] = [r/(gb+gc+pi)*100 if (gb+gc+pi)>0 else 0 for r,gb,gc,pi in zip(DATA['revenue'], DATA['gtv_payouts_b2b'], DATA['gtv_payouts_b2c'], DATA['gtv_payins_b2b'])]
+
+# ══════════════════════════════════════════════════════════════
+# BASE = Promedio M1-M4 (run-rate representativo)
+# ══════════════════════════════════════════════════════════════
+BASE = {}
+for key, vals in DATA.items():
+    if isinstance(vals, list) and len(vals) == 4:
+        BASE[key] = sum(vals) / 4
+
+# Excepción: Payins B2B usa M4 (producto nuevo, M1-M2 son $0)
+BASE['rev_payins_b2b'] = DATA['rev_payins_b2b'][3]  # $6,744
+
+# Promedios clave para referencia rápida
+BASE_REVENUE = BASE['revenue']              # ~$393,444
+BASE_GASTOS = BASE['gastos']                # ~$321,499
+BASE_COGS = BASE['cogs']                    # ~$100,854
+BASE_PERSONAL = BASE['personal']            # ~$95,622
+BASE_MARKETING = BASE['marketing']          # ~$53,020
+BASE_ADMIN = BASE['admin']                  # ~$28,860
+BASE_TAX = BASE['tax']                      # ~$25,837
+BASE_BANKING = BASE['banking']              # ~$14,720
+BASE_INVERSIONES = BASE['inversiones']      # ~$2,587
+BASE_HEADCOUNT = BASE['headcount']          # ~59.25
+BASE_OP_MARGIN = (BASE_REVENUE - BASE_GASTOS) / BASE_REVENUE * 100  # ~18.3%
+BASE_GROSS_MARGIN = (BASE_REVENUE - BASE_COGS) / BASE_REVENUE * 100  # ~74.4%
+
+# GTV promedios
+BASE_GTV_B2B = BASE['gtv_payouts_b2b']      # ~$51.5M
+BASE_GTV_B2C = BASE['gtv_payouts_b2c']      # ~$2.4M
+BASE_GTV_PAYINS = BASE['gtv_payins_b2b']    # ~$256K (solo M3-M4)
+
+# ══════════════════════════════════════════════════════════════
+# CLIENTES B2B Y MÉTRICAS POR USUARIO
+# ══════════════════════════════════════════════════════════════
+
+# Usuarios B2B activos por mes (ya existe en DATA como b2b_users_est)
+DATA['users_b2b'] = DATA['b2b_users_est']  # [323, 342, 353, 396]
+
+# avg_gtv_user_b2b ya viene del Excel en DATA, no se recalcula
+
+# Revenue por cliente B2B por línea de negocio
+DATA['rev_per_user_payouts_b2b'] = [
+    DATA['rev_payouts_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
+    for i in range(4)
+]
+DATA['rev_per_user_exchange_b2b'] = [
+    DATA['rev_exchange_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
+    for i in range(4)
+]
+DATA['rev_per_user_payins_b2b'] = [
+    DATA['rev_payins_b2b'][i] / DATA['users_b2b'][i] if DATA['users_b2b'][i] > 0 else 0
+    for i in range(4)
+]
+DATA['rev_per_user_total_b2b'] = [
+    DATA['rev_per_user_payouts_b2b'][i] +
+    DATA['rev_per_user_exchange_b2b'][i] +
+    DATA['rev_per_user_payins_b2b'][i]
+    for i in range(4)
+]
+
+# Take rate efectivo por usuario B2B
+DATA['take_rate_per_user_b2b'] = [
+    (DATA['rev_per_user_total_b2b'][i] / DATA['avg_gtv_user_b2b'][i] * 100)
+    if DATA['avg_gtv_user_b2b'][i] > 0 else 0
+    for i in range(4)
+]
+
+# Promedios para BASE
+BASE['users_b2b'] = sum(DATA['users_b2b']) / 4                              # ~353.5
+BASE['avg_gtv_user_b2b'] = sum(DATA['avg_gtv_user_b2b']) / 4                # ~$146,054
+BASE['rev_per_user_total_b2b'] = sum(DATA['rev_per_user_total_b2b']) / 4
+BASE['rev_per_user_payouts_b2b'] = sum(DATA['rev_per_user_payouts_b2b']) / 4
+BASE['rev_per_user_exchange_b2b'] = sum(DATA['rev_per_user_exchange_b2b']) / 4
+BASE['rev_per_user_payins_b2b'] = sum(DATA['rev_per_user_payins_b2b']) / 4
+BASE['take_rate_per_user_b2b'] = sum(DATA['take_rate_per_user_b2b']) / 4
+BASE['arpu_b2b_total'] = sum(DATA['arpu_b2b_total']) / 4
+
+# Churn promedio B2B - usar los 4 meses (Vita tiene 6 años, M1 no es onboarding)
+# Datos: [2.64%, -1.30%, 1.00%, 1.45%] → promedio = 0.95%
+# M2 negativo (-1.30%) = expansión neta, se incluye como está (no usar abs())
+AVG_CHURN_B2B = sum(DATA['churn_b2b']) / 4 / 100  # promedio M1-M4 como decimal = 0.0095
+# Para cálculos de CLTV, usar valor seguro (mínimo 0.5% para evitar división por cero)
+AVG_CHURN_B2B_SAFE = max(0.005, AVG_CHURN_B2B)  # = 0.0095 (0.95%)
+
+# ARPU B2B — SOLO PAYOUTS (consistente con base de clientes derivada de Payouts)
+# Exchange y Payins son oportunidad de cross-sell, no se incluyen en cálculo base
+BASE_ARPU_PAYOUTS_B2B = np.mean([DATA['rev_payouts_b2b'][i] / DATA['b2b_users_est'][i] for i in range(4)])  # ~$872
+
+# CLTV y MRR B2B — usando ARPU solo Payouts
+BASE_MRR_B2B = BASE['users_b2b'] * BASE_ARPU_PAYOUTS_B2B  # ~$308K
+BASE_CLTV_B2B = BASE_ARPU_PAYOUTS_B2B / AVG_CHURN_B2B_SAFE if AVG_CHURN_B2B_SAFE > 0 else 0  # ~$92K
+BASE_ARR_B2B = BASE_MRR_B2B * 12  # ~$3.7M
+
+# CLTV/CAC ratio y LTV/CAC promedio
+AVG_CAC_B2B = sum(DATA['cac_b2b']) / 4  # ~$1,324
+BASE_LTV_CAC = BASE_CLTV_B2B / AVG_CAC_B2B if AVG_CAC_B2B > 0 else 0  # ~69x
+
+# ARPU total (para referencia de cross-sell upside)
+BASE_ARPU_TOTAL_B2B = BASE['rev_per_user_total_b2b']  # ~$994 (incluye Exchange + Payins)
+CROSS_SELL_UPSIDE = (BASE_ARPU_TOTAL_B2B / BASE_ARPU_PAYOUTS_B2B - 1) * 100  # ~14%
+
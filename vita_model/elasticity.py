@@ -0,0 +1,120 @@
+"""Elasticidad al take rate ajustada a la historia M1-M4.
+
+Antes la respuesta a una rebaja era una sola razón: 18 clientes/mes por
+los 15 bp de la baja 0.70 → 0.55 (clients_per_bp = 18 / 15). Acá se
+ajusta sobre las series de DATA:
+
+  adquisición B2B   altas netas/mes = a + b × (take M1 − take) × 100
+                    (MCO con intercepto; b = clientes/mes por bp de baja y
+                    base_rate = a + b × baja M1→M4, el ritmo con el take M4)
+  GTV por cliente   ln(GTV Payouts B2B / clientes) = c + ε × ln(take B2B)
+  GTV B2C           ln(GTV Payouts B2C) = c + ε × ln(take B2C) (informativa:
+                    el escenario mueve B2C con mult_b2c, no con el take)
+
+Un ajuste con menos de FIT_MIN_N puntos, R² < FIT_MIN_R2 o de signo
+invertido (más precio, más clientes o más volumen) cae al fallback, como
+en curves.fit_history(): la razón 18 / 15 para la adquisición (pendiente
+e intercepto juntos, nunca uno del ajuste y otro fijo) y 0 para la
+elasticidad de GTV. El ajuste se cachea por versión del dataset
+(curves.data_version()), así sólo corre de nuevo si cambia DATA.
+
+take_rate_curve() evalúa el escenario completo sobre toda la grilla del
+slider de una vez (evaluate_batch) y devuelve el take que maximiza el
+revenue M16 y el que maximiza clientes sin bajar el revenue del take de
+referencia (M4).
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .curves import data_version
+from .data import DATA
+
+FIT_MIN_R2 = 0.5
+FIT_MIN_N = 3
+
+# Fallback de la adquisición: 18 clientes/mes con los 15 bp de la baja 0.70 → 0.55
+BASE_RATE = 18
+BASE_DROP_BP = 15
+
+# Series de GTV por producto: (take, GTV, clientes o None)
+GTV_HISTORY = {
+    'payouts_b2b': ('take_payouts_b2b', 'gtv_payouts_b2b', 'b2b_users_est'),
+    'payouts_b2c': ('take_payouts_b2c', 'gtv_payouts_b2c', None),
+}
+
+TAKE_OBJECTIVES = {
+    'revenue': 'Máximo revenue M16',
+    'clients': 'Máximos clientes sin bajar revenue',
+}
+
+
+def _ols(x, y):
+    # Pendiente, intercepto y R² de y = a + b·x
+    X = np.column_stack([np.ones_like(x), x])
+    (a, b), *_ = np.linalg.lstsq(X, y, rcond=None)
+    sst = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - ((y - X @ (a, b)) ** 2).sum() / sst if sst > 0 else None
+    return float(b), float(a), None if r2 is None else float(r2)
+
+
+@lru_cache(maxsize=4)
+def fit_elasticity(version):
+    """Respuesta al take rate ajustada a M1-M4 → dict.
+
+    version sólo es la clave del caché (ver curves.data_version()). Devuelve
+    'acquisition' (clients_per_bp y base_rate usados, pendiente e
+    intercepto del ajuste, r2, fallback, n) y 'gtv' por producto
+    (elasticity, fit, r2, fallback, n).
+    """
+    take = np.array(DATA['take_payouts_b2b'], dtype=float)
+    adds = np.diff(np.array(DATA['b2b_users_est'], dtype=float))
+    drop = (take[0] - take[1:]) * 100
+    slope, intercept, r2 = _ols(drop, adds)
+    fallback = len(adds) < FIT_MIN_N or r2 is None or r2 < FIT_MIN_R2 or slope < 0
+    fits = {'acquisition': {
+        'clients_per_bp': BASE_RATE / BASE_DROP_BP if fallback else slope,
+        'base_rate': BASE_RATE if fallback else intercept + slope * float(drop[-1]),
+        'fit': slope, 'intercept': intercept, 'r2': r2, 'fallback': fallback, 'n': len(adds),
+    }}
+
+    fits['gtv'] = {}
+    for product, (take_key, gtv_key, clients_key) in GTV_HISTORY.items():
+        take = np.array(DATA[take_key], dtype=float)
+        gtv = np.array(DATA[gtv_key], dtype=float)
+        if clients_key is not None:
+            gtv = gtv / np.array(DATA[clients_key], dtype=float)
+        elasticity, _, r2 = _ols(np.log(take), np.log(gtv))
+        fallback = len(take) < FIT_MIN_N or r2 is None or r2 < FIT_MIN_R2 or elasticity > 0
+        fits['gtv'][product] = {'elasticity': 0.0 if fallback else elasticity, 'fit': elasticity, 'r2': r2,
+                                'fallback': fallback, 'n': len(take)}
+    return fits
+
+
+TAKE_FIT = fit_elasticity(data_version())
+
+
+def take_rate_curve(inputs, assumptions, takes=None):
+    """Escenario M16 sobre toda la grilla de take B2B (resto de sliders de inputs).
+
+    Una sola pasada vectorizada: devuelve las curvas total_rev_proj,
+    rev_b2b_proj, clients_payouts y margin_proj por take, y el take óptimo
+    para cada objetivo de TAKE_OBJECTIVES.
+    """
+    from .goal_seek import SLIDER_GRIDS   # goal_seek → batch → scenario, que importa este módulo
+    from .batch import evaluate_batch
+    takes = SLIDER_GRIDS['take_b2b'] if takes is None else np.asarray(takes, dtype=float)
+    params = {k: v for k, v in vars(inputs).items() if k != 'take_b2b'}
+    outputs = ('total_rev_proj', 'rev_b2b_proj', 'clients_payouts', 'margin_proj')
+    curve = evaluate_batch(take_b2b=takes, assumptions=assumptions, outputs=outputs, **params)
+
+    revenue = curve['total_rev_proj']
+    ref = evaluate_batch(take_b2b=assumptions.ref_take_b2b, assumptions=assumptions, outputs=('total_rev_proj',),
+                         **params)['total_rev_proj'][0]
+    keeps_revenue = revenue >= ref
+    best = {
+        'revenue': float(takes[np.argmax(revenue)]),
+        'clients': float(takes[keeps_revenue][np.argmax(curve['clients_payouts'][keeps_revenue])])
+                   if keeps_revenue.any() else float(assumptions.ref_take_b2b),
+    }
+    return {'takes': takes, **curve, 'ref_revenue': float(ref), 'best': best}
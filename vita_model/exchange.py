@@ -0,0 +1,118 @@
+"""Exchange: revenue de spread regresionado sobre los volúmenes operados.
+
+Antes rev_ex_proj = rev_b2b_proj × exchange_ratio (~0.19 constante): el
+Exchange seguía al revenue de Payouts B2B, así una baja de take rate
+también bajaba el Exchange. Acá, por segmento (B2B, B2C) y bucket de
+volumen (ventas, compras de EXCHANGE_SIDES):
+
+  volumen   vol(s, b) = k(s, b) × GTV Payouts(s)          (MCO sin intercepto)
+  revenue   rev(s) = Σ_b spread(s, b) × vol(s, b)          (MCO sin intercepto)
+
+Un ajuste de revenue con R² < FIT_MIN_R2 o con algún spread ≤ 0 se
+reemplaza por el spread promedio del segmento (Σ revenue ÷ Σ volumen) en
+todos sus buckets, como el fallback de vita_model.elasticity. Lo mismo
+con cada ratio de volumen: con R² < FIT_MIN_R2 o ≤ 0 se usa la
+participación histórica del bucket (Σ volumen ÷ Σ GTV del segmento).
+
+La historia es columnar (exchange_history(): un array por columna, una
+fila por segmento y período) y los ajustes acumulan las ecuaciones normales
+por segmento con np.bincount en una sola pasada, así el mismo código sirve
+para los 4 meses de DATA o para cientos de meses / trades diarios. El
+ajuste sobre DATA se cachea por versión del dataset (EXCHANGE_FIT).
+"""
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from .curves import data_version
+from .data import DATA
+from .elasticity import FIT_MIN_R2
+
+EXCHANGE_SEGMENTS = ('b2b', 'b2c')
+EXCHANGE_SIDES = ('ventas', 'compras')
+EXCHANGE_BUCKETS = tuple(f'{side}_{segment}' for segment in EXCHANGE_SEGMENTS for side in EXCHANGE_SIDES)
+
+
+def exchange_history(data=DATA):
+    """Historia en columnas: period, segment (índice en EXCHANGE_SEGMENTS), gtv
+    (GTV Payouts), revenue (revenue Exchange) y volume (filas, EXCHANGE_SIDES)."""
+    n = len(data['rev_exchange_b2b'])
+    return {
+        'period': np.tile(np.arange(1, n + 1), len(EXCHANGE_SEGMENTS)),
+        'segment': np.repeat(np.arange(len(EXCHANGE_SEGMENTS)), n),
+        'gtv': np.concatenate([data[f'gtv_payouts_{s}'] for s in EXCHANGE_SEGMENTS]).astype(float),
+        'revenue': np.concatenate([data[f'rev_exchange_{s}'] for s in EXCHANGE_SEGMENTS]).astype(float),
+        'volume': np.column_stack([
+            np.concatenate([data[f'vol_exchange_{side}_{s}'] for s in EXCHANGE_SEGMENTS])
+            for side in EXCHANGE_SIDES]).astype(float),
+    }
+
+
+def _grouped_lstsq(group, X, y, n_groups):
+    # MCO sin intercepto por grupo: X'X y X'y acumulados con bincount → (beta, r2, n)
+    k = X.shape[1]
+    xtx = np.stack([np.bincount(group, X[:, i] * X[:, j], n_groups)
+                    for i in range(k) for j in range(k)], axis=-1).reshape(n_groups, k, k)
+    xty = np.stack([np.bincount(group, X[:, i] * y, n_groups) for i in range(k)], axis=-1)
+    beta = (np.linalg.pinv(xtx) @ xty[..., None])[..., 0]
+    n = np.bincount(group, minlength=n_groups)
+    y_mean = np.bincount(group, y, n_groups) / np.maximum(n, 1)
+    sst = np.bincount(group, (y - y_mean[group]) ** 2, n_groups)
+    sse = np.bincount(group, (y - (X * beta[group]).sum(axis=1)) ** 2, n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(sst > 0, 1 - sse / sst, np.nan)
+    return beta, r2, n
+
+
+def fit_exchange(history):
+    """Ajusta volumen ~ GTV Payouts y revenue ~ volúmenes por segmento → dict.
+
+    Devuelve arrays (segmentos, lados) 'volume_ratio' (volumen / GTV),
+    'r2_volume', 'volume_fallback' y 'spread' (revenue / volumen, %), y por
+    segmento 'r2_revenue', 'fallback' y 'n', más el tiempo.
+    """
+    t0 = time.perf_counter()
+    group, volume = history['segment'], history['volume']
+    n_groups = len(EXCHANGE_SEGMENTS)
+    fits = [_grouped_lstsq(group, history['gtv'][:, None], volume[:, j], n_groups) for j in range(volume.shape[1])]
+    volume_ratio = np.column_stack([beta[:, 0] for beta, _, _ in fits])
+    r2_volume = np.column_stack([r2 for _, r2, _ in fits])
+    share = (np.column_stack([np.bincount(group, volume[:, j], n_groups) for j in range(volume.shape[1])])
+             / np.bincount(group, history['gtv'], n_groups)[:, None])
+    volume_fallback = ~(r2_volume >= FIT_MIN_R2) | (volume_ratio <= 0)
+    volume_ratio = np.where(volume_fallback, share, volume_ratio)
+
+    spread, r2_revenue, n = _grouped_lstsq(group, volume, history['revenue'], n_groups)
+    pooled = np.bincount(group, history['revenue'], n_groups) / np.bincount(group, volume.sum(axis=1), n_groups)
+    fallback = ~(r2_revenue >= FIT_MIN_R2) | (spread <= 0).any(axis=1)
+    spread = np.where(fallback[:, None], pooled[:, None], spread)
+    return {
+        'volume_ratio': volume_ratio,
+        'r2_volume': r2_volume,
+        'volume_fallback': volume_fallback,
+        'spread': spread * 100,
+        'r2_revenue': r2_revenue,
+        'fallback': fallback,
+        'n': n,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+@lru_cache(maxsize=4)
+def exchange_fit(version):
+    """fit_exchange() sobre la historia de DATA; version sólo es la clave del caché."""
+    return fit_exchange(exchange_history())
+
+
+EXCHANGE_FIT = exchange_fit(data_version())
+
+
+def bucket_volume(gtv, volume_ratios):
+    """Volumen Exchange por bucket (EXCHANGE_BUCKETS) → (..., buckets).
+
+    gtv: (..., segmentos) GTV Payouts; volume_ratios: un valor por bucket,
+    tupla o array (..., buckets) con broadcasting sobre el batch.
+    """
+    gtv = np.repeat(np.asarray(gtv, dtype=float), len(EXCHANGE_SIDES), axis=-1)
+    return gtv * np.asarray(volume_ratios, dtype=float)
@@ -0,0 +1,162 @@
+"""Financiamiento del gap mes a mes: línea de crédito, venture debt y equity.
+
+Sobre la caja proyectada (resultado mensual de la trayectoria menos la
+inversión de crecimiento, repartida en M5..M16) se modela:
+
+  línea de crédito  revolving hasta line_limit: se gira cuando la caja cae
+                    bajo min_cash y se repaga con el excedente; interés
+                    mensual sobre lo girado + comisión sobre lo no usado
+  venture debt      tramos (mes, monto) que se giran sólo si en los
+                    próximos vd_lookahead meses la caja orgánica cae bajo
+                    min_cash por más de lo que queda de línea; comisión de
+                    apertura, vd_interest_only meses sólo interés y luego
+                    amortización lineal en vd_amortization meses
+  equity            lo que falta para sostener min_cash con la deuda al tope
+
+y los covenants mientras hay deuda: caja mínima, deuda ≤ cov_debt_mrr ×
+revenue mensual y resultado operativo ≥ cov_coverage × intereses. La caja
+mínima se mide antes del equity del mes (cash_pre_equity): el equity
+repone min_cash como último recurso, no evita el incumplimiento.
+
+Todo es NumPy sobre (..., meses): net/revenue pueden venir de un batch de
+escenarios y las tasas/límites de FinancingTerms pueden ser arrays, que
+hacen broadcasting con el batch (escenarios × tasas en una pasada). El
+loop es sólo sobre meses (la deuda de un mes depende del anterior).
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .data import DATA
+
+# Ruta de financiamiento (de menor a mayor costo / dilución)
+FINANCING_ROUTES = ('Orgánico', 'Línea de crédito', 'Venture debt', 'Equity')
+
+COVENANTS = {
+    'min_cash': 'Caja mínima',
+    'leverage': 'Deuda / revenue mensual',
+    'coverage': 'Cobertura de intereses',
+}
+
+INVESTMENT_MONTHS = (5, 16)   # la inversión de crecimiento (total_investment) se ejecuta en la rampa
+
+
+@dataclass(frozen=True)
+class FinancingTerms:
+    min_cash: float = 1_000_000       # caja operativa mínima (por debajo se gira deuda)
+    line_limit: float = 2_000_000
+    line_rate: float = 0.14           # tasa anual de la línea
+    line_fee: float = 0.005           # comisión anual sobre lo no girado
+    vd_tranches: tuple = ((9, 1_500_000), (13, 1_500_000))   # (mes, monto): los $2-3M de la Fase 2
+    vd_rate: float = 0.12
+    vd_fee: float = 0.01              # comisión de apertura sobre el tramo girado
+    vd_interest_only: int = 6
+    vd_amortization: int = 24
+    vd_lookahead: int = 12
+    cov_min_cash: float = 500_000
+    cov_debt_mrr: float = 3.0
+    cov_coverage: float = 2.0
+
+
+DEFAULT_TERMS = FinancingTerms()
+
+
+def _investment(total_investment, months):
+    first, last = INVESTMENT_MONTHS
+    ramp = (months >= first) & (months <= last)
+    return np.asarray(total_investment, dtype=float)[..., None] * ramp / (last - first + 1)
+
+
+def financing_schedule(net, revenue, months, total_investment=0.0, terms=DEFAULT_TERMS, cash0=DATA['cash'][3]):
+    """Plan de financiamiento mes a mes.
+
+    net, revenue: (..., meses) de la trayectoria para `months` (desde M5);
+    total_investment: (...). Devuelve un dict con arrays (..., meses) de
+    flujo operativo (net − inversión), caja (y caja antes del equity),
+    saldos y giros de línea y venture debt, intereses, comisiones,
+    amortizaciones, equity y covenants incumplidos, más el resumen:
+    pico de línea, venture debt girado, costo financiero, equity necesario,
+    primer mes con covenant incumplido (0 = ninguno) y ruta (índice de
+    FINANCING_ROUTES).
+    """
+    months = np.asarray(months)
+    net = np.asarray(net, dtype=float)
+    revenue = np.asarray(revenue, dtype=float)
+    flow = net - _investment(total_investment, months)
+    t = {f.name: np.asarray(getattr(terms, f.name), dtype=float) for f in fields(terms) if f.name != 'vd_tranches'}
+    shape = np.broadcast_shapes(flow.shape[:-1], revenue.shape[:-1], *(v.shape for v in t.values()))
+    n = len(months)
+
+    # Caja orgánica (sin deuda) para decidir los tramos de venture debt
+    organic = cash0 + np.cumsum(np.broadcast_to(flow, shape + (n,)), axis=-1)
+    lookahead = int(terms.vd_lookahead)
+    future_min = np.stack([organic[..., i:i + lookahead].min(axis=-1) for i in range(n)], axis=-1)
+
+    tranche_month = np.array([m for m, _ in terms.vd_tranches], dtype=float)
+    tranche_amount = np.array([a for _, a in terms.vd_tranches], dtype=float)
+    drawn = np.zeros(shape + (len(tranche_month),))
+
+    out = {k: np.zeros(shape + (n,)) for k in
+           ('cash', 'cash_pre_equity', 'line', 'vd', 'line_draw', 'vd_draw', 'interest', 'fees', 'principal',
+            'equity')}
+    cash, line, vd = np.full(shape, float(cash0)), np.zeros(shape), np.zeros(shape)
+    io, amort = int(terms.vd_interest_only), int(terms.vd_amortization)
+    for i, m in enumerate(months):
+        interest = (line * t['line_rate'] + vd * t['vd_rate']) / 12
+        fees = (t['line_limit'] - line) * t['line_fee'] / 12
+        age = m - tranche_month
+        principal = np.minimum((drawn * ((age > io) & (age <= io + amort)) / amort).sum(axis=-1), vd)
+        cash = cash + flow[..., i] - interest - fees - principal
+        vd = vd - principal
+
+        # Tramo de venture debt: sólo si la línea no alcanza para el bache que viene
+        shortfall = t['min_cash'] - (cash + future_min[..., i] - organic[..., i])
+        draw_now = (tranche_month == m) & (shortfall > t['line_limit'] - line)[..., None]
+        vd_draw = (draw_now * tranche_amount).sum(axis=-1)
+        drawn = drawn + draw_now * tranche_amount
+        vd_fee = vd_draw * t['vd_fee']
+        cash, vd, fees = cash + vd_draw - vd_fee, vd + vd_draw, fees + vd_fee
+
+        # Línea: gira hasta min_cash (tope line_limit) o repaga con el excedente
+        line_draw = np.clip(t['min_cash'] - cash, -line, t['line_limit'] - line)
+        cash, line = cash + line_draw, line + line_draw
+        cash_pre_equity = cash
+        equity = np.maximum(t['min_cash'] - cash, 0)
+        cash = cash + equity
+
+        for k, v in (('cash', cash), ('cash_pre_equity', cash_pre_equity), ('line', line), ('vd', vd), ('line_draw', line_draw), ('vd_draw', vd_draw),
+                     ('interest', interest), ('fees', fees), ('principal', principal), ('equity', equity)):
+            out[k][..., i] = v
+
+    debt = out['line'] + out['vd']
+    has_debt = debt > 0
+    covenants = {
+        'min_cash': has_debt & (out['cash_pre_equity'] < t['cov_min_cash'][..., None]),
+        'leverage': has_debt & (debt > t['cov_debt_mrr'][..., None] * revenue),
+        'coverage': (out['interest'] > 0) & (net < t['cov_coverage'][..., None] * out['interest']),
+    }
+    breach = np.any(np.stack(list(covenants.values())), axis=0)
+    equity = out['equity'].sum(axis=-1)
+    vd_drawn = out['vd_draw'].sum(axis=-1)
+    peak_line = out['line'].max(axis=-1)
+    route = np.select([equity > 0, vd_drawn > 0, peak_line > 0], [3, 2, 1], 0)
+    return dict(
+        out,
+        months=months,
+        flow=np.broadcast_to(flow, shape + (n,)),
+        debt=debt,
+        covenants=covenants,
+        peak_line=peak_line,
+        vd_drawn=vd_drawn,
+        financing_cost=(out['interest'] + out['fees']).sum(axis=-1),
+        equity_needed=equity,
+        first_breach=np.where(breach.any(axis=-1), months[np.argmax(breach, axis=-1)], 0),
+        route=route,
+    )
+
+
+def scenario_financing(values, terms=DEFAULT_TERMS, last_month=24):
+    """financing_schedule() sobre la trayectoria M5..M{last_month} de un escenario (o batch)."""
+    get = values.get if isinstance(values, dict) else (lambda k: getattr(values, k))
+    proj = get('trajectory').window(last_month, 5)
+    return financing_schedule(proj.net, proj.revenue, proj.months, get('total_investment'), terms)
@@ -0,0 +1,158 @@
+"""Libro de forwards FX: contratos, spread, cobertura back-to-back y stress.
+
+El revenue de Forwards era un slider (fwd_rev, 15K–80K) con un costo fijo
+de fwd_cost. Acá el libro se arma desde la cartera B2B del escenario:
+
+  coberturistas   adoption × clientes B2B del mes, con rampa lineal desde el
+                  lanzamiento (M5) hasta M16
+  contratos       Poisson(contracts_per_client) por coberturista y mes;
+                  nocional lognormal alrededor de hedge_ratio × GTV mensual
+                  por cliente ÷ contracts_per_client, plazo uniforme
+                  tenor_days, spread uniforme spread_range y sentido
+                  (compra / venta de USD) con buy_share
+  revenue         nocional × spread, al cerrar el contrato
+  cobertura       back-to-back con el banco: bank_spread × nocional más el
+                  fondeo del margen que el banco pide por sobre el del
+                  cliente (bank_margin − client_margin) durante el plazo
+  stress          con el libro abierto al cierre de M16, un shock FX
+                  relativo s deja al cliente con pérdida max(0, −sentido × s)
+                  × nocional; lo que excede su margen inicial lo adelanta
+                  Vita al banco (necesidad de margen) y una fracción
+                  walk_away no se recupera (pérdida de crédito)
+
+simulate_forwards() genera n_paths libros a la vez (arrays planos de
+contratos) y evalúa el stress sobre la grilla FX_SHOCKS y sobre
+n_scenarios shocks aleatorios (volatilidad fx_vol escalada al plazo
+remanente de cada contrato) como una matriz contratos × escenarios, por
+bloques de escenarios para acotar la memoria.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+FWD_MONTHS = np.arange(5, 17)   # M5..M16: lanzamiento → fin de la rampa
+FWD_PATHS = 50
+FWD_SCENARIOS = 500
+FX_SHOCKS = (-0.20, -0.10, -0.05, 0.05, 0.10, 0.20)   # shock FX relativo instantáneo sobre el libro abierto
+DAYS_PER_MONTH = 30
+NOTIONAL_SIGMA = 1.1    # dispersión lognormal del nocional (como el GTV por cliente)
+CHUNK_SCENARIOS = 256   # escenarios por bloque de la matriz contratos × escenarios
+
+
+@dataclass(frozen=True)
+class ForwardTerms:
+    adoption: float = 0.20             # clientes B2B que cubren en M16
+    hedge_ratio: float = 0.40          # parte del GTV mensual del coberturista que se fija a plazo
+    contracts_per_client: float = 2.0  # contratos por coberturista y mes
+    tenor_days: tuple = (30, 180)
+    spread_range: tuple = (0.15, 0.25)   # % sobre nocional (spot + puntos forward)
+    buy_share: float = 0.6             # contratos de compra de USD (importadores)
+    bank_spread: float = 0.05          # % sobre nocional del back-to-back con el banco
+    client_margin: float = 0.05        # margen inicial que deja el cliente (fracción del nocional)
+    bank_margin: float = 0.05          # margen inicial que pide el banco
+    funding_rate: float = 0.12         # costo anual de fondear margen propio
+    fx_vol: float = 0.12               # volatilidad anual del tipo de cambio
+    walk_away: float = 0.10            # fracción de la pérdida del cliente sobre su margen que no se recupera
+
+
+DEFAULT_FWD_TERMS = ForwardTerms()
+
+
+def _path_sums(values, path, n_paths):
+    # Suma por libro de (contratos, k) con los contratos ordenados por libro → (n_paths, k)
+    out = np.zeros((n_paths, values.shape[1]))
+    if len(path):
+        starts = np.flatnonzero(np.r_[True, path[1:] != path[:-1]])
+        out[path[starts]] = np.add.reduceat(values, starts, axis=0)
+    return out
+
+
+def _exposure(notional, side, shock, client_margin):
+    # Pérdida del cliente por sobre su margen: (contratos, escenarios)
+    return notional[:, None] * np.maximum(-side[:, None] * shock - client_margin, 0)
+
+
+def simulate_forwards(clients, gtv_per_client, terms=DEFAULT_FWD_TERMS, months=FWD_MONTHS, n_paths=FWD_PATHS,
+                      n_scenarios=FWD_SCENARIOS, seed=0):
+    """Simula n_paths libros de forwards M5..M16 y su stress al cierre de M16.
+
+    clients: clientes B2B por mes de `months`; gtv_per_client: GTV Payouts
+    mensual promedio por cliente. Devuelve un dict con arrays (n_paths,
+    meses) de contratos, nocional, revenue, costo de cobertura y neto; el
+    libro abierto en M16 por camino (contratos, nocional); el stress sobre
+    FX_SHOCKS (n_paths, shocks) de necesidad de margen y pérdida de
+    crédito; la pérdida de crédito de los n_scenarios shocks aleatorios
+    (n_paths, n_scenarios); cantidad de contratos y tiempo.
+    """
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    months = np.asarray(months)
+    n_months = len(months)
+    ramp = (months - months[0] + 1) / n_months
+    hedgers = terms.adoption * np.asarray(clients, dtype=float) * ramp
+
+    # Contratos planos, ordenados por (libro, mes)
+    counts = rng.poisson(hedgers * terms.contracts_per_client, size=(n_paths, n_months))
+    cell = np.repeat(np.arange(n_paths * n_months), counts.ravel())
+    path, month = np.divmod(cell, n_months)
+    n = len(cell)
+    mean_notional = terms.hedge_ratio * gtv_per_client / terms.contracts_per_client
+    notional = rng.lognormal(-NOTIONAL_SIGMA ** 2 / 2, NOTIONAL_SIGMA, n) * mean_notional
+    lo, hi = terms.tenor_days
+    tenor = rng.integers(lo, hi + 1, n)
+    spread = rng.uniform(*terms.spread_range, n) / 100
+    side = np.where(rng.random(n) < terms.buy_share, 1.0, -1.0)
+
+    funding = max(terms.bank_margin - terms.client_margin, 0) * terms.funding_rate * tenor / 365
+    by_cell = np.stack([notional, notional * spread, notional * (terms.bank_spread / 100 + funding)], axis=-1)
+    sums = np.stack([np.bincount(cell, by_cell[:, k], n_paths * n_months) for k in range(3)], axis=-1)
+    sums = sums.reshape(n_paths, n_months, 3)
+    revenue, cost = sums[..., 1], sums[..., 2]
+
+    # Libro abierto al cierre del último mes: vencimiento posterior al día n_months × 30
+    booked = month * DAYS_PER_MONTH + rng.integers(0, DAYS_PER_MONTH, n)
+    remaining = booked + tenor - n_months * DAYS_PER_MONTH
+    open_ = remaining > 0
+    o_path, o_notional, o_side = path[open_], notional[open_], side[open_]
+    o_years = remaining[open_] / 365
+
+    stress_shocks = np.array(FX_SHOCKS)
+    margin_need = _path_sums(_exposure(o_notional, o_side, stress_shocks, terms.client_margin), o_path, n_paths)
+
+    # Shocks aleatorios: un z por escenario (común a todo el libro), escalado al plazo remanente
+    z = rng.standard_normal(n_scenarios)
+    scale = terms.fx_vol * np.sqrt(o_years)
+    random_loss = np.empty((n_paths, n_scenarios))
+    for start in range(0, n_scenarios, CHUNK_SCENARIOS):
+        block = slice(start, start + CHUNK_SCENARIOS)
+        shock = (scale[:, None] * z[None, block]).astype(np.float32)
+        random_loss[:, block] = _path_sums(
+            _exposure(o_notional.astype(np.float32), o_side.astype(np.float32), shock, terms.client_margin),
+            o_path, n_paths) * terms.walk_away
+
+    return {
+        'months': months,
+        'contracts': counts,
+        'notional': sums[..., 0],
+        'revenue': revenue,
+        'hedge_cost': cost,
+        'net': revenue - cost,
+        'open_contracts': np.bincount(o_path, minlength=n_paths),
+        'open_notional': np.bincount(o_path, o_notional, n_paths),
+        'shocks': stress_shocks,
+        'margin_need': margin_need,
+        'credit_loss': margin_need * terms.walk_away,
+        'random_loss': random_loss,
+        'n_contracts': n,
+        'n_open': len(o_path),
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def scenario_forwards(result, terms=DEFAULT_FWD_TERMS, **kwargs):
+    """simulate_forwards() con la cartera B2B de un escenario (ScenarioResult con trayectoria a M16)."""
+    proj = result.trajectory
+    clients = proj.clients_b2b[..., proj.index(int(FWD_MONTHS[0])):proj.index(int(FWD_MONTHS[-1])) + 1]
+    gtv_per_client = result.gtv_b2b_m16 / result.clients_payouts if result.clients_payouts > 0 else 0.0
+    return simulate_forwards(clients, gtv_per_client, terms, **kwargs)
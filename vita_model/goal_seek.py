@@ -0,0 +1,145 @@
+"""Goal-seek del Scenario Builder.
+
+Busca la combinación más barata de sliders libres que cumple las metas
+(múltiplo ≥ 3×, margen ≥ 30%, gap ≤ 0). La búsqueda es una grilla
+vectorizada sobre los mismos pasos de los sliders: si la grilla completa
+supera max_points se evalúa una grilla gruesa y luego se refina a
+resolución completa alrededor de las GOAL_SEEK_REFINE mejores celdas,
+siempre en batch. El batch corre por bloques y se corta al pasar el
+presupuesto de tiempo (budget_ms), quedándose con lo ya evaluado.
+"""
+import time
+
+import numpy as np
+
+from .batch import evaluate_batch
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs
+
+# Valores alcanzables con los sliders del sidebar (mismos rangos y pasos)
+SLIDER_GRIDS = {
+    'take_b2b': np.round(np.arange(0.30, 0.551, 0.01), 2),
+    'mktg_monthly': np.arange(20, 101, 5),
+    'hc_target': np.arange(58, 81, 1),
+    'clients_payins_m16': np.arange(5, 101, 5),
+}
+
+# session_state de cada slider del sidebar (para "Aplicar al sidebar")
+SLIDER_KEYS = {
+    'take_b2b': 'sb_tr_b2b',
+    'mktg_monthly': 'sb_mktg',
+    'hc_target': 'sb_hc',
+    'clients_payins_m16': 'sb_cli_pi',
+    'new_countries': 'sb_countries',
+    'mult_b2c': 'sb_b2c',
+}
+
+# "Meta 3×" de clientes B2B M16 / M4: la misma que marca el badge del sidebar
+META_MULT_TOTAL = 3.0
+
+# métrica → (sentido, umbral por defecto). multiple es revenue M16 / base.
+GOAL_TARGETS = {
+    'mult_total': ('>=', META_MULT_TOTAL),
+    'multiple': ('>=', 3.0),
+    'margin_proj': ('>=', 30.0),
+    'gap': ('<=', 0.0),
+}
+
+GOAL_SEEK_MAX_POINTS = 20_000   # grilla gruesa: ~40 ms de evaluate_batch
+GOAL_SEEK_REFINE = 8            # mejores celdas gruesas que se refinan
+GOAL_SEEK_BUDGET_MS = 200
+GOAL_SEEK_CHUNK = 1 << 13       # filas por bloque entre chequeos del presupuesto
+
+
+def _violation(values, targets):
+    # Incumplimiento total normalizado (0 = cumple todas las metas)
+    total = 0
+    for metric, threshold in targets.items():
+        sense = GOAL_TARGETS[metric][0]
+        scale = max(abs(threshold), 1.0) if metric != 'gap' else 1e6
+        diff = (threshold - values[metric]) if sense == '>=' else (values[metric] - threshold)
+        total = total + np.maximum(diff, 0) / scale
+    return total
+
+
+def _evaluate_points(inp, cols, assumptions, deadline):
+    # evaluate_batch por bloques hasta agotar los puntos o pasar el deadline (al menos un bloque)
+    n = len(next(iter(cols.values())))
+    parts = []
+    for start in range(0, n, GOAL_SEEK_CHUNK):
+        block = {k: c[start:start + GOAL_SEEK_CHUNK] for k, c in cols.items()}
+        params = {k: block.get(k, getattr(inp, k)) for k in
+                  ('take_b2b', 'new_countries', 'clients_payins_m16', 'mult_b2c', 'hc_target', 'mktg_monthly',
+                   'fwd_rev', 'card_rev', 'hiring_mode', 'fwd_on', 'ai_on', 'card_on')}
+        parts.append(evaluate_batch(**params, assumptions=assumptions,
+                                    outputs=tuple(GOAL_TARGETS) + ('total_investment', 'mktg_12m')))
+        if time.perf_counter() > deadline:
+            break
+    values = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    m = len(values['gap'])
+    return {k: c[:m] for k, c in cols.items()}, values, m < n
+
+
+def _rank(values, targets):
+    # Orden de preferencia: primero por incumplimiento (0 = factible), luego por costo
+    violation = _violation(values, targets)
+    cost = values['total_investment'] + values['mktg_12m']
+    return np.lexsort((cost, violation)), violation, cost
+
+
+def goal_seek(inputs=None, targets=None, free=tuple(SLIDER_GRIDS), assumptions=DEFAULT_ASSUMPTIONS,
+              max_points=GOAL_SEEK_MAX_POINTS, budget_ms=GOAL_SEEK_BUDGET_MS):
+    """Combinación más barata de sliders libres que cumple las metas.
+
+    Costo = inversión del plan (CAC + infraestructura + hires) + 12 meses de
+    marketing. Los sliders no libres quedan en su valor actual. Si ninguna
+    combinación cumple, devuelve la que menos incumple (feasible=False).
+    Con la grilla gruesa o el presupuesto de tiempo agotado
+    (exhaustive=False) el óptimo es el mejor de lo evaluado.
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + budget_ms / 1000
+    inp = inputs if inputs is not None else ScenarioInputs()
+    if targets is None:
+        targets = {k: GOAL_TARGETS[k][1] for k in ('mult_total', 'margin_proj', 'gap')}
+    free = [k for k in SLIDER_GRIDS if k in free]
+    if not free:
+        raise ValueError("goal_seek necesita al menos una variable libre")
+    grids = {k: SLIDER_GRIDS[k] for k in free}
+    shape = tuple(len(g) for g in grids.values())
+
+    # Grilla gruesa si la completa excede max_points (índices en la grilla completa)
+    stride = 1
+    while np.prod([len(range(0, n, stride)) for n in shape]) > max_points:
+        stride += 1
+    index = np.stack([m.ravel() for m in np.meshgrid(*(np.arange(0, n, stride) for n in shape), indexing='ij')])
+    cols, values, cut = _evaluate_points(inp, {k: g[i] for (k, g), i in zip(grids.items(), index)}, assumptions,
+                                         deadline)
+    n_evaluated = len(values['gap'])
+    order, violation, cost = _rank(values, targets)
+
+    if stride > 1 and not cut and time.perf_counter() < deadline:
+        # Refinar a resolución completa alrededor de las mejores celdas gruesas (sin repetir puntos)
+        offsets = np.arange(-(stride - 1), stride)
+        near = []
+        for i in order[:GOAL_SEEK_REFINE]:
+            axes = [np.clip(j + offsets, 0, n - 1) for j, n in zip(index[:, i], shape)]
+            near.append(np.ravel_multi_index([m.ravel() for m in np.meshgrid(*axes, indexing='ij')], shape))
+        refine = np.setdiff1d(np.concatenate(near), np.ravel_multi_index(index[:, :n_evaluated], shape))
+        refine = np.unravel_index(refine, shape)
+        fine_cols, fine_values, cut = _evaluate_points(
+            inp, {k: g[i] for (k, g), i in zip(grids.items(), refine)}, assumptions, deadline)
+        n_evaluated += len(fine_values['gap'])
+        cols = {k: np.concatenate([cols[k], fine_cols[k]]) for k in cols}
+        values = {k: np.concatenate([values[k], fine_values[k]]) for k in values}
+        order, violation, cost = _rank(values, targets)
+
+    i = int(order[0])
+    return {
+        'feasible': bool(violation[i] == 0),
+        'inputs': {k: cols[k][i].item() for k in free},
+        'outputs': {k: float(values[k][i]) for k in GOAL_TARGETS},
+        'cost': float(cost[i]),
+        'n_evaluated': n_evaluated,
+        'exhaustive': stride == 1 and not cut,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
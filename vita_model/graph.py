@@ -0,0 +1,162 @@
+"""Grafo declarativo de métricas con recálculo incremental.
+
+Cada métrica es una función cuyo nombre es el de la métrica y que declara
+sus inputs: otras métricas o fuentes ('inp.take_b2b', 'a.cogs_rate', ...).
+MetricGraph.compute() evalúa el grafo completo sin estado (sirve igual
+para escalares o arrays); IncrementalGraph guarda los valores del run
+anterior y sólo recalcula los nodos aguas abajo de las fuentes que
+cambiaron.
+"""
+import inspect
+from dataclasses import dataclass, fields, is_dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    inputs: tuple
+    fn: object
+
+    def call(self, values):
+        # Los parámetros de fn son los inputs sin prefijo ('inp.take_b2b' → take_b2b)
+        return self.fn(**{k.rsplit('.', 1)[-1]: values[k] for k in self.inputs})
+
+
+def same_value(x, y):
+    """Igualdad robusta para fuentes: escalares, arrays NumPy y dataclasses."""
+    if x is y:
+        return True
+    if type(x) is not type(y):
+        return False
+    if is_dataclass(x):
+        return all(same_value(getattr(x, f.name), getattr(y, f.name)) for f in fields(x))
+    if isinstance(x, np.ndarray):
+        return x.shape == y.shape and bool(np.array_equal(x, y))
+    try:
+        return bool(x == y)
+    except (TypeError, ValueError):
+        return False
+
+
+class MetricGraph:
+    def __init__(self):
+        self.nodes = {}
+        self._order = None
+
+    def metric(self, *inputs):
+        """Decorador: registra la función como métrica con los inputs dados."""
+        def register(fn):
+            params = inspect.signature(fn).parameters
+            if not any(p.kind is p.VAR_KEYWORD for p in params.values()):
+                names = [k.rsplit('.', 1)[-1] for k in inputs]
+                if sorted(names) != sorted(params):
+                    raise ValueError(f"{fn.__name__}: inputs {names} no calzan con los parámetros {list(params)}")
+            self.nodes[fn.__name__] = Node(fn.__name__, tuple(inputs), fn)
+            self._order = None
+            return fn
+        return register
+
+    @property
+    def order(self):
+        """Nodos en orden topológico."""
+        if self._order is None:
+            order, state = [], {}
+
+            def visit(name):
+                if state.get(name) == 'done':
+                    return
+                if state.get(name) == 'visiting':
+                    raise ValueError(f"Ciclo en el grafo de métricas en '{name}'")
+                state[name] = 'visiting'
+                for dep in self.nodes[name].inputs:
+                    if dep in self.nodes:
+                        visit(dep)
+                state[name] = 'done'
+                order.append(name)
+
+            for name in self.nodes:
+                visit(name)
+            self._order = order
+        return self._order
+
+    def upstream(self, targets):
+        """Nodos (métricas) necesarios para calcular targets, incluidos ellos mismos."""
+        needed, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name in needed or name not in self.nodes:
+                continue
+            needed.add(name)
+            stack.extend(self.nodes[name].inputs)
+        return needed
+
+    def downstream(self, changed):
+        """Nodos afectados (directa o indirectamente) por las fuentes/métricas changed."""
+        dirty = set(changed)
+        for name in self.order:
+            if any(dep in dirty for dep in self.nodes[name].inputs):
+                dirty.add(name)
+        return dirty & set(self.nodes)
+
+    def compute(self, sources, targets=None):
+        """Evaluación completa sin estado → dict target → valor."""
+        targets = list(self.nodes) if targets is None else list(targets)
+        needed = self.upstream(targets)
+        values = dict(sources)
+        for name in self.order:
+            if name in needed:
+                values[name] = self.nodes[name].call(values)
+        return {t: values[t] for t in targets}
+
+
+class IncrementalGraph:
+    """Estado entre reruns: recalcula sólo lo que depende de fuentes cambiadas."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.sources = {}
+        self.values = {}
+        self.changed = []
+        self.recomputed = []
+        self.runs = 0
+
+    def run(self, sources, targets=None):
+        graph = self.graph
+        targets = list(graph.nodes) if targets is None else list(targets)
+        changed = [k for k, v in sources.items() if k not in self.sources or not same_value(v, self.sources[k])]
+        needed = graph.upstream(targets)
+        affected = graph.downstream(changed)
+        dirty = (affected | (needed - set(self.values))) & needed
+
+        values = dict(self.values)
+        values.update(sources)
+        recomputed = []
+        for name in graph.order:
+            if name in dirty:
+                values[name] = graph.nodes[name].call(values)
+                recomputed.append(name)
+
+        self.sources = dict(sources)
+        # Los nodos afectados que este run no necesitó quedaron viejos: se descartan y el próximo run que los
+        # pida los recalcula (needed − values)
+        self.values = {k: v for k, v in values.items() if k in graph.nodes and (k in dirty or k not in affected)}
+        self.changed = changed
+        self.recomputed = recomputed
+        self.runs += 1
+        return {t: values[t] for t in targets}
+
+    def inspect(self):
+        """Estado del último run: fuentes cambiadas y, por nodo, inputs y si se recalculó."""
+        recomputed = set(self.recomputed)
+        return {
+            'run': self.runs,
+            'changed': list(self.changed),
+            'recomputed': list(self.recomputed),
+            'reused': [n for n in self.graph.order if n in self.values and n not in recomputed],
+            'nodes': [
+                {'name': n, 'inputs': self.graph.nodes[n].inputs, 'recomputed': n in recomputed}
+                for n in self.graph.order
+            ],
+        }
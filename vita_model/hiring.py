@@ -0,0 +1,184 @@
+"""Plan de contrataciones por rol.
+
+Cada hire planificado es una posición de un structure-of-arrays
+(HiringPlan): rol, salario mensual, mes de inicio y meses de rampa hasta
+el costo completo. La nómina por mes (total o por área) se acumula con
+np.bincount + cumsum (ver _accumulate): cientos de hires en 60 meses se
+evalúan en microsegundos, y un batch de escenarios agrega ejes adelante.
+
+scenario_plan() arma el plan del Scenario Builder: new_positions hires
+repartidos entre áreas según AREA_MIX (el siguiente hire va al área con
+mayor déficit respecto de su peso), cada uno con el salario de su rol y,
+en modo gradual, un hire cada 12/N meses desde M5.
+
+El grafo de métricas no arma ese plan hire por hire: como el k-ésimo hire
+es siempre del mismo rol (HIRE_ORDER), el plan sólo depende del modo y de
+N, y su nómina M5..M16 por unidad de new_hire_cost se precalcula una vez
+para N = 0..MAX_HIRES (PLAN_PAYROLL, con su total de 12 meses).
+scenario_payroll*() y scenario_savings() son un lookup por escenario, sin
+ejes de roles ni de hires; la serie por mes sólo se lee para la
+trayectoria.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+AREAS = ('Growth', 'Desarrollo', 'Operaciones', 'Finanzas', 'Compliance', 'Legales', 'RRHH', 'BI')
+AREA_MIX = (0.20, 0.20, 0.20, 0.20, 0.08, 0.05, 0.05, 0.02)   # distribución actual del presupuesto
+
+# Rol → (área, salario relativo a Assumptions.new_hire_cost, meses de rampa hasta el costo completo).
+# Promedio ponderado por AREA_MIX ≈ 1.0: el costo medio por hire sigue siendo new_hire_cost.
+ROLES = {
+    'Ejecutivo comercial B2B': ('Growth', 1.00, 0),
+    'Ingeniero de software': ('Desarrollo', 1.30, 0),
+    'Analista de operaciones': ('Operaciones', 0.75, 0),
+    'Analista de tesorería': ('Finanzas', 0.95, 0),
+    'Oficial de cumplimiento': ('Compliance', 1.10, 0),
+    'Abogado': ('Legales', 1.10, 0),
+    'Generalista RRHH': ('RRHH', 0.70, 0),
+    'Analista de datos': ('BI', 1.00, 0),
+}
+ROLE_NAMES = tuple(ROLES)
+ROLE_AREA = np.array([AREAS.index(area) for area, _, _ in ROLES.values()])
+ROLE_SALARY = np.array([mult for _, mult, _ in ROLES.values()])
+ROLE_RAMP = np.array([ramp for _, _, ramp in ROLES.values()])
+
+MAX_HIRES = 256
+
+
+def _hire_order(n=MAX_HIRES):
+    # Rol del k-ésimo hire: el área con mayor déficit (peso × k − asignados); empate → la primera
+    weights = np.array([AREA_MIX[a] for a in ROLE_AREA])
+    assigned = np.zeros(len(weights))
+    order = np.empty(n, dtype=np.int64)
+    for k in range(n):
+        i = int(np.argmax(weights * (k + 1) - assigned))
+        order[k] = i
+        assigned[i] += 1
+    return order
+
+
+HIRE_ORDER = _hire_order()
+
+
+def _accumulate(weight, start, ramp, n_months, group=None, n_groups=1):
+    """Σ por mes (y grupo) de weight · clip((t − start + 1) / max(ramp, 1), 0, 1) → (..., n_groups, n_months).
+
+    Cada hire aporta una pendiente weight/ramp que empieza en start y
+    termina en start + ramp: dos deltas por hire (np.bincount) y dos cumsum
+    sobre el eje de meses. O(hires + meses), sin la matriz hires × meses.
+    """
+    weight, start, ramp = np.broadcast_arrays(np.asarray(weight, dtype=float),
+                                              np.asarray(start, dtype=float), np.asarray(ramp))
+    batch, size = weight.shape[:-1], weight.shape[-1]
+    rows = math.prod(batch)
+    group = np.zeros(size, dtype=np.int64) if group is None else np.asarray(group)
+    live = start < n_months
+    first = np.where(live, start, 0).astype(np.int64)
+    width = np.maximum(ramp, 1)
+    slope = np.where(live, weight / width, 0)
+    cell = (np.arange(rows).reshape(batch + (1,)) * n_groups + group) * n_months
+    end = first + width
+    inside = live & (end < n_months)
+    # +pendiente en start, −pendiente en start + ramp (si cae dentro del horizonte)
+    index = np.concatenate([(cell + first).ravel(), (cell + np.where(inside, end, 0)).ravel()])
+    deltas = np.bincount(index, np.concatenate([slope.ravel(), -np.where(inside, slope, 0).ravel()]),
+                         rows * n_groups * n_months)
+    return deltas.reshape(batch + (n_groups, n_months)).cumsum(axis=-1).cumsum(axis=-1)
+
+
+@dataclass(frozen=True)
+class HiringPlan:
+    """Hires planificados como arrays; el eje de hires es el último (..., K)."""
+    role: np.ndarray      # (K,) índice en ROLE_NAMES
+    salary: np.ndarray    # (..., K) costo mensual con el costo completo
+    start: np.ndarray     # (..., K) mes de inicio (0 = M5); inf = no se contrata
+    ramp: np.ndarray      # (..., K) meses hasta el costo completo (0 = completo desde el inicio)
+
+    @property
+    def size(self):
+        return self.role.shape[-1]
+
+    def payroll(self, n_months):
+        """Nómina incremental por mes → (..., n_months)."""
+        return _accumulate(self.salary, self.start, self.ramp, n_months)[..., 0, :]
+
+    def payroll_by_area(self, n_months):
+        """Nómina incremental por área y mes → (..., len(AREAS), n_months)."""
+        return _accumulate(self.salary, self.start, self.ramp, n_months, ROLE_AREA[self.role], len(AREAS))
+
+    def hires_by_area(self):
+        """Hires planificados (start finito) por área → (..., len(AREAS))."""
+        return _accumulate(1.0, np.where(np.isfinite(self.start), 0, np.inf), 0, 1,
+                           ROLE_AREA[self.role], len(AREAS))[..., 0]
+
+    def headcount(self, n_months):
+        """Hires activos por mes → (..., n_months)."""
+        return _accumulate(1.0, self.start, 0, n_months)[..., 0, :]
+
+
+def _check_size(new_positions):
+    n = np.asarray(new_positions)
+    if n.size and n.max() > MAX_HIRES:
+        raise ValueError(f"El plan admite hasta {MAX_HIRES} hires")
+
+
+def scenario_plan(new_positions, hiring_mode, new_hire_cost):
+    """Plan de new_positions hires (escalares o arrays de escenarios).
+
+    Gradual: el hire k (1..N) entra en el mes ceil(12k/N) − 1 desde M5, o
+    sea 1 hire cada 12/N meses; inmediato: todos en M5.
+    """
+    _check_size(new_positions)
+    n = np.asarray(new_positions)
+    size = int(n.max()) if n.size else 0
+    k = np.arange(1, size + 1)
+    n = n[..., None]
+    gradual = np.ceil(12 * k / np.maximum(n, 1)) - 1
+    start = np.where(k <= n, np.where(np.asarray(hiring_mode)[..., None], gradual, 0), np.inf)
+    role = HIRE_ORDER[:size]
+    return HiringPlan(
+        role=role,
+        salary=ROLE_SALARY[role] * np.asarray(new_hire_cost, dtype=float)[..., None],
+        start=start,
+        ramp=ROLE_RAMP[role],
+    )
+
+
+# Nómina relativa (new_hire_cost = 1) de scenario_plan() en M5..M16 por modo (0 = inmediato, 1 = gradual) y
+# N = 0..MAX_HIRES hires: el plan sólo depende de (modo, N), así que los escenarios leen su fila
+PLAN_MONTHS = 12
+PLAN_PAYROLL = np.stack([scenario_plan(np.arange(MAX_HIRES + 1), mode, 1.0).payroll(PLAN_MONTHS)
+                         for mode in (False, True)])                 # (modos, MAX_HIRES + 1, PLAN_MONTHS)
+PLAN_PAYROLL_TOTAL = PLAN_PAYROLL.sum(axis=-1)                      # (modos, MAX_HIRES + 1)
+
+
+def _plan_row(new_positions, hiring_mode):
+    # Índices (modo, N) en las tablas PLAN_*: hires enteros
+    _check_size(new_positions)
+    return np.asarray(hiring_mode).astype(np.int64), np.asarray(new_positions).astype(np.int64)
+
+
+def scenario_payroll(new_positions, hiring_mode, new_hire_cost):
+    """Nómina incremental por mes de scenario_plan() M5..M16 → (..., PLAN_MONTHS), sin armar el plan."""
+    mode, n = _plan_row(new_positions, hiring_mode)
+    return PLAN_PAYROLL[mode, n] * np.asarray(new_hire_cost, dtype=float)[..., None]
+
+
+def scenario_payroll_m16(new_positions, hiring_mode, new_hire_cost):
+    """Nómina incremental del plan en M16 → (...): un lookup por escenario."""
+    mode, n = _plan_row(new_positions, hiring_mode)
+    return PLAN_PAYROLL[mode, n, -1] * np.asarray(new_hire_cost, dtype=float)
+
+
+def scenario_payroll_total(new_positions, hiring_mode, new_hire_cost):
+    """Nómina incremental del plan acumulada M5..M16 → (...): un lookup por escenario."""
+    mode, n = _plan_row(new_positions, hiring_mode)
+    return PLAN_PAYROLL_TOTAL[mode, n] * np.asarray(new_hire_cost, dtype=float)
+
+
+def scenario_savings(new_positions, new_hire_cost):
+    """Nómina de M5..M16 contratando todo en M5 menos la del plan gradual → (...)."""
+    _, n = _plan_row(new_positions, False)
+    return (PLAN_PAYROLL_TOTAL[0, n] - PLAN_PAYROLL_TOTAL[1, n]) * np.asarray(new_hire_cost, dtype=float)
@@ -0,0 +1,205 @@
+"""Liquidez diaria: float de settlement y prefunding a partir del GTV.
+
+cash_proj es mensual (revenue − costos); la restricción real de un negocio
+de payouts es intra-mes: Vita paga en destino antes de recibir los fondos
+de origen y mantiene cuentas de destino pre-depositadas. Este módulo baja
+el GTV mensual proyectado por producto a días y simula N trayectorias:
+
+  volumen(d, p) = GTV mensual(p) × perfil intra-mes(d, p) × ruido lognormal,
+                  normalizado para que cada mes sume exactamente su GTV
+  float(d, p)   = volumen de los últimos |lag| días, con signo del lag
+                  (lag > 0: Vita adelanta caja; lag < 0: retiene fondos del cliente)
+  prefund(d, p) = días de prefunding × volumen diario promedio de 30 días
+  necesidad(d)  = Σ_p float + prefund
+  saldo libre   = caja M4 + resultado diario acumulado − (necesidad − necesidad en M4)
+
+La necesidad en M4 ya está dentro de la caja M4, así que sólo el
+incremento consume caja. Todo es NumPy sobre (..., trayectorias, días,
+productos): un año con 1.000 trayectorias corre en milisegundos.
+"""
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+from .curves import LINES, ramp_curves
+from .data import DATA
+
+LIQUIDITY_PRODUCTS = ('payouts_b2b', 'payouts_b2c', 'payins', 'exchange')
+
+LIQUIDITY_LABELS = {
+    'payouts_b2b': 'Payouts B2B',
+    'payouts_b2c': 'Payouts B2C',
+    'payins': 'Payins B2B',
+    'exchange': 'Exchange',
+}
+
+
+@dataclass(frozen=True)
+class Settlement:
+    lag: int                 # días entre que Vita paga y recibe (> 0 adelanta caja; < 0 retiene fondos)
+    prefund: float           # días de volumen pre-depositados en destino
+    weekday: tuple           # peso por día de la semana (lunes..domingo)
+    month_end: float = 1.0   # multiplicador de los últimos 3 días del mes (nómina, proveedores)
+    mid_month: float = 1.0   # multiplicador de los días 14-16 (quincena)
+
+
+SETTLEMENT = {
+    'payouts_b2b': Settlement(lag=1, prefund=1.5, weekday=(1.15, 1.05, 1.0, 1.0, 1.2, 0.25, 0.1), month_end=1.8,
+                              mid_month=1.3),
+    'payouts_b2c': Settlement(lag=1, prefund=2.0, weekday=(0.9, 0.9, 0.9, 1.0, 1.2, 1.3, 0.9), month_end=1.4,
+                              mid_month=1.4),
+    'payins': Settlement(lag=-2, prefund=0.0, weekday=(1.1, 1.0, 1.0, 1.0, 1.1, 0.2, 0.1), month_end=1.3),
+    'exchange': Settlement(lag=1, prefund=0.25, weekday=(1.15, 1.05, 1.0, 1.0, 1.2, 0.3, 0.15), month_end=1.6,
+                           mid_month=1.2),
+}
+
+# Volumen Exchange M4 (ventas + compras, B2B + B2C); en M16, exchange_volume_m16 del escenario
+VOL_EXCHANGE_M4 = sum(DATA[k][3] for k in ('vol_exchange_ventas_b2b', 'vol_exchange_compras_b2b',
+                                            'vol_exchange_ventas_b2c', 'vol_exchange_compras_b2c'))
+GTV_M4 = np.array([DATA['gtv_payouts_b2b'][3], DATA['gtv_payouts_b2c'][3], DATA['gtv_payins_b2b'][3], VOL_EXCHANGE_M4])
+PRODUCT_LINES = ('rev_b2b', 'rev_b2c', 'rev_pi', 'rev_ex')   # línea de revenue que da la forma de la rampa
+
+LIQUIDITY_START = np.datetime64('2026-02-01')   # M5 (el dashboard es de febrero 2026)
+PREFUND_WINDOW = 30
+LIQUIDITY_SIGMA = 0.25                           # ruido lognormal diario del volumen
+NOISE_TABLE = 1 << 16
+
+
+def calendar(n_months, start=LIQUIDITY_START):
+    """Días de M5..M(4+n_months) → (fechas, índice de mes por día, primer día de cada mes)."""
+    month0 = start.astype('datetime64[M]')
+    bounds = (month0 + np.arange(n_months + 1)).astype('datetime64[D]')
+    dates = np.arange(bounds[0], bounds[-1])
+    month = np.searchsorted(bounds, dates, side='right') - 1
+    return dates, month, (bounds[:-1] - bounds[0]).astype(np.int64)
+
+
+def monthly_gtv(values, assumptions, n_months=12):
+    """GTV mensual por producto M5..M(4+n_months) → (..., n_months, productos).
+
+    values: dict de evaluate() o ScenarioResult con trayectoria hasta M(4+n_months).
+    M5..M16 siguen la curva de rampa de la línea; después, el revenue de la línea.
+    """
+    get = values.get if isinstance(values, dict) else (lambda k: getattr(values, k))
+    proj = get('trajectory')
+    if proj.horizon < 4 + n_months:
+        raise ValueError(f"La trayectoria llega a M{proj.horizon}; se necesita M{4 + n_months}")
+    gtv_m16 = np.stack(np.broadcast_arrays(
+        get('gtv_b2b_m16'), get('gtv_b2c_m16'), get('gtv_payins_m16'),
+        np.asarray(get('exchange_volume_m16')).sum(axis=-1)), axis=-1)
+    curves = ramp_curves(assumptions.ramp_curves)[[LINES.index(line) for line in PRODUCT_LINES]]
+    ramp = GTV_M4[:, None] + (gtv_m16[..., None] - GTV_M4[:, None]) * curves   # (..., productos, 12)
+    if n_months > 12:
+        rev = np.stack([getattr(proj, line) for line in PRODUCT_LINES], axis=-2)
+        i16 = proj.index(16)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(rev[..., i16:i16 + 1] > 0,
+                              rev[..., i16 + 1:i16 + n_months - 11] / rev[..., i16:i16 + 1], 1.0)
+        ramp = np.broadcast_to(ramp, growth.shape[:-1] + (12,))
+        ramp = np.concatenate([ramp, ramp[..., -1:] * growth], axis=-1)
+    return np.swapaxes(ramp[..., :n_months], -1, -2)
+
+
+def _profile(dates, month, settlement):
+    # Peso intra-mes por producto y día (sin normalizar) → (productos, días)
+    dow = (dates.astype(np.int64) - 4) % 7          # 1970-01-01 fue jueves → 0 = lunes
+    day = (dates - dates.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+    last = np.r_[month[1:] != month[:-1], True]
+    month_end = (last | np.r_[last[1:], False] | np.r_[last[2:], False, False])
+    mid = (day >= 14) & (day <= 16)
+    return np.stack([
+        np.asarray(s.weekday)[dow] * np.where(month_end, s.month_end, 1.0) * np.where(mid, s.mid_month, 1.0)
+        for s in (settlement[name] for name in LIQUIDITY_PRODUCTS)])
+
+
+@lru_cache(maxsize=1)
+def _normal_quantiles():
+    return np.frompyfunc(NormalDist().inv_cdf, 1, 1)((np.arange(NOISE_TABLE) + 0.5) / NOISE_TABLE).astype(float)
+
+
+def _noise(rng, shape, sigma):
+    # Ruido lognormal de media 1 por cuantiles: una tabla de 2^16 cuantiles normales
+    # indexada con enteros uniformes es ~10x más rápida que standard_normal
+    table = np.exp(sigma * _normal_quantiles())
+    return (table / table.mean())[rng.integers(0, NOISE_TABLE, size=shape, dtype=np.uint16)]
+
+
+def _trailing_sums(volume, windows, pad):
+    # Sumas móviles de los últimos w[p] días (eje -1) por producto (eje -2) con un solo
+    # cumsum; los días previos a M5 valen pad[p]. Una salida (..., productos, días) por ventana.
+    n_products, n_days = volume.shape[-2:]
+    windows = [np.broadcast_to(w, (n_products,)).tolist() for w in windows]
+    width = max(max(w) for w in windows)
+    head = np.broadcast_to(np.asarray(pad)[:, None], volume.shape[:-1] + (width,))
+    c = np.cumsum(np.concatenate([np.zeros(volume.shape[:-1] + (1,)), head, volume], axis=-1), axis=-1)
+    out = []
+    for w in windows:
+        s = np.empty_like(volume)
+        for p, wp in enumerate(w):
+            s[..., p, :] = c[..., p, width + 1:] - c[..., p, width + 1 - wp:width + 1 - wp + n_days]
+        out.append(s)
+    return out
+
+
+def simulate_liquidity(gtv, net, cash0=DATA['cash'][3], settlement=None, n_paths=1000, seed=0,
+                       sigma=LIQUIDITY_SIGMA, start=LIQUIDITY_START):
+    """Simulación diaria de float y prefunding.
+
+    gtv: GTV mensual por producto (..., meses, productos); net: resultado
+    mensual (..., meses). Devuelve dict con fechas, necesidad y saldo libre
+    diarios (..., trayectorias, días), pico y promedio de necesidad por mes
+    (..., trayectorias, meses), saldo mínimo y su día (..., trayectorias)
+    y el tiempo de la simulación.
+    """
+    t0 = time.perf_counter()
+    settlement = SETTLEMENT if settlement is None else settlement
+    gtv = np.swapaxes(np.asarray(gtv, dtype=float), -1, -2)           # (..., productos, meses)
+    n_months = gtv.shape[-1]
+    dates, month, first = calendar(n_months, start)
+    n_days = len(dates)
+    days_in_month = np.diff(np.append(first, n_days))
+
+    # Volumen diario: perfil × ruido, normalizado por mes para respetar el GTV mensual
+    rng = np.random.default_rng(seed)
+    weights = _noise(rng, gtv.shape[:-2] + (n_paths, len(LIQUIDITY_PRODUCTS), n_days), sigma)
+    weights *= _profile(dates, month, settlement)
+    scale = np.expand_dims(gtv, -3) / np.add.reduceat(weights, first, axis=-1)
+    volume = weights * scale[..., month]
+
+    lag = np.array([settlement[p].lag for p in LIQUIDITY_PRODUCTS])
+    prefund = np.array([settlement[p].prefund for p in LIQUIDITY_PRODUCTS])
+    daily_m4 = GTV_M4 / 30
+    need_m4 = float(((lag + prefund) * daily_m4).sum())
+
+    # Float: volumen de los últimos |lag| días con el signo del lag; prefunding: promedio de 30 días
+    float_, window = _trailing_sums(volume, (np.abs(lag), PREFUND_WINDOW), daily_m4)
+    need = np.sign(lag) @ float_ + (prefund / PREFUND_WINDOW) @ window
+
+    daily_net = np.expand_dims(np.asarray(net, dtype=float) / days_in_month, -2)[..., month]
+    balance = cash0 + np.cumsum(daily_net, axis=-1) - (need - need_m4)
+
+    return {
+        'dates': dates,
+        'month': month + 5,
+        'need': need,
+        'balance': balance,
+        'need_m4': need_m4,
+        'peak_need': np.maximum.reduceat(need, first, axis=-1),
+        'avg_need': np.add.reduceat(need, first, axis=-1) / days_in_month,
+        'min_balance': balance.min(axis=-1),
+        'min_day': balance.argmin(axis=-1),
+        'volume': volume.sum(axis=-2),
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def scenario_liquidity(values, assumptions, n_months=12, **kwargs):
+    """simulate_liquidity() con el GTV y el resultado mensual de un escenario (o batch)."""
+    get = values.get if isinstance(values, dict) else (lambda k: getattr(values, k))
+    proj = get('trajectory')
+    start = proj.index(5)
+    return simulate_liquidity(monthly_gtv(values, assumptions, n_months),
+                              proj.net[..., start:start + n_months], **kwargs)
@@ -0,0 +1,411 @@
+"""Métricas del escenario M16 como grafo de dependencias.
+
+Cada función es una métrica (su nombre = campo de ScenarioResult o nodo
+intermedio) y el decorador declara de qué depende: otras métricas, sliders
+('inp.<campo>' de ScenarioInputs), constantes ('a.<campo>' de Assumptions)
+o el objeto completo ('inputs', 'assumptions', 'horizon'). Las fórmulas son
+elementwise con NumPy, así el grafo sirve igual para un escenario o un batch.
+"""
+import numpy as np
+
+from .data import BASE, BASE_REVENUE, BASE_ADMIN, BASE_GTV_B2C
+from .countries import COUNTRY_GTV, country_admin_months, country_clients, launch_schedule
+from .exchange import EXCHANGE_SIDES, bucket_volume
+from .graph import MetricGraph
+from .hiring import scenario_payroll, scenario_payroll_m16, scenario_payroll_total, scenario_plan, scenario_savings
+from .payins import price_points, scale_fit, scale_take
+from .projection import project_months, ramp_cash
+
+SCENARIO_GRAPH = MetricGraph()
+metric = SCENARIO_GRAPH.metric
+
+# Métricas M16 que project_months() / ramp_totals() leen del escenario
+PROJECTION_INPUTS = (
+    'rev_b2b_proj', 'rev_b2c_proj', 'rev_ex_proj', 'rev_payins_proj', 'fwd_rev', 'card_rev',
+    'total_rev_proj', 'total_variable', 'cogs_proj', 'tax_proj', 'mktg_proj',
+    'hiring_payroll', 'country_schedule', 'fwd_cost', 'ai_savings', 'clients_payouts',
+)
+# Métricas M16 de la caja en forma cerrada (ramp_cash()): sin series por mes
+CASH_INPUTS = (
+    'rev_b2b_proj', 'rev_b2c_proj', 'rev_ex_proj', 'rev_payins_proj', 'fwd_rev', 'card_rev',
+    'total_rev_proj', 'total_variable', 'hiring_payroll_12m', 'country_schedule', 'fwd_cost', 'ai_savings',
+)
+
+
+def _safe_div(num, den, default=0):
+    # num / den cuando den > 0, default en otro caso (escalares o arrays)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / den, default)
+
+
+def scenario_sources(inp, a, horizon=16):
+    """Fuentes del grafo: sliders, constantes (por campo) y los objetos completos."""
+    sources = {'inputs': inp, 'assumptions': a, 'horizon': horizon}
+    sources.update({f'inp.{k}': v for k, v in vars(inp).items()})
+    sources.update({f'a.{k}': v for k, v in vars(a).items()})
+    return sources
+
+
+# ── PAYOUTS B2B: clientes = f(take rate, países) ──
+@metric('a.ref_take_b2b', 'inp.take_b2b')
+def additional_drop_bp(ref_take_b2b, take_b2b):
+    return np.maximum(0, (ref_take_b2b - take_b2b) * 100)
+
+
+@metric('additional_drop_bp', 'a.clients_per_bp')
+def additional_rate(additional_drop_bp, clients_per_bp):
+    # Cada bp adicional de baja sobre el M4 = clients_per_bp clientes/mes más (vita_model.elasticity)
+    return additional_drop_bp * clients_per_bp
+
+
+@metric('a.base_rate', 'additional_rate')
+def monthly_client_rate(base_rate, additional_rate):
+    return base_rate + additional_rate
+
+
+@metric('monthly_client_rate')
+def organic_growth(monthly_client_rate):
+    return np.trunc(monthly_client_rate * 12).astype(np.int64)
+
+
+@metric('inp.new_countries', 'a.country_launch')
+def country_schedule(new_countries, country_launch):
+    # Mes de lanzamiento por país (vita_model.countries); inf = no se lanza
+    return launch_schedule(new_countries, country_launch)
+
+
+@metric('country_schedule', 'a.clients_per_country')
+def country_clients_m16(country_schedule, clients_per_country):
+    return country_clients(country_schedule, clients_per_country)
+
+
+@metric('country_clients_m16')
+def country_growth(country_clients_m16):
+    # Clientes enteros, como organic_growth
+    return np.round(country_clients_m16.sum(axis=-1)).astype(np.int64)
+
+
+@metric('a.clients_b2b_m4', 'organic_growth', 'country_growth')
+def clients_gross(clients_b2b_m4, organic_growth, country_growth):
+    return clients_b2b_m4 + organic_growth + country_growth
+
+
+@metric('a.clients_b2b_m4', 'clients_gross', 'a.churn_b2b', 'a.ref_churn_b2b')
+def churn_loss(clients_b2b_m4, clients_gross, churn_b2b, ref_churn_b2b):
+    # base_rate ya es neto del churn histórico: sólo el exceso (o defecto) sobre ese
+    # churn se descuenta, 12 meses sobre la base activa promedio M4→M16
+    excess = (churn_b2b - ref_churn_b2b) * 12 * (clients_b2b_m4 + clients_gross) / 2
+    return np.round(excess).astype(np.int64)
+
+
+@metric('clients_gross', 'churn_loss')
+def clients_payouts(clients_gross, churn_loss):
+    return np.maximum(clients_gross - churn_loss, 0)
+
+
+@metric('a.gtv_per_client_payouts', 'inp.take_b2b', 'a.ref_take_b2b', 'a.gtv_elasticity_b2b')
+def gtv_per_client_b2b(gtv_per_client_payouts, take_b2b, ref_take_b2b, gtv_elasticity_b2b):
+    # Respuesta del GTV por cliente al take rate (elasticidad ajustada a M1-M4; 0 = sin respuesta)
+    return gtv_per_client_payouts * (take_b2b / ref_take_b2b) ** gtv_elasticity_b2b
+
+
+@metric('clients_payouts', 'country_clients_m16', 'gtv_per_client_b2b')
+def gtv_b2b_m16(clients_payouts, country_clients_m16, gtv_per_client_b2b):
+    # Los clientes de cada país nuevo mueven GTV × su factor (COUNTRY_GTV)
+    return (clients_payouts + (country_clients_m16 * (COUNTRY_GTV - 1)).sum(axis=-1)) * gtv_per_client_b2b
+
+
+@metric('gtv_b2b_m16', 'inp.take_b2b')
+def rev_b2b_proj(gtv_b2b_m16, take_b2b):
+    return gtv_b2b_m16 * (take_b2b / 100)
+
+
+@metric('rev_b2b_proj')
+def growth_pct_payouts(rev_b2b_proj):
+    return ((rev_b2b_proj / BASE['rev_payouts_b2b']) - 1) * 100 if BASE['rev_payouts_b2b'] > 0 else 0
+
+
+# ── PAYINS B2B: clientes → take rate de escala → revenue ──
+@metric('inp.clients_payins_m16', 'a.payins_clients_min', 'a.payins_clients_max')
+def scale_factor(clients_payins_m16, payins_clients_min, payins_clients_max):
+    sf = np.log(clients_payins_m16 / payins_clients_min) / np.log(payins_clients_max / payins_clients_min)
+    return np.minimum(1.0, np.maximum(0.0, sf))
+
+
+@metric('inp.clients_payins_m16', 'assumptions')
+def take_payins_derived(clients_payins_m16, assumptions):
+    # Curva precio/escala ajustada a los puntos de precio (vita_model.payins)
+    return scale_take(clients_payins_m16, scale_fit(*price_points(assumptions)))
+
+
+@metric('inp.clients_payins_m16', 'a.avg_gtv_payins_client')
+def gtv_payins_m16(clients_payins_m16, avg_gtv_payins_client):
+    return clients_payins_m16 * avg_gtv_payins_client
+
+
+@metric('gtv_payins_m16', 'take_payins_derived')
+def rev_payins_proj(gtv_payins_m16, take_payins_derived):
+    return gtv_payins_m16 * (take_payins_derived / 100)
+
+
+@metric('clients_payouts', 'inp.clients_payins_m16')
+def total_b2b_m16(clients_payouts, clients_payins_m16):
+    return clients_payouts + clients_payins_m16
+
+
+@metric('total_b2b_m16', 'a.clients_b2b_m4', 'a.clients_payins_m4')
+def mult_total(total_b2b_m16, clients_b2b_m4, clients_payins_m4):
+    return total_b2b_m16 / (clients_b2b_m4 + clients_payins_m4)
+
+
+# ── EXCHANGE, B2C Y PRODUCTOS NUEVOS ──
+@metric('gtv_b2b_m16', 'gtv_b2c_m16', 'a.exchange_volume_ratios')
+def exchange_volume_m16(gtv_b2b_m16, gtv_b2c_m16, exchange_volume_ratios):
+    # Volumen por bucket (vita_model.exchange.EXCHANGE_BUCKETS) → (..., buckets)
+    return bucket_volume(np.stack(np.broadcast_arrays(gtv_b2b_m16, gtv_b2c_m16), axis=-1), exchange_volume_ratios)
+
+
+@metric('exchange_volume_m16', 'a.exchange_spreads')
+def exchange_rev_m16(exchange_volume_m16, exchange_spreads):
+    return exchange_volume_m16 * np.asarray(exchange_spreads) / 100
+
+
+@metric('exchange_rev_m16')
+def rev_ex_b2b_proj(exchange_rev_m16):
+    return exchange_rev_m16[..., :len(EXCHANGE_SIDES)].sum(axis=-1)
+
+
+@metric('exchange_rev_m16')
+def rev_ex_b2c_proj(exchange_rev_m16):
+    return exchange_rev_m16[..., len(EXCHANGE_SIDES):].sum(axis=-1)
+
+
+@metric('rev_ex_b2b_proj', 'rev_ex_b2c_proj')
+def rev_ex_proj(rev_ex_b2b_proj, rev_ex_b2c_proj):
+    return rev_ex_b2b_proj + rev_ex_b2c_proj
+
+
+@metric('inp.mult_b2c')
+def rev_b2c_proj(mult_b2c):
+    return BASE['rev_payouts_b2c'] * mult_b2c
+
+
+@metric('inp.fwd_on', 'inp.fwd_rev')
+def fwd_rev(fwd_on, fwd_rev):
+    return np.where(fwd_on, fwd_rev, 0)
+
+
+@metric('inp.card_on', 'inp.card_rev')
+def card_rev(card_on, card_rev):
+    return np.where(card_on, card_rev, 0)
+
+
+@metric('rev_b2b_proj', 'rev_b2c_proj', 'rev_ex_proj', 'rev_payins_proj', 'fwd_rev', 'card_rev')
+def total_rev_proj(rev_b2b_proj, rev_b2c_proj, rev_ex_proj, rev_payins_proj, fwd_rev, card_rev):
+    return rev_b2b_proj + rev_b2c_proj + rev_ex_proj + rev_payins_proj + fwd_rev + card_rev
+
+
+# ── OPERACIONES ──
+@metric('inp.hc_target', 'a.team_size')
+def new_positions(hc_target, team_size):
+    # Hires enteros (el plan de vita_model.hiring es por persona)
+    return np.floor(np.maximum(0, hc_target - team_size)).astype(np.int64)
+
+
+@metric('new_positions', 'inp.hiring_mode', 'a.new_hire_cost')
+def hiring_plan(new_positions, hiring_mode, new_hire_cost):
+    # Hires por rol con salario y mes de inicio (vita_model.hiring); mes 0 = M5
+    return scenario_plan(new_positions, hiring_mode, new_hire_cost)
+
+
+@metric('new_positions', 'inp.hiring_mode', 'a.new_hire_cost')
+def hiring_payroll(new_positions, hiring_mode, new_hire_cost):
+    # Nómina del plan M5..M16 (..., 12): sólo para la trayectoria
+    return scenario_payroll(new_positions, hiring_mode, new_hire_cost)
+
+
+@metric('new_positions', 'inp.hiring_mode', 'a.new_hire_cost')
+def hiring_payroll_m16(new_positions, hiring_mode, new_hire_cost):
+    return scenario_payroll_m16(new_positions, hiring_mode, new_hire_cost)
+
+
+@metric('new_positions', 'inp.hiring_mode', 'a.new_hire_cost')
+def hiring_payroll_12m(new_positions, hiring_mode, new_hire_cost):
+    # Nómina del plan acumulada M5..M16 (la caja M16 sólo necesita el total)
+    return scenario_payroll_total(new_positions, hiring_mode, new_hire_cost)
+
+
+@metric('new_positions', 'a.new_hire_cost')
+def hiring_savings_12m(new_positions, new_hire_cost):
+    # Nómina M5..M16 contratando todo en M5 vs el plan gradual (tablas precalculadas, sin armar los planes)
+    return scenario_savings(new_positions, new_hire_cost)
+
+
+@metric('clients_payouts', 'a.clients_b2b_m4')
+def new_clients_b2b(clients_payouts, clients_b2b_m4):
+    return clients_payouts - clients_b2b_m4
+
+
+@metric('new_clients_b2b', 'inp.clients_payins_m16')
+def total_new_clients_12m(new_clients_b2b, clients_payins_m16):
+    return new_clients_b2b + clients_payins_m16
+
+
+@metric('inp.mktg_monthly')
+def mktg_12m(mktg_monthly):
+    return mktg_monthly * 1000 * 12
+
+
+@metric('mktg_12m', 'total_new_clients_12m')
+def effective_cac(mktg_12m, total_new_clients_12m):
+    return _safe_div(mktg_12m, total_new_clients_12m)
+
+
+# ── COSTOS FIJOS (no cambian con revenue) ──
+@metric('a.team_size', 'a.team_cost_per_head', 'hiring_payroll_m16')
+def personal_proj(team_size, team_cost_per_head, hiring_payroll_m16):
+    # Equipo actual + nómina del plan en M16 (último mes de la rampa)
+    return team_size * team_cost_per_head + hiring_payroll_m16
+
+
+@metric('country_schedule', 'a.country_admin')
+def admin_proj(country_schedule, country_admin):
+    return BASE_ADMIN + country_admin_months(country_schedule, country_admin, 16, 16)
+
+
+@metric('a.bank_proj')
+def bank_proj(bank_proj):
+    return bank_proj
+
+
+@metric('a.inv_proj')
+def inv_proj(inv_proj):
+    return inv_proj
+
+
+@metric('inp.ai_on', 'a.ai_savings')
+def ai_savings(ai_on, ai_savings):
+    return np.where(ai_on, ai_savings, 0)
+
+
+@metric('inp.fwd_on', 'a.fwd_cost')
+def fwd_cost(fwd_on, fwd_cost):
+    return np.where(fwd_on, fwd_cost, 0)
+
+
+@metric('personal_proj', 'admin_proj', 'bank_proj', 'inv_proj', 'fwd_cost', 'ai_savings')
+def total_fixed(personal_proj, admin_proj, bank_proj, inv_proj, fwd_cost, ai_savings):
+    return personal_proj + admin_proj + bank_proj + inv_proj + fwd_cost - ai_savings
+
+
+# ── COSTOS VARIABLES (escalan con volumen/revenue) ──
+@metric('inp.mult_b2c')
+def gtv_b2c_m16(mult_b2c):
+    return BASE_GTV_B2C * mult_b2c
+
+
+@metric('gtv_b2b_m16', 'gtv_b2c_m16', 'gtv_payins_m16')
+def gtv_m16(gtv_b2b_m16, gtv_b2c_m16, gtv_payins_m16):
+    return gtv_b2b_m16 + gtv_b2c_m16 + gtv_payins_m16
+
+
+@metric('gtv_m16', 'a.cogs_rate')
+def cogs_proj(gtv_m16, cogs_rate):
+    return gtv_m16 * cogs_rate
+
+
+@metric('total_rev_proj', 'a.tax_rate')
+def tax_proj(total_rev_proj, tax_rate):
+    return total_rev_proj * tax_rate
+
+
+@metric('inp.mktg_monthly')
+def mktg_proj(mktg_monthly):
+    return mktg_monthly * 1000
+
+
+@metric('cogs_proj', 'tax_proj', 'mktg_proj')
+def total_variable(cogs_proj, tax_proj, mktg_proj):
+    return cogs_proj + tax_proj + mktg_proj
+
+
+# ── TOTALES M16 ──
+@metric('total_fixed', 'total_variable')
+def total_gastos_proj(total_fixed, total_variable):
+    return total_fixed + total_variable
+
+
+@metric('total_fixed', 'total_gastos_proj')
+def fixed_ratio(total_fixed, total_gastos_proj):
+    return _safe_div(total_fixed, total_gastos_proj) * 100
+
+
+@metric('total_variable', 'total_gastos_proj')
+def variable_ratio(total_variable, total_gastos_proj):
+    return _safe_div(total_variable, total_gastos_proj) * 100
+
+
+@metric('total_rev_proj', 'total_gastos_proj')
+def margin_proj(total_rev_proj, total_gastos_proj):
+    return _safe_div(total_rev_proj - total_gastos_proj, total_rev_proj) * 100
+
+
+@metric('total_rev_proj')
+def multiple(total_rev_proj):
+    return total_rev_proj / BASE_REVENUE
+
+
+@metric('total_rev_proj', 'inp.hc_target')
+def rev_per_emp_proj(total_rev_proj, hc_target):
+    return total_rev_proj / hc_target
+
+
+@metric('total_rev_proj', 'total_gastos_proj')
+def net_income(total_rev_proj, total_gastos_proj):
+    return total_rev_proj - total_gastos_proj
+
+
+# ── MÉTRICAS POR CLIENTE B2B (Payouts + Exchange + Payins) ──
+@metric('rev_b2b_proj', 'rev_ex_b2b_proj', 'rev_payins_proj', 'clients_payouts')
+def rev_per_user_total_m16(rev_b2b_proj, rev_ex_b2b_proj, rev_payins_proj, clients_payouts):
+    return _safe_div(rev_b2b_proj + rev_ex_b2b_proj + rev_payins_proj, clients_payouts)
+
+
+@metric('clients_payouts', 'rev_per_user_total_m16')
+def mrr_m16(clients_payouts, rev_per_user_total_m16):
+    return clients_payouts * rev_per_user_total_m16
+
+
+@metric('rev_per_user_total_m16', 'a.churn_b2b')
+def cltv_m16(rev_per_user_total_m16, churn_b2b):
+    return _safe_div(rev_per_user_total_m16, churn_b2b)
+
+
+# ── INVERSIÓN ──
+@metric('new_clients_b2b', 'a.cac_b2b', 'a.b2c_users_per_mult', 'inp.mult_b2c', 'a.cac_b2c',
+        'inp.clients_payins_m16', 'a.cac_payins')
+def cac_investment(new_clients_b2b, cac_b2b, b2c_users_per_mult, mult_b2c, cac_b2c, clients_payins_m16, cac_payins):
+    return (new_clients_b2b * cac_b2b + b2c_users_per_mult * (mult_b2c - 1) * cac_b2c
+            + clients_payins_m16 * cac_payins)
+
+
+@metric('cac_investment', 'a.infra_investment', 'inp.hc_target', 'a.team_size', 'a.hire_investment')
+def total_investment(cac_investment, infra_investment, hc_target, team_size, hire_investment):
+    return cac_investment + infra_investment + (hc_target - team_size) * hire_investment * 12
+
+
+# ── TRAYECTORIA M4 (real) → M16 (→ horizonte) Y CAJA ──
+@metric('assumptions', *CASH_INPUTS)
+def cash_proj(assumptions, **m16):
+    # Caja M16 sumando los flujos M5..M16 en forma cerrada (la Projection sólo si se pide la trayectoria)
+    return ramp_cash(assumptions, m16)
+
+
+@metric('total_investment', 'cash_proj')
+def gap(total_investment, cash_proj):
+    return total_investment - cash_proj
+
+
+@metric('inputs', 'assumptions', 'horizon', *PROJECTION_INPUTS)
+def trajectory(inputs, assumptions, horizon, **m16):
+    return project_months(inputs, assumptions, m16, horizon=horizon)
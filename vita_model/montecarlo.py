@@ -0,0 +1,85 @@
+"""Monte Carlo sobre los drivers del Scenario Builder.
+
+En vez de un valor puntual, cada driver incierto recibe una distribución.
+Se sortean N muestras de una vez (Assumptions con arrays) y se pasan por
+las mismas fórmulas de vita_model.scenario, sin loops por escenario.
+"""
+from dataclasses import replace
+
+import numpy as np
+
+from .data import AVG_CHURN_B2B_SAFE
+from .metrics import PROJECTION_INPUTS
+from .projection import ramp_totals
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate
+
+# driver → (distribución, parámetros). Centradas en los valores del modelo.
+#   triangular: (mín, moda, máx) | lognormal: (mediana, sigma del log)
+MC_DISTRIBUTIONS = {
+    'base_rate': ('triangular', (12, 18, 24)),                   # clientes/mes orgánicos
+    'clients_per_country': ('triangular', (25, 50, 70)),         # clientes B2B por país nuevo
+    'avg_gtv_payins_client': ('lognormal', (250000, 0.35)),      # GTV mensual por cliente Payins
+    'cogs_rate': ('triangular', (0.0012, 0.0016, 0.0022)),       # % del GTV
+    'churn_b2b': ('triangular', (0.005, AVG_CHURN_B2B_SAFE, 0.02)),  # churn mensual B2B (clientes y CLTV)
+}
+
+MC_LABELS = {
+    'base_rate': 'Ritmo orgánico (cli/mes)',
+    'clients_per_country': 'Clientes por país',
+    'avg_gtv_payins_client': 'GTV por cliente Payins',
+    'cogs_rate': 'COGS (% GTV)',
+    'churn_b2b': 'Churn B2B mensual',
+}
+
+MC_OUTPUTS = ('total_rev_proj', 'margin_proj', 'total_gastos_proj', 'cash_proj', 'gap', 'multiple', 'cltv_m16')
+PERCENTILES = (5, 50, 95)
+
+
+def sample_drivers(n, seed=None, distributions=None):
+    """Sortea n valores por driver → dict driver → array."""
+    rng = np.random.default_rng(seed)
+    samples = {}
+    for name, (dist, params) in (distributions or MC_DISTRIBUTIONS).items():
+        if dist == 'triangular':
+            samples[name] = rng.triangular(*params, size=n)
+        elif dist == 'lognormal':
+            median, sigma = params
+            samples[name] = rng.lognormal(np.log(median), sigma, size=n)
+        elif dist == 'uniform':
+            samples[name] = rng.uniform(*params, size=n)
+        elif dist == 'normal':
+            samples[name] = rng.normal(*params, size=n)
+        else:
+            raise ValueError(f"Distribución no soportada para {name}: {dist}")
+    return samples
+
+
+def run_monte_carlo(inputs=None, n=100_000, seed=42, distributions=None, assumptions=DEFAULT_ASSUMPTIONS):
+    """Corre n escenarios con drivers aleatorios para los sliders dados.
+
+    Devuelve un dict con las muestras de cada driver ('samples'), los arrays
+    de resultados ('outputs'), percentiles P5/P50/P95 de cada resultado y de
+    la trayectoria mensual de revenue y caja ('bands'), y la probabilidad de
+    necesitar financiamiento (gap > 0).
+    """
+    inp = inputs if inputs is not None else ScenarioInputs()
+    samples = sample_drivers(n, seed, distributions)
+    a = replace(assumptions, **samples)
+    values = evaluate(inp, a, targets=MC_OUTPUTS + PROJECTION_INPUTS)
+    # Sólo revenue y caja por mes: sin las series por línea (N × meses × buckets)
+    traj = ramp_totals(inp, a, values)
+
+    outputs = {k: np.broadcast_to(values[k], (n,)) for k in MC_OUTPUTS}
+    return {
+        'n': n,
+        'seed': seed,
+        'samples': samples,
+        'outputs': outputs,
+        'percentiles': {k: np.percentile(v, PERCENTILES) for k, v in outputs.items()},
+        'bands': {
+            'months': np.arange(4, 17),
+            'revenue': np.percentile(traj['revenue'], PERCENTILES, axis=0),
+            'cash': np.percentile(traj['cash'], PERCENTILES, axis=0),
+        },
+        'prob_gap': float(np.mean(outputs['gap'] > 0)),
+    }
@@ -0,0 +1,158 @@
+"""Frontera de Pareto crecimiento vs margen vs gap de financiamiento.
+
+Evalúa la grilla completa de sliders del Scenario Builder (los toggles
+quedan fijos) y extrae los escenarios no dominados en (crecimiento,
+margin_proj, −gap): ningún otro escenario es igual o mejor en los tres
+objetivos y estrictamente mejor en alguno. Crecimiento es multiple
+(revenue M16 / base) o mult_total (clientes B2B M16 / M4).
+
+La grilla sale del cubo precalculado si existe para la configuración de
+toggles (38M puntos, sólo multiple) o se evalúa en batch (más gruesa si
+excede max_points). El filtro de dominancia es en dos pasos:
+  1. Descarte vectorizado por celdas: se discretizan los objetivos 2 y 3
+     en una grilla G×G y con un máximo-sufijo 2-D se marca como dominado
+     todo punto para el que existe otro con objetivo 1 ≥ y celda
+     estrictamente mayor en 2 y 3. Es O(n) y elimina casi toda la grilla.
+  2. Barrido exacto (Kung) sobre los sobrevivientes: orden lexicográfico
+     descendente y una escalera 2-D con bisección, O(m log m).
+"""
+import time
+from bisect import bisect_left
+from dataclasses import replace
+
+import numpy as np
+
+from .batch import evaluate_batch
+from .cube import CUBE_AXES, CUBE_FIELDS, FIXED_FIELDS, CubeStore
+from .data import BASE_REVENUE
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs
+
+PARETO_GROWTH = ('multiple', 'mult_total')   # objetivo de crecimiento; los otros dos son margin_proj y −gap
+PARETO_MAX_POINTS = 1_000_000
+PARETO_CELLS = 512
+
+
+def _cell_filter(obj, cells=PARETO_CELLS):
+    """Máscara de candidatos: False = dominado con certeza (ver paso 1 del módulo)."""
+    n = len(obj)
+    bins = []
+    for j in (1, 2):
+        lo, hi = obj[:, j].min(), obj[:, j].max()
+        scale = (cells - 1) / (hi - lo) if hi > lo else 0.0
+        bins.append(((obj[:, j] - lo) * scale).astype(np.int64))
+    best = np.full((cells + 1, cells + 1), -np.inf)
+    np.maximum.at(best, (bins[0], bins[1]), obj[:, 0])
+    # Máximo del objetivo 1 en celdas ≥ (i, j), luego desplazado a celdas estrictamente mayores
+    best = np.maximum.accumulate(np.maximum.accumulate(best[::-1, ::-1], axis=0), axis=1)[::-1, ::-1]
+    return best[bins[0] + 1, bins[1] + 1] < obj[:, 0] if n else np.zeros(0, dtype=bool)
+
+
+def _sweep(obj, idx):
+    """Barrido exacto sobre obj[idx] → índices no dominados (duplicados exactos: se queda el primero)."""
+    sub = obj[idx]
+    order = idx[np.lexsort((-sub[:, 2], -sub[:, 1], -sub[:, 0]))]
+    # Escalera de los ya aceptados: objetivo 2 ascendente, objetivo 3 descendente
+    stair2, stair3, keep = [], [], []
+    for i in order.tolist():
+        p2, p3 = obj[i, 1], obj[i, 2]
+        k = bisect_left(stair2, p2)
+        if k < len(stair2) and stair3[k] >= p3:
+            continue   # un punto anterior (objetivo 1 ≥) lo iguala o supera en 2 y 3
+        # Sacar de la escalera los que p domina en (2, 3): contiguos a la izquierda de k
+        j = k
+        while j > 0 and stair3[j - 1] <= p3:
+            j -= 1
+        stair2[j:k] = [p2]
+        stair3[j:k] = [p3]
+        keep.append(i)
+    return np.array(keep, dtype=np.int64)
+
+
+def pareto_mask(objectives, cells=PARETO_CELLS):
+    """Máscara de puntos no dominados; objectives es (n, 3) y se maximizan las 3 columnas."""
+    obj = np.asarray(objectives, dtype=float)
+    candidates = np.flatnonzero(_cell_filter(obj, cells))
+    mask = np.zeros(len(obj), dtype=bool)
+    mask[_sweep(obj, candidates)] = True
+    return mask
+
+
+def _cube_objectives(cube, rows, inputs):
+    out = cube.outputs(rows, inputs)
+    return np.column_stack([out['total_rev_proj'] / BASE_REVENUE, out['margin_proj'], -out['gap']])
+
+
+def _grid_from_cube(cube, inputs):
+    # Frontera por bloque del primer eje y luego de la unión (la frontera global está contenida): acota la memoria
+    shape = cube.data.shape[:-1]
+    block_size = int(np.prod(shape[1:]))
+    flat, parts = [], []
+    for i in range(shape[0]):
+        obj = _cube_objectives(cube, cube.data[i].reshape(-1, len(CUBE_FIELDS)), inputs)
+        keep = np.flatnonzero(pareto_mask(obj))
+        flat.append(keep + i * block_size)
+        parts.append(obj[keep])
+    grid_idx = np.unravel_index(np.concatenate(flat), shape)
+    cols = {k: axis[g] for (k, axis), g in zip(CUBE_AXES.items(), grid_idx)}
+    return cols, np.concatenate(parts), int(np.prod(shape))
+
+
+def _grid_live(inputs, assumptions, growth, max_points):
+    stride = 1
+    while np.prod([len(range(0, len(g), stride)) for g in CUBE_AXES.values()]) > max_points:
+        stride += 1
+    # Gruesa pero siempre con los extremos de cada slider
+    axes = {k: np.unique(np.append(g[::stride], g[-1])) for k, g in CUBE_AXES.items()}
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    cols = {k: m.ravel() for k, m in zip(axes, mesh)}
+    fixed = {k: getattr(inputs, k) for k in FIXED_FIELDS}
+    values = evaluate_batch(**cols, **fixed, assumptions=assumptions, outputs=(growth, 'margin_proj', 'gap'))
+    obj = np.column_stack([values[growth], values['margin_proj'], -values['gap']])
+    return cols, obj, len(obj)
+
+
+def pareto_frontier(inputs=None, assumptions=DEFAULT_ASSUMPTIONS, growth='multiple', store=None,
+                    max_points=PARETO_MAX_POINTS, sample=4000, seed=0):
+    """Escenarios no dominados en (growth, margin_proj, −gap) sobre la grilla de sliders.
+
+    Los toggles e ingresos de Forwards/Card se toman de inputs; los seis
+    sliders recorren su grilla. Devuelve un dict con los sliders y
+    objetivos de cada punto de la frontera (ordenada por growth), una
+    muestra de la grilla evaluada (para el fondo del gráfico), la fuente
+    ('cube' o 'live'), puntos evaluados y tiempo.
+    """
+    if growth not in PARETO_GROWTH:
+        raise ValueError(f"growth debe ser uno de {PARETO_GROWTH}")
+    t0 = time.perf_counter()
+    inp = inputs if inputs is not None else ScenarioInputs()
+    store = store if store is not None else CubeStore(assumptions=assumptions)
+    cube = store.cube(inp, assumptions) if growth == 'multiple' else None
+    rng = np.random.default_rng(seed)
+    if cube is not None:
+        cols, obj, n_evaluated = _grid_from_cube(cube, inp)
+        picks = np.sort(rng.choice(n_evaluated, size=min(sample, n_evaluated), replace=False))
+        sample_obj = _cube_objectives(cube, cube.data.reshape(-1, len(CUBE_FIELDS))[picks], inp)
+        source = 'cube'
+    else:
+        cols, obj, n_evaluated = _grid_live(inp, assumptions, growth, max_points)
+        sample_obj = obj[rng.choice(n_evaluated, size=min(sample, n_evaluated), replace=False)]
+        source = 'live'
+    keep = np.flatnonzero(pareto_mask(obj))
+    keep = keep[np.argsort(obj[keep, 0], kind='stable')]
+    return {
+        'growth': growth,
+        'inputs': {k: c[keep] for k, c in cols.items()},
+        growth: obj[keep, 0],
+        'margin_proj': obj[keep, 1],
+        'gap': -obj[keep, 2],
+        'sample': {growth: sample_obj[:, 0], 'margin_proj': sample_obj[:, 1], 'gap': -sample_obj[:, 2]},
+        'source': source,
+        'n_evaluated': n_evaluated,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def frontier_inputs(frontier, i, base=None):
+    """ScenarioInputs del punto i de la frontera (toggles de base)."""
+    base = base if base is not None else ScenarioInputs()
+    return replace(base, **{k: v[i].item() for k, v in frontier['inputs'].items()})
@@ -0,0 +1,163 @@
+"""Payins B2B: curva precio/escala, GTV por exportador y pipeline comercial.
+
+El escenario M16 tomaba el take de una curva log fija entre
+(payins_clients_min, payins_take_max) y (payins_clients_max,
+payins_take_min) y un GTV plano de avg_gtv_payins_client por cliente.
+Acá:
+
+  curva precio/escala  take = a + b × ln(clientes), ajustada por MCO a los
+                       puntos de precio (los dos extremos de Assumptions más
+                       los observados en payins_price_points) y acotada al
+                       rango de esos puntos. Con los puntos default reproduce
+                       la curva de siempre; cada precio cerrado que se agregue
+                       la re-ajusta. El ajuste es elementwise, así sirve para
+                       los batches del tornado y del Monte Carlo.
+  GTV por exportador   lognormal de media avg_gtv_payins_client (PAYINS_GTV_SIGMA)
+                       con onboarding lineal de ONBOARDING_MONTHS meses
+  pipeline             etapas (prospectos, probabilidad de conversión, ventana de
+                       cierre) + leads nuevos por mes; el ritmo de leads se
+                       despeja para que el pipeline llegue en valor esperado a
+                       la meta de clientes M16 del sidebar
+
+project_payins() simula M5..M16 en n_paths trayectorias a la vez
+(NumPy sobre trayectorias × clientes × meses) y devuelve clientes, GTV,
+take (de la curva según los clientes activos) y revenue por mes.
+"""
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+PAYINS_MONTHS = np.arange(5, 17)   # M5..M16
+PAYINS_GTV_SIGMA = 0.9             # dispersión lognormal del GTV mensual por exportador
+ONBOARDING_MONTHS = 3              # meses hasta operar el GTV completo
+PAYINS_PATHS = 2000
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    name: str
+    prospects: int
+    conversion: float     # probabilidad de cerrar
+    close: tuple          # (primer, último) mes de cierre desde hoy (M4)
+
+
+PAYINS_PIPELINE = (
+    PipelineStage('Negociación', 4, 0.70, (1, 2)),
+    PipelineStage('Propuesta', 10, 0.45, (2, 4)),
+    PipelineStage('Demo', 25, 0.25, (3, 6)),
+    PipelineStage('Lead calificado', 60, 0.10, (5, 10)),
+)
+NEW_LEADS = PipelineStage('Leads nuevos/mes', 0, 0.10, (5, 10))   # prospects = leads por mes (se despeja)
+
+
+def scale_fit(clients, takes):
+    """MCO de take = a + b·ln(clientes) sobre los puntos (eje -1) → (a, b, lo, hi).
+
+    clients y takes: (..., puntos), con broadcasting sobre el batch.
+    """
+    x = np.log(np.asarray(clients, dtype=float))
+    y = np.asarray(takes, dtype=float)
+    x, y = np.broadcast_arrays(x, y)
+    xm, ym = x.mean(axis=-1, keepdims=True), y.mean(axis=-1, keepdims=True)
+    b = ((x - xm) * (y - ym)).sum(axis=-1) / ((x - xm) ** 2).sum(axis=-1)
+    a = ym[..., 0] - b * xm[..., 0]
+    return a, b, y.min(axis=-1), y.max(axis=-1)
+
+
+def price_points(assumptions):
+    """Puntos (clientes, take) de la curva: extremos de Assumptions + payins_price_points."""
+    a = assumptions
+    extra = tuple(a.payins_price_points)
+    clients = (a.payins_clients_min, a.payins_clients_max) + tuple(c for c, _ in extra)
+    takes = (a.payins_take_max, a.payins_take_min) + tuple(t for _, t in extra)
+    return np.stack(np.broadcast_arrays(*clients), axis=-1), np.stack(np.broadcast_arrays(*takes), axis=-1)
+
+
+def scale_take(clients, fit):
+    """Take rate Payins (%) para `clients` con un ajuste de scale_fit()."""
+    a, b, lo, hi = fit
+    with np.errstate(divide='ignore'):
+        return np.clip(a + b * np.log(np.maximum(clients, 1)), lo, hi)
+
+
+@lru_cache(maxsize=16)
+def scale_curve(points, grid=tuple(range(1, 101))):
+    """Curva cacheada para gráficos: points = ((clientes, take), ...) → (grid, take, fit)."""
+    clients, takes = np.array(points, dtype=float).T
+    fit = tuple(float(v) for v in scale_fit(clients, takes))
+    return np.array(grid, dtype=float), scale_take(np.array(grid, dtype=float), fit), fit
+
+
+def _close_weights(stage, months):
+    # Probabilidad de cerrar en cada mes de `months` para un prospecto de la etapa (ventana uniforme)
+    lo, hi = stage.close
+    window = np.arange(lo, hi + 1) + 4
+    return (months[:, None] == window).sum(axis=1) / len(window)
+
+
+def required_leads(target, assumptions, pipeline=PAYINS_PIPELINE, leads=NEW_LEADS, months=PAYINS_MONTHS):
+    """Leads nuevos por mes para que el pipeline llegue (en valor esperado) a `target` clientes en M16."""
+    stages = sum(s.prospects * s.conversion * _close_weights(s, months).sum() for s in pipeline)
+    lo, hi = leads.close
+    lag = np.arange(lo, hi + 1)
+    reach = ((months[:, None] + lag) <= months[-1]).mean(axis=1).sum()   # cierres antes de M16 por lead/mes
+    gap = np.asarray(target, dtype=float) - assumptions.clients_payins_m4 - stages
+    return np.maximum(gap, 0) / (leads.conversion * reach) if reach > 0 else np.zeros_like(gap)
+
+
+def project_payins(target, assumptions, pipeline=PAYINS_PIPELINE, leads=NEW_LEADS, months=PAYINS_MONTHS,
+                   n_paths=PAYINS_PATHS, seed=0, lead_rate=None):
+    """Proyección mensual de Payins B2B desde el pipeline.
+
+    target: meta de clientes M16 (slider); lead_rate por defecto
+    required_leads(target). Devuelve dict con arrays (n_paths, meses) de
+    clientes, altas, GTV, take y revenue, la curva ajustada, el ritmo de
+    leads y el tiempo.
+    """
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    months = np.asarray(months)
+    n_months = len(months)
+    lead_rate = float(required_leads(target, assumptions, pipeline, leads, months) if lead_rate is None else lead_rate)
+
+    # Altas por mes: cada etapa ~ Binomial repartida en su ventana; leads nuevos ~ Poisson
+    # (un lead que entra en m cierra en m + lag, lag uniforme: Poisson con tasa por par (m, lag))
+    adds = np.zeros((n_paths, n_months), dtype=np.int64)
+    for stage in pipeline:
+        won = rng.binomial(stage.prospects, stage.conversion, size=n_paths)
+        adds += rng.multinomial(won, _close_weights(stage, months))
+    lo, hi = leads.close
+    lag = np.arange(lo, hi + 1)
+    pairs = ((months[:, None] + lag) == months[:, None, None]).sum(axis=(1, 2))   # pares (entrada, lag) por mes de cierre
+    adds += rng.poisson(lead_rate * leads.conversion * pairs / len(lag), size=(n_paths, n_months))
+
+    # Exportadores: los de M4 + cada alta, con su GTV y su mes de alta
+    m4 = int(assumptions.clients_payins_m4)
+    capacity = m4 + int(adds.sum(axis=1).max())
+    total = np.cumsum(adds, axis=1)
+    slot = np.arange(capacity - m4)
+    start = np.full((n_paths, capacity), months[0] - ONBOARDING_MONTHS, dtype=np.int64)   # M4: GTV completo
+    start[:, m4:] = months[(slot[None, :, None] >= total[:, None, :]).sum(axis=-1).clip(max=n_months - 1)]
+    exists = np.ones((n_paths, capacity), dtype=bool)
+    exists[:, m4:] = slot[None, :] < total[:, -1:]
+    sigma = PAYINS_GTV_SIGMA
+    gtv_client = rng.lognormal(-sigma ** 2 / 2, sigma, size=(n_paths, capacity)) * assumptions.avg_gtv_payins_client
+
+    ramp = np.clip((months[None, None, :] - start[..., None] + 1) / ONBOARDING_MONTHS, 0, 1) * exists[..., None]
+    gtv = np.einsum('pc,pcm->pm', gtv_client, ramp)
+    clients = m4 + total
+    fit = scale_fit(*price_points(assumptions))
+    take = scale_take(clients, fit)
+    return {
+        'months': months,
+        'clients': clients,
+        'adds': adds,
+        'gtv': gtv,
+        'take': take,
+        'revenue': gtv * take / 100,
+        'lead_rate': lead_rate,
+        'fit': fit,
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
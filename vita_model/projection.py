@@ -0,0 +1,310 @@
+"""Proyección mensual M4 (real) → M16 → horizonte largo (hasta M60+).
+
+Series de tiempo como arrays NumPy preasignados, con el mes en el último
+eje: un escenario da arrays (T,), un batch de N escenarios da (N, T). Sin
+append ni loops por mes: el costo por mes es constante al alargar el
+horizonte.
+
+Los barridos que sólo leen la caja M16 no arman los meses: ramp_cash()
+suma los flujos M5..M16 en forma cerrada (Σ de cada curva, nómina
+acumulada del plan y meses activos por país), O(líneas) por escenario.
+
+Tramos:
+  M4        datos reales de DATA
+  M5-M16    rampa desde M4 hacia el escenario M16 con la curva de cada
+            línea de negocio (vita_model.curves; default logística)
+  M17+      crecimiento anual post-M16 (Assumptions.growth_after_m16),
+            costos fijos crecen a fixed_growth_after_m16 y los variables
+            mantienen el ratio de M16
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from .countries import country_admin_cost, country_admin_months
+from .curves import LINES, ramp_curves
+from .data import (
+    DATA, BASE_REVENUE, BASE_COGS, BASE_PERSONAL, BASE_MARKETING, BASE_ADMIN,
+    BASE_TAX, BASE_BANKING, BASE_INVERSIONES,
+)
+
+HORIZONS = (16, 24, 36, 60)
+M16_INDEX = 12
+RAMP_F = np.arange(1, 13) / 12        # avance lineal de la rampa M5..M16
+AI_ACTIVE = np.arange(12) >= 3        # el ahorro del AI Sales Agent corre desde M8
+
+# Línea de negocio → (campo del escenario M16, revenue real M4)
+REVENUE_LINES = {
+    'rev_b2b': ('rev_b2b_proj', DATA['rev_payouts_b2b'][3]),
+    'rev_b2c': ('rev_b2c_proj', DATA['rev_payouts_b2c'][3]),
+    'rev_ex': ('rev_ex_proj', DATA['rev_exchange'][3]),
+    'rev_pi': ('rev_payins_proj', DATA['rev_payins_b2b'][3]),
+    'rev_fwd': ('fwd_rev', 0),      # productos nuevos: no existían en M4
+    'rev_card': ('card_rev', 0),
+}
+
+LINE_LABELS = {
+    'rev_b2b': 'Payouts B2B',
+    'rev_b2c': 'Payouts B2C',
+    'rev_ex': 'Exchange',
+    'rev_pi': 'Payins B2B',
+    'rev_fwd': 'Forwards FX',
+    'rev_card': 'Vita Card',
+}
+
+# Buckets de costo variable → (campo del escenario M16, promedio base)
+VARIABLE_BUCKETS = {
+    'cogs': ('cogs_proj', BASE_COGS),
+    'tax': ('tax_proj', BASE_TAX),
+    'marketing': ('mktg_proj', BASE_MARKETING),
+}
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Serie mensual por línea de negocio y bucket de costo (mes en el último eje)."""
+    months: np.ndarray
+    # Revenue por línea
+    rev_b2b: np.ndarray
+    rev_b2c: np.ndarray
+    rev_ex: np.ndarray
+    rev_pi: np.ndarray
+    rev_fwd: np.ndarray
+    rev_card: np.ndarray
+    # Costos fijos
+    personal: np.ndarray
+    admin: np.ndarray
+    banking: np.ndarray
+    inversiones: np.ndarray
+    fwd_cost: np.ndarray
+    ai_savings: np.ndarray
+    # Costos variables
+    cogs: np.ndarray
+    tax: np.ndarray
+    marketing: np.ndarray
+    # Clientes B2B
+    clients_b2b: np.ndarray
+    clients_payins: np.ndarray
+    # Totales
+    revenue: np.ndarray
+    fixed: np.ndarray
+    variable: np.ndarray
+    cost: np.ndarray
+    net: np.ndarray
+    cash: np.ndarray
+
+    @property
+    def horizon(self):
+        return int(self.months[-1])
+
+    def index(self, month):
+        """Posición del mes M{month} en el último eje."""
+        return int(month) - int(self.months[0])
+
+    def window(self, last_month, first_month=None):
+        """Sub-proyección M{first_month}..M{last_month} (por defecto desde M4)."""
+        start = 0 if first_month is None else self.index(first_month)
+        sl = slice(start, self.index(last_month) + 1)
+        return Projection(**{f.name: getattr(self, f.name)[..., sl] for f in fields(self)})
+
+    def annual(self, start_month, years):
+        """Sumas de 12 meses a partir de M{start_month}+1 → dict de arrays (..., years)."""
+        start = self.index(start_month) + 1
+        sl = slice(start, start + 12 * years)
+        out = {}
+        for name in ('revenue', 'fixed', 'variable', 'cost', 'net'):
+            block = getattr(self, name)[..., sl]
+            out[name] = block.reshape(block.shape[:-1] + (years, 12)).sum(axis=-1)
+        return out
+
+    def to_frame(self):
+        """DataFrame mes × (líneas, buckets, totales) de un escenario."""
+        df = pd.DataFrame({f.name: getattr(self, f.name) for f in fields(self) if f.name != 'months'},
+                          index=pd.Index([f'M{m}' for m in self.months], name='mes'))
+        df['margin'] = np.where(df['revenue'] > 0, df['net'] / df['revenue'] * 100, 0)
+        return df
+
+
+def _col(x):
+    # Escalar o array de escenarios → agrega el eje de meses
+    return np.asarray(x)[..., None]
+
+
+def _growth_index(annual_rates, n_months):
+    # Índice acumulado de crecimiento mensual compuesto para M17..M(16+n)
+    rates = np.asarray(annual_rates, dtype=float)
+    year = np.minimum(np.arange(n_months) // 12, len(rates) - 1)
+    return np.cumprod((1 + rates[year]) ** (1 / 12))
+
+
+def _variable_ratios(m16):
+    # Ratio variable / revenue en M4 (promedio base) y en M16 del escenario (..., 1)
+    variable_ratio_base = (BASE_COGS + BASE_TAX + BASE_MARKETING) / BASE_REVENUE if BASE_REVENUE > 0 else 0.40
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variable_ratio_m16 = _col(np.where(m16['total_rev_proj'] > 0,
+                                           m16['total_variable'] / m16['total_rev_proj'], 0.35))
+    return variable_ratio_base, variable_ratio_m16
+
+
+def _revenue_targets(m16):
+    # Revenue M4 por línea (L,) y M16 del escenario (..., L), en el orden de REVENUE_LINES / LINES
+    m4 = np.array([m4 for _, m4 in REVENUE_LINES.values()], dtype=float)
+    targets = np.stack(np.broadcast_arrays(*(np.asarray(m16[field], dtype=float)
+                                             for field, _ in REVENUE_LINES.values())), axis=-1)
+    return m4, targets
+
+
+def _ramp(inp, a, m16):
+    # Tramo M5..M16 de los totales (arrays (..., 12)), compartido con ramp_totals()
+    f = RAMP_F
+    # Rampa desde M4 real hacia M16 proyectado con la curva de cada línea (vita_model.curves):
+    # total = Σ M4 + (M16 − M4 por línea) @ curvas (líneas × meses), un producto matricial para todo el batch
+    curves = ramp_curves(a.ramp_curves)
+    m4, targets = _revenue_targets(m16)
+    revenue = m4.sum() + (targets - m4) @ curves
+
+    # Costos fijos: nómina del plan de contrataciones (vita_model.hiring) y admin de los países ya lanzados
+    ramp = np.arange(1, 13)
+    personal = BASE_PERSONAL + m16['hiring_payroll']
+    admin = BASE_ADMIN + country_admin_cost(m16['country_schedule'], a.country_admin, ramp + 4)
+    fwd_cost = _col(m16['fwd_cost'])
+    ai_savings = np.where(AI_ACTIVE, _col(m16['ai_savings']), 0)
+    fixed = personal + admin + BASE_BANKING + BASE_INVERSIONES + fwd_cost - ai_savings
+
+    # Costos variables: ratio interpolado entre base y M16
+    variable_ratio_base, variable_ratio_m16 = _variable_ratios(m16)
+    variable = revenue * (variable_ratio_base + (variable_ratio_m16 - variable_ratio_base) * f)
+    return dict(f=f, curves=curves, revenue=revenue, personal=personal, admin=admin, fwd_cost=fwd_cost,
+                ai_savings=ai_savings, fixed=fixed, variable_ratio_m16=variable_ratio_m16, variable=variable)
+
+
+def ramp_totals(inp, a, m16):
+    """Revenue y caja M4..M16 sin armar la Projection completa.
+
+    Para barridos grandes y Monte Carlo, donde las series por línea y bucket
+    no se usan: devuelve {'revenue', 'cash'} con forma (..., 13).
+    """
+    r = _ramp(inp, a, m16)
+    net = r['revenue'] - (r['fixed'] + r['variable'])
+    lead = net.shape[:-1] + (1,)
+    flows = np.concatenate([np.broadcast_to(DATA['cash'][3], lead), net], axis=-1)
+    revenue = np.concatenate([np.broadcast_to(DATA['revenue'][3], lead), r['revenue']], axis=-1)
+    return {'revenue': revenue, 'cash': np.cumsum(flows, axis=-1)}
+
+
+def ramp_cash(a, m16):
+    """Caja M16 en forma cerrada, sin la matriz de meses de _ramp() → (...).
+
+    Los mismos flujos M5..M16 que ramp_totals(), sumados por tramo: el
+    revenue con la suma de cada curva, el variable con Σ curva × avance
+    (el ratio se interpola linealmente), la nómina con su total de 12
+    meses (m16['hiring_payroll_12m']) y el admin con los meses activos de
+    cada país.
+    """
+    curves = ramp_curves(a.ramp_curves)
+    m4, targets = _revenue_targets(m16)
+    delta = targets - m4
+    revenue = 12 * m4.sum() + delta @ curves.sum(axis=1)
+    revenue_f = m4.sum() * RAMP_F.sum() + delta @ (curves @ RAMP_F)
+    variable_ratio_base, variable_ratio_m16 = _variable_ratios(m16)
+    variable = variable_ratio_base * revenue + (variable_ratio_m16[..., 0] - variable_ratio_base) * revenue_f
+    fixed = (12 * (BASE_PERSONAL + BASE_ADMIN + BASE_BANKING + BASE_INVERSIONES + np.asarray(m16['fwd_cost']))
+             + m16['hiring_payroll_12m'] + country_admin_months(m16['country_schedule'], a.country_admin)
+             - AI_ACTIVE.sum() * np.asarray(m16['ai_savings']))
+    return DATA['cash'][3] + revenue - fixed - variable
+
+
+def project_months(inp, a, m16, horizon=16):
+    """Proyección M4..M{horizon} a partir de los valores M16 del escenario.
+
+    m16 es el dict de vita_model.scenario.evaluate() (escalares o arrays de
+    escenarios); inp y a son los mismos ScenarioInputs / Assumptions.
+    """
+    if horizon < 16:
+        raise ValueError("El horizonte mínimo es M16")
+    n_months = horizon - 3
+    n_post = n_months - 1 - 12
+    rev_growth = _growth_index(a.growth_after_m16, n_post)
+    fixed_growth = _growth_index([a.fixed_growth_after_m16], n_post)
+    r = _ramp(inp, a, m16)
+    f, curves = r['f'], r['curves']
+
+    drivers = [m16[field] for field, _ in REVENUE_LINES.values()] + [
+        m16[k] for k in ('total_rev_proj', 'total_variable', 'cogs_proj', 'tax_proj', 'mktg_proj',
+                         'fwd_cost', 'ai_savings', 'clients_payouts')] + [
+        r['personal'][..., 0], r['admin'][..., 0], inp.clients_payins_m16,
+        a.country_admin, a.clients_b2b_m4, a.clients_payins_m4]
+    shape = np.broadcast_shapes(*(np.shape(x) for x in drivers)) + (n_months,)
+
+    def series(m4, ramp_values, post_values):
+        out = np.empty(shape)
+        out[..., 0] = m4
+        out[..., 1:13] = ramp_values
+        out[..., 13:] = post_values
+        return out
+
+    # ── REVENUE (total y por línea) ──
+    revenue_ramp = r['revenue']
+    revenue = series(DATA['revenue'][3], revenue_ramp, revenue_ramp[..., -1:] * rev_growth)
+    lines = {}
+    for name, (field, m4) in REVENUE_LINES.items():
+        ramp_values = m4 + (_col(m16[field]) - m4) * curves[LINES.index(name)]
+        lines[name] = series(m4, ramp_values, ramp_values[..., -1:] * rev_growth)
+
+    # ── COSTOS FIJOS: post-M16 crecen a fixed_growth_after_m16 ──
+    def fixed_series(m4, ramp_values):
+        ramp_values = np.broadcast_to(ramp_values, shape[:-1] + (12,))
+        return series(m4, ramp_values, ramp_values[..., -1:] * fixed_growth)
+
+    variable_m4 = DATA['cogs'][3] + DATA['tax'][3] + DATA['marketing'][3]
+    personal = fixed_series(DATA['personal'][3], r['personal'])
+    admin = fixed_series(DATA['admin'][3], r['admin'])
+    banking = fixed_series(DATA['banking'][3], BASE_BANKING)
+    inversiones = fixed_series(DATA['inversiones'][3], BASE_INVERSIONES)
+    fwd_cost = fixed_series(0, r['fwd_cost'])
+    ai_savings = fixed_series(0, r['ai_savings'])
+    fixed = fixed_series(DATA['gastos'][3] - variable_m4, r['fixed'])
+
+    # ── COSTOS VARIABLES: ratio sobre revenue interpolado entre base y M16, luego fijo ──
+    variable = series(variable_m4, r['variable'], revenue[..., 13:] * r['variable_ratio_m16'])
+    buckets = {}
+    for name, (field, base) in VARIABLE_BUCKETS.items():
+        ratio_base = base / BASE_REVENUE
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio16 = _col(np.where(m16['total_rev_proj'] > 0, m16[field] / m16['total_rev_proj'], ratio_base))
+        buckets[name] = series(DATA[name][3], revenue_ramp * (ratio_base + (ratio16 - ratio_base) * f),
+                               revenue[..., 13:] * ratio16)
+
+    # ── TOTALES Y CAJA ──
+    cost = fixed + variable
+    cost[..., 0] = DATA['gastos'][3]
+    net = revenue - cost
+    cash_flows = net.copy()
+    cash_flows[..., 0] = DATA['cash'][3]
+    cash = np.cumsum(cash_flows, axis=-1)
+
+    # ── CLIENTES B2B: curva de su línea hacia M16 y luego al ritmo del revenue ──
+    def clients_series(m4, c16, line):
+        ramp_values = _col(m4) + (_col(c16) - _col(m4)) * curves[LINES.index(line)]
+        return series(m4, ramp_values, ramp_values[..., -1:] * rev_growth)
+
+    return Projection(
+        months=np.arange(4, horizon + 1),
+        **lines,
+        personal=personal,
+        admin=admin,
+        banking=banking,
+        inversiones=inversiones,
+        fwd_cost=fwd_cost,
+        ai_savings=ai_savings,
+        **buckets,
+        clients_b2b=clients_series(a.clients_b2b_m4, m16['clients_payouts'], 'rev_b2b'),
+        clients_payins=clients_series(a.clients_payins_m4, inp.clients_payins_m16, 'rev_pi'),
+        revenue=revenue,
+        fixed=fixed,
+        variable=variable,
+        cost=cost,
+        net=net,
+        cash=cash,
+    )
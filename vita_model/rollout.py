@@ -0,0 +1,114 @@
+"""Búsqueda del calendario de lanzamiento de países.
+
+Para los N países del slider elige cuáles lanzar, en qué orden y en qué
+mes (M5..M16) para maximizar la caja M16 o minimizar el gap de
+financiamiento; el resto del escenario queda fijo.
+Como cada país tiene techo de clientes a M16 (countries.country_clients),
+adelantar un lanzamiento más allá de lo necesario para llegar al techo
+sólo suma meses de admin: el óptimo no es "todo lo antes posible".
+
+El espacio completo (C(países, N) × N! órdenes × 12^N meses) se poda
+antes de evaluar:
+  1. Meses estrictamente crecientes con al menos min_gap meses entre
+     lanzamientos (capacidad del equipo); con min_gap=0 los empates se
+     quedan sólo en el orden de COUNTRIES (son el mismo calendario).
+  2. Ningún país antes de su mes earliest (sociedad, licencias).
+Los calendarios que quedan se evalúan en bloques con el grafo de métricas
+(Assumptions.country_launch como array (bloque, países)). Los resultados
+se cachean por escenario (LRUCache, clave = fingerprint de los inputs).
+"""
+import time
+from dataclasses import replace
+from itertools import combinations, permutations
+from math import comb, factorial
+
+import numpy as np
+
+from .cache import LRUCache, fingerprint
+from .countries import COUNTRIES, COUNTRY_EARLIEST, COUNTRY_LAUNCH, COUNTRY_NAMES, LAUNCH_MONTHS
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate
+
+# Objetivo → sentido
+ROLLOUT_OBJECTIVES = {'cash_proj': 'max', 'gap': 'min'}
+
+ROLLOUT_CHUNK = 1 << 12
+ROLLOUT_CACHE = LRUCache(maxsize=32, ttl=3600)
+
+
+def _month_tuples(n, min_gap):
+    # Meses (m1 ≤ … ≤ mn) con mj+1 − mj ≥ min_gap → array (T, n)
+    out = [()]
+    for _ in range(n):
+        out = [t + (m,) for t in out for m in LAUNCH_MONTHS.tolist() if not t or m - t[-1] >= min_gap]
+    return np.array(out, dtype=float).reshape(-1, n)
+
+
+def candidate_schedules(n, min_gap=1):
+    """Calendarios podados → array (K, países) de meses de lanzamiento (inf = no se lanza)."""
+    if n == 0:
+        return np.full((1, len(COUNTRIES)), np.inf)
+    months = _month_tuples(n, min_gap)
+    blocks = []
+    for subset in combinations(range(len(COUNTRIES)), n):
+        for order in permutations(subset):
+            order = np.array(order)
+            ok = (months >= COUNTRY_EARLIEST[order]).all(axis=1)
+            if min_gap == 0:
+                # Empates de mes: sólo el orden de COUNTRIES (el calendario es el mismo)
+                ok &= ((np.diff(months, axis=1) > 0) | (np.diff(order) > 0)).all(axis=1)
+            block = np.full((int(ok.sum()), len(COUNTRIES)), np.inf)
+            block[:, order] = months[ok]
+            blocks.append(block)
+    return np.concatenate(blocks)
+
+
+def _schedule_dict(row):
+    return {name: int(m) for name, m in zip(COUNTRY_NAMES, row) if np.isfinite(m)}
+
+
+def _search(inp, assumptions, objective, min_gap, top):
+    t0 = time.perf_counter()
+    n = int(inp.new_countries)
+    schedules = candidate_schedules(n, min_gap)
+    values = {k: np.empty(len(schedules)) for k in ROLLOUT_OBJECTIVES}
+    for start in range(0, len(schedules), ROLLOUT_CHUNK):
+        sl = slice(start, start + ROLLOUT_CHUNK)
+        out = evaluate(inp, replace(assumptions, country_launch=schedules[sl]), with_trajectory=False)
+        for k in values:
+            values[k][sl] = out[k]
+    score = values[objective] if ROLLOUT_OBJECTIVES[objective] == 'max' else -values[objective]
+    best = np.argsort(-score, kind='stable')[:top]
+    return {
+        'objective': objective,
+        'n_countries': n,
+        'top': [dict(schedule=_schedule_dict(schedules[i]), **{k: float(v[i]) for k, v in values.items()})
+                for i in best],
+        'n_space': comb(len(COUNTRIES), n) * factorial(n) * len(LAUNCH_MONTHS) ** n,
+        'n_evaluated': len(schedules),
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }
+
+
+def optimize_rollout(inputs=None, assumptions=DEFAULT_ASSUMPTIONS, objective='cash_proj', min_gap=1, top=10):
+    """Mejores calendarios para los new_countries del escenario (cacheado por inputs).
+
+    Devuelve un dict con los top calendarios ({país: mes} y sus cash_proj
+    y gap), el calendario actual (no cacheado), tamaño del espacio,
+    calendarios evaluados tras la poda y tiempo de la búsqueda.
+    """
+    if objective not in ROLLOUT_OBJECTIVES:
+        raise ValueError(f"objective debe ser uno de {tuple(ROLLOUT_OBJECTIVES)}")
+    inp = inputs if inputs is not None else ScenarioInputs()
+    # El calendario actual no cambia la búsqueda: fuera de la clave del caché
+    search_assumptions = replace(assumptions, country_launch=COUNTRY_LAUNCH)
+    key = fingerprint((inp, search_assumptions, objective, min_gap, top))
+    result = ROLLOUT_CACHE.get_or_compute(
+        key, lambda: _search(inp, search_assumptions, objective, min_gap, top))
+    current = evaluate(inp, assumptions, with_trajectory=False)
+    return dict(result, current=dict(schedule=_schedule_dict(current['country_schedule']),
+                                     **{k: float(current[k]) for k in ROLLOUT_OBJECTIVES}))
+
+
+def schedule_launch(schedule):
+    """{país: mes} → Assumptions.country_launch; los países que no están quedan sin lanzar (inf)."""
+    return tuple(float(schedule[name]) if name in schedule else np.inf for name in COUNTRY_NAMES)
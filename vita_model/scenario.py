@@ -0,0 +1,210 @@
+"""Motor de escenarios M16 del Scenario Builder.
+
+Función pura sin Streamlit: ScenarioInputs (sliders del sidebar) +
+Assumptions (constantes del modelo) → ScenarioResult. La UI sólo lee
+sliders, llama a run_scenario() y renderiza el resultado.
+
+Las fórmulas viven en vita_model.metrics (una métrica por función, con sus
+dependencias declaradas) y son elementwise con NumPy: evaluate() acepta
+escalares o arrays (con broadcasting) tanto en ScenarioInputs como en
+Assumptions, así el mismo código sirve para un escenario, un barrido o un
+Monte Carlo.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from .countries import COUNTRY_LAUNCH
+from .data import DATA, AVG_CHURN_B2B_SAFE
+from .elasticity import TAKE_FIT
+from .exchange import EXCHANGE_FIT
+from .hiring import HiringPlan
+from .metrics import SCENARIO_GRAPH, scenario_sources
+from .projection import Projection
+
+
+@dataclass(frozen=True)
+class ScenarioInputs:
+    """Parámetros del sidebar (mismos defaults que los sliders)."""
+    take_b2b: float = 0.50           # Take rate Payouts B2B (%)
+    new_countries: int = 3           # Bolivia, Perú, España (vita_model.countries)
+    clients_payins_m16: int = 50
+    mult_b2c: float = 2.5
+    hc_target: int = 64
+    hiring_mode: bool = True         # True = contratación gradual
+    mktg_monthly: float = 55         # $K/mes
+    fwd_on: bool = True
+    ai_on: bool = True
+    card_on: bool = True
+    fwd_rev: float = 45000
+    card_rev: float = 40000
+
+
+@dataclass(frozen=True)
+class Assumptions:
+    """Constantes del modelo (antes hard-coded en app_1.py)."""
+    # Payouts B2B
+    clients_b2b_m4: int = 396
+    base_rate: float = TAKE_FIT['acquisition']['base_rate']             # clientes/mes con drop actual (0.70→0.55)
+    ref_take_b2b: float = 0.55             # take rate M4
+    clients_per_bp: float = TAKE_FIT['acquisition']['clients_per_bp']   # clientes/mes por bp de baja (ajuste M1-M4)
+    clients_per_country: float = 50        # clientes B2B por país nuevo a M16 (calendario planificado)
+    country_launch: tuple = COUNTRY_LAUNCH  # mes de lanzamiento por país de vita_model.countries
+    gtv_per_client_payouts: float = float(np.mean(DATA['avg_gtv_user_b2b']))
+    gtv_elasticity_b2b: float = TAKE_FIT['gtv']['payouts_b2b']['elasticity']   # GTV/cliente ∝ (take / ref)^ε
+    # Payins B2B: take rate de escala (curva log entre 2 y 100 clientes)
+    payins_take_max: float = 1.37
+    payins_take_min: float = 0.65
+    payins_clients_min: float = 2
+    payins_clients_max: float = 100
+    avg_gtv_payins_client: float = 250000
+    payins_price_points: tuple = ((2, DATA['take_payins_b2b'][3]),)   # (clientes, take %) observados: re-ajustan la curva
+    clients_payins_m4: int = 2
+    # Exchange: volumen por bucket ∝ GTV Payouts del segmento, revenue = spread × volumen (EXCHANGE_BUCKETS)
+    exchange_volume_ratios: tuple = tuple(float(v) for v in EXCHANGE_FIT['volume_ratio'].ravel())
+    exchange_spreads: tuple = tuple(float(v) for v in EXCHANGE_FIT['spread'].ravel())   # %
+    # Costos fijos
+    team_size: int = 58
+    team_cost_per_head: float = 1836
+    new_hire_cost: float = 2500
+    country_admin: float = 5000
+    bank_proj: float = 18000
+    inv_proj: float = 8000
+    ai_savings: float = 14000
+    fwd_cost: float = 4500
+    # Costos variables
+    cogs_rate: float = 0.0016              # ~0.16% del GTV (promedio M2-M4)
+    tax_rate: float = 0.073                # impuestos operativos ~7.3% del revenue
+    # Inversión del plan
+    cac_b2b: float = 1200
+    cac_b2c: float = 15
+    b2c_users_per_mult: float = 3000
+    cac_payins: float = 2000
+    infra_investment: float = 300000
+    hire_investment: float = 1900
+    # Retención
+    churn_b2b: float = AVG_CHURN_B2B_SAFE
+    ref_churn_b2b: float = AVG_CHURN_B2B_SAFE  # churn ya neto en base_rate (promedio M1-M4)
+    # Horizonte largo (post-M16): crecimiento anual por año y de costos fijos
+    growth_after_m16: tuple = (0.30, 0.25, 0.20, 0.15, 0.10)
+    fixed_growth_after_m16: float = 0.20
+    # Rampa M4→M16: pares (línea, familia) de vita_model.curves; las líneas sin entrada usan 'logistic'
+    ramp_curves: tuple = ()
+
+
+DEFAULT_ASSUMPTIONS = Assumptions()
+
+
+@dataclass(frozen=True)
+class ScenarioResult:
+    inputs: ScenarioInputs
+    # Payouts B2B
+    monthly_client_rate: float
+    additional_drop_bp: float
+    additional_rate: float
+    organic_growth: int
+    country_schedule: np.ndarray
+    country_clients_m16: np.ndarray
+    country_growth: float
+    clients_payouts: float
+    new_clients_b2b: float
+    gtv_b2b_m16: float
+    rev_b2b_proj: float
+    growth_pct_payouts: float
+    # Payins B2B
+    scale_factor: float
+    take_payins_derived: float
+    gtv_payins_m16: float
+    rev_payins_proj: float
+    total_b2b_m16: float
+    mult_total: float
+    # Exchange, B2C y productos nuevos
+    exchange_volume_m16: np.ndarray
+    exchange_rev_m16: np.ndarray
+    rev_ex_b2b_proj: float
+    rev_ex_b2c_proj: float
+    rev_ex_proj: float
+    rev_b2c_proj: float
+    fwd_rev: float
+    card_rev: float
+    total_rev_proj: float
+    # Operaciones
+    new_positions: int
+    hiring_plan: HiringPlan
+    hiring_payroll: np.ndarray
+    hiring_savings_12m: float
+    total_new_clients_12m: float
+    mktg_12m: float
+    effective_cac: float
+    # Costos fijos
+    personal_proj: float
+    admin_proj: float
+    bank_proj: float
+    inv_proj: float
+    ai_savings: float
+    fwd_cost: float
+    total_fixed: float
+    # Costos variables
+    gtv_b2c_m16: float
+    gtv_m16: float
+    cogs_proj: float
+    tax_proj: float
+    mktg_proj: float
+    total_variable: float
+    # Totales M16
+    total_gastos_proj: float
+    fixed_ratio: float
+    variable_ratio: float
+    margin_proj: float
+    multiple: float
+    rev_per_emp_proj: float
+    net_income: float
+    # Métricas por cliente B2B
+    rev_per_user_total_m16: float
+    mrr_m16: float
+    cltv_m16: float
+    # Inversión, caja y financiamiento
+    cac_investment: float
+    total_investment: float
+    trajectory: Projection
+    cash_proj: float
+    gap: float
+
+
+RESULT_FIELDS = tuple(f.name for f in fields(ScenarioResult) if f.name != 'inputs')
+# Detalle de un escenario que los barridos no necesitan: la Projection completa, el plan hire por hire y su
+# nómina mes a mes (los totales M16 salen de las tablas de vita_model.hiring y de projection.ramp_cash())
+DETAIL_FIELDS = ('trajectory', 'hiring_plan', 'hiring_payroll')
+
+
+def evaluate(inp, a=DEFAULT_ASSUMPTIONS, with_trajectory=True, horizon=16, state=None, targets=None):
+    """Evalúa las fórmulas del escenario sobre escalares o arrays.
+
+    Devuelve un dict campo → valor con los mismos nombres que ScenarioResult,
+    calculado con el grafo de vita_model.metrics. La trayectoria es una
+    Projection M4..M{horizon}; con with_trajectory=False se omiten ella,
+    el plan hire por hire y la nómina por mes (DETAIL_FIELDS, más liviano
+    para barridos grandes) y cash_proj y gap se calculan igual, en forma
+    cerrada. targets restringe el cálculo a esos campos (y lo que
+    necesiten), p. ej. los outputs de un barrido.
+
+    Con state (un IncrementalGraph) sólo se recalculan las métricas aguas
+    abajo de los sliders/constantes que cambiaron desde el run anterior.
+    """
+    if targets is None:
+        targets = RESULT_FIELDS if with_trajectory else tuple(k for k in RESULT_FIELDS if k not in DETAIL_FIELDS)
+    sources = scenario_sources(inp, a, horizon)
+    if state is not None:
+        return state.run(sources, targets)
+    return SCENARIO_GRAPH.compute(sources, targets)
+
+
+def _to_scalar(v):
+    return v.item() if isinstance(v, (np.ndarray, np.generic)) and np.ndim(v) == 0 else v
+
+
+def run_scenario(inputs=None, assumptions=DEFAULT_ASSUMPTIONS, horizon=16, state=None):
+    """Evalúa el escenario M16 completo (revenue, costos, trayectoria a M{horizon}, caja y gap)."""
+    inp = inputs if inputs is not None else ScenarioInputs()
+    values = evaluate(inp, assumptions, horizon=horizon, state=state)
+    return ScenarioResult(inputs=inp, **{k: _to_scalar(v) for k, v in values.items()})
@@ -0,0 +1,133 @@
+"""Análisis de sensibilidad tipo tornado.
+
+Cada parámetro (sliders del sidebar y constantes del modelo) se mueve ±X%
+dejando el resto fijo. Los drivers enteros (países, headcount, equipo) se
+redondean al entero más cercano, se mueven al menos una unidad y se acotan
+al rango de su slider. Las 2N perturbaciones + el escenario base se arman
+como arrays y se evalúan en una sola pasada de vita_model.scenario.
+"""
+from dataclasses import replace
+
+import numpy as np
+
+from .countries import COUNTRIES
+from .scenario import DEFAULT_ASSUMPTIONS, ScenarioInputs, evaluate
+
+# Sliders del sidebar (ScenarioInputs)
+INPUT_PARAMS = {
+    'take_b2b': 'Take rate Payouts B2B',
+    'new_countries': 'Nuevos países',
+    'clients_payins_m16': 'Clientes Payins M16',
+    'mult_b2c': 'Multiplicador B2C',
+    'hc_target': 'Headcount target',
+    'mktg_monthly': 'Marketing mensual',
+    'fwd_rev': 'Revenue Forwards',
+    'card_rev': 'Revenue Vita Card',
+}
+
+# Constantes del modelo (Assumptions). Quedan fuera los datos reales de M4
+# (clientes B2B y Payins actuales), que no son supuestos.
+ASSUMPTION_PARAMS = {
+    'base_rate': 'Ritmo orgánico (cli/mes)',
+    'ref_take_b2b': 'Take rate B2B de referencia',
+    'clients_per_bp': 'Clientes por bp de baja',
+    'clients_per_country': 'Clientes por país',
+    'gtv_per_client_payouts': 'GTV por cliente Payouts',
+    'payins_take_max': 'Take rate Payins máx.',
+    'payins_take_min': 'Take rate Payins mín.',
+    'avg_gtv_payins_client': 'GTV por cliente Payins',
+    'exchange_volume_ratios': 'Volumen Exchange / GTV Payouts',
+    'exchange_spreads': 'Spreads Exchange',
+    'team_size': 'Equipo actual',
+    'team_cost_per_head': 'Costo por persona actual',
+    'new_hire_cost': 'Costo por nuevo hire',
+    'country_admin': 'Admin por país',
+    'bank_proj': 'Banking',
+    'inv_proj': 'Inversiones',
+    'ai_savings': 'Ahorro AI Sales Agent',
+    'fwd_cost': 'Costo Forwards',
+    'cogs_rate': 'COGS (% GTV)',
+    'tax_rate': 'Impuestos (% revenue)',
+    'cac_b2b': 'CAC B2B',
+    'cac_b2c': 'CAC B2C',
+    'cac_payins': 'CAC Payins',
+    'churn_b2b': 'Churn B2B mensual',
+    'infra_investment': 'Inversión infraestructura',
+    'hire_investment': 'Inversión por hire',
+}
+
+# Drivers enteros → (mínimo, máximo) del slider; None = sin tope
+INTEGER_PARAMS = {
+    'new_countries': (0, len(COUNTRIES)),
+    'hc_target': (58, 80),
+    'team_size': (1, None),
+}
+
+TORNADO_METRICS = ('total_rev_proj', 'margin_proj', 'gap')
+
+
+def run_tornado(inputs=None, pct=0.10, metrics=TORNADO_METRICS, assumptions=DEFAULT_ASSUMPTIONS):
+    """Evalúa base + (−pct, +pct) por parámetro en un solo batch.
+
+    Devuelve {'base': {métrica: valor}, 'rows': {métrica: [fila, ...]}} con
+    filas ordenadas de mayor a menor swing. Cada fila: param, label, low,
+    high (valor de la métrica con el parámetro a −pct / +pct), low_value,
+    high_value (valor perturbado del parámetro; None si es por bucket) y swing.
+    """
+    inp = inputs if inputs is not None else ScenarioInputs()
+    params = [('input', k) for k in INPUT_PARAMS] + [('assumption', k) for k in ASSUMPTION_PARAMS]
+    n = 1 + 2 * len(params)
+
+    # Fila 0 = base; filas 2j+1 / 2j+2 = parámetro j a −pct / +pct
+    factors = np.ones((len(params), n))
+    idx = np.arange(len(params))
+    factors[idx, 2 * idx + 1] = 1 - pct
+    factors[idx, 2 * idx + 2] = 1 + pct
+
+    inp_cols, a_cols = {}, {}
+    for j, (kind, name) in enumerate(params):
+        base = getattr(inp, name) if kind == 'input' else getattr(assumptions, name)
+        # Constantes por bucket (tuplas) → (n, buckets)
+        col = np.multiply.outer(factors[j], base)
+        if name in INTEGER_PARAMS:
+            col = _integer_steps(base, factors[j], *INTEGER_PARAMS[name])
+        (inp_cols if kind == 'input' else a_cols)[name] = col
+    if not inp.fwd_on:
+        inp_cols['fwd_rev'] = inp_cols['fwd_rev'] * 0
+    if not inp.card_on:
+        inp_cols['card_rev'] = inp_cols['card_rev'] * 0
+
+    values = evaluate(replace(inp, **inp_cols), replace(assumptions, **a_cols), with_trajectory=False)
+
+    base, rows = {}, {}
+    for m in metrics:
+        v = np.broadcast_to(values[m], (n,))
+        base[m] = float(v[0])
+        low, high = v[1::2], v[2::2]
+        swing = np.abs(high - low)
+        order = np.argsort(-swing, kind='stable')
+        rows[m] = [
+            {
+                'param': params[j][1],
+                'label': (INPUT_PARAMS if params[j][0] == 'input' else ASSUMPTION_PARAMS)[params[j][1]],
+                'low': float(low[j]),
+                'high': float(high[j]),
+                'low_value': _perturbed(inp_cols, a_cols, params[j], 2 * j + 1),
+                'high_value': _perturbed(inp_cols, a_cols, params[j], 2 * j + 2),
+                'swing': float(swing[j]),
+            }
+            for j in order
+        ]
+    return {'pct': pct, 'base': base, 'rows': rows}
+
+
+def _integer_steps(base, factors, lo, hi):
+    """±pct al entero más cercano, como mínimo ±1 y dentro de [lo, hi]."""
+    v = np.round(base * factors)
+    v = np.where(factors < 1, np.minimum(v, base - 1), np.where(factors > 1, np.maximum(v, base + 1), base))
+    return np.clip(v, lo, hi if hi is not None else np.inf).astype(np.int64)
+
+
+def _perturbed(inp_cols, a_cols, param, i):
+    col = (inp_cols if param[0] == 'input' else a_cols)[param[1]]
+    return float(col[i]) if col.ndim == 1 else None
@@ -0,0 +1,296 @@
+"""Motor de valorización del tab Valuation.
+
+DCF vectorizado: WACC, crecimiento terminal, paths de crecimiento y de
+margen pueden ser arrays (con broadcasting), así una grilla completa de
+sensibilidad se calcula en una sola pasada NumPy en vez de un loop Python
+por combinación.
+
+run_valuation() calcula los 6 métodos a partir de ValuationInputs, que es
+hashable para poder memoizar el resultado por escenario. Los métodos desde
+M16 son elementwise (m16_range() acepta ValuationInputs con arrays), así el
+cubo de escenarios precalcula la valorización de toda la grilla.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .data import BASE_REVENUE, BASE_GASTOS, BASE_GTV_B2B, BASE_GTV_B2C
+
+DCF_YEARS = 5
+
+
+def dcf(base_rev_annual, growth_rates, margins, wacc, terminal_growth=0.03):
+    """DCF a 5 años + valor terminal (Gordon) sobre EBITDA.
+
+    growth_rates y margins tienen el año en el último eje (..., 5); wacc,
+    terminal_growth y base_rev_annual hacen broadcasting con el resto. Si
+    wacc <= terminal_growth el valor terminal es 0.
+
+    Devuelve un dict con 'ev' (PV total), 'tv_pv', y arrays (..., 5) de
+    'revenue', 'ebitda' y 'pv' por año.
+    """
+    growth_rates = np.asarray(growth_rates, dtype=float)
+    margins = np.asarray(margins, dtype=float)
+    wacc = np.asarray(wacc, dtype=float)[..., None]
+    terminal_growth = np.asarray(terminal_growth, dtype=float)[..., None]
+
+    rev = np.asarray(base_rev_annual, dtype=float)[..., None]
+    revenue, ebitda, pv = [], [], []
+    total_pv = 0
+    for i in range(DCF_YEARS):
+        rev = rev * (1 + growth_rates[..., i:i + 1])
+        e = rev * margins[..., i:i + 1]
+        p = e / ((1 + wacc) ** (i + 1))
+        revenue.append(np.broadcast_to(rev, p.shape))
+        ebitda.append(np.broadcast_to(e, p.shape))
+        pv.append(p)
+        total_pv = total_pv + p
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terminal_value = np.where(wacc > terminal_growth,
+                                  ebitda[-1] * (1 + terminal_growth) / (wacc - terminal_growth), 0)
+    tv_pv = terminal_value / ((1 + wacc) ** DCF_YEARS)
+    revenue, ebitda, pv = (np.concatenate(x, axis=-1) for x in (revenue, ebitda, pv))
+    return {
+        'ev': (total_pv + tv_pv)[..., 0],
+        'tv_pv': tv_pv[..., 0],
+        'revenue': revenue,
+        'ebitda': ebitda,
+        'pv': pv,
+    }
+
+
+def dcf_grid(base_rev_annual, growth_rates, margins, waccs, terminal_growths):
+    """EV para cada combinación WACC × g terminal → array (len(waccs), len(terminal_growths))."""
+    waccs = np.asarray(waccs, dtype=float)
+    terminal_growths = np.asarray(terminal_growths, dtype=float)
+    return dcf(base_rev_annual, growth_rates, margins, waccs[:, None], terminal_growths[None, :])['ev']
+
+
+def dcf_detail(result, idx=()):
+    """Filas año a año de un punto del DCF (formato de la tabla del expander)."""
+    return [
+        {'year': i + 1, 'revenue': float(result['revenue'][idx + (i,)]),
+         'ebitda': float(result['ebitda'][idx + (i,)]), 'pv': float(result['pv'][idx + (i,)])}
+        for i in range(DCF_YEARS)
+    ]
+
+
+# ═══════════════════════════════════════════════════════════
+# VALORIZACIÓN MULTI-MÉTODO (tab Valuation)
+# ═══════════════════════════════════════════════════════════
+REV_MULTIPLES = {'Conservador': {'base': 5, 'm16': 6}, 'Base': {'base': 7, 'm16': 8}, 'Optimista': {'base': 9, 'm16': 11}}
+EBITDA_MULTIPLES = [15, 20, 25]
+GROWTH_FROM_BASE = [1.0, 0.50, 0.30, 0.20, 0.15]
+MARGIN_FROM_BASE = [0.25, 0.35, 0.38, 0.40, 0.42]
+VC_IRRS = [('25% IRR', 0.25), ('35% IRR', 0.35), ('45% IRR', 0.45)]
+EXIT_MULTIPLE = 6
+
+
+@dataclass(frozen=True)
+class ValuationInputs:
+    """Todo lo que determina la valorización (hashable: sirve de clave de caché)."""
+    rev_m16: float
+    gastos_m16: float
+    gtv_m16: float
+    multiple: float
+    years_revenue: tuple      # revenue de los 5 años post-M16 (proyección)
+    years_net: tuple          # EBITDA de los 5 años post-M16
+    rev_exit_monthly: float   # revenue mensual en M64 (año 5 del plan)
+
+
+def valuation_inputs(rev_m16, gastos_m16, gtv_m16, multiple, projection):
+    """Arma ValuationInputs con los valores M16 y la proyección M17→M76."""
+    years = projection.annual(16, DCF_YEARS)
+    return ValuationInputs(
+        rev_m16=float(rev_m16), gastos_m16=float(gastos_m16), gtv_m16=float(gtv_m16), multiple=float(multiple),
+        years_revenue=tuple(float(v) for v in years['revenue']),
+        years_net=tuple(float(v) for v in years['net']),
+        rev_exit_monthly=float(projection.revenue[projection.index(16 + 48)]),
+    )
+
+
+def _convergence(values):
+    """Rango de convergencia elementwise: descarta el mínimo y el máximo si hay más de 2 métodos > 0."""
+    v = np.stack(np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in values)))
+    v = np.sort(np.where(v > 0, v, np.inf), axis=0)   # métodos sin valor al final
+    k = (v < np.inf).sum(axis=0)
+    low = np.where(k > 2, v[min(1, len(v) - 1)], v[0])
+    high = np.take_along_axis(v, np.where(k > 2, k - 2, np.maximum(k - 1, 0))[None], axis=0)[0]
+    return np.where(k > 0, low, 0), np.where(k > 0, high, 0)
+
+
+def _methods_m16(vi):
+    """Métodos desde M16, elementwise: los campos de vi pueden ser arrays (años en el último eje)."""
+    rev_m16 = np.asarray(vi.rev_m16, dtype=float)
+    gastos_m16 = np.asarray(vi.gastos_m16, dtype=float)
+    gtv_m16 = np.asarray(vi.gtv_m16, dtype=float)
+    years_revenue = np.asarray(vi.years_revenue, dtype=float)
+    years_net = np.asarray(vi.years_net, dtype=float)
+
+    rev_annual_m16 = rev_m16 * 12
+    annual_growth_pct = (np.asarray(vi.multiple, dtype=float) - 1) * 100
+    gtv_annual_m16 = gtv_m16 * 12
+    ebitda_m16_annual = (rev_m16 - gastos_m16) * 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin_m16 = np.where(rev_m16 > 0, (rev_m16 - gastos_m16) / rev_m16 * 100, 0)
+        take_rate_m16 = np.where(gtv_annual_m16 > 0, rev_annual_m16 / gtv_annual_m16 * 100, 0)
+        # Desde M16: años 1-5 = sumas de 12 meses de la proyección M17→M76
+        rev_years = np.concatenate([rev_annual_m16[..., None], years_revenue], axis=-1)
+        growth_from_m16 = rev_years[..., 1:] / rev_years[..., :-1] - 1
+        margin_from_m16 = years_net / years_revenue
+    rule40_m16 = annual_growth_pct + margin_m16
+    return {
+        'rev_annual_m16': rev_annual_m16,
+        'ebitda_m16_annual': ebitda_m16_annual,
+        'margin_m16': margin_m16,
+        'rule40_m16': rule40_m16,
+        'evrev_m16': {case: rev_annual_m16 * mults['m16'] for case, mults in REV_MULTIPLES.items()},
+        'evebitda_m16': {f'{m}x': ebitda_m16_annual * m for m in EBITDA_MULTIPLES},
+        'growth_from_m16': growth_from_m16,
+        'margin_from_m16': margin_from_m16,
+        'dcf_m16_15': dcf(rev_annual_m16, growth_from_m16, margin_from_m16, 0.15),
+        'dcf_m16_20': dcf(rev_annual_m16, growth_from_m16, margin_from_m16, 0.20),
+        'take_rate_m16': take_rate_m16,
+        'vol_val_m16': rev_annual_m16 * np.where(take_rate_m16 < 1.2, 8, 5),
+        'r40_val_m16': rev_annual_m16 * 6 * np.where(rule40_m16 >= 40, 1.75, 1.0),
+    }
+
+
+def _range_m16(m):
+    return _convergence([m['evrev_m16']['Base'], m['evebitda_m16']['20x'], m['dcf_m16_15']['ev'],
+                         m['vol_val_m16'], m['r40_val_m16']])
+
+
+def m16_range(vi):
+    """Rango de convergencia M16 (low, high) — elementwise, sirve para barridos y el cubo de escenarios."""
+    return _range_m16(_methods_m16(vi))
+
+
+def run_valuation(vi):
+    """Los 6 métodos de valorización (Base avg M1-M4 y M16) de un escenario → dict."""
+    # Anualizados
+    rev_annual_base = BASE_REVENUE * 12
+    gtv_annual_base = (BASE_GTV_B2B + BASE_GTV_B2C) * 12
+
+    # Márgenes
+    ebitda_base = BASE_REVENUE - BASE_GASTOS
+    ebitda_base_annual = ebitda_base * 12
+    margin_base = ebitda_base / BASE_REVENUE * 100 if BASE_REVENUE > 0 else 0
+    m = _methods_m16(vi)
+    rev_annual_m16 = float(m['rev_annual_m16'])
+
+    # Rule of 40
+    rule40_base = 8 + margin_base  # ~8% growth MoM anualizado + margen
+
+    # MÉTODO 1: EV/Revenue Multiple
+    evrev = {case: {'base': rev_annual_base * mults['base'], 'm16': float(m['evrev_m16'][case])}
+             for case, mults in REV_MULTIPLES.items()}
+
+    # MÉTODO 2: EV/EBITDA
+    evebitda_base = {f'{x}x': ebitda_base_annual * x for x in EBITDA_MULTIPLES}
+    evebitda_m16 = {k: float(v) for k, v in m['evebitda_m16'].items()}
+
+    # MÉTODO 3: DCF — Base en una sola pasada vectorizada: WACC 20% (índice 0) y 15% (índice 1)
+    dcf_base = dcf(rev_annual_base, GROWTH_FROM_BASE, MARGIN_FROM_BASE, np.array([0.20, 0.15]))
+    dcf_base_20, dcf_base_15 = dcf_base['ev']
+
+    # MÉTODO 4: Volume-Based (GTV)
+    take_rate_base = rev_annual_base / gtv_annual_base * 100 if gtv_annual_base > 0 else 0
+    vol_val_base = rev_annual_base * 7
+
+    # MÉTODO 5: VC Method
+    rev_year5 = vi.rev_exit_monthly * 12  # run-rate anual en M64 (año 5 del plan)
+    exit_value = rev_year5 * EXIT_MULTIPLE
+    vc_vals = {label: exit_value / ((1 + irr) ** 5) for label, irr in VC_IRRS}
+
+    # MÉTODO 6: Rule of 40 Adjusted
+    r40_val_base = rev_annual_base * 5 * (1.75 if rule40_base >= 40 else 1.0)
+
+    base_low, base_high = (float(x) for x in _convergence([evrev['Base']['base'], evebitda_base.get('20x', 0), dcf_base_20,
+                                                         vol_val_base, vc_vals.get('35% IRR', 0), r40_val_base]))
+    m16_low, m16_high = (float(x) for x in _range_m16(m))
+    return {
+        'rev_annual_base': rev_annual_base, 'rev_annual_m16': rev_annual_m16,
+        'ebitda_base_annual': ebitda_base_annual, 'ebitda_m16_annual': float(m['ebitda_m16_annual']),
+        'margin_base': margin_base, 'margin_m16': float(m['margin_m16']),
+        'rule40_base': rule40_base, 'rule40_m16': float(m['rule40_m16']),
+        'evrev': evrev, 'evebitda_base': evebitda_base, 'evebitda_m16': evebitda_m16,
+        'growth_from_base': GROWTH_FROM_BASE, 'margin_from_base': MARGIN_FROM_BASE,
+        'growth_from_m16': m['growth_from_m16'], 'margin_from_m16': m['margin_from_m16'],
+        'dcf_base_20': dcf_base_20, 'dcf_base_15': dcf_base_15,
+        'dcf_m16_15': float(m['dcf_m16_15']['ev']), 'dcf_m16_20': float(m['dcf_m16_20']['ev']),
+        'dcf_m16_detail': dcf_detail(m['dcf_m16_15']), 'dcf_m16_tv': float(m['dcf_m16_15']['tv_pv']),
+        'take_rate_base': take_rate_base, 'take_rate_m16': float(m['take_rate_m16']),
+        'vol_val_base': vol_val_base, 'vol_val_m16': float(m['vol_val_m16']),
+        'rev_year5': rev_year5, 'exit_multiple': EXIT_MULTIPLE, 'exit_value': exit_value, 'vc_vals': vc_vals,
+        'r40_val_base': r40_val_base, 'r40_val_m16': float(m['r40_val_m16']),
+        'base_low': base_low, 'base_high': base_high, 'm16_low': m16_low, 'm16_high': m16_high,
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+# VALORIZACIÓN MONTE CARLO (modo simulación del tab Valuation)
+# ═══════════════════════════════════════════════════════════
+# driver → (distribución, parámetros), mismo formato que montecarlo.MC_DISTRIBUTIONS.
+# Centradas en los supuestos puntuales de run_valuation(); los extremos son los casos del tab.
+VALUATION_DISTRIBUTIONS = {
+    'rev_multiple': ('triangular', (6, 8, 11)),             # EV/Revenue M16 (Conservador / Base / Optimista)
+    'ebitda_multiple': ('triangular', (15, 20, 25)),
+    'wacc': ('triangular', (0.12, 0.15, 0.20)),
+    'terminal_growth': ('triangular', (0.02, 0.03, 0.04)),
+    'exit_multiple': ('triangular', (4, EXIT_MULTIPLE, 8)),
+    'irr': ('triangular', (0.25, 0.35, 0.45)),
+}
+
+VALUATION_MC_LABELS = {
+    'rev_multiple': 'EV/Revenue',
+    'ebitda_multiple': 'EV/EBITDA',
+    'wacc': 'WACC',
+    'terminal_growth': 'g terminal',
+    'exit_multiple': 'Múltiplo de exit',
+    'irr': 'IRR objetivo (VC)',
+}
+
+VALUATION_METHODS = ('EV/Revenue', 'EV/EBITDA', 'DCF', 'Volume-Based (GTV)', 'VC Method', 'Rule of 40 Adjusted')
+VALUATION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def run_valuation_mc(vi, n=100_000, seed=42, distributions=None):
+    """Los 6 métodos desde M16 con supuestos aleatorios, vectorizado sobre n sorteos.
+
+    Volume-Based y Rule of 40 no tienen múltiplo propio: se re-valorizan con
+    el mismo factor de mercado que EV/Revenue (rev_multiple / 8x). Devuelve
+    un dict con las muestras ('samples'), el EV por método y sorteo
+    ('values'), sus percentiles VALUATION_PERCENTILES, el rango de
+    convergencia por sorteo (descarta mín. y máx. de los 6) y su punto medio.
+    """
+    from .montecarlo import sample_drivers   # montecarlo importa el motor de escenarios completo
+
+    t0 = time.perf_counter()
+    s = sample_drivers(n, seed, distributions or VALUATION_DISTRIBUTIONS)
+    m = _methods_m16(vi)
+    market = s['rev_multiple'] / REV_MULTIPLES['Base']['m16']
+    rev_year5 = vi.rev_exit_monthly * 12
+    values = dict(zip(VALUATION_METHODS, (
+        m['rev_annual_m16'] * s['rev_multiple'],
+        m['ebitda_m16_annual'] * s['ebitda_multiple'],
+        dcf(m['rev_annual_m16'], m['growth_from_m16'], m['margin_from_m16'], s['wacc'], s['terminal_growth'])['ev'],
+        m['vol_val_m16'] * market,
+        rev_year5 * s['exit_multiple'] / (1 + s['irr']) ** 5,
+        m['r40_val_m16'] * market,
+    )))
+    low, high = _convergence(list(values.values()))
+    mid = (low + high) / 2
+    return {
+        'n': n,
+        'seed': seed,
+        'samples': s,
+        'values': values,
+        'percentiles': {k: np.percentile(v, VALUATION_PERCENTILES) for k, v in values.items()},
+        'low': low,
+        'high': high,
+        'mid_percentiles': np.percentile(mid, VALUATION_PERCENTILES),
+        'elapsed_ms': (time.perf_counter() - t0) * 1000,
+    }